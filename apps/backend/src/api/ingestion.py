@@ -1,15 +1,27 @@
 """Data Ingestion API endpoints."""
 import uuid
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import get_settings
 from src.database.connection import get_db
-from src.database.models import IngestionLog
-from src.api.schemas import IngestionRequest, IngestionStatusResponse
+from src.database.models import IngestionLog, IngestionSubscription, Organization
+from src.ingestion.backfill import enqueue_backfill
+from src.ingestion.jobs import JOB_HANDLERS, enqueue_job, request_cancel
+from src.ingestion.plans import build_plan, enqueue_planned_ingestion, load_active_subscriptions
+from src.api.schemas import (
+    BackfillRequest,
+    IngestionRequest,
+    IngestionStatusResponse,
+    IngestionSubscriptionCreate,
+    IngestionSubscriptionResponse,
+    PlannedIngestionRequest,
+    PlannedQueryResponse,
+)
 
 router = APIRouter()
 
@@ -17,12 +29,14 @@ router = APIRouter()
 @router.post("/trigger", response_model=IngestionStatusResponse)
 async def trigger_ingestion(
     request: IngestionRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ) -> IngestionStatusResponse:
     """
     Trigger a data ingestion job.
     
+    The job is queued in ``ingestion.ingestion_jobs`` and picked up by an
+    ingestion worker process (``python -m src.ingestion.worker``).
+    
     Supported sources:
     - sam_gov: SAM.gov opportunities
     - grants_gov: Grants.gov opportunities (planned)
@@ -32,19 +46,22 @@ async def trigger_ingestion(
     log = IngestionLog(
         source_system=request.source,
         status="queued",
-        metadata=request.params or {},
+        extra_metadata=request.params or {},
     )
     db.add(log)
-    await db.commit()
-    await db.refresh(log)
+    await db.flush()
     
-    # Queue background task
-    if request.source == "sam_gov":
-        background_tasks.add_task(
-            run_sam_gov_ingestion,
-            log.id,
-            request.params or {}
+    # Queue job for the ingestion workers
+    if request.source in JOB_HANDLERS:
+        await enqueue_job(
+            db,
+            job_type=request.source,
+            params=request.params or {},
+            ingestion_log_id=log.id,
+            max_attempts=get_settings().ingestion_job_max_attempts,
         )
+        await db.commit()
+        await db.refresh(log)
     else:
         # Update status for unsupported sources
         log.status = "failed"
@@ -66,6 +83,152 @@ async def trigger_ingestion(
     )
 
 
+@router.post("/backfill", response_model=IngestionStatusResponse)
+async def trigger_backfill(
+    request: BackfillRequest,
+    db: AsyncSession = Depends(get_db),
+) -> IngestionStatusResponse:
+    """
+    Queue a historical SAM.gov backfill.
+    
+    The range is split into day or week shards that the worker ingests in
+    parallel; completed shards are skipped if the job is resumed.
+    """
+    try:
+        log = await enqueue_backfill(
+            db,
+            request.start_date,
+            request.end_date,
+            shard=request.shard,
+            naics_codes=request.naics_codes,
+            notice_types=request.notice_types,
+            set_aside_codes=request.set_aside_codes,
+            shard_concurrency=request.shard_concurrency,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    await db.refresh(log)
+    
+    return IngestionStatusResponse(
+        id=log.id,
+        source_system=log.source_system,
+        status=log.status,
+        started_at=log.started_at,
+        completed_at=log.completed_at,
+        records_fetched=log.records_fetched,
+        records_inserted=log.records_inserted,
+        records_updated=log.records_updated,
+        records_failed=log.records_failed,
+        error_message=log.error_message,
+    )
+
+
+@router.post("/subscriptions", response_model=IngestionSubscriptionResponse, status_code=201)
+async def create_subscription(
+    data: IngestionSubscriptionCreate,
+    db: AsyncSession = Depends(get_db),
+) -> IngestionSubscriptionResponse:
+    """
+    Subscribe an organization to SAM.gov notices matching some filters.
+    
+    Active subscriptions are merged into the shared-fetch plan run by
+    ``POST /ingestion/plan/run``.
+    """
+    if not await db.get(Organization, data.organization_id):
+        raise HTTPException(status_code=404, detail="Organization not found")
+    
+    subscription = IngestionSubscription(**data.model_dump(), active=True)
+    db.add(subscription)
+    await db.commit()
+    await db.refresh(subscription)
+    
+    return IngestionSubscriptionResponse.model_validate(subscription)
+
+
+@router.get("/subscriptions", response_model=List[IngestionSubscriptionResponse])
+async def list_subscriptions(
+    organization_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_db),
+) -> List[IngestionSubscriptionResponse]:
+    """List active ingestion subscriptions."""
+    stmt = select(IngestionSubscription).where(
+        IngestionSubscription.active.is_(True)
+    ).order_by(IngestionSubscription.created_at)
+    
+    if organization_id:
+        stmt = stmt.where(IngestionSubscription.organization_id == organization_id)
+    
+    result = await db.execute(stmt)
+    return [
+        IngestionSubscriptionResponse.model_validate(subscription)
+        for subscription in result.scalars().all()
+    ]
+
+
+@router.delete("/subscriptions/{subscription_id}", status_code=204)
+async def delete_subscription(
+    subscription_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """Deactivate an ingestion subscription."""
+    subscription = await db.get(IngestionSubscription, subscription_id)
+    if not subscription:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    
+    subscription.active = False
+    await db.commit()
+
+
+@router.get("/plan", response_model=List[PlannedQueryResponse])
+async def get_ingestion_plan(
+    db: AsyncSession = Depends(get_db),
+) -> List[PlannedQueryResponse]:
+    """Show the SAM.gov queries that cover all active subscriptions."""
+    queries = build_plan(await load_active_subscriptions(db))
+    return [
+        PlannedQueryResponse(
+            **query.filters,
+            subscription_ids=query.subscription_ids,
+            organization_ids=query.organization_ids,
+        )
+        for query in queries
+    ]
+
+
+@router.post("/plan/run", response_model=IngestionStatusResponse)
+async def run_ingestion_plan(
+    request: PlannedIngestionRequest,
+    db: AsyncSession = Depends(get_db),
+) -> IngestionStatusResponse:
+    """
+    Queue one shared-fetch ingestion for all active subscriptions.
+    
+    Each notice is fetched and stored once and scored against every
+    subscribing organization whose filters it matches.
+    """
+    log = await enqueue_planned_ingestion(
+        db,
+        limit=request.limit,
+        incremental=request.incremental,
+    )
+    await db.commit()
+    await db.refresh(log)
+    
+    return IngestionStatusResponse(
+        id=log.id,
+        source_system=log.source_system,
+        status=log.status,
+        started_at=log.started_at,
+        completed_at=log.completed_at,
+        records_fetched=log.records_fetched,
+        records_inserted=log.records_inserted,
+        records_updated=log.records_updated,
+        records_failed=log.records_failed,
+        error_message=log.error_message,
+    )
+
+
 @router.get("/status/{ingestion_id}", response_model=IngestionStatusResponse)
 async def get_ingestion_status(
     ingestion_id: uuid.UUID,
@@ -93,6 +256,38 @@ async def get_ingestion_status(
     )
 
 
+@router.post("/cancel/{ingestion_id}", response_model=IngestionStatusResponse)
+async def cancel_ingestion(
+    ingestion_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+) -> IngestionStatusResponse:
+    """
+    Cancel an ingestion job.
+    
+    Queued jobs are cancelled immediately; running jobs stop after the
+    page they are currently storing.
+    """
+    job = await request_cancel(db, ingestion_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    await db.commit()
+    
+    log = await db.get(IngestionLog, ingestion_id)
+    
+    return IngestionStatusResponse(
+        id=log.id,
+        source_system=log.source_system,
+        status=log.status,
+        started_at=log.started_at,
+        completed_at=log.completed_at,
+        records_fetched=log.records_fetched,
+        records_inserted=log.records_inserted,
+        records_updated=log.records_updated,
+        records_failed=log.records_failed,
+        error_message=log.error_message,
+    )
+
+
 @router.get("/history")
 async def get_ingestion_history(
     source: Optional[str] = None,
@@ -123,58 +318,3 @@ async def get_ingestion_history(
         )
         for log in logs
     ]
-
-
-async def run_sam_gov_ingestion(ingestion_id: uuid.UUID, params: dict):
-    """
-    Background task to run SAM.gov ingestion.
-    
-    This is a placeholder - actual implementation uses the 
-    src.ingestion.sam_gov module.
-    """
-    from src.database.connection import async_session_factory
-    from src.ingestion.sam_gov import SAMGovIngester
-    from src.config import get_settings
-    
-    settings = get_settings()
-    
-    async with async_session_factory() as db:
-        # Update status to running
-        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
-        result = await db.execute(stmt)
-        log = result.scalar_one_or_none()
-        
-        if not log:
-            return
-        
-        log.status = "running"
-        await db.commit()
-        
-        try:
-            # Run ingestion
-            ingester = SAMGovIngester(
-                api_key=settings.sam_gov_api_key,
-                db_session=db,
-            )
-            
-            stats = await ingester.ingest(
-                naics_codes=params.get("naics_codes"),
-                posted_from=params.get("posted_from"),
-                limit=params.get("limit", 100),
-            )
-            
-            # Update log with results
-            log.status = "completed"
-            log.completed_at = datetime.now(timezone.utc)
-            log.records_fetched = stats.get("fetched", 0)
-            log.records_inserted = stats.get("inserted", 0)
-            log.records_updated = stats.get("updated", 0)
-            log.records_failed = stats.get("failed", 0)
-            
-        except Exception as e:
-            log.status = "failed"
-            log.completed_at = datetime.now(timezone.utc)
-            log.error_message = str(e)
-        
-        await db.commit()
-
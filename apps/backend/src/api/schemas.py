@@ -1,6 +1,6 @@
 """Pydantic schemas for API request/response models."""
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional, List, Dict, Any
 
@@ -160,6 +160,97 @@ class RelevanceScoreListResponse(BaseModel):
     organization_id: uuid.UUID
 
 
+class SemanticMatchResponse(BaseModel):
+    """Opportunity matched through the term index."""
+    opportunity_id: uuid.UUID
+    semantic_score: float
+
+
+class SemanticMatchListResponse(BaseModel):
+    """Best semantic matches for an organization."""
+    items: List[SemanticMatchResponse]
+    organization_id: uuid.UUID
+
+
+class RankedOpportunityResponse(BaseModel):
+    """Opportunity with its relevance score, computed on request."""
+    opportunity_id: uuid.UUID
+    title: str
+    overall_score: float
+    naics_score: float
+    semantic_score: float
+    geographic_score: float
+    size_score: float
+    past_performance_score: float
+    explanation: str
+
+
+class RankedOpportunityListResponse(BaseModel):
+    """Best opportunities for an organization across the open corpus."""
+    items: List[RankedOpportunityResponse]
+    organization_id: uuid.UUID
+    considered: int
+    scored: int
+
+
+class CandidateScoringResponse(BaseModel):
+    """Result of scoring an organization's candidate opportunities."""
+    organization_id: uuid.UUID
+    candidates: int
+    scored: int
+
+
+class CandidateRecallResponse(BaseModel):
+    """Candidate filter recall against full scoring of a corpus sample."""
+    organization_id: uuid.UUID
+    corpus: int
+    candidates: int
+    reduction: Optional[float] = None
+    sampled: int
+    relevant: int
+    relevant_kept: int
+    recall: Optional[float] = None
+    dropped_by: Dict[str, int] = {}
+    min_score: float
+
+
+class WeightProfileRequest(BaseModel):
+    """Relevance component weights; scaled to sum to 1 when saved."""
+    naics: float = Field(..., ge=0)
+    semantic: float = Field(..., ge=0)
+    geographic: float = Field(..., ge=0)
+    size: float = Field(..., ge=0)
+    past_performance: float = Field(..., ge=0)
+
+
+class WeightProfileResponse(BaseModel):
+    """An organization's relevance component weights."""
+    organization_id: uuid.UUID
+    weights: Dict[str, float]
+    custom: bool
+    # Stored scores re-weighted by the change, when one was made
+    rescored: Optional[int] = None
+
+
+class ReweightedScoreResponse(BaseModel):
+    """Stored relevance score re-weighted under other component weights."""
+    opportunity_id: uuid.UUID
+    overall_score: float
+    stored_overall_score: float
+    naics_score: Optional[float] = None
+    semantic_score: Optional[float] = None
+    geographic_score: Optional[float] = None
+    size_score: Optional[float] = None
+    past_performance_score: Optional[float] = None
+
+
+class ReweightedScoreListResponse(BaseModel):
+    """An organization's stored scores ranked under the given weights."""
+    items: List[ReweightedScoreResponse]
+    organization_id: uuid.UUID
+    weights: Dict[str, float]
+
+
 # ============ Risk Assessment Schemas ============
 
 class RiskAssessmentRequest(BaseModel):
@@ -203,6 +294,49 @@ class IngestionRequest(BaseModel):
     params: Optional[Dict[str, Any]] = None
 
 
+class BackfillRequest(BaseModel):
+    """Request to backfill a historical SAM.gov date range."""
+    start_date: date
+    end_date: date
+    shard: str = Field("week", pattern="^(day|week)$")
+    naics_codes: Optional[List[str]] = None
+    notice_types: Optional[List[str]] = None
+    set_aside_codes: Optional[List[str]] = None
+    shard_concurrency: Optional[int] = Field(None, ge=1, le=32)
+
+
+class IngestionSubscriptionCreate(BaseModel):
+    """Request to subscribe an organization to SAM.gov notices."""
+    organization_id: uuid.UUID
+    naics_codes: Optional[List[str]] = None
+    notice_types: Optional[List[str]] = None
+    set_aside_codes: Optional[List[str]] = None
+
+
+class IngestionSubscriptionResponse(IngestionSubscriptionCreate):
+    """Ingestion subscription response."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
+    active: bool
+    created_at: datetime
+
+
+class PlannedQueryResponse(BaseModel):
+    """One SAM.gov query of the shared-fetch plan."""
+    naics_codes: List[str]
+    notice_types: List[str]
+    set_aside_codes: List[str]
+    subscription_ids: List[uuid.UUID]
+    organization_ids: List[uuid.UUID]
+
+
+class PlannedIngestionRequest(BaseModel):
+    """Request to run the shared-fetch plan."""
+    limit: Optional[int] = Field(None, ge=1)
+    incremental: bool = True
+
+
 class IngestionStatusResponse(BaseModel):
     """Ingestion status response."""
     id: uuid.UUID
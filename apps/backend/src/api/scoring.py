@@ -1,27 +1,50 @@
 """Relevance Scoring API endpoints."""
 import uuid
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.connection import get_db
+from src.config import get_settings
 from src.database.models import Organization, Opportunity, RelevanceScore
+from src.ingestion.scoring import score_opportunities
+from src.services import embeddings
+from src.services.candidates import generate_candidates, measure_recall
+from src.services.embeddings import get_embedding_engine
+from src.services.ranking import rank_opportunities
 from src.services.relevance_scorer import RelevanceScorer
+from src.services.term_index import current_term_index, match_opportunities
+from src.services.weight_profiles import (
+    normalize_weights, profile_weights, rerank_stored_scores, save_weight_profile,
+)
 from src.api.schemas import (
     RelevanceScoreRequest, RelevanceScoreBatchRequest,
-    RelevanceScoreResponse, RelevanceScoreListResponse
+    RelevanceScoreResponse, RelevanceScoreListResponse,
+    SemanticMatchResponse, SemanticMatchListResponse,
+    RankedOpportunityResponse, RankedOpportunityListResponse,
+    CandidateScoringResponse, CandidateRecallResponse,
+    WeightProfileRequest, WeightProfileResponse,
+    ReweightedScoreResponse, ReweightedScoreListResponse,
 )
 
 router = APIRouter()
-scorer = RelevanceScorer()
+
+
+async def get_scorer(db: AsyncSession = Depends(get_db)) -> RelevanceScorer:
+    """Scorer using local embeddings, or else the term index, for semantic scores."""
+    return RelevanceScorer(
+        term_index=await current_term_index(db),
+        embeddings=get_embedding_engine(),
+    )
 
 
 @router.post("/calculate", response_model=RelevanceScoreResponse)
 async def calculate_relevance_score(
     request: RelevanceScoreRequest,
     db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
 ) -> RelevanceScoreResponse:
     """
     Calculate relevance score between an organization and an opportunity.
@@ -97,6 +120,7 @@ async def calculate_relevance_score(
 async def calculate_batch_scores(
     request: RelevanceScoreBatchRequest,
     db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
 ) -> RelevanceScoreListResponse:
     """
     Calculate relevance scores for multiple opportunities.
@@ -123,9 +147,11 @@ async def calculate_batch_scores(
             detail="Some opportunity IDs were not found"
         )
     
+    matrix = scorer.score_matrix([organization], opportunities)
+    
     scores = []
-    for opportunity in opportunities:
-        result = await scorer.calculate_score(organization, opportunity)
+    for j, opportunity in enumerate(matrix.opportunities):
+        result = matrix.result(0, j)
         
         score_record = RelevanceScore(
             organization_id=request.organization_id,
@@ -157,17 +183,25 @@ async def get_organization_scores(
     organization_id: uuid.UUID,
     min_score: float = 0.0,
     limit: int = 50,
+    active_only: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> RelevanceScoreListResponse:
     """
     Get all relevance scores for an organization.
     
-    Returns scores sorted by overall_score descending.
+    Returns scores sorted by overall_score descending. The score
+    maintainer keeps these current for every active opportunity;
+    active_only leaves out scores of notices archived since.
     """
     stmt = select(RelevanceScore).where(
         RelevanceScore.organization_id == organization_id,
         RelevanceScore.overall_score >= min_score,
-    ).order_by(RelevanceScore.overall_score.desc()).limit(limit)
+    )
+    if active_only:
+        stmt = stmt.join(Opportunity, Opportunity.id == RelevanceScore.opportunity_id).where(
+            Opportunity.status == "active"
+        )
+    stmt = stmt.order_by(RelevanceScore.overall_score.desc()).limit(limit)
     
     result = await db.execute(stmt)
     scores = result.scalars().all()
@@ -178,6 +212,288 @@ async def get_organization_scores(
     )
 
 
+@router.get("/organization/{organization_id}/matches", response_model=SemanticMatchListResponse)
+async def get_semantic_matches(
+    organization_id: uuid.UUID,
+    min_score: float = 0.0,
+    limit: int = Query(50, ge=1, le=500),
+    method: str = Query("terms", pattern="^(terms|embeddings)$"),
+    db: AsyncSession = Depends(get_db),
+) -> SemanticMatchListResponse:
+    """
+    Find active opportunities matching an organization's narratives.
+    
+    With ``method=terms`` looks up the postings of the organization's
+    query terms in the term index; with ``method=embeddings`` searches the
+    local vector index for the nearest opportunity embeddings. Neither
+    scores every opportunity. Returns semantic scores only, best first.
+    """
+    org_result = await db.execute(
+        select(Organization).where(Organization.id == organization_id)
+    )
+    organization = org_result.scalar_one_or_none()
+    if not organization:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    
+    matches = []
+    if method == "embeddings":
+        engine = get_embedding_engine()
+        if engine is None:
+            raise HTTPException(status_code=400, detail="Embeddings are not enabled")
+        matches = await embeddings.match_opportunities(engine, db, organization, limit=limit, min_score=min_score)
+    else:
+        index = await current_term_index(db)
+        if index is not None:
+            matches = await match_opportunities(db, index, organization, limit=limit, min_score=min_score)
+            # The stored query vector may have been refreshed
+            await db.commit()
+    
+    return SemanticMatchListResponse(
+        items=[
+            SemanticMatchResponse(opportunity_id=opportunity_id, semantic_score=round(score, 4))
+            for opportunity_id, score in matches
+        ],
+        organization_id=organization_id,
+    )
+
+
+async def _get_organization(db: AsyncSession, organization_id: uuid.UUID) -> Organization:
+    org_result = await db.execute(
+        select(Organization).where(Organization.id == organization_id)
+    )
+    organization = org_result.scalar_one_or_none()
+    if not organization:
+        raise HTTPException(status_code=404, detail="Organization not found")
+    return organization
+
+
+@router.get("/organization/{organization_id}/top", response_model=RankedOpportunityListResponse)
+async def get_top_opportunities(
+    organization_id: uuid.UUID,
+    k: int = Query(50, ge=1, le=500),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> RankedOpportunityListResponse:
+    """
+    Rank every open, active opportunity for an organization.
+    
+    Scores are computed on request (nothing is stored). Opportunities
+    whose best possible score cannot reach the current k-th result are
+    skipped; ``scored`` reports how many were scored in full.
+    """
+    organization = await _get_organization(db, organization_id)
+    top = await rank_opportunities(db, scorer, organization, k=k, min_score=min_score)
+    
+    return RankedOpportunityListResponse(
+        items=[
+            RankedOpportunityResponse(
+                opportunity_id=opportunity.id,
+                title=opportunity.title,
+                overall_score=result.overall_score,
+                naics_score=result.naics_score,
+                semantic_score=result.semantic_score,
+                geographic_score=result.geographic_score,
+                size_score=result.size_score,
+                past_performance_score=result.past_performance_score,
+                explanation=result.explanation,
+            )
+            for opportunity, result in top.results
+        ],
+        organization_id=organization_id,
+        considered=top.considered,
+        scored=top.scored,
+    )
+
+
+@router.post("/organization/{organization_id}/candidates", response_model=CandidateScoringResponse)
+async def score_candidates(
+    organization_id: uuid.UUID,
+    state_radius: Optional[int] = Query(None, ge=0, le=5),
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> CandidateScoringResponse:
+    """
+    Score and store an organization's candidate opportunities.
+    
+    Candidates are the active, open opportunities in the organization's
+    NAICS sectors that it is eligible to bid on (and, with
+    ``state_radius``, performed within that many adjacent states). Only
+    these are run through full relevance scoring.
+    """
+    organization = await _get_organization(db, organization_id)
+    if state_radius is None:
+        state_radius = get_settings().candidate_state_radius
+    
+    candidates = await generate_candidates(db, scorer, organization, state_radius)
+    scored = await score_opportunities(db, [organization], candidates, scorer)
+    await db.commit()
+    
+    return CandidateScoringResponse(
+        organization_id=organization_id,
+        candidates=len(candidates),
+        scored=scored,
+    )
+
+
+@router.get("/organization/{organization_id}/candidates/recall", response_model=CandidateRecallResponse)
+async def get_candidate_recall(
+    organization_id: uuid.UUID,
+    min_score: float = Query(0.6, ge=0.0, le=1.0),
+    sample: int = Query(2000, ge=1, le=20000),
+    state_radius: Optional[int] = Query(None, ge=0, le=5),
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> CandidateRecallResponse:
+    """
+    Measure how many relevant opportunities candidate generation keeps.
+    
+    Scores a random sample of the active, open corpus in full; recall is
+    the share of sampled opportunities scoring at least ``min_score`` that
+    pass the candidate filter, reduction the share of the corpus it drops.
+    """
+    organization = await _get_organization(db, organization_id)
+    if state_radius is None:
+        state_radius = get_settings().candidate_state_radius
+    
+    report = await measure_recall(db, scorer, organization, min_score, sample, state_radius)
+    
+    return CandidateRecallResponse(
+        organization_id=organization_id,
+        corpus=report.corpus,
+        candidates=report.candidates,
+        reduction=round(report.reduction, 4) if report.reduction is not None else None,
+        sampled=report.sampled,
+        relevant=report.relevant,
+        relevant_kept=report.relevant_kept,
+        recall=round(report.recall, 4) if report.recall is not None else None,
+        dropped_by=report.dropped_by,
+        min_score=min_score,
+    )
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+@router.get("/organization/{organization_id}/weights", response_model=WeightProfileResponse)
+async def get_weight_profile(
+    organization_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> WeightProfileResponse:
+    """Get the component weights an organization is scored with."""
+    organization = await _get_organization(db, organization_id)
+    return WeightProfileResponse(
+        organization_id=organization_id,
+        weights=profile_weights(scorer, organization),
+        custom=organization.scoring_weights is not None,
+    )
+
+
+@router.put("/organization/{organization_id}/weights", response_model=WeightProfileResponse)
+async def set_weight_profile(
+    organization_id: uuid.UUID,
+    request: WeightProfileRequest,
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> WeightProfileResponse:
+    """
+    Save a custom weight profile for an organization.
+    
+    Stored scores are re-weighted from their stored components in a
+    single UPDATE; nothing is re-scored.
+    """
+    organization = await _get_organization(db, organization_id)
+    try:
+        rescored = await save_weight_profile(db, scorer, organization, request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    
+    return WeightProfileResponse(
+        organization_id=organization_id,
+        weights=profile_weights(scorer, organization),
+        custom=True,
+        rescored=rescored,
+    )
+
+
+@router.delete("/organization/{organization_id}/weights", response_model=WeightProfileResponse)
+async def clear_weight_profile(
+    organization_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> WeightProfileResponse:
+    """Return an organization to the default weights, re-weighting its stored scores."""
+    organization = await _get_organization(db, organization_id)
+    rescored = await save_weight_profile(db, scorer, organization, None)
+    await db.commit()
+    
+    return WeightProfileResponse(
+        organization_id=organization_id,
+        weights=profile_weights(scorer, organization),
+        custom=False,
+        rescored=rescored,
+    )
+
+
+@router.get("/organization/{organization_id}/reweighted", response_model=ReweightedScoreListResponse)
+async def get_reweighted_scores(
+    organization_id: uuid.UUID,
+    naics: Optional[float] = Query(None, ge=0),
+    semantic: Optional[float] = Query(None, ge=0),
+    geographic: Optional[float] = Query(None, ge=0),
+    size: Optional[float] = Query(None, ge=0),
+    past_performance: Optional[float] = Query(None, ge=0),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    scorer: RelevanceScorer = Depends(get_scorer),
+) -> ReweightedScoreListResponse:
+    """
+    Rank an organization's stored scores under what-if weights.
+    
+    Weights not given keep the organization's current value; the result
+    is scaled to sum to 1. Stored components are re-weighted in SQL and
+    nothing is written.
+    """
+    organization = await _get_organization(db, organization_id)
+    overrides = {
+        "naics": naics,
+        "semantic": semantic,
+        "geographic": geographic,
+        "size": size,
+        "past_performance": past_performance,
+    }
+    weights = profile_weights(scorer, organization)
+    weights.update({name: value for name, value in overrides.items() if value is not None})
+    try:
+        weights = normalize_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    rows = await rerank_stored_scores(db, organization_id, weights, limit=limit, min_score=min_score)
+    
+    return ReweightedScoreListResponse(
+        items=[
+            ReweightedScoreResponse(
+                opportunity_id=row.opportunity_id,
+                overall_score=float(row.overall_score),
+                stored_overall_score=float(row.stored_overall_score),
+                naics_score=_float(row.naics_score),
+                semantic_score=_float(row.semantic_score),
+                geographic_score=_float(row.geographic_score),
+                size_score=_float(row.size_score),
+                past_performance_score=_float(row.past_performance_score),
+            )
+            for row in rows
+        ],
+        organization_id=organization_id,
+        weights=weights,
+    )
+
+
 @router.get("/{score_id}", response_model=RelevanceScoreResponse)
 async def get_score(
     score_id: uuid.UUID,
@@ -27,6 +27,31 @@ class Settings(BaseSettings):
     # SAM.gov API
     sam_gov_api_key: Optional[str] = None
     sam_gov_base_url: str = "https://api.sam.gov/opportunities/v2"
+    sam_gov_max_concurrency: int = 4
+    sam_gov_watermark_overlap_days: int = 1
+    sam_gov_requests_per_second: float = 2.0
+    sam_gov_rate_limit_burst: int = 5
+    sam_gov_max_retries: int = 5
+    sam_gov_max_connections: int = 10
+    sam_gov_keepalive_seconds: float = 30.0
+    sam_gov_description_concurrency: int = 8
+    sam_gov_stream_json: bool = True
+    sam_gov_backfill_shard_concurrency: int = 4
+    sam_gov_csv_chunk_size: int = 20000
+    sam_gov_csv_parse_workers: int = 4
+    sam_gov_reparse_batch_size: int = 2000
+    sam_gov_reparse_workers: int = 4
+    sam_gov_plan_query_concurrency: int = 2
+    sam_gov_refresh_requests_per_hour: int = 600
+    sam_gov_refresh_tick_seconds: float = 30.0
+    
+    # Ingestion workers
+    ingestion_worker_concurrency: int = 2
+    ingestion_worker_poll_seconds: float = 5.0
+    ingestion_job_stale_seconds: int = 300
+    ingestion_job_max_attempts: int = 3
+    ingestion_pipeline_queue_size: int = 4
+    ingestion_hydrate_workers: int = 2
     
     # OpenAI
     openai_api_key: Optional[str] = None
@@ -44,6 +69,36 @@ class Settings(BaseSettings):
         "size": 0.15,
         "past_performance": 0.15
     }
+    # Organizations and opportunities whose derived scoring features are cached
+    feature_cache_size: int = 10000
+    # Seconds a loaded term index snapshot is reused before reloading
+    term_index_refresh_seconds: float = 300.0
+    # Score only candidates (NAICS sector, set-aside, open deadline) for whole-corpus organizations
+    candidate_generation_enabled: bool = True
+    # Place-of-performance state hops kept by candidate generation; unset disables the rule
+    candidate_state_radius: Optional[int] = None
+    # Seconds the encoded corpus used by top-K ranking is reused before rebuilding
+    ranking_corpus_refresh_seconds: float = 300.0
+    # Score maintainer (src.ingestion.score_maintainer)
+    score_maintainer_tick_seconds: float = 30.0
+    # Changes younger than this are left for the next round, so rows from
+    # still-open transactions are not skipped past
+    score_maintainer_settle_seconds: float = 60.0
+    # Changed opportunities (or active opportunities per changed-organization page) per batch
+    score_maintainer_batch_size: int = 1000
+    
+    # Local Embeddings ("hashing" or "sentence-transformers"; unset disables them)
+    embedding_backend: Optional[str] = None
+    # Model name or local path for sentence-transformers; never downloaded
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_dimension: int = 384
+    embedding_batch_size: int = 64
+    # Shared by every process on the host
+    embedding_index_dir: str = "/var/lib/aureon/embeddings"
+    embedding_max_segments: int = 16
+    embedding_ivf_probes: int = 8
+    # Vectors embedded on demand kept per process until the index stores them
+    embedding_pending_max: int = 20000
     
     # Rate Limiting
     rate_limit_requests: int = 100
@@ -1,6 +1,6 @@
 """Database package for Aureon."""
 from src.database.connection import get_db, init_db, close_db
-from src.database.models import Organization, Opportunity, RelevanceScore, RiskAssessment
+from src.database.models import Organization, Opportunity, OpportunityRaw, RelevanceScore, RiskAssessment
 
 __all__ = [
     "get_db",
@@ -8,6 +8,7 @@ __all__ = [
     "close_db",
     "Organization",
     "Opportunity",
+    "OpportunityRaw",
     "RelevanceScore",
     "RiskAssessment",
 ]
@@ -5,8 +5,8 @@ from decimal import Decimal
 from typing import Optional, List
 
 from sqlalchemy import (
-    Column, String, Text, Integer, Numeric, DateTime, Boolean,
-    ForeignKey, CheckConstraint, UniqueConstraint, Index, JSON
+    Column, String, Text, Integer, BigInteger, Numeric, DateTime, Boolean,
+    ForeignKey, CheckConstraint, UniqueConstraint, Index, JSON, text
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -52,6 +52,9 @@ class Organization(Base):
     capabilities_narrative: Mapped[Optional[str]] = mapped_column(Text)
     past_performance_summary: Mapped[Optional[str]] = mapped_column(Text)
     
+    # Relevance component weights (normalized); None scores with the defaults
+    scoring_weights: Mapped[Optional[dict]] = mapped_column(JSONB)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -132,8 +135,16 @@ class Opportunity(Base):
     attachments: Mapped[list] = mapped_column(JSONB, default=list)
     amendments: Mapped[list] = mapped_column(JSONB, default=list)
     
-    # Raw data and timestamps
-    raw_data: Mapped[Optional[dict]] = mapped_column(JSONB)
+    # Change detection (hash of the normalized payload, per-field hashes,
+    # and the fields that differed on the last real update)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64))
+    field_hashes: Mapped[dict] = mapped_column(JSONB, default=dict)
+    changed_fields: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
+    
+    # SAMGovIngester.PARSER_VERSION that produced the parsed columns
+    parser_version: Mapped[Optional[int]] = mapped_column(Integer)
+    
+    # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     ingested_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
@@ -141,6 +152,79 @@ class Opportunity(Base):
     # Relationships
     relevance_scores: Mapped[List["RelevanceScore"]] = relationship(back_populates="opportunity", cascade="all, delete-orphan")
     risk_assessments: Mapped[List["RiskAssessment"]] = relationship(back_populates="opportunity", cascade="all, delete-orphan")
+    # Never loaded implicitly; use selectinload(Opportunity.raw) or query OpportunityRaw
+    raw: Mapped[Optional["OpportunityRaw"]] = relationship(
+        back_populates="opportunity", cascade="all, delete-orphan", passive_deletes=True, lazy="raise"
+    )
+
+
+class OpportunityRaw(Base):
+    """Source payload of an opportunity, kept out of the hot opportunities table."""
+    __tablename__ = "opportunity_raw"
+    __table_args__ = {"schema": "aureon"}
+    
+    opportunity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("aureon.opportunities.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Stored with lz4 TOAST compression (see init-db.sql)
+    raw_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    opportunity: Mapped["Opportunity"] = relationship(back_populates="raw")
+
+
+class OpportunityTerm(Base):
+    """Posting of a term in an opportunity's title and description (see src.services.term_index)."""
+    __tablename__ = "opportunity_terms"
+    __table_args__ = (
+        Index("idx_opportunity_terms_opportunity", "opportunity_id"),
+        {"schema": "aureon"}
+    )
+    
+    term: Mapped[str] = mapped_column(Text, primary_key=True)
+    opportunity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("aureon.opportunities.id", ondelete="CASCADE"), primary_key=True
+    )
+    term_frequency: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Token count of the whole document, for BM25 length normalization
+    doc_length: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class TermStat(Base):
+    """Number of indexed opportunities containing a term."""
+    __tablename__ = "term_stats"
+    __table_args__ = {"schema": "aureon"}
+    
+    term: Mapped[str] = mapped_column(Text, primary_key=True)
+    doc_freq: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class TermCorpus(Base):
+    """Single-row totals of the term index."""
+    __tablename__ = "term_corpus"
+    __table_args__ = (
+        CheckConstraint("id", name="chk_term_corpus_single_row"),
+        {"schema": "aureon"}
+    )
+    
+    id: Mapped[bool] = mapped_column(Boolean, primary_key=True, default=True)
+    doc_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_length: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class OrganizationQueryVector(Base):
+    """Precomputed term-index query vector of an organization's narratives."""
+    __tablename__ = "organization_query_vectors"
+    __table_args__ = {"schema": "aureon"}
+    
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("aureon.organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    # {term: weight}, weights summing to 1
+    terms: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Corpus size the IDF weights were computed against
+    doc_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
 class RelevanceScore(Base):
@@ -248,3 +332,147 @@ class IngestionLog(Base):
     error_message: Mapped[Optional[str]] = mapped_column(Text)
     extra_metadata: Mapped[dict] = mapped_column(JSONB, default=dict, name="metadata")
 
+
+
+class IngestionWatermark(Base):
+    """High-water mark of the last successful ingestion per source and filter set."""
+    __tablename__ = "ingestion_watermarks"
+    __table_args__ = (
+        UniqueConstraint("source_system", "filter_key", name="uq_watermark_source_filter"),
+        {"schema": "ingestion"}
+    )
+    
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    source_system: Mapped[str] = mapped_column(String(50), nullable=False)
+    filter_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    filters: Mapped[dict] = mapped_column(JSONB, default=dict)
+    
+    # Latest posted / last-modified dates seen by a successful run
+    last_posted_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_modified_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    
+    ingestion_log_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("ingestion.ingestion_logs.id", ondelete="SET NULL")
+    )
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DescriptionCache(Base):
+    """Notice description text fetched from SAM.gov, keyed by last modification."""
+    __tablename__ = "description_cache"
+    __table_args__ = {"schema": "ingestion"}
+    
+    notice_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # modifiedDate (or postedDate) as sent by the API; a new value means refetch
+    last_modified: Mapped[str] = mapped_column(String(40), primary_key=True)
+    description: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class IngestionJob(Base):
+    """Durable ingestion job consumed by worker processes."""
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('queued', 'running', 'completed', 'failed', 'cancelled')",
+            name="chk_ingestion_job_status"
+        ),
+        Index("idx_ingestion_jobs_claim", "status", "available_at"),
+        {"schema": "ingestion"}
+    )
+    
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    ingestion_log_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("ingestion.ingestion_logs.id", ondelete="CASCADE")
+    )
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    params: Mapped[dict] = mapped_column(JSONB, default=dict)
+    
+    # Scheduling
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    priority: Mapped[int] = mapped_column(Integer, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    
+    # Progress and control
+    checkpoint: Mapped[dict] = mapped_column(JSONB, default=dict)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(100))
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
+    
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class IngestionSubscription(Base):
+    """SAM.gov filters an organization wants ingested and scored."""
+    __tablename__ = "ingestion_subscriptions"
+    __table_args__ = (
+        Index("idx_ingestion_subscriptions_org", "organization_id"),
+        {"schema": "ingestion"}
+    )
+    
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("aureon.organizations.id", ondelete="CASCADE"), nullable=False
+    )
+    
+    # Same filters as an ad-hoc SAM.gov ingestion; empty means "any"
+    naics_codes: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
+    notice_types: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
+    set_aside_codes: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text))
+    active: Mapped[bool] = mapped_column(Boolean, default=True)
+    
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NoticeRefresh(Base):
+    """Refresh schedule of a tracked SAM.gov notice (see src.ingestion.refresh)."""
+    __tablename__ = "notice_refresh"
+    __table_args__ = (
+        Index(
+            "idx_notice_refresh_due", "priority", "next_refresh_at",
+            postgresql_where=text("retired_at IS NULL"),
+        ),
+        {"schema": "ingestion"}
+    )
+    
+    opportunity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("aureon.opportunities.id", ondelete="CASCADE"), primary_key=True
+    )
+    source_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    
+    # Refresh tier; lower priority values are refreshed first
+    tier: Mapped[str] = mapped_column(String(20), nullable=False)
+    priority: Mapped[int] = mapped_column(Integer, nullable=False)
+    next_refresh_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    
+    last_refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    last_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    refresh_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Set once the notice is past its archive date and no longer refreshed
+    retired_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class ScoreWatermark(Base):
+    """Last organization or opportunity change applied to the relevance scores."""
+    __tablename__ = "score_watermarks"
+    __table_args__ = {"schema": "ingestion"}
+    
+    # "organizations" or "opportunities"
+    entity: Mapped[str] = mapped_column(String(20), primary_key=True)
+    # (updated_at, id) of the last row applied, in that order
+    last_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
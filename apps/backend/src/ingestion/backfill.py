@@ -0,0 +1,295 @@
+"""
+SAM.gov Historical Backfill
+
+Splits a long posted-date range into day or week shards and ingests them
+concurrently through ``SAMGovIngester``. Small windows keep every query
+well under the API's result caps, and per-shard progress is kept in the
+job checkpoint so an interrupted backfill resumes where it stopped.
+
+Backfills run as ``sam_gov_backfill`` jobs on the ingestion workers.
+
+Usage:
+    python -m src.ingestion.backfill --start 2022-01-01 --end 2024-12-31 --shard week
+"""
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import click
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import IngestionLog
+
+if TYPE_CHECKING:
+    from src.ingestion.jobs import JobContext
+
+logger = structlog.get_logger()
+
+SHARD_SIZES = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+}
+
+STAT_KEYS = ("fetched", "inserted", "updated", "unchanged", "failed", "pages")
+
+
+def build_shards(start: date, end: date, shard: str = "week") -> List[Tuple[date, date]]:
+    """
+    Split an inclusive date range into consecutive shards.
+    
+    Args:
+        start: First posted date
+        end: Last posted date (inclusive)
+        shard: Shard size, ``day`` or ``week``
+    
+    Returns:
+        List of inclusive (from, to) date pairs covering the range
+    """
+    if shard not in SHARD_SIZES:
+        raise ValueError(f"Unknown shard size '{shard}'")
+    if end < start:
+        raise ValueError("Backfill end date is before start date")
+    
+    step = SHARD_SIZES[shard]
+    shards = []
+    current = start
+    while current <= end:
+        shard_end = min(current + step - timedelta(days=1), end)
+        shards.append((current, shard_end))
+        current = shard_end + timedelta(days=1)
+    return shards
+
+
+async def run_sam_gov_backfill(
+    ingestion_id: uuid.UUID,
+    params: dict,
+    context: Optional["JobContext"] = None,
+):
+    """
+    Run a sharded SAM.gov backfill for an ingestion log entry.
+    
+    ``params`` holds ``start_date`` and ``end_date`` (ISO dates), ``shard``
+    and the usual NAICS / notice type / set-aside filters. Each shard gets
+    its own database session; all shards share one rate-limited HTTP
+    client, so the configured quota applies to the backfill as a whole.
+    Backfills do not move the incremental watermark, so a shard counts
+    as done only once every page of its window stored without failed
+    records; otherwise the backfill fails and a retry resumes the shard
+    from its stored pages.
+    """
+    from src.database.connection import async_session_factory
+    from src.ingestion.sam_gov import SAMGovIngester, create_sam_gov_client
+    from src.config import get_settings
+    
+    settings = get_settings()
+    checkpoint = context.checkpoint if context else {}
+    shard_state: Dict[str, Dict[str, Any]] = checkpoint.setdefault("shards", {})
+    
+    shards = build_shards(
+        date.fromisoformat(params["start_date"]),
+        date.fromisoformat(params["end_date"]),
+        params.get("shard", "week"),
+    )
+    concurrency = params.get("shard_concurrency") or settings.sam_gov_backfill_shard_concurrency
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    client = create_sam_gov_client()
+    incomplete_shards: List[str] = []
+    
+    async def run_shard(shard_from: date, shard_to: date) -> None:
+        key = shard_from.isoformat()
+        state = shard_state.get(key, {})
+        if state.get("done"):
+            return
+        
+        async def on_page(progress: Dict[str, Any]) -> None:
+            shard_state[key] = progress
+            if context:
+                await context.save_checkpoint(shards=shard_state)
+        
+        async with semaphore, async_session_factory() as db:
+            ingester = SAMGovIngester(
+                api_key=settings.sam_gov_api_key,
+                db_session=db,
+                max_concurrency=settings.sam_gov_max_concurrency,
+                client=client,
+            )
+            stats = await ingester.ingest(
+                naics_codes=params.get("naics_codes"),
+                posted_from=shard_from.strftime("%m/%d/%Y"),
+                posted_to=shard_to.strftime("%m/%d/%Y"),
+                notice_types=params.get("notice_types"),
+                set_aside_codes=params.get("set_aside_codes"),
+                limit=None,
+                paginate=True,
+                checkpoint=state,
+                on_page=on_page,
+            )
+        
+        if not ingester.last_window_complete or stats["failed"]:
+            # Keep the page progress, so a retried job fetches just the
+            # pages that did not store
+            incomplete_shards.append(key)
+            logger.warning("Backfill shard incomplete", shard=key, **stats)
+            return
+        
+        shard_state[key] = {"done": True, "stats": stats}
+        if context:
+            await context.save_checkpoint(shards=shard_state)
+        logger.info("Backfill shard complete", shard=key, **stats)
+    
+    async with async_session_factory() as db:
+        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
+        result = await db.execute(stmt)
+        log = result.scalar_one_or_none()
+        
+        if not log:
+            await client.aclose()
+            return
+        
+        log.status = "running"
+        await db.commit()
+        
+        logger.info(
+            "Starting SAM.gov backfill",
+            start_date=params["start_date"],
+            end_date=params["end_date"],
+            shards=len(shards),
+            resumed_shards=sum(1 for state in shard_state.values() if state.get("done")),
+        )
+        
+        error: Optional[BaseException] = None
+        try:
+            async with asyncio.TaskGroup() as group:
+                for shard_from, shard_to in shards:
+                    group.create_task(run_shard(shard_from, shard_to))
+        except ExceptionGroup as group_error:
+            # Surface the first shard failure (JobCancelled included) to the worker
+            error = group_error.exceptions[0]
+        finally:
+            await client.aclose()
+        
+        if error is None and incomplete_shards:
+            error = RuntimeError(
+                f"{len(incomplete_shards)} backfill shard(s) incomplete: {sorted(incomplete_shards)}"
+            )
+        if error is not None:
+            await db.rollback()
+            if not context:
+                log.status = "failed"
+                log.completed_at = datetime.now(timezone.utc)
+                log.error_message = str(error)
+                await db.commit()
+            raise error
+        
+        totals = {key: 0 for key in STAT_KEYS}
+        for state in shard_state.values():
+            for key in STAT_KEYS:
+                totals[key] += state.get("stats", {}).get(key, 0)
+        
+        metadata = dict(log.extra_metadata or {})
+        metadata["shards"] = len(shards)
+        metadata["records_unchanged"] = totals["unchanged"]
+        
+        log.status = "completed"
+        log.completed_at = datetime.now(timezone.utc)
+        log.records_fetched = totals["fetched"]
+        log.records_inserted = totals["inserted"]
+        log.records_updated = totals["updated"]
+        log.records_failed = totals["failed"]
+        log.extra_metadata = metadata
+        await db.commit()
+        
+        logger.info("SAM.gov backfill complete", **totals)
+
+
+async def enqueue_backfill(
+    session: AsyncSession,
+    start_date: date,
+    end_date: date,
+    shard: str = "week",
+    naics_codes: Optional[List[str]] = None,
+    notice_types: Optional[List[str]] = None,
+    set_aside_codes: Optional[List[str]] = None,
+    shard_concurrency: Optional[int] = None,
+) -> IngestionLog:
+    """
+    Queue a backfill job for the ingestion workers.
+    
+    The caller commits.
+    
+    Returns:
+        Ingestion log entry tracking the backfill
+    
+    Raises:
+        ValueError: If the date range or shard size is invalid
+    """
+    from src.ingestion.jobs import enqueue_job
+    from src.config import get_settings
+    
+    # Validate the range up front rather than in the worker
+    build_shards(start_date, end_date, shard)
+    
+    params = {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "shard": shard,
+        "naics_codes": naics_codes,
+        "notice_types": notice_types,
+        "set_aside_codes": set_aside_codes,
+        "shard_concurrency": shard_concurrency,
+    }
+    
+    log = IngestionLog(
+        source_system="sam_gov",
+        status="queued",
+        extra_metadata={"backfill": params},
+    )
+    session.add(log)
+    await session.flush()
+    await enqueue_job(
+        session,
+        job_type="sam_gov_backfill",
+        params=params,
+        ingestion_log_id=log.id,
+        max_attempts=get_settings().ingestion_job_max_attempts,
+    )
+    return log
+
+
+async def _enqueue_from_cli(**kwargs) -> uuid.UUID:
+    """Queue a backfill in its own session and return the log ID."""
+    from src.database.connection import async_session_factory
+    
+    async with async_session_factory() as db:
+        log = await enqueue_backfill(db, **kwargs)
+        await db.commit()
+        return log.id
+
+
+@click.command()
+@click.option("--start", "start_date", type=click.DateTime(["%Y-%m-%d"]), required=True, help="First posted date")
+@click.option("--end", "end_date", type=click.DateTime(["%Y-%m-%d"]), required=True, help="Last posted date (inclusive)")
+@click.option("--shard", type=click.Choice(list(SHARD_SIZES)), default="week", help="Shard size")
+@click.option("--naics", "naics_codes", multiple=True, help="NAICS code filter (repeatable)")
+@click.option("--notice-type", "notice_types", multiple=True, help="Notice type filter (repeatable)")
+@click.option("--set-aside", "set_aside_codes", multiple=True, help="Set-aside filter (repeatable)")
+@click.option("--shard-concurrency", type=int, default=None, help="Shards ingested in parallel")
+def main(start_date, end_date, shard, naics_codes, notice_types, set_aside_codes, shard_concurrency):
+    """Queue a sharded SAM.gov backfill."""
+    ingestion_id = asyncio.run(_enqueue_from_cli(
+        start_date=start_date.date(),
+        end_date=end_date.date(),
+        shard=shard,
+        naics_codes=list(naics_codes) or None,
+        notice_types=list(notice_types) or None,
+        set_aside_codes=list(set_aside_codes) or None,
+        shard_concurrency=shard_concurrency,
+    ))
+    click.echo(f"Queued backfill {ingestion_id} ({len(build_shards(start_date.date(), end_date.date(), shard))} shards)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+SAM.gov Description Hydration
+
+In v2 search responses ``description`` is a link to the noticedesc
+endpoint rather than the text itself. ``DescriptionHydrator`` replaces
+those links with the plain-text body before opportunities are stored.
+
+Bodies are cached in ``ingestion.description_cache`` by notice ID and the
+notice's last-modified date, so a notice is only fetched again after it
+changes. Cache misses are fetched concurrently with bounded parallelism
+through the shared rate-limited client.
+"""
+import asyncio
+import html
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import DescriptionCache
+from src.ingestion.http_client import RateLimitedClient
+
+logger = structlog.get_logger()
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text content, turning block-level tags into line breaks."""
+    
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "ul", "ol", "tr", "table",
+        "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+    }
+    SKIP_TAGS = {"script", "style"}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+    
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(value: str) -> str:
+    """
+    Convert an HTML description body to plain text.
+    
+    Block elements become line breaks, runs of spaces collapse and at most
+    one blank line is kept between paragraphs.
+    """
+    if not value:
+        return ""
+    if "<" not in value:
+        return html.unescape(value).strip()
+    
+    extractor = _TextExtractor()
+    extractor.feed(value)
+    extractor.close()
+    
+    text = "".join(extractor.parts).replace("\xa0", " ")
+    lines = [re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def is_description_url(value: Optional[str]) -> bool:
+    """Whether a parsed description is still a noticedesc link."""
+    return bool(value) and value.startswith(("http://", "https://")) and "noticedesc" in value
+
+
+class DescriptionHydrator:
+    """
+    Replaces description links on parsed opportunities with their text.
+    
+    Cached text is reused while the notice's last-modified date is
+    unchanged; new cache rows are written in the caller's transaction.
+    """
+    
+    def __init__(
+        self,
+        client: RateLimitedClient,
+        db_session: AsyncSession,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        db_lock: Optional[asyncio.Lock] = None,
+    ):
+        """
+        Initialize the hydrator.
+        
+        Args:
+            client: Rate-limited client shared with the search requests
+            db_session: Session used for cache reads and writes
+            api_key: SAM.gov API key appended to description requests
+            max_concurrency: Maximum description requests in flight
+            db_lock: Lock guarding ``db_session`` when it is shared with
+                other concurrent users
+        """
+        self.client = client
+        self.db_session = db_session
+        self.api_key = api_key
+        self.max_concurrency = max(1, max_concurrency)
+        self.db_lock = db_lock or asyncio.Lock()
+    
+    async def hydrate(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Hydrate descriptions in place.
+        
+        Rows whose fetch fails keep their link and are retried by the next
+        ingest, since failures are not cached.
+        
+        Returns:
+            Counts of descriptions served from cache, fetched, and failed
+        """
+        counts = {"cached": 0, "fetched": 0, "failed": 0}
+        
+        pending = [row for row in rows if is_description_url(row.get("description"))]
+        if not pending:
+            return counts
+        
+        async with self.db_lock:
+            cached = await self._load_cached(pending)
+        
+        # Notices repeated within a batch share one request
+        misses: Dict[Tuple[str, str], str] = {}
+        for row in pending:
+            key = (row["source_id"], self._last_modified(row))
+            if key in cached:
+                row["description"] = cached[key]
+                counts["cached"] += 1
+            else:
+                misses.setdefault(key, row["description"])
+        
+        if misses:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def fetch(url: str) -> Optional[str]:
+                async with semaphore:
+                    return await self._fetch_description(url)
+            
+            keys = list(misses)
+            bodies = await asyncio.gather(*(fetch(misses[key]) for key in keys))
+            fetched = {key: body for key, body in zip(keys, bodies) if body is not None}
+            
+            async with self.db_lock:
+                await self._store_cached(fetched)
+            
+            for row in pending:
+                if not is_description_url(row.get("description")):
+                    continue
+                key = (row["source_id"], self._last_modified(row))
+                if key in fetched:
+                    row["description"] = fetched[key]
+                    counts["fetched"] += 1
+                else:
+                    counts["failed"] += 1
+        
+        logger.debug("Hydrated descriptions", **counts)
+        return counts
+    
+    async def _load_cached(self, rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+        """Cached text for the rows' current (notice, last-modified) keys."""
+        notice_ids = list({row["source_id"] for row in rows})
+        stmt = select(
+            DescriptionCache.notice_id,
+            DescriptionCache.last_modified,
+            DescriptionCache.description,
+        ).where(DescriptionCache.notice_id.in_(notice_ids))
+        result = await self.db_session.execute(stmt)
+        return {(notice_id, modified): text for notice_id, modified, text in result.all()}
+    
+    async def _store_cached(self, fetched: Dict[Tuple[str, str], str]) -> None:
+        """Replace cache entries for refetched notices."""
+        if not fetched:
+            return
+        
+        await self.db_session.execute(
+            delete(DescriptionCache).where(
+                DescriptionCache.notice_id.in_({notice_id for notice_id, _ in fetched})
+            )
+        )
+        stmt = insert(DescriptionCache.__table__).on_conflict_do_nothing()
+        await self.db_session.execute(stmt, [
+            {"notice_id": notice_id, "last_modified": modified, "description": text}
+            for (notice_id, modified), text in fetched.items()
+        ])
+    
+    async def _fetch_description(self, url: str) -> Optional[str]:
+        """
+        Fetch one description body.
+        
+        Returns:
+            Plain text ("" when the notice has no description), or None on failure
+        """
+        params = {"api_key": self.api_key} if self.api_key else None
+        try:
+            response = await self.client.get(url, params=params)
+            if response.status_code == 404:
+                return ""
+            response.raise_for_status()
+            return html_to_text(response.json().get("description") or "")
+        except Exception as e:
+            logger.warning("Failed to fetch description", url=url, error=str(e))
+            return None
+    
+    @staticmethod
+    def _last_modified(row: Dict[str, Any]) -> str:
+        raw = row.get("raw_data") or {}
+        return str(raw.get("modifiedDate") or raw.get("postedDate") or "")
@@ -0,0 +1,275 @@
+"""
+Rate-Limited HTTP Client
+
+Shared HTTP layer for source adapters. Wraps ``httpx.AsyncClient`` with:
+- A token bucket so concurrent callers stay within an API key's quota
+- Retries with exponential backoff and full jitter on 429, transient 5xx
+  and transport errors, honoring ``Retry-After`` when the server sends it
+- Connection pooling and keep-alive limits
+- Per-request timing metrics (p50/p99 latency, retries, throttle waits)
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+    
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    each request takes one token and waits when the bucket is empty.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting for it if necessary.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            # A negative balance is this caller's place in line
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RequestMetrics:
+    """Rolling request timing and outcome counters."""
+    
+    # Latency samples kept for percentile calculation
+    WINDOW = 10000
+    
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.throttled_seconds = 0.0
+        self.status_counts: Dict[int, int] = {}
+        self._latencies: Deque[float] = deque(maxlen=self.WINDOW)
+    
+    def record(self, latency: float, status_code: Optional[int]) -> None:
+        """Record one completed attempt."""
+        self.requests += 1
+        self._latencies.append(latency)
+        if status_code is None:
+            self.errors += 1
+        else:
+            self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile in seconds over the rolling window."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Metrics snapshot for logging."""
+        p50 = self.percentile(50)
+        p99 = self.percentile(99)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "status_counts": dict(self.status_counts),
+        }
+
+
+class RateLimitedClient:
+    """
+    ``httpx.AsyncClient`` wrapper with rate limiting and retries.
+    
+    Exposes the subset of the httpx API used by the ingesters (``get``,
+    ``request`` and ``aclose``). One instance can be shared by concurrent
+    tasks and source adapters so they draw from the same quota.
+    """
+    
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    
+    def __init__(
+        self,
+        requests_per_second: float = 2.0,
+        burst: Optional[float] = None,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        timeout: float = 30,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+        **client_kwargs,
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            requests_per_second: Sustained request rate (0 disables limiting)
+            burst: Bucket capacity; defaults to one second of requests
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds, doubled per retry
+            backoff_max: Upper bound for a single backoff sleep
+            timeout: Request timeout in seconds
+            max_connections: Connection pool size
+            max_keepalive_connections: Idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept
+            client: Pre-built httpx client (pool settings are then ignored)
+            client_kwargs: Extra ``httpx.AsyncClient`` arguments, e.g. ``transport``
+        """
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = RequestMetrics()
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            **client_kwargs,
+        )
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Rate-limited GET with retries."""
+        return await self.request("GET", url, **kwargs)
+    
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Rate-limited request whose body is read incrementally.
+        
+        Retries apply until response headers arrive; the body is then left
+        unread for the caller (``aiter_bytes``/``aiter_text``) and the
+        response is closed on exit.
+        """
+        response = await self.request(method, url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+    
+    async def request(self, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying throttled and transient failures.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            stream: Return as soon as headers arrive without reading the body;
+                the caller must close the response (see ``stream()``)
+            **kwargs: Passed to ``httpx.AsyncClient.build_request``
+        
+        Returns:
+            The final response; callers still call ``raise_for_status``
+        
+        Raises:
+            httpx.TransportError: If every attempt failed at the transport level
+        """
+        attempt = 0
+        while True:
+            waited = await self.bucket.acquire()
+            self.metrics.throttled_seconds += waited
+            
+            started = time.perf_counter()
+            try:
+                response = await self.client.send(
+                    self.client.build_request(method, url, **kwargs), stream=stream
+                )
+            except httpx.TransportError as e:
+                self.metrics.record(time.perf_counter() - started, None)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "HTTP transport error, retrying",
+                    url=url,
+                    error=str(e),
+                    attempt=attempt + 1,
+                    delay=round(delay, 2),
+                )
+            else:
+                self.metrics.record(time.perf_counter() - started, response.status_code)
+                if (
+                    response.status_code not in self.RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = self._backoff(attempt, self._retry_after(response))
+                logger.warning(
+                    "HTTP request throttled or failed, retrying",
+                    url=url,
+                    status_code=response.status_code,
+                    attempt=attempt + 1,
+                    delay=round(delay, 2),
+                )
+                await response.aclose()
+            
+            self.metrics.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.client.aclose()
+    
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,368 @@
+"""
+Durable Ingestion Jobs
+
+Postgres-backed queue for ingestion work. The API enqueues rows in
+``ingestion.ingestion_jobs``; separate worker processes (see
+``src.ingestion.worker``) claim them with ``SELECT ... FOR UPDATE SKIP
+LOCKED`` so that several workers can poll the same table without
+blocking each other.
+
+Handlers persist a checkpoint after every stored page. When a worker
+dies its heartbeat goes stale, another worker reclaims the job and the
+handler resumes from the checkpoint instead of starting over.
+"""
+import asyncio
+import copy
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import IngestionJob, IngestionLog
+
+logger = structlog.get_logger()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation of its job was requested."""
+
+
+async def enqueue_job(
+    session: AsyncSession,
+    job_type: str,
+    params: Dict[str, Any],
+    ingestion_log_id: Optional[uuid.UUID] = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+) -> IngestionJob:
+    """
+    Add a job to the queue.
+    
+    The caller commits; the job becomes visible to workers at that point.
+    """
+    job = IngestionJob(
+        ingestion_log_id=ingestion_log_id,
+        job_type=job_type,
+        params=params,
+        status="queued",
+        priority=priority,
+        max_attempts=max_attempts,
+        available_at=datetime.now(timezone.utc),
+        checkpoint={},
+    )
+    session.add(job)
+    await session.flush()
+    return job
+
+
+async def claim_job(
+    session: AsyncSession,
+    worker_id: str,
+    stale_after: timedelta,
+) -> Optional[IngestionJob]:
+    """
+    Claim the next runnable job for ``worker_id``.
+    
+    Runnable jobs are queued jobs whose ``available_at`` has passed, plus
+    running jobs whose heartbeat is older than ``stale_after`` (their
+    worker crashed). Rows locked by other workers are skipped.
+    
+    Returns:
+        The claimed job, already committed as running, or None
+    """
+    now = func.now()
+    stmt = (
+        select(IngestionJob)
+        .where(
+            or_(
+                and_(
+                    IngestionJob.status == "queued",
+                    IngestionJob.available_at <= now,
+                ),
+                and_(
+                    IngestionJob.status == "running",
+                    IngestionJob.heartbeat_at < now - stale_after,
+                ),
+            )
+        )
+        .order_by(IngestionJob.priority.desc(), IngestionJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(stmt)
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        await session.rollback()
+        return None
+    
+    if job.status == "running":
+        logger.warning(
+            "Reclaiming stale ingestion job",
+            job_id=str(job.id),
+            previous_worker=job.worker_id,
+        )
+    
+    claimed_at = datetime.now(timezone.utc)
+    job.status = "running"
+    job.worker_id = worker_id
+    job.heartbeat_at = claimed_at
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = job.started_at or claimed_at
+    
+    if job.ingestion_log_id:
+        log = await session.get(IngestionLog, job.ingestion_log_id)
+        if log:
+            log.status = "running"
+    
+    await session.commit()
+    return job
+
+
+async def request_cancel(session: AsyncSession, ingestion_log_id: uuid.UUID) -> Optional[IngestionJob]:
+    """
+    Cancel the job behind an ingestion log entry.
+    
+    Queued jobs are cancelled immediately. Running jobs are flagged and
+    stop at their next checkpoint. The caller commits.
+    """
+    stmt = select(IngestionJob).where(
+        IngestionJob.ingestion_log_id == ingestion_log_id
+    ).with_for_update()
+    result = await session.execute(stmt)
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        return None
+    
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.completed_at = datetime.now(timezone.utc)
+        log = await session.get(IngestionLog, ingestion_log_id)
+        if log:
+            log.status = "cancelled"
+            log.completed_at = job.completed_at
+    elif job.status == "running":
+        job.cancel_requested = True
+    
+    return job
+
+
+class JobContext:
+    """
+    Handle passed to job handlers for checkpointing and cancellation.
+    
+    Uses its own session so that checkpoints commit independently of the
+    handler's data transactions.
+    """
+    
+    def __init__(self, session_factory, job_id: uuid.UUID, checkpoint: Optional[Dict] = None):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.checkpoint: Dict[str, Any] = dict(checkpoint or {})
+        self.cancel_requested = False
+        self._lock = asyncio.Lock()
+    
+    async def save_checkpoint(self, **updates) -> None:
+        """
+        Merge ``updates`` into the checkpoint and persist it.
+        
+        Raises:
+            JobCancelled: If cancellation was requested meanwhile
+        """
+        self.checkpoint.update(updates)
+        
+        # Serialize writers so an older snapshot never lands after a newer one
+        async with self._lock, self.session_factory() as session:
+            job = await session.get(IngestionJob, self.job_id)
+            job.checkpoint = copy.deepcopy(self.checkpoint)
+            job.heartbeat_at = datetime.now(timezone.utc)
+            self.cancel_requested = job.cancel_requested
+            await session.commit()
+        
+        if self.cancel_requested:
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+    
+    async def heartbeat(self) -> bool:
+        """
+        Refresh the job's heartbeat.
+        
+        Returns:
+            True if cancellation was requested
+        """
+        async with self.session_factory() as session:
+            job = await session.get(IngestionJob, self.job_id)
+            job.heartbeat_at = datetime.now(timezone.utc)
+            self.cancel_requested = job.cancel_requested
+            await session.commit()
+        return self.cancel_requested
+
+
+async def run_sam_gov_ingestion(
+    ingestion_id: uuid.UUID,
+    params: dict,
+    context: Optional[JobContext] = None,
+):
+    """
+    Run a SAM.gov ingestion for an ingestion log entry.
+    
+    Unless an explicit ``posted_from`` is given (or ``incremental`` is
+    false), only notices posted since the watermark of the last successful
+    run with the same filters are fetched, minus a small overlap window.
+    The watermark is advanced only when the run fetched its whole window
+    (paginated, not cut short by ``limit``) and stored every record;
+    otherwise the next run fetches the same window again.
+    
+    With a ``context`` the resolved date window and per-page progress are
+    checkpointed, so a resumed attempt fetches the same window and skips
+    pages that were already stored.
+    
+    New and changed opportunities are scored as they are stored against the
+    organizations listed in ``score_organization_ids``, if any.
+    """
+    from src.database.connection import async_session_factory
+    from src.ingestion.sam_gov import SAMGovIngester
+    from src.ingestion.watermarks import (
+        advance_watermark, get_watermark, incremental_start, normalize_filters
+    )
+    from src.config import get_settings
+    
+    settings = get_settings()
+    checkpoint = context.checkpoint if context else {}
+    
+    async with async_session_factory() as db:
+        # Update status to running
+        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
+        result = await db.execute(stmt)
+        log = result.scalar_one_or_none()
+        
+        if not log:
+            return
+        
+        log.status = "running"
+        await db.commit()
+        
+        filters = normalize_filters(
+            naics_codes=params.get("naics_codes"),
+            notice_types=params.get("notice_types"),
+            set_aside_codes=params.get("set_aside_codes"),
+        )
+        posted_from = checkpoint.get("posted_from", params.get("posted_from"))
+        posted_to = checkpoint.get("posted_to", params.get("posted_to"))
+        metadata = dict(log.extra_metadata or {})
+        
+        try:
+            if not posted_from and params.get("incremental", True):
+                watermark = await get_watermark(db, "sam.gov", filters)
+                start = incremental_start(
+                    watermark,
+                    timedelta(days=settings.sam_gov_watermark_overlap_days),
+                )
+                if start:
+                    posted_from = start.strftime("%m/%d/%Y")
+                    metadata["incremental_from"] = posted_from
+            
+            if context:
+                # Pin the window so a resumed attempt pages the same result set
+                now = datetime.now(timezone.utc)
+                posted_from = posted_from or (now - timedelta(days=30)).strftime("%m/%d/%Y")
+                posted_to = posted_to or now.strftime("%m/%d/%Y")
+                await context.save_checkpoint(posted_from=posted_from, posted_to=posted_to)
+            
+            # Run ingestion
+            ingester = SAMGovIngester(
+                api_key=settings.sam_gov_api_key,
+                db_session=db,
+                max_concurrency=settings.sam_gov_max_concurrency,
+            )
+            
+            async def on_page(progress: Dict[str, Any]) -> None:
+                await context.save_checkpoint(**progress)
+            
+            try:
+                stats = await ingester.ingest(
+                    naics_codes=params.get("naics_codes"),
+                    posted_from=posted_from,
+                    posted_to=posted_to,
+                    notice_types=params.get("notice_types"),
+                    set_aside_codes=params.get("set_aside_codes"),
+                    limit=params.get("limit", 100),
+                    paginate=params.get("paginate", False),
+                    checkpoint=checkpoint,
+                    on_page=on_page if context else None,
+                    score_organization_ids=[
+                        uuid.UUID(str(org_id)) for org_id in params.get("score_organization_ids") or []
+                    ],
+                )
+            finally:
+                await ingester.close()
+            
+            if ingester.last_window_complete and not stats.get("failed"):
+                watermark = await advance_watermark(
+                    db,
+                    "sam.gov",
+                    filters,
+                    last_posted_date=ingester.last_posted_date,
+                    last_modified_date=ingester.last_modified_date,
+                    ingestion_log_id=ingestion_id,
+                )
+                metadata["watermark"] = {
+                    "last_posted_date": _isoformat(watermark.last_posted_date),
+                    "last_modified_date": _isoformat(watermark.last_modified_date),
+                }
+            else:
+                metadata["watermark_held"] = (
+                    "failed records" if stats.get("failed") else "window not fully fetched"
+                )
+            
+            # Update log with results
+            log.status = "completed"
+            log.completed_at = datetime.now(timezone.utc)
+            log.records_fetched = stats.get("fetched", 0)
+            log.records_inserted = stats.get("inserted", 0)
+            log.records_updated = stats.get("updated", 0)
+            log.records_failed = stats.get("failed", 0)
+            metadata["records_unchanged"] = stats.get("unchanged", 0)
+        
+        except JobCancelled:
+            await db.rollback()
+            log.status = "cancelled"
+            log.completed_at = datetime.now(timezone.utc)
+            log.extra_metadata = metadata
+            await db.commit()
+            raise
+        
+        except Exception as e:
+            if context:
+                # Leave the log running; the worker decides on retry or failure
+                await db.rollback()
+                raise
+            log.status = "failed"
+            log.completed_at = datetime.now(timezone.utc)
+            log.error_message = str(e)
+        
+        log.extra_metadata = metadata
+        await db.commit()
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """Serialize an optional datetime for JSONB metadata."""
+    return value.isoformat() if value else None
+
+
+from src.ingestion.backfill import run_sam_gov_backfill  # noqa: E402
+from src.ingestion.plans import run_sam_gov_planned_ingestion  # noqa: E402
+from src.ingestion.reparse import run_sam_gov_reparse  # noqa: E402
+from src.ingestion.sam_gov_csv import run_sam_gov_csv_load  # noqa: E402
+
+# Job type -> handler(ingestion_log_id, params, context)
+JOB_HANDLERS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "sam_gov": run_sam_gov_ingestion,
+    "sam_gov_backfill": run_sam_gov_backfill,
+    "sam_gov_csv": run_sam_gov_csv_load,
+    "sam_gov_planned": run_sam_gov_planned_ingestion,
+    "sam_gov_reparse": run_sam_gov_reparse,
+}
@@ -0,0 +1,151 @@
+"""
+Incremental JSON Parsing
+
+Extracts the items of one array inside a JSON object while the document
+is still arriving, so large API pages can be processed record by record
+without holding the whole body (and its decoded tree) in memory.
+
+Usage:
+    parser = JSONArrayStream("opportunitiesData")
+    async for chunk in response.aiter_text():
+        for item in parser.feed(chunk):
+            ...
+    for item in parser.close():
+        ...
+    total = parser.envelope.get("totalRecords")
+"""
+import json
+import re
+import sys
+from typing import Any, Dict, List
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class JSONArrayStream:
+    """
+    Push parser for ``{"...": ..., "<key>": [item, item, ...], ...}``.
+    
+    Each array item is decoded with the C JSON decoder once it is
+    complete; only the unconsumed tail of the text is buffered. An item
+    still incomplete after a decode attempt is retried only once its text
+    has doubled, so an item spanning many pieces costs linear, not
+    quadratic, decoding time. Everything outside the array is collected
+    into ``envelope`` once the document is closed.
+    """
+    
+    def __init__(self, key: str):
+        self.key = key
+        self.envelope: Dict[str, Any] = {}
+        # Largest allocation of the pending text buffer, in bytes (decoded
+        # items handed back by feed() are not counted)
+        self.peak_text_bytes = 0
+        
+        self._decoder = json.JSONDecoder()
+        self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._state = "prefix"
+        self._buffer = ""
+        self._prefix = ""
+        self._suffix: List[str] = []
+        # Buffer length at which an incomplete item is decoded again; text
+        # arriving before that is held unjoined
+        self._retry_length = 0
+        self._held: List[str] = []
+        self._held_length = 0
+    
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add the next piece of the document.
+        
+        Returns:
+            Array items completed by this piece, in document order
+        """
+        if self._state == "suffix":
+            self._suffix.append(text)
+            return []
+        
+        if self._retry_length:
+            self._held.append(text)
+            self._held_length += len(text)
+            self.peak_text_bytes = max(
+                self.peak_text_bytes, sys.getsizeof(self._buffer) + self._held_length
+            )
+            if len(self._buffer) + self._held_length < self._retry_length:
+                return []
+            text = "".join(self._held)
+            self._held = []
+            self._held_length = 0
+        
+        self._buffer += text
+        self.peak_text_bytes = max(self.peak_text_bytes, sys.getsizeof(self._buffer))
+        
+        if self._state == "prefix":
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return []
+            self._prefix = self._buffer[:match.end()]
+            self._buffer = self._buffer[match.end():]
+            self._state = "items"
+        
+        return self._drain()
+    
+    def close(self) -> List[Any]:
+        """
+        Finish the document and decode the envelope.
+        
+        Returns:
+            Array items held back by the doubling rule, in document order
+        
+        Raises:
+            ValueError: If the document ended inside the array or is not valid JSON
+        """
+        if self._state == "prefix":
+            # The array never appeared; the whole body is the envelope
+            self.envelope = json.loads(self._buffer) if self._buffer.strip() else {}
+            return []
+        items = []
+        if self._state == "items":
+            self._buffer += "".join(self._held)
+            self._held = []
+            self._retry_length = 0
+            items = self._drain()
+        if self._state != "suffix":
+            raise ValueError(f"JSON document ended inside the {self.key!r} array")
+        
+        self.envelope = json.loads(self._prefix + "]" + "".join(self._suffix))
+        self.envelope.pop(self.key, None)
+        return items
+    
+    def _drain(self) -> List[Any]:
+        """Decode every complete item at the front of the buffer."""
+        items = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                self._retry_length = 0
+                break
+            
+            char = buffer[pos]
+            if char == "]":
+                self._state = "suffix"
+                self._suffix.append(buffer[pos + 1:])
+                buffer, pos = "", 0
+                self._retry_length = 0
+                break
+            if char == ",":
+                pos += 1
+                continue
+            
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Incomplete item; wait until its text has doubled
+                self._retry_length = 2 * (len(buffer) - pos)
+                break
+            items.append(item)
+            pos = end
+        
+        self._buffer = buffer[pos:]
+        return items
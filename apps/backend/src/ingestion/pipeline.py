@@ -0,0 +1,170 @@
+"""
+Staged Ingestion Pipeline
+
+Small asyncio producer/consumer framework used by the ingesters. A source
+async iterator feeds a chain of stages connected by bounded queues; each
+stage runs its own number of workers and records throughput and latency.
+
+Because every queue is bounded, a slow stage applies backpressure all the
+way to the source, so memory stays flat regardless of job size while the
+network-bound and database-bound stages overlap.
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Per-stage counters."""
+    name: str
+    workers: int = 1
+    batches: int = 0
+    items: int = 0
+    busy_seconds: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=10000))
+    
+    def record(self, items: int, seconds: float) -> None:
+        self.batches += 1
+        self.items += items
+        self.busy_seconds += seconds
+        self.latencies.append(seconds)
+    
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        
+        def percentile(pct: float) -> Optional[float]:
+            if not ordered:
+                return None
+            index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+            return round(ordered[index] * 1000, 1)
+        
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "items": self.items,
+            "items_per_second": round(self.items / wall_seconds, 1) if wall_seconds else None,
+            "p50_ms": percentile(50),
+            "p99_ms": percentile(99),
+            # Fraction of the run the stage's workers spent working
+            "utilization": round(self.busy_seconds / (wall_seconds * self.workers), 3) if wall_seconds else None,
+        }
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline stage.
+    
+    ``handler`` receives a batch and returns the batch for the next stage,
+    or None to drop it.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[Any]]]
+    workers: int = 1
+
+
+class Pipeline:
+    """
+    Runs a source iterator through a chain of stages.
+    
+    The first error in any stage cancels the rest of the pipeline and is
+    re-raised from ``run()``; whatever earlier stages already committed
+    stays committed. ``size`` reports how many records a batch holds for
+    the throughput counters.
+    """
+    
+    def __init__(
+        self,
+        source: AsyncIterator[Any],
+        stages: List[Stage],
+        queue_size: int = 4,
+        size: Callable[[Any], int] = lambda batch: 1,
+        source_name: str = "fetch",
+    ):
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.size = size
+        self.source_name = source_name
+        self.metrics: Dict[str, StageMetrics] = {
+            source_name: StageMetrics(source_name),
+            **{stage.name: StageMetrics(stage.name, workers=max(1, stage.workers)) for stage in stages},
+        }
+        self.wall_seconds = 0.0
+    
+    async def run(self) -> None:
+        """Drive the pipeline until the source is exhausted."""
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        started = time.perf_counter()
+        
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self._produce(queues[0] if queues else None))
+                for index, stage in enumerate(self.stages):
+                    outbox = queues[index + 1] if index + 1 < len(queues) else None
+                    downstream = self.stages[index + 1].workers if outbox else 0
+                    remaining = [max(1, stage.workers)]
+                    for _ in range(max(1, stage.workers)):
+                        group.create_task(
+                            self._work(stage, queues[index], outbox, remaining, downstream)
+                        )
+        except ExceptionGroup as group_error:
+            raise group_error.exceptions[0]
+        finally:
+            self.wall_seconds = time.perf_counter() - started
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage metrics for the last run."""
+        return {name: metrics.summary(self.wall_seconds) for name, metrics in self.metrics.items()}
+    
+    async def _produce(self, outbox: Optional[asyncio.Queue]) -> None:
+        metrics = self.metrics[self.source_name]
+        iterator = self.source.__aiter__()
+        try:
+            while True:
+                waited = time.perf_counter()
+                try:
+                    batch = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                metrics.record(self.size(batch), time.perf_counter() - waited)
+                if outbox is not None:
+                    await outbox.put(batch)
+        finally:
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+        
+        if outbox is not None:
+            for _ in range(max(1, self.stages[0].workers)):
+                await outbox.put(_DONE)
+    
+    async def _work(
+        self,
+        stage: Stage,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        remaining: List[int],
+        downstream_workers: int,
+    ) -> None:
+        metrics = self.metrics[stage.name]
+        while True:
+            batch = await inbox.get()
+            if batch is _DONE:
+                break
+            started = time.perf_counter()
+            result = await stage.handler(batch)
+            metrics.record(self.size(batch), time.perf_counter() - started)
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+        
+        # The last worker of a stage closes the next stage's input
+        remaining[0] -= 1
+        if remaining[0] == 0 and outbox is not None:
+            for _ in range(max(1, downstream_workers)):
+                await outbox.put(_DONE)
@@ -0,0 +1,395 @@
+"""
+Shared-Fetch Ingestion Plans
+
+Organizations register the SAM.gov filters they care about as
+``ingestion.ingestion_subscriptions``. Instead of one ingestion per
+organization, the planner merges every active subscription into a small
+set of SAM.gov queries that together cover the union of their filters:
+
+- identical filter sets collapse into one query,
+- a query whose results are a subset of another's is dropped, and
+- two queries that differ in a single filter (e.g. only their NAICS
+  codes) are merged by taking the union of that filter, which returns
+  exactly the union of their results.
+
+The queries of a plan run as one ``sam_gov_planned`` job on a shared
+rate-limited client. A notice returned by several queries is stored by
+the first one only, and each new or changed notice is scored against
+every subscriber whose filters it matches. API calls and upserts
+therefore grow with unique notices rather than with tenants.
+
+Usage:
+    python -m src.ingestion.plans
+    python -m src.ingestion.plans --enqueue
+"""
+import asyncio
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set
+
+import click
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import IngestionLog, IngestionSubscription
+from src.ingestion.watermarks import (
+    advance_watermark, filter_key, get_watermark, incremental_start, normalize_filters
+)
+
+if TYPE_CHECKING:
+    from src.ingestion.jobs import JobContext
+
+logger = structlog.get_logger()
+
+FILTER_DIMENSIONS = ("naics_codes", "notice_types", "set_aside_codes")
+
+STAT_KEYS = ("fetched", "inserted", "updated", "unchanged", "failed", "pages", "duplicates", "scored")
+
+
+@dataclass
+class PlannedQuery:
+    """One SAM.gov query of a shared-fetch plan and the subscriptions it serves."""
+    filters: Dict[str, List[str]]
+    subscription_ids: List[str] = field(default_factory=list)
+    organization_ids: List[str] = field(default_factory=list)
+    
+    @property
+    def key(self) -> str:
+        """Stable key of the query's filters (also its watermark key)."""
+        return filter_key(self.filters)
+
+
+def subscription_filters(subscription: IngestionSubscription) -> Dict[str, List[str]]:
+    """Normalized filter set of a subscription."""
+    return normalize_filters(
+        naics_codes=subscription.naics_codes,
+        notice_types=subscription.notice_types,
+        set_aside_codes=subscription.set_aside_codes,
+    )
+
+
+def _covers(outer: Dict[str, List[str]], inner: Dict[str, List[str]]) -> bool:
+    """Whether every notice matching ``inner`` also matches ``outer``."""
+    for dimension in FILTER_DIMENSIONS:
+        if not outer[dimension]:
+            continue
+        if not inner[dimension] or not set(inner[dimension]) <= set(outer[dimension]):
+            return False
+    return True
+
+
+def _merge(a: Dict[str, List[str]], b: Dict[str, List[str]]) -> Optional[Dict[str, List[str]]]:
+    """
+    Single filter set matching exactly the union of ``a`` and ``b``.
+    
+    Only exists when the two differ in at most one dimension, or when one
+    covers the other; any other merge would fetch notices neither wants.
+    """
+    if _covers(a, b):
+        return a
+    if _covers(b, a):
+        return b
+    
+    differing = [dimension for dimension in FILTER_DIMENSIONS if a[dimension] != b[dimension]]
+    if len(differing) != 1:
+        return None
+    
+    dimension = differing[0]
+    merged = dict(a)
+    # Both are non-empty here, otherwise one would cover the other
+    merged[dimension] = sorted(set(a[dimension]) | set(b[dimension]))
+    return merged
+
+
+def build_plan(subscriptions: Sequence[IngestionSubscription]) -> List[PlannedQuery]:
+    """
+    Compute the SAM.gov queries covering a set of subscriptions.
+    
+    Queries are merged pairwise until no exact merge is left. Inputs are
+    taken in order, so the same subscriptions always give the same plan.
+    
+    Returns:
+        Queries ordered by key, each listing the subscriptions it serves
+    """
+    queries: Dict[str, PlannedQuery] = {}
+    for subscription in subscriptions:
+        filters = subscription_filters(subscription)
+        query = queries.setdefault(filter_key(filters), PlannedQuery(filters))
+        query.subscription_ids.append(str(subscription.id))
+        if str(subscription.organization_id) not in query.organization_ids:
+            query.organization_ids.append(str(subscription.organization_id))
+    
+    pending = list(queries.values())
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        for i in range(len(pending)):
+            for j in range(i + 1, len(pending)):
+                merged = _merge(pending[i].filters, pending[j].filters)
+                if merged is None:
+                    continue
+                a, b = pending[i], pending.pop(j)
+                pending[i] = PlannedQuery(
+                    merged,
+                    a.subscription_ids + b.subscription_ids,
+                    a.organization_ids + [org for org in b.organization_ids if org not in a.organization_ids],
+                )
+                merged_any = True
+                break
+            if merged_any:
+                break
+    
+    return sorted(pending, key=lambda query: query.key)
+
+
+async def load_active_subscriptions(session: AsyncSession) -> List[IngestionSubscription]:
+    """Active subscriptions, oldest first."""
+    stmt = select(IngestionSubscription).where(
+        IngestionSubscription.active.is_(True)
+    ).order_by(IngestionSubscription.created_at, IngestionSubscription.id)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def run_sam_gov_planned_ingestion(
+    ingestion_id: uuid.UUID,
+    params: dict,
+    context: Optional["JobContext"] = None,
+):
+    """
+    Run the shared-fetch plan over all active subscriptions.
+    
+    The plan is pinned in the checkpoint on the first attempt, together
+    with each query's date window and page progress, so a resumed attempt
+    runs the same queries and skips what was stored. Each query keeps its
+    own incremental watermark, advanced only when the query fetched its
+    whole window without failed records. Subscriptions are re-read on every attempt,
+    so scoring always fans out to the current subscribers.
+    
+    ``params`` may set ``limit`` (per query), ``posted_from``/``posted_to``
+    and ``incremental``.
+    """
+    from src.database.connection import async_session_factory
+    from src.ingestion.sam_gov import SAMGovIngester, create_sam_gov_client
+    
+    settings = get_settings()
+    checkpoint = context.checkpoint if context else {}
+    query_state: Dict[str, Dict[str, Any]] = checkpoint.setdefault("queries", {})
+    
+    async with async_session_factory() as db:
+        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
+        result = await db.execute(stmt)
+        log = result.scalar_one_or_none()
+        
+        if not log:
+            return
+        
+        log.status = "running"
+        await db.commit()
+        
+        subscriptions = await load_active_subscriptions(db)
+        if "plan" in checkpoint:
+            queries = [PlannedQuery(**query) for query in checkpoint["plan"]]
+        else:
+            queries = build_plan(subscriptions)
+            if context:
+                await context.save_checkpoint(plan=[asdict(query) for query in queries])
+        
+        subscribers: Dict[uuid.UUID, List[Dict[str, List[str]]]] = {}
+        for subscription in subscriptions:
+            subscribers.setdefault(subscription.organization_id, []).append(
+                subscription_filters(subscription)
+            )
+        
+        logger.info(
+            "Starting planned SAM.gov ingestion",
+            subscriptions=len(subscriptions),
+            organizations=len(subscribers),
+            queries=len(queries),
+            resumed_queries=sum(1 for state in query_state.values() if state.get("done")),
+        )
+        
+        semaphore = asyncio.Semaphore(max(1, settings.sam_gov_plan_query_concurrency))
+        client = create_sam_gov_client()
+        seen_source_ids: Set[str] = set()
+        overlap = timedelta(days=settings.sam_gov_watermark_overlap_days)
+        
+        async def run_query(query: PlannedQuery) -> None:
+            key = query.key
+            if query_state.get(key, {}).get("done"):
+                return
+            
+            async def save() -> None:
+                if context:
+                    await context.save_checkpoint(queries=query_state)
+            
+            async def on_page(progress: Dict[str, Any]) -> None:
+                query_state[key] = {**query_state[key], **progress}
+                await save()
+            
+            async with semaphore, async_session_factory() as query_db:
+                state = query_state.get(key, {})
+                posted_from = state.get("posted_from", params.get("posted_from"))
+                posted_to = state.get("posted_to", params.get("posted_to"))
+                if not posted_from and params.get("incremental", True):
+                    start = incremental_start(await get_watermark(query_db, "sam.gov", query.filters), overlap)
+                    if start:
+                        posted_from = start.strftime("%m/%d/%Y")
+                
+                # Pin the window so a resumed attempt pages the same result set
+                now = datetime.now(timezone.utc)
+                query_state[key] = {
+                    **state,
+                    "posted_from": posted_from or (now - timedelta(days=30)).strftime("%m/%d/%Y"),
+                    "posted_to": posted_to or now.strftime("%m/%d/%Y"),
+                }
+                await save()
+                
+                ingester = SAMGovIngester(
+                    api_key=settings.sam_gov_api_key,
+                    db_session=query_db,
+                    max_concurrency=settings.sam_gov_max_concurrency,
+                    client=client,
+                )
+                stats = await ingester.ingest(
+                    naics_codes=query.filters["naics_codes"] or None,
+                    posted_from=query_state[key]["posted_from"],
+                    posted_to=query_state[key]["posted_to"],
+                    notice_types=query.filters["notice_types"] or None,
+                    set_aside_codes=query.filters["set_aside_codes"] or None,
+                    limit=params.get("limit"),
+                    paginate=True,
+                    checkpoint=query_state[key],
+                    on_page=on_page,
+                    subscribers=subscribers,
+                    seen_source_ids=seen_source_ids,
+                )
+                
+                # A window cut short by the limit, or with failed records, is fetched again next run
+                advanced = ingester.last_window_complete and not stats.get("failed")
+                if advanced:
+                    await advance_watermark(
+                        query_db,
+                        "sam.gov",
+                        query.filters,
+                        last_posted_date=ingester.last_posted_date,
+                        last_modified_date=ingester.last_modified_date,
+                        ingestion_log_id=ingestion_id,
+                    )
+                    await query_db.commit()
+            
+            query_state[key] = {"done": True, "stats": stats, "watermark_advanced": advanced}
+            await save()
+            logger.info("Planned query complete", query=key, filters=query.filters, **stats)
+        
+        try:
+            async with asyncio.TaskGroup() as group:
+                for query in queries:
+                    group.create_task(run_query(query))
+        except ExceptionGroup as group_error:
+            # Surface the first query failure (JobCancelled included) to the worker
+            error = group_error.exceptions[0]
+            await db.rollback()
+            if not context:
+                log.status = "failed"
+                log.completed_at = datetime.now(timezone.utc)
+                log.error_message = str(error)
+                await db.commit()
+            raise error
+        finally:
+            await client.aclose()
+        
+        totals = {key: 0 for key in STAT_KEYS}
+        for state in query_state.values():
+            for key in STAT_KEYS:
+                totals[key] += state.get("stats", {}).get(key, 0)
+        
+        metadata = dict(log.extra_metadata or {})
+        metadata["queries"] = len(queries)
+        metadata["subscriptions"] = len(subscriptions)
+        metadata["records_unchanged"] = totals["unchanged"]
+        metadata["records_duplicate"] = totals["duplicates"]
+        metadata["scored"] = totals["scored"]
+        
+        log.status = "completed"
+        log.completed_at = datetime.now(timezone.utc)
+        log.records_fetched = totals["fetched"]
+        log.records_inserted = totals["inserted"]
+        log.records_updated = totals["updated"]
+        log.records_failed = totals["failed"]
+        log.extra_metadata = metadata
+        await db.commit()
+        
+        logger.info("Planned SAM.gov ingestion complete", **totals)
+
+
+async def enqueue_planned_ingestion(
+    session: AsyncSession,
+    limit: Optional[int] = None,
+    incremental: bool = True,
+) -> IngestionLog:
+    """
+    Queue a planned ingestion over all active subscriptions.
+    
+    The caller commits.
+    
+    Returns:
+        Ingestion log entry tracking the run
+    """
+    from src.ingestion.jobs import enqueue_job
+    
+    params = {"limit": limit, "incremental": incremental}
+    
+    log = IngestionLog(
+        source_system="sam_gov",
+        status="queued",
+        extra_metadata={"plan": params},
+    )
+    session.add(log)
+    await session.flush()
+    await enqueue_job(
+        session,
+        job_type="sam_gov_planned",
+        params=params,
+        ingestion_log_id=log.id,
+        max_attempts=get_settings().ingestion_job_max_attempts,
+    )
+    return log
+
+
+async def _plan_from_cli(enqueue: bool, limit: Optional[int]) -> tuple:
+    """Build the current plan and optionally queue a run of it."""
+    from src.database.connection import async_session_factory
+    
+    async with async_session_factory() as db:
+        subscriptions = await load_active_subscriptions(db)
+        queries = build_plan(subscriptions)
+        ingestion_id = None
+        if enqueue:
+            log = await enqueue_planned_ingestion(db, limit=limit)
+            await db.commit()
+            ingestion_id = log.id
+    return subscriptions, queries, ingestion_id
+
+
+@click.command()
+@click.option("--enqueue", is_flag=True, help="Queue a run of the plan for the ingestion workers")
+@click.option("--limit", type=int, default=None, help="Maximum records per query")
+def main(enqueue, limit):
+    """Show the shared-fetch plan for all active subscriptions."""
+    subscriptions, queries, ingestion_id = asyncio.run(_plan_from_cli(enqueue, limit))
+    click.echo(f"{len(subscriptions)} subscriptions -> {len(queries)} queries")
+    for query in queries:
+        filters = ", ".join(
+            f"{dimension}={','.join(query.filters[dimension]) or '*'}" for dimension in FILTER_DIMENSIONS
+        )
+        click.echo(f"  {filters} ({len(query.organization_ids)} organizations)")
+    if ingestion_id:
+        click.echo(f"Queued planned ingestion {ingestion_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Deadline-Driven Notice Refresh
+
+Notices close to their response deadline are amended and extended far
+more often than notices that close months from now, so refreshing every
+stored notice at the same rate either misses late amendments or wastes
+the API quota. The refresh scheduler keeps a priority queue of tracked
+notices in ``ingestion.notice_refresh``. Each notice gets a tier from its
+deadline proximity, moved up one tier if it changed recently. The tier
+sets how soon the notice is refetched.
+
+Due notices are drained hottest tier first and within a fixed hourly
+request budget, so when the budget is short cold notices wait while
+closing ones keep being refreshed. Notices past their ``archive_date``
+are archived and retired from the queue so they stop consuming refresh
+capacity; one that a later ingest makes active again is tracked anew.
+
+Usage:
+    python -m src.ingestion.refresh
+    python -m src.ingestion.refresh --once
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+import structlog
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import NoticeRefresh, Opportunity
+
+logger = structlog.get_logger()
+
+# (tier, days until the response deadline up to which it applies, refresh interval),
+# hottest first; the last tier takes everything else
+REFRESH_TIERS: List[Tuple[str, Optional[int], timedelta]] = [
+    ("closing", 3, timedelta(hours=2)),
+    ("hot", 14, timedelta(hours=8)),
+    ("warm", 45, timedelta(days=1)),
+    ("cold", None, timedelta(days=7)),
+]
+
+# Notices changed this recently are refreshed one tier hotter
+RECENT_CHANGE = timedelta(days=3)
+
+# Retry delay for notices whose refresh request failed
+FAILED_RETRY = timedelta(minutes=15)
+
+
+def refresh_schedule(
+    response_deadline: Optional[datetime],
+    last_changed_at: Optional[datetime],
+    now: datetime,
+) -> Tuple[str, int, datetime]:
+    """
+    Tier, priority and next refresh time of a notice refreshed at ``now``.
+    
+    Notices without a deadline, or whose deadline has passed, are cold.
+    
+    Returns:
+        Tuple of (tier name, priority, next refresh time)
+    """
+    index = len(REFRESH_TIERS) - 1
+    if response_deadline and response_deadline >= now:
+        days_left = (response_deadline - now).total_seconds() / 86400
+        index = next(
+            i for i, (_, max_days, _) in enumerate(REFRESH_TIERS)
+            if max_days is None or days_left <= max_days
+        )
+    
+    if last_changed_at and now - last_changed_at <= RECENT_CHANGE:
+        index = max(0, index - 1)
+    
+    tier, _, interval = REFRESH_TIERS[index]
+    return tier, index, now + interval
+
+
+class RefreshBudget:
+    """
+    Token bucket holding the hourly refresh request budget.
+    
+    Tokens accrue continuously; the bucket holds at most five minutes'
+    worth (but at least one request, unless the budget is zero), so an
+    idle scheduler cannot save up a large burst.
+    """
+    
+    def __init__(self, requests_per_hour: int):
+        self.rate = max(requests_per_hour, 0) / 3600
+        self.capacity = max(1.0, requests_per_hour / 12) if requests_per_hour > 0 else 0.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+    
+    def take(self, wanted: int) -> int:
+        """Take up to ``wanted`` whole tokens; returns how many were granted."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        
+        granted = min(wanted, int(self.tokens))
+        self.tokens -= granted
+        return granted
+    
+    def refund(self, unused: int) -> None:
+        """Return tokens taken but not spent."""
+        self.tokens = min(self.capacity, self.tokens + unused)
+
+
+class RefreshScheduler:
+    """Tracks stored notices and refreshes them by deadline priority."""
+    
+    # Notices added to the queue per sync statement
+    SYNC_BATCH_SIZE = 1000
+    
+    def __init__(
+        self,
+        session_factory,
+        requests_per_hour: Optional[int] = None,
+        tick_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            session_factory: Creates database sessions
+            requests_per_hour: SAM.gov requests the scheduler may spend per hour
+            tick_seconds: Seconds between scheduling rounds
+        """
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.requests_per_hour = requests_per_hour or settings.sam_gov_refresh_requests_per_hour
+        self.tick_seconds = tick_seconds or settings.sam_gov_refresh_tick_seconds
+        self.budget = RefreshBudget(self.requests_per_hour)
+        self._stopping = asyncio.Event()
+    
+    def stop(self):
+        """Stop after the current round."""
+        self._stopping.set()
+    
+    async def run(self):
+        """Run scheduling rounds until stopped."""
+        logger.info(
+            "Refresh scheduler started",
+            requests_per_hour=self.requests_per_hour,
+            tick_seconds=self.tick_seconds,
+        )
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Refresh round failed", error=str(e))
+            
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Refresh scheduler stopped")
+    
+    async def run_once(self) -> Dict[str, int]:
+        """
+        One scheduling round: retire, track new notices, refresh due ones.
+        
+        Returns:
+            Dictionary with round statistics
+        """
+        stats = {"retired": await self.retire(), "tracked": await self.sync()}
+        stats.update(await self.refresh_due())
+        if any(stats.values()):
+            logger.info("Refresh round complete", **stats)
+        return stats
+    
+    async def retire(self) -> int:
+        """
+        Archive notices past their archive date and drop them from the queue.
+        
+        Returns:
+            Number of queue entries retired
+        """
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Opportunity)
+                .where(Opportunity.status == "active", Opportunity.archive_date <= now)
+                .values(status="archived")
+            )
+            result = await db.execute(
+                update(NoticeRefresh)
+                .where(
+                    NoticeRefresh.retired_at.is_(None),
+                    NoticeRefresh.opportunity_id == Opportunity.id,
+                    Opportunity.status != "active",
+                )
+                .values(retired_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount or 0
+    
+    async def sync(self) -> int:
+        """
+        Track active SAM.gov notices that are not tracked yet, or whose
+        entry was retired before an ingest made them active again.
+        
+        Entries are scheduled from the notice's last update, which is
+        when ingestion last saw it.
+        
+        Returns:
+            Number of notices added or re-tracked
+        """
+        added = 0
+        async with self.session_factory() as db:
+            while True:
+                stmt = (
+                    select(
+                        Opportunity.id,
+                        Opportunity.source_id,
+                        Opportunity.response_deadline,
+                        Opportunity.updated_at,
+                    )
+                    .outerjoin(NoticeRefresh, NoticeRefresh.opportunity_id == Opportunity.id)
+                    .where(
+                        or_(NoticeRefresh.opportunity_id.is_(None), NoticeRefresh.retired_at.is_not(None)),
+                        Opportunity.source_system == "sam.gov",
+                        Opportunity.status == "active",
+                    )
+                    .limit(self.SYNC_BATCH_SIZE)
+                )
+                result = await db.execute(stmt)
+                rows = []
+                for row in result:
+                    seen_at = row.updated_at or datetime.now(timezone.utc)
+                    tier, priority, next_refresh_at = refresh_schedule(row.response_deadline, None, seen_at)
+                    rows.append({
+                        "opportunity_id": row.id,
+                        "source_id": row.source_id,
+                        "tier": tier,
+                        "priority": priority,
+                        "next_refresh_at": next_refresh_at,
+                        "last_refreshed_at": seen_at,
+                        "refresh_count": 0,
+                    })
+                if not rows:
+                    break
+                
+                upsert = insert(NoticeRefresh.__table__)
+                await db.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=["opportunity_id"],
+                        set_={
+                            "tier": upsert.excluded.tier,
+                            "priority": upsert.excluded.priority,
+                            "next_refresh_at": upsert.excluded.next_refresh_at,
+                            "last_refreshed_at": upsert.excluded.last_refreshed_at,
+                            "retired_at": None,
+                        },
+                    ),
+                    rows,
+                )
+                await db.commit()
+                added += len(rows)
+                if len(rows) < self.SYNC_BATCH_SIZE:
+                    break
+        return added
+    
+    async def refresh_due(self) -> Dict[str, int]:
+        """
+        Refresh due notices, hottest first, as far as the budget allows.
+        
+        Claimed entries are leased by pushing ``next_refresh_at`` forward
+        before any request is made, so concurrent schedulers skip them.
+        
+        Returns:
+            Dictionary with "refreshed", "changed", "missing" and "failed" counts
+        """
+        from src.ingestion.sam_gov import SAMGovIngester
+        
+        counts = {"refreshed": 0, "changed": 0, "missing": 0, "failed": 0}
+        settings = get_settings()
+        now = datetime.now(timezone.utc)
+        
+        async with self.session_factory() as db:
+            due = await self._count_due(db, now)
+            granted = self.budget.take(due)
+            if not granted:
+                return counts
+            claimed = await self._claim(db, granted, now)
+            # Entries locked by a concurrent scheduler are skipped, not spent
+            self.budget.refund(granted - len(claimed))
+            if not claimed:
+                return counts
+            
+            ingester = SAMGovIngester(
+                api_key=settings.sam_gov_api_key,
+                db_session=db,
+                max_concurrency=settings.sam_gov_max_concurrency,
+            )
+            changed_ids: List[uuid.UUID] = []
+            try:
+                outcomes = await ingester.refresh_notices(
+                    [(entry["source_id"], entry["posted_date"]) for entry in claimed],
+                    changed_ids,
+                )
+            finally:
+                await ingester.close()
+            
+            await self._reschedule(db, claimed, outcomes, set(changed_ids))
+        
+        for outcome in outcomes.values():
+            if outcome == "stored":
+                counts["refreshed"] += 1
+            else:
+                counts[outcome] += 1
+        counts["changed"] = len(changed_ids)
+        return counts
+    
+    async def _count_due(self, db: AsyncSession, now: datetime) -> int:
+        result = await db.execute(
+            select(NoticeRefresh.opportunity_id)
+            .where(NoticeRefresh.retired_at.is_(None), NoticeRefresh.next_refresh_at <= now)
+            .limit(int(self.budget.capacity))
+        )
+        return len(result.all())
+    
+    async def _claim(self, db: AsyncSession, limit: int, now: datetime) -> List[Dict[str, Any]]:
+        """Lease the ``limit`` most urgent due entries."""
+        stmt = (
+            select(NoticeRefresh.opportunity_id, NoticeRefresh.source_id, Opportunity.posted_date)
+            .join(Opportunity, Opportunity.id == NoticeRefresh.opportunity_id)
+            .where(NoticeRefresh.retired_at.is_(None), NoticeRefresh.next_refresh_at <= now)
+            .order_by(NoticeRefresh.priority, NoticeRefresh.next_refresh_at)
+            .limit(limit)
+            .with_for_update(of=NoticeRefresh, skip_locked=True)
+        )
+        result = await db.execute(stmt)
+        claimed = [
+            {"opportunity_id": row.opportunity_id, "source_id": row.source_id, "posted_date": row.posted_date}
+            for row in result
+        ]
+        if claimed:
+            await db.execute(
+                update(NoticeRefresh)
+                .where(NoticeRefresh.opportunity_id.in_([entry["opportunity_id"] for entry in claimed]))
+                .values(next_refresh_at=now + FAILED_RETRY)
+            )
+        await db.commit()
+        return claimed
+    
+    async def _reschedule(
+        self,
+        db: AsyncSession,
+        claimed: List[Dict[str, Any]],
+        outcomes: Dict[str, str],
+        changed_ids: set,
+    ) -> None:
+        """Schedule the next refresh of each claimed entry from its fresh state."""
+        now = datetime.now(timezone.utc)
+        ids = [entry["opportunity_id"] for entry in claimed]
+        result = await db.execute(
+            select(
+                NoticeRefresh.opportunity_id,
+                NoticeRefresh.last_changed_at,
+                Opportunity.response_deadline,
+            )
+            .join(Opportunity, Opportunity.id == NoticeRefresh.opportunity_id)
+            .where(NoticeRefresh.opportunity_id.in_(ids))
+        )
+        current = {row.opportunity_id: row for row in result}
+        
+        for entry in claimed:
+            row = current.get(entry["opportunity_id"])
+            if row is None:
+                continue
+            outcome = outcomes.get(entry["source_id"], "failed")
+            if outcome == "failed":
+                # The lease already pushed it FAILED_RETRY into the future
+                continue
+            
+            last_changed_at = now if row.opportunity_id in changed_ids else row.last_changed_at
+            tier, priority, next_refresh_at = refresh_schedule(row.response_deadline, last_changed_at, now)
+            if outcome == "missing":
+                # Withdrawn or deleted upstream; keep checking, but rarely
+                tier, priority = REFRESH_TIERS[-1][0], len(REFRESH_TIERS) - 1
+                next_refresh_at = now + REFRESH_TIERS[-1][2]
+            
+            await db.execute(
+                update(NoticeRefresh)
+                .where(NoticeRefresh.opportunity_id == row.opportunity_id)
+                .values(
+                    tier=tier,
+                    priority=priority,
+                    next_refresh_at=next_refresh_at,
+                    last_refreshed_at=now,
+                    last_changed_at=last_changed_at,
+                    refresh_count=NoticeRefresh.refresh_count + 1,
+                )
+            )
+        await db.commit()
+    
+    async def queue_summary(self) -> Dict[str, Dict[str, int]]:
+        """Tracked and currently due notices per tier."""
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(
+                    NoticeRefresh.tier,
+                    func.count(),
+                    func.count(case((NoticeRefresh.next_refresh_at <= now, 1))),
+                )
+                .where(NoticeRefresh.retired_at.is_(None))
+                .group_by(NoticeRefresh.tier)
+            )
+            return {tier: {"tracked": tracked, "due": due} for tier, tracked, due in result}
+
+
+@click.command()
+@click.option("--once", is_flag=True, help="Run a single scheduling round and exit")
+@click.option("--requests-per-hour", type=int, default=None, help="SAM.gov request budget per hour")
+@click.option("--tick-seconds", type=float, default=None, help="Seconds between scheduling rounds")
+def main(once: bool, requests_per_hour: Optional[int], tick_seconds: Optional[float]):
+    """Refresh tracked SAM.gov notices by deadline priority until interrupted."""
+    from src.database.connection import async_session_factory
+    
+    scheduler = RefreshScheduler(
+        async_session_factory,
+        requests_per_hour=requests_per_hour,
+        tick_seconds=tick_seconds,
+    )
+    
+    async def run_once():
+        stats = await scheduler.run_once()
+        click.echo(", ".join(f"{key}={value}" for key, value in stats.items()))
+        for tier, counts in (await scheduler.queue_summary()).items():
+            click.echo(f"  {tier}: {counts['tracked']} tracked, {counts['due']} due")
+    
+    try:
+        asyncio.run(run_once() if once else scheduler.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
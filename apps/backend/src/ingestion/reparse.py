@@ -0,0 +1,437 @@
+"""
+SAM.gov Re-parse Job
+
+Re-runs the current ``SAMGovIngester._parse_opportunity`` over the
+``raw_data`` already stored for each opportunity (in
+``aureon.opportunity_raw``), so parser fixes reach the whole corpus
+without refetching anything from SAM.gov.
+
+Rows are selected by ``parser_version`` older than
+``SAMGovIngester.PARSER_VERSION`` and streamed through a server-side
+cursor. Parsing and hashing run in a process pool. Only the columns whose
+field hash changed are written back, grouped into one executemany UPDATE
+per distinct set of changed columns. Rows whose content is unchanged only
+get their ``parser_version`` re-stamped, which leaves ``updated_at``
+alone. Every committed batch carries the new version, so an interrupted
+run simply resumes with the rows still behind.
+
+Usage:
+    python -m src.ingestion.reparse
+    python -m src.ingestion.reparse --enqueue
+"""
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import click
+import structlog
+from sqlalchemy import Text, bindparam, cast, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import IngestionLog, Opportunity, OpportunityRaw
+from src.ingestion.descriptions import is_description_url
+from src.ingestion.pipeline import Pipeline, Stage
+from src.ingestion.sam_gov import SAMGovIngester
+from src.services.term_index import index_opportunities
+
+if TYPE_CHECKING:
+    from src.ingestion.jobs import JobContext
+
+logger = structlog.get_logger()
+
+# Parsed fields never written back: the input itself and bookkeeping
+NOT_REWRITTEN = {"raw_data", "ingested_at", "parser_version", "source_id", "source_system"}
+
+STAT_KEYS = ("scanned", "changed", "unchanged", "failed", "batches")
+
+
+@dataclass
+class ReparsedRow:
+    """Outcome of re-parsing one stored opportunity."""
+    id: str
+    # Changed columns and their new values; empty when content is unchanged
+    values: Dict[str, Any] = field(default_factory=dict)
+    content_hash: Optional[str] = None
+    field_hashes: Optional[Dict[str, str]] = None
+
+
+def reparse_rows(rows: List[Tuple[str, str, Optional[str], Optional[Dict[str, str]]]]) -> Tuple[List[ReparsedRow], int]:
+    """
+    Re-parse stored rows and diff them against their field hashes.
+    
+    Runs in a worker process. Descriptions that were hydrated after
+    ingestion are kept, since ``raw_data`` only holds the link.
+    
+    Args:
+        rows: (id, raw_data JSON text, stored description, stored field hashes)
+    
+    Returns:
+        Tuple of (re-parse outcomes, rows that failed to parse)
+    """
+    results = []
+    failed = 0
+    for row_id, raw_text, description, stored_hashes in rows:
+        try:
+            parsed = SAMGovIngester._parse_opportunity(json.loads(raw_text))
+        except Exception:
+            failed += 1
+            continue
+        
+        if is_description_url(parsed["description"]) and description and not is_description_url(description):
+            parsed["description"] = description
+        
+        content_hash, field_hashes = SAMGovIngester._content_hashes(parsed)
+        stored_hashes = stored_hashes or {}
+        values = {
+            key: parsed[key]
+            for key, value in field_hashes.items()
+            if key not in NOT_REWRITTEN and stored_hashes.get(key) != value
+        }
+        if values:
+            results.append(ReparsedRow(row_id, values, content_hash, field_hashes))
+        else:
+            results.append(ReparsedRow(row_id))
+    return results, failed
+
+
+@dataclass
+class _Batch:
+    """One batch of stored rows moving through the re-parse pipeline."""
+    rows: List[Tuple[str, str, Optional[str], Optional[Dict[str, str]]]]
+    results: List[ReparsedRow] = field(default_factory=list)
+    failed: int = 0
+
+
+class OpportunityReparser:
+    """Re-parses stored SAM.gov opportunities with the current parser."""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        parser_version: int = SAMGovIngester.PARSER_VERSION,
+    ):
+        """
+        Initialize the re-parser.
+        
+        Args:
+            session_factory: Creates the reading and the writing session
+            batch_size: Rows per cursor fetch and per write transaction
+            workers: Parser processes; 1 parses on a thread of this process
+            parser_version: Version to bring rows up to
+        """
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size or settings.sam_gov_reparse_batch_size)
+        self.workers = max(1, workers or settings.sam_gov_reparse_workers)
+        self.parser_version = parser_version
+        
+        # Per-stage metrics from the most recent run() call
+        self.last_pipeline_metrics: Dict[str, Dict[str, Any]] = {}
+    
+    async def pending(self) -> int:
+        """Number of SAM.gov rows parsed by an older version."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(func.count())
+                .select_from(Opportunity)
+                .join(OpportunityRaw, OpportunityRaw.opportunity_id == Opportunity.id)
+                .where(*self._stale_filter())
+            )
+            return result.scalar_one()
+    
+    async def run(
+        self,
+        stats: Optional[Dict[str, int]] = None,
+        on_batch: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Re-parse every row behind ``parser_version``.
+        
+        Args:
+            stats: Counters carried over from an interrupted attempt
+            on_batch: Awaited with the running counters after each batch commits
+        
+        Returns:
+            Dictionary with re-parse statistics
+        """
+        stats = {key: (stats or {}).get(key, 0) for key in STAT_KEYS}
+        executor: Optional[Executor] = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        
+        logger.info(
+            "Starting SAM.gov re-parse",
+            pending=await self.pending(),
+            parser_version=self.parser_version,
+            batch_size=self.batch_size,
+            workers=self.workers,
+        )
+        
+        async def parse(batch: _Batch) -> _Batch:
+            batch.results, batch.failed = await loop.run_in_executor(executor, reparse_rows, batch.rows)
+            batch.rows = []
+            return batch
+        
+        async with self.session_factory() as reader, self.session_factory() as writer:
+            async def write(batch: _Batch) -> None:
+                await self._write_batch(writer, batch.results)
+                await writer.commit()
+                
+                changed = sum(1 for result in batch.results if result.values)
+                stats["scanned"] += len(batch.results) + batch.failed
+                stats["changed"] += changed
+                stats["unchanged"] += len(batch.results) - changed
+                stats["failed"] += batch.failed
+                stats["batches"] += 1
+                if on_batch:
+                    await on_batch(dict(stats))
+            
+            pipeline = Pipeline(
+                self._stream_rows(reader),
+                [
+                    Stage("parse", parse, workers=self.workers),
+                    Stage("write", write),
+                ],
+                queue_size=self.workers + 1,
+                size=lambda batch: len(batch.rows) or len(batch.results) + batch.failed,
+                source_name="read",
+            )
+            try:
+                await pipeline.run()
+            finally:
+                self.last_pipeline_metrics = pipeline.summary()
+                if executor:
+                    executor.shutdown(cancel_futures=True)
+        
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "SAM.gov re-parse complete",
+            parser_version=self.parser_version,
+            rows_per_second=round(stats["scanned"] / elapsed, 1) if elapsed else None,
+            **stats,
+        )
+        return stats
+    
+    def _stale_filter(self) -> list:
+        return [
+            Opportunity.source_system == "sam.gov",
+            or_(
+                Opportunity.parser_version.is_(None),
+                Opportunity.parser_version < self.parser_version,
+            ),
+        ]
+    
+    async def _stream_rows(self, reader: AsyncSession) -> AsyncIterator[_Batch]:
+        """Pipeline source: stale rows in batches from a server-side cursor."""
+        stmt = select(
+            cast(Opportunity.id, Text),
+            # Decoded in the worker processes rather than here
+            cast(OpportunityRaw.raw_data, Text),
+            Opportunity.description,
+            Opportunity.field_hashes,
+        ).join(
+            OpportunityRaw, OpportunityRaw.opportunity_id == Opportunity.id
+        ).where(*self._stale_filter()).execution_options(yield_per=self.batch_size)
+        
+        result = await reader.stream(stmt)
+        async for partition in result.partitions():
+            yield _Batch(rows=[tuple(row) for row in partition])
+    
+    async def _write_batch(self, writer: AsyncSession, results: List[ReparsedRow]) -> None:
+        """
+        Write changed columns back, grouped by the set of columns that changed,
+        and re-index rows whose title or description changed.
+        """
+        table = Opportunity.__table__
+        unchanged = [uuid.UUID(result.id) for result in results if not result.values]
+        if unchanged:
+            await writer.execute(
+                update(table)
+                .where(table.c.id.in_(unchanged))
+                # Keep updated_at; only the bookkeeping version moves
+                .values(parser_version=self.parser_version, updated_at=table.c.updated_at)
+            )
+        
+        groups: Dict[FrozenSet[str], List[ReparsedRow]] = {}
+        for result in results:
+            if result.values:
+                groups.setdefault(frozenset(result.values), []).append(result)
+        
+        for columns, group in groups.items():
+            ordered = sorted(columns)
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    **{column: bindparam(f"b_{column}") for column in ordered},
+                    content_hash=bindparam("b_content_hash"),
+                    field_hashes=bindparam("b_field_hashes"),
+                    changed_fields=bindparam("b_changed_fields"),
+                    parser_version=self.parser_version,
+                    updated_at=func.now(),
+                )
+            )
+            await writer.execute(stmt, [
+                {
+                    "b_id": uuid.UUID(result.id),
+                    **{f"b_{column}": result.values[column] for column in ordered},
+                    "b_content_hash": result.content_hash,
+                    "b_field_hashes": result.field_hashes,
+                    "b_changed_fields": ordered,
+                }
+                for result in group
+            ])
+        
+        # Keep the term index in step with rewritten titles and descriptions
+        reindex = [
+            uuid.UUID(result.id) for result in results
+            if "title" in result.values or "description" in result.values
+        ]
+        if reindex:
+            await index_opportunities(writer, reindex)
+
+
+async def run_sam_gov_reparse(
+    ingestion_id: uuid.UUID,
+    params: dict,
+    context: Optional["JobContext"] = None,
+):
+    """
+    Re-parse stored SAM.gov opportunities for an ingestion log entry.
+    
+    ``params`` may set ``batch_size`` and ``workers``. Progress lives in the
+    rows themselves (``parser_version``); the checkpoint only carries the
+    counters across attempts.
+    """
+    from src.database.connection import async_session_factory
+    
+    checkpoint = context.checkpoint if context else {}
+    
+    async def on_batch(stats: Dict[str, int]) -> None:
+        await context.save_checkpoint(stats=stats)
+    
+    async with async_session_factory() as db:
+        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
+        result = await db.execute(stmt)
+        log = result.scalar_one_or_none()
+        
+        if not log:
+            return
+        
+        log.status = "running"
+        await db.commit()
+        
+        reparser = OpportunityReparser(
+            async_session_factory,
+            batch_size=params.get("batch_size"),
+            workers=params.get("workers"),
+        )
+        try:
+            stats = await reparser.run(
+                stats=checkpoint.get("stats"),
+                on_batch=on_batch if context else None,
+            )
+        except Exception as e:
+            await db.rollback()
+            if not context:
+                log.status = "failed"
+                log.completed_at = datetime.now(timezone.utc)
+                log.error_message = str(e)
+                await db.commit()
+            raise
+        
+        log.status = "completed"
+        log.completed_at = datetime.now(timezone.utc)
+        log.records_fetched = stats["scanned"]
+        log.records_updated = stats["changed"]
+        log.records_failed = stats["failed"]
+        log.extra_metadata = {
+            **(log.extra_metadata or {}),
+            "records_unchanged": stats["unchanged"],
+            "stages": reparser.last_pipeline_metrics,
+        }
+        await db.commit()
+
+
+async def enqueue_reparse(
+    session: AsyncSession,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> IngestionLog:
+    """
+    Queue a re-parse job for the ingestion workers.
+    
+    The caller commits.
+    
+    Returns:
+        Ingestion log entry tracking the re-parse
+    """
+    from src.ingestion.jobs import enqueue_job
+    
+    params = {
+        "parser_version": SAMGovIngester.PARSER_VERSION,
+        "batch_size": batch_size,
+        "workers": workers,
+    }
+    
+    log = IngestionLog(
+        source_system="sam_gov",
+        status="queued",
+        extra_metadata={"reparse": params},
+    )
+    session.add(log)
+    await session.flush()
+    await enqueue_job(
+        session,
+        job_type="sam_gov_reparse",
+        params=params,
+        ingestion_log_id=log.id,
+        max_attempts=get_settings().ingestion_job_max_attempts,
+    )
+    return log
+
+
+async def _reparse_from_cli(batch_size: Optional[int], workers: Optional[int], enqueue: bool) -> uuid.UUID:
+    """Create the log entry, then queue the re-parse or run it in this process."""
+    from src.database.connection import async_session_factory
+    
+    async with async_session_factory() as db:
+        if enqueue:
+            log = await enqueue_reparse(db, batch_size, workers)
+        else:
+            log = IngestionLog(
+                source_system="sam_gov",
+                status="running",
+                extra_metadata={"reparse": {"parser_version": SAMGovIngester.PARSER_VERSION}},
+            )
+            db.add(log)
+        await db.commit()
+    
+    if not enqueue:
+        await run_sam_gov_reparse(log.id, {"batch_size": batch_size, "workers": workers})
+    return log.id
+
+
+@click.command()
+@click.option("--batch-size", type=int, default=None, help="Rows per cursor fetch and write transaction")
+@click.option("--workers", type=int, default=None, help="Parser processes")
+@click.option("--enqueue", is_flag=True, help="Queue the re-parse for the ingestion workers instead")
+def main(batch_size, workers, enqueue):
+    """Re-parse stored SAM.gov opportunities with the current parser."""
+    ingestion_id = asyncio.run(_reparse_from_cli(batch_size, workers, enqueue))
+    click.echo(
+        f"{'Queued' if enqueue else 'Finished'} re-parse {ingestion_id} "
+        f"(parser version {SAMGovIngester.PARSER_VERSION})"
+    )
+
+
+if __name__ == "__main__":
+    main()
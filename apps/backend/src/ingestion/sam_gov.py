@@ -7,19 +7,72 @@ and stores them in the Aureon database.
 API Documentation: https://open.gsa.gov/api/sam-api/
 """
 import asyncio
+import hashlib
+import json
+import sys
+import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Set, Tuple
 import structlog
 
 import httpx
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Opportunity
+from src.config import get_settings
+from src.database.models import Opportunity, OpportunityRaw, Organization
+from src.ingestion.descriptions import DescriptionHydrator
+from src.ingestion.http_client import RateLimitedClient
+from src.ingestion.json_stream import JSONArrayStream
+from src.ingestion.pipeline import Pipeline, Stage
+from src.ingestion.scoring import score_pairs
+from src.ingestion.watermarks import filters_match
+from src.services.candidates import CandidateFilter
+from src.services.embeddings import get_embedding_engine
+from src.services.relevance_scorer import RelevanceScorer
+from src.services.term_index import current_term_index, index_opportunities
 
 logger = structlog.get_logger()
 
 
+@dataclass
+class _PageBatch:
+    """One page of search results moving through the ingest pipeline."""
+    offset: int
+    items: List[Dict]
+    rows: Optional[List[Dict[str, Any]]] = None
+    changed_ids: List[uuid.UUID] = field(default_factory=list)
+    # Records that failed to parse while streaming
+    failed: int = 0
+    # Peak size of the response text held undecoded; decoded items not included
+    text_bytes: int = 0
+    # Set once every record of the page is stored; only such pages are checkpointed
+    stored: bool = False
+
+
+def create_sam_gov_client(timeout: float = 30, **client_kwargs) -> RateLimitedClient:
+    """
+    Build an HTTP client sized to the configured SAM.gov API quota.
+    
+    Share one client between concurrent ingesters so they draw from the
+    same rate limit and connection pool. Extra keyword arguments (e.g. a
+    ``transport`` for an in-process fake server) go to ``httpx.AsyncClient``.
+    """
+    settings = get_settings()
+    return RateLimitedClient(
+        requests_per_second=settings.sam_gov_requests_per_second,
+        burst=settings.sam_gov_rate_limit_burst,
+        max_retries=settings.sam_gov_max_retries,
+        timeout=timeout,
+        max_connections=settings.sam_gov_max_connections,
+        max_keepalive_connections=settings.sam_gov_max_connections,
+        keepalive_expiry=settings.sam_gov_keepalive_seconds,
+        **client_kwargs,
+    )
+
+
 class SAMGovIngester:
     """
     Ingests opportunities from SAM.gov's public API.
@@ -31,7 +84,21 @@ class SAMGovIngester:
     - Set-aside types
     """
     
-    BASE_URL = "https://api.sam.gov/opportunities/v2/search"
+    # API maximum page size
+    PAGE_SIZE = 1000
+    
+    # Rows per upsert statement; each batch is committed on its own
+    UPSERT_BATCH_SIZE = 500
+    
+    # Bump whenever _parse_opportunity changes what it produces; stored rows
+    # from older versions are re-parsed by src.ingestion.reparse
+    PARSER_VERSION = 1
+    
+    # Parsed field holding the source payload; stored in aureon.opportunity_raw
+    RAW_FIELD = "raw_data"
+    
+    # Parsed fields left out of the content hash (bookkeeping, not content)
+    UNHASHED_FIELDS = {RAW_FIELD, "ingested_at", "parser_version"}
     
     # SAM.gov notice types
     NOTICE_TYPES = {
@@ -51,6 +118,11 @@ class SAMGovIngester:
         api_key: Optional[str] = None,
         db_session: Optional[AsyncSession] = None,
         timeout: int = 30,
+        max_concurrency: int = 4,
+        client: Optional[RateLimitedClient] = None,
+        base_url: Optional[str] = None,
+        hydrate_descriptions: bool = True,
+        stream_json: Optional[bool] = None,
     ):
         """
         Initialize SAM.gov ingester.
@@ -59,15 +131,51 @@ class SAMGovIngester:
             api_key: SAM.gov API key (required for production use)
             db_session: Database session for storing opportunities
             timeout: Request timeout in seconds
+            max_concurrency: Maximum page requests in flight when paginating
+            client: Shared HTTP client; not closed by close() when given
+            base_url: Search endpoint override, e.g. a local fake server
+            hydrate_descriptions: Replace description links with their text
+                before storing (requires db_session for the cache)
+            stream_json: Parse search responses incrementally, record by
+                record, as they download (defaults to the
+                ``sam_gov_stream_json`` setting)
         """
         self.api_key = api_key
         self.db_session = db_session
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.max_concurrency = max(1, max_concurrency)
+        self._owns_client = client is None
+        self.client = client or create_sam_gov_client(timeout)
+        self.base_url = base_url or f"{get_settings().sam_gov_base_url.rstrip('/')}/search"
+        self.stream_json = get_settings().sam_gov_stream_json if stream_json is None else stream_json
+        
+        # Pipeline stages share db_session; only one may use it at a time
+        self._db_lock = asyncio.Lock()
+        
+        self.hydrator: Optional[DescriptionHydrator] = None
+        if hydrate_descriptions and db_session is not None:
+            self.hydrator = DescriptionHydrator(
+                self.client,
+                db_session,
+                api_key=api_key,
+                max_concurrency=get_settings().sam_gov_description_concurrency,
+                db_lock=self._db_lock,
+            )
+        
+        # Latest dates seen by the most recent ingest() call
+        self.last_posted_date: Optional[datetime] = None
+        self.last_modified_date: Optional[datetime] = None
+        # Whether the most recent ingest() call fetched every record its
+        # window matched (not cut short by ``limit`` or a single page)
+        self.last_window_complete = False
+        
+        # Per-stage metrics from the most recent ingest() call
+        self.last_pipeline_metrics: Dict[str, Dict[str, Any]] = {}
     
     async def close(self):
         """Close HTTP client."""
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
     
     async def ingest(
         self,
@@ -76,19 +184,43 @@ class SAMGovIngester:
         posted_to: Optional[str] = None,
         notice_types: Optional[List[str]] = None,
         set_aside_codes: Optional[List[str]] = None,
-        limit: int = 100,
+        limit: Optional[int] = 100,
+        paginate: bool = False,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        on_page: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        score_organization_ids: Optional[List[uuid.UUID]] = None,
+        subscribers: Optional[Dict[uuid.UUID, List[Dict[str, List[str]]]]] = None,
+        seen_source_ids: Optional[Set[str]] = None,
     ) -> Dict[str, int]:
         """
         Ingest opportunities from SAM.gov.
         
+        Pages flow through a staged pipeline (fetch, parse, hydrate, store,
+        score, checkpoint) connected by bounded queues, so only a few pages
+        are held in memory at a time and each page is committed as soon as
+        it is stored. A failure part-way through keeps every page already
+        committed; with ``on_page`` the run can resume from there.
+        
         Args:
             naics_codes: Filter by NAICS codes
             posted_from: Start date (MM/DD/YYYY format)
             posted_to: End date (MM/DD/YYYY format)
             notice_types: Filter by notice types
             set_aside_codes: Filter by set-aside types
-            limit: Maximum records to fetch
-            
+            limit: Maximum records to fetch (None fetches every page when paginating)
+            paginate: Follow totalRecords and fetch all remaining pages
+            checkpoint: Progress from an interrupted run; pages at its
+                ``completed_offsets`` are skipped and its ``stats`` carried over
+            on_page: Awaited with the updated checkpoint after each page is stored
+            score_organization_ids: Organizations to score new and changed
+                opportunities against as they are stored
+            subscribers: Organization ID -> normalized filter sets; new and
+                changed opportunities are scored against each organization
+                with a filter set the notice matches
+            seen_source_ids: Notice IDs already handled by another query of
+                the same run; such notices are skipped (counted as
+                ``duplicates``) and every stored notice is added
+        
         Returns:
             Dictionary with ingestion statistics
         """
@@ -97,14 +229,32 @@ class SAMGovIngester:
             naics_codes=naics_codes,
             posted_from=posted_from,
             limit=limit,
+            paginate=paginate,
         )
         
         stats = {
             "fetched": 0,
             "inserted": 0,
             "updated": 0,
+            "unchanged": 0,
             "failed": 0,
+            "pages": 0,
+            "descriptions_fetched": 0,
+            "descriptions_failed": 0,
+            "scored": 0,
+            "embedded": 0,
+            "duplicates": 0,
+            "peak_page_text_bytes": 0,
         }
+        settings = get_settings()
+        checkpoint = checkpoint or {}
+        completed_offsets = set(checkpoint.get("completed_offsets", []))
+        for key, value in checkpoint.get("stats", {}).items():
+            if key in stats:
+                stats[key] = value
+        self.last_posted_date = None
+        self.last_modified_date = None
+        self.last_window_complete = False
         
         # Set default date range (last 30 days)
         if not posted_from:
@@ -119,7 +269,7 @@ class SAMGovIngester:
             "api_key": self.api_key,
             "postedFrom": posted_from,
             "postedTo": posted_to,
-            "limit": min(limit, 1000),  # API max is 1000
+            "limit": min(limit or self.PAGE_SIZE, self.PAGE_SIZE),
             "offset": 0,
         }
         
@@ -132,59 +282,404 @@ class SAMGovIngester:
         if set_aside_codes:
             params["typeOfSetAside"] = ",".join(set_aside_codes)
         
+        pipeline = Pipeline(
+            self._counted_pages(params, limit, paginate, completed_offsets, stats),
+            self._build_stages(
+                stats, completed_offsets, on_page, score_organization_ids, subscribers, seen_source_ids
+            ),
+            queue_size=settings.ingestion_pipeline_queue_size,
+            size=lambda batch: len(batch.items),
+        )
         try:
-            # Fetch opportunities
-            opportunities = await self._fetch_opportunities(params)
-            stats["fetched"] = len(opportunities)
-            
-            # Store in database
-            if self.db_session and opportunities:
-                for opp_data in opportunities:
-                    try:
-                        result = await self._store_opportunity(opp_data)
-                        if result == "inserted":
-                            stats["inserted"] += 1
-                        elif result == "updated":
-                            stats["updated"] += 1
-                    except Exception as e:
-                        logger.warning(
-                            "Failed to store opportunity",
-                            notice_id=opp_data.get("noticeId"),
-                            error=str(e),
-                        )
-                        stats["failed"] += 1
-                
-                await self.db_session.commit()
+            await pipeline.run()
             
             logger.info("SAM.gov ingestion complete", **stats)
-            
+            logger.info("SAM.gov request metrics", **self.client.metrics.summary())
+        
         except Exception as e:
             logger.error("SAM.gov ingestion failed", error=str(e))
             raise
+        finally:
+            self.last_pipeline_metrics = pipeline.summary()
+            logger.info("SAM.gov pipeline metrics", stages=self.last_pipeline_metrics)
         
         return stats
     
+    async def refresh_notices(
+        self,
+        notices: List[Tuple[str, Optional[datetime]]],
+        changed_ids: Optional[List[uuid.UUID]] = None,
+    ) -> Dict[str, str]:
+        """
+        Re-fetch individual notices by ID and store the ones that changed.
+        
+        Each notice costs one search request filtered by ``noticeid``; up
+        to ``max_concurrency`` are in flight at once. The posted date, if
+        known, narrows the search window (which the API caps at a year).
+        Fetched notices are parsed, hydrated and upserted like any page, so
+        unchanged ones are skipped by their content hash.
+        
+        Args:
+            notices: (notice ID, posted date) pairs
+            changed_ids: Receives the IDs of rows that were updated
+        
+        Returns:
+            Notice ID -> "stored", "missing" (not returned by the API) or "failed"
+        """
+        now = datetime.now(timezone.utc)
+        earliest = now - timedelta(days=364)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        outcomes: Dict[str, str] = {}
+        
+        async def fetch(notice_id: str, posted: Optional[datetime]) -> Optional[Dict[str, Any]]:
+            params = {
+                "api_key": self.api_key,
+                "noticeid": notice_id,
+                "postedFrom": max(posted or earliest, earliest).strftime("%m/%d/%Y"),
+                "postedTo": now.strftime("%m/%d/%Y"),
+                "limit": 1,
+                "offset": 0,
+            }
+            async with semaphore:
+                try:
+                    batch, _ = await self._fetch_batch(params, parse=False)
+                except Exception:
+                    outcomes[notice_id] = "failed"
+                    return None
+            
+            item = next((item for item in batch.items if item.get("noticeId") == notice_id), None)
+            row = self._parse_record(item) if item else None
+            outcomes[notice_id] = "stored" if row else ("failed" if item else "missing")
+            return row
+        
+        fetched = await asyncio.gather(*(fetch(notice_id, posted) for notice_id, posted in notices))
+        rows = [row for row in fetched if row]
+        
+        if rows and self.db_session is not None:
+            if self.hydrator:
+                await self.hydrator.hydrate(rows)
+            async with self._db_lock:
+                counts = await self._store_opportunities(rows, changed_ids)
+            if counts["failed"]:
+                for row in rows:
+                    outcomes[row["source_id"]] = "failed"
+        
+        return outcomes
+    
+    async def _iter_pages(
+        self,
+        params: Dict[str, Any],
+        limit: Optional[int],
+        paginate: bool,
+        completed_offsets: Optional[Set[int]] = None,
+    ) -> AsyncIterator[_PageBatch]:
+        """
+        Yield fetched pages in completion order.
+        
+        The first page is fetched on its own to learn totalRecords. In
+        pagination mode the remaining offsets are then fetched concurrently,
+        keeping at most ``max_concurrency`` requests in flight so that a slow
+        consumer never has more than that many pages buffered. Offsets in
+        ``completed_offsets`` were stored by an earlier attempt and are not
+        yielded again (the first page is still fetched for its total).
+        """
+        completed_offsets = completed_offsets or set()
+        first_page, total = await self._fetch_batch(params)
+        self.last_window_complete = len(first_page.items) >= total or (
+            paginate and (limit is None or limit >= total)
+        )
+        if params["offset"] not in completed_offsets:
+            yield first_page
+        
+        if not paginate or not first_page.items:
+            return
+        
+        page_size = params["limit"]
+        if limit is not None:
+            total = min(total, limit)
+        offsets = iter(
+            offset for offset in range(len(first_page.items), total, page_size)
+            if offset not in completed_offsets
+        )
+        
+        pending = set()
+        
+        def schedule_next() -> bool:
+            offset = next(offsets, None)
+            if offset is None:
+                return False
+            page_params = {
+                **params,
+                "offset": offset,
+                "limit": min(page_size, total - offset),
+            }
+            pending.add(asyncio.create_task(self._fetch_batch(page_params)))
+            return True
+        
+        try:
+            while len(pending) < self.max_concurrency and schedule_next():
+                pass
+            
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    schedule_next()
+                for task in done:
+                    batch, _ = task.result()
+                    yield batch
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _counted_pages(
+        self,
+        params: Dict[str, Any],
+        limit: Optional[int],
+        paginate: bool,
+        completed_offsets: Set[int],
+        stats: Dict[str, int],
+    ) -> AsyncIterator["_PageBatch"]:
+        """Pipeline source: fetched pages wrapped as batches."""
+        async for batch in self._iter_pages(params, limit, paginate, completed_offsets):
+            stats["fetched"] += len(batch.items)
+            stats["pages"] += 1
+            stats["failed"] += batch.failed
+            stats["peak_page_text_bytes"] = max(stats["peak_page_text_bytes"], batch.text_bytes)
+            self._observe_dates(batch.items)
+            yield batch
+    
+    def _build_stages(
+        self,
+        stats: Dict[str, int],
+        completed_offsets: Set[int],
+        on_page: Optional[Callable[[Dict[str, Any]], Awaitable[None]]],
+        score_organization_ids: Optional[List[uuid.UUID]],
+        subscribers: Optional[Dict[uuid.UUID, List[Dict[str, List[str]]]]] = None,
+        seen_source_ids: Optional[Set[str]] = None,
+    ) -> List[Stage]:
+        """
+        Pipeline stages after fetch.
+        
+        Parsing and hydration run ahead of the database work; storing and
+        scoring share ``db_session`` and take turns on ``_db_lock``. The
+        checkpoint stage runs last with a single worker so ``on_page`` only
+        ever sees pages that are fully stored; pages with failed records are
+        left out of ``completed_offsets``.
+        """
+        settings = get_settings()
+        subscribers = subscribers or {}
+        
+        async def parse(batch: _PageBatch) -> _PageBatch:
+            # Streamed pages were already parsed record by record
+            if batch.rows is None:
+                batch.rows = self._parse_page(batch.items, stats)
+                batch.failed = len(batch.items) - len(batch.rows)
+            if seen_source_ids is not None:
+                # Drop notices another query of this run already claimed
+                # before they cost a hydration or an upsert
+                fresh = []
+                for row in batch.rows:
+                    if row["source_id"] in seen_source_ids:
+                        stats["duplicates"] += 1
+                    else:
+                        seen_source_ids.add(row["source_id"])
+                        fresh.append(row)
+                batch.rows = fresh
+            return batch
+        
+        async def hydrate(batch: _PageBatch) -> _PageBatch:
+            if batch.rows:
+                hydrated = await self.hydrator.hydrate(batch.rows)
+                stats["descriptions_fetched"] += hydrated["fetched"]
+                stats["descriptions_failed"] += hydrated["failed"]
+            return batch
+        
+        async def store(batch: _PageBatch) -> _PageBatch:
+            failed = batch.failed
+            if batch.rows:
+                async with self._db_lock:
+                    counts = await self._store_opportunities(batch.rows, batch.changed_ids)
+                for key, value in counts.items():
+                    stats[key] += value
+                failed += counts["failed"]
+            batch.stored = not failed
+            # Parsed rows are no longer needed once stored
+            batch.rows = None
+            return batch
+        
+        embeddings = get_embedding_engine()
+        
+        async def embed(batch: _PageBatch) -> _PageBatch:
+            if batch.changed_ids:
+                async with self._db_lock:
+                    rows = await embeddings.opportunity_rows(self.db_session, batch.changed_ids)
+                # Embedding is CPU-bound; keep the event loop free for the other stages
+                stats["embedded"] += await asyncio.to_thread(embeddings.add_opportunities, rows)
+            return batch
+        
+        scorer = None
+        organizations: List[Organization] = []
+        score_all = set(score_organization_ids or [])
+        # Whole-corpus organizations score only their candidates
+        candidate_filters: Dict[uuid.UUID, CandidateFilter] = {}
+        
+        async def score(batch: _PageBatch) -> _PageBatch:
+            nonlocal scorer, organizations, candidate_filters
+            if not batch.changed_ids:
+                return batch
+            async with self._db_lock:
+                if scorer is None:
+                    scorer = RelevanceScorer(
+                        term_index=await current_term_index(self.db_session),
+                        embeddings=embeddings,
+                    )
+                    result = await self.db_session.execute(
+                        select(Organization).where(Organization.id.in_(score_all | set(subscribers)))
+                    )
+                    organizations = list(result.scalars().all())
+                    if embeddings is not None:
+                        await asyncio.to_thread(embeddings.organization_vectors, organizations)
+                    if settings.candidate_generation_enabled:
+                        candidate_filters = {
+                            organization.id: CandidateFilter.for_organization(
+                                scorer, organization, settings.candidate_state_radius
+                            )
+                            for organization in organizations
+                            if organization.id in score_all
+                        }
+                result = await self.db_session.execute(
+                    select(Opportunity).where(Opportunity.id.in_(batch.changed_ids))
+                )
+                filter_fields = await self._load_filter_fields(batch.changed_ids) if subscribers else {}
+                pairs = [
+                    (organization, opportunity)
+                    for opportunity in result.scalars().all()
+                    for organization in organizations
+                    if (organization.id in score_all and (
+                        organization.id not in candidate_filters
+                        or candidate_filters[organization.id].matches(scorer, opportunity)
+                    )) or any(
+                        filters_match(filters, filter_fields.get(opportunity.id, {}))
+                        for filters in subscribers.get(organization.id, ())
+                    )
+                ]
+                try:
+                    stats["scored"] += await score_pairs(self.db_session, pairs, scorer)
+                    await self.db_session.commit()
+                except Exception as e:
+                    await self.db_session.rollback()
+                    logger.warning("Failed to score opportunity batch", error=str(e))
+            return batch
+        
+        async def checkpoint(batch: _PageBatch) -> None:
+            # A page with records that failed to parse or store is fetched
+            # again on resume, where its failures are counted anew
+            if batch.stored:
+                completed_offsets.add(batch.offset)
+            if on_page:
+                await on_page({
+                    "completed_offsets": sorted(completed_offsets),
+                    "stats": {key: value for key, value in stats.items() if key != "failed"},
+                })
+        
+        stages = []
+        if self.db_session is not None:
+            stages.append(Stage("parse", parse))
+            if self.hydrator:
+                stages.append(Stage("hydrate", hydrate, workers=settings.ingestion_hydrate_workers))
+            stages.append(Stage("store", store))
+            if embeddings is not None:
+                stages.append(Stage("embed", embed))
+            if score_organization_ids or subscribers:
+                stages.append(Stage("score", score))
+        stages.append(Stage("checkpoint", checkpoint))
+        return stages
+    
+    def _parse_page(self, opportunities: List[Dict], stats: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Parse one page of opportunities, counting records that fail."""
+        rows = []
+        for opp_data in opportunities:
+            row = self._parse_record(opp_data)
+            if row is None:
+                stats["failed"] += 1
+            else:
+                rows.append(row)
+        return rows
+    
+    def _parse_record(self, opp_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse one opportunity, logging and returning None on failure."""
+        try:
+            return self._parse_opportunity(opp_data)
+        except Exception as e:
+            logger.warning(
+                "Failed to parse opportunity",
+                notice_id=opp_data.get("noticeId"),
+                error=str(e),
+            )
+            return None
+    
     async def _fetch_opportunities(self, params: Dict[str, Any]) -> List[Dict]:
         """Fetch opportunities from SAM.gov API."""
+        opportunities, _ = await self._fetch_page(params)
+        return opportunities
+    
+    async def _fetch_page(self, params: Dict[str, Any]) -> Tuple[List[Dict], int]:
+        """
+        Fetch a single page from SAM.gov API.
+        
+        Returns:
+            Tuple of (opportunities on this page, totalRecords for the query)
+        """
+        batch, total = await self._fetch_batch(params, parse=False)
+        return batch.items, total
+    
+    async def _fetch_batch(
+        self, params: Dict[str, Any], parse: Optional[bool] = None
+    ) -> Tuple[_PageBatch, int]:
+        """
+        Fetch a single page as a pipeline batch.
+        
+        In streaming mode ``opportunitiesData`` items are decoded one at a
+        time while the body downloads and, when ``parse`` is set (the default
+        when storing), each is parsed as soon as it arrives.
+        
+        Returns:
+            Tuple of (batch for this page, totalRecords for the query)
+        """
+        if parse is None:
+            parse = self.db_session is not None
+        batch = _PageBatch(offset=params.get("offset", 0), items=[])
+        
         if not self.api_key:
             logger.warning("No SAM.gov API key configured, returning sample data")
-            return self._get_sample_opportunities()
+            batch.items = self._get_sample_opportunities()
+            return batch, len(batch.items)
         
         try:
-            response = await self.client.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            opportunities = data.get("opportunitiesData", [])
+            if self.stream_json:
+                total = await self._stream_page(params, batch, parse)
+            else:
+                response = await self.client.get(self.base_url, params=params)
+                response.raise_for_status()
+                
+                # The whole body is buffered before decoding
+                batch.text_bytes = sys.getsizeof(response.content)
+                data = response.json()
+                batch.items = data.get("opportunitiesData", [])
+                total = data.get("totalRecords", 0)
             
             logger.debug(
                 "Fetched opportunities from SAM.gov",
-                count=len(opportunities),
-                total=data.get("totalRecords", 0),
+                count=len(batch.items),
+                offset=batch.offset,
+                total=total,
+                text_bytes=batch.text_bytes,
             )
             
-            return opportunities
-            
+            return batch, total
+        
         except httpx.HTTPStatusError as e:
             logger.error(
                 "SAM.gov API error",
@@ -196,57 +691,300 @@ class SAMGovIngester:
             logger.error("Failed to fetch from SAM.gov", error=str(e))
             raise
     
-    async def _store_opportunity(self, data: Dict[str, Any]) -> str:
+    async def _stream_page(self, params: Dict[str, Any], batch: _PageBatch, parse: bool) -> int:
         """
-        Store or update an opportunity in the database.
+        Download one search page, decoding items incrementally into ``batch``.
         
         Returns:
-            "inserted" or "updated"
+            totalRecords for the query
         """
-        source_id = data.get("noticeId", "")
+        parser = JSONArrayStream("opportunitiesData")
+        if parse:
+            batch.rows = []
+        
+        def take(items: List[Dict[str, Any]]) -> None:
+            for item in items:
+                batch.items.append(item)
+                if not parse:
+                    continue
+                row = self._parse_record(item)
+                if row is None:
+                    batch.failed += 1
+                else:
+                    batch.rows.append(row)
         
-        # Check if exists
-        stmt = select(Opportunity).where(
-            Opportunity.source_id == source_id,
-            Opportunity.source_system == "sam.gov",
+        async with self.client.stream("GET", self.base_url, params=params) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            
+            async for chunk in response.aiter_text():
+                take(parser.feed(chunk))
+        
+        take(parser.close())
+        batch.text_bytes = parser.peak_text_bytes
+        return parser.envelope.get("totalRecords", 0)
+    
+    async def _store_opportunities(
+        self,
+        rows: List[Dict[str, Any]],
+        changed_ids: Optional[List[uuid.UUID]] = None,
+    ) -> Dict[str, int]:
+        """
+        Upsert parsed opportunities in batches.
+        
+        Each batch is a single INSERT ... ON CONFLICT DO UPDATE against the
+        (source_id, source_system) unique constraint, committed on its own.
+        The statement is compiled once and executed with a parameter list, so
+        SQLAlchemy renders it as multi-row VALUES without per-row round trips.
+        Inserted and updated rows are told apart by ``xmax = 0`` in the
+        RETURNING clause, which only holds for freshly inserted tuples.
+        
+        Rows whose content hash matches the stored one are skipped entirely,
+        so re-ingesting an unchanged notice neither rewrites the row nor
+        bumps ``updated_at``. Changed rows record which fields differ in
+        ``changed_fields``. IDs of inserted and updated rows are appended to
+        ``changed_ids`` when given.
+        
+        ``raw_data`` goes to ``aureon.opportunity_raw`` and written rows are
+        re-indexed in the term index, both in the same transaction.
+        
+        Returns:
+            Dictionary with "inserted", "updated", "unchanged" and "failed" counts
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        
+        # A single statement may not touch the same row twice, so keep
+        # only the last occurrence of each notice
+        unique_rows = {
+            (row["source_id"], row["source_system"]): row for row in rows
+        }
+        rows = list(unique_rows.values())
+        
+        for start in range(0, len(rows), self.UPSERT_BATCH_SIZE):
+            batch = rows[start:start + self.UPSERT_BATCH_SIZE]
+            
+            try:
+                existing = await self._load_field_hashes(batch)
+                changed = self._detect_changes(batch, existing)
+                counts["unchanged"] += len(batch) - len(changed)
+                if not changed:
+                    continue
+                
+                raw_payloads = {
+                    (row["source_id"], row["source_system"]): row.pop(self.RAW_FIELD)
+                    for row in changed
+                }
+                
+                stmt = insert(Opportunity.__table__)
+                update_columns = {
+                    key: stmt.excluded[key]
+                    for key in changed[0]
+                    if key not in ("source_id", "source_system")
+                }
+                update_columns["updated_at"] = func.now()
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["source_id", "source_system"],
+                    set_=update_columns,
+                    where=Opportunity.__table__.c.content_hash.is_distinct_from(
+                        stmt.excluded.content_hash
+                    ),
+                ).returning(
+                    Opportunity.__table__.c.id,
+                    Opportunity.__table__.c.source_id,
+                    Opportunity.__table__.c.source_system,
+                    literal_column("xmax = 0").label("inserted"),
+                )
+                
+                result = await self.db_session.execute(stmt, changed)
+                written = result.all()
+                await self._store_raw_data([
+                    {"opportunity_id": row.id, "raw_data": raw_payloads[(row.source_id, row.source_system)]}
+                    for row in written
+                ])
+                await index_opportunities(self.db_session, [row.id for row in written])
+                await self.db_session.commit()
+            except Exception as e:
+                await self.db_session.rollback()
+                logger.warning(
+                    "Failed to store opportunity batch",
+                    batch_size=len(batch),
+                    error=str(e),
+                )
+                counts["failed"] += len(batch)
+                continue
+            
+            if changed_ids is not None:
+                changed_ids.extend(row.id for row in written)
+            inserted = sum(1 for row in written if row.inserted)
+            counts["inserted"] += inserted
+            counts["updated"] += len(written) - inserted
+            # Rows changed concurrently to the same content hit the WHERE guard
+            counts["unchanged"] += len(changed) - len(written)
+        
+        return counts
+    
+    async def _store_raw_data(self, rows: List[Dict[str, Any]]) -> None:
+        """Upsert source payloads into the opportunity_raw side table."""
+        if not rows:
+            return
+        stmt = insert(OpportunityRaw.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["opportunity_id"],
+            set_={"raw_data": stmt.excluded.raw_data, "updated_at": func.now()},
+        )
+        await self.db_session.execute(stmt, rows)
+    
+    async def _load_filter_fields(self, opportunity_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Dict[str, str]]:
+        """Raw fields the API filters on, read out of the payloads in SQL."""
+        fields = ("naicsCode", "type", "typeOfSetAside")
+        result = await self.db_session.execute(
+            select(
+                OpportunityRaw.opportunity_id,
+                *(OpportunityRaw.raw_data[name].astext.label(name) for name in fields),
+            ).where(OpportunityRaw.opportunity_id.in_(opportunity_ids))
         )
-        result = await self.db_session.execute(stmt)
-        existing = result.scalar_one_or_none()
-        
-        # Parse opportunity data
-        opp_dict = self._parse_opportunity(data)
-        
-        if existing:
-            # Update existing
-            for key, value in opp_dict.items():
-                setattr(existing, key, value)
-            existing.updated_at = datetime.now(timezone.utc)
-            return "updated"
+        return {
+            row.opportunity_id: {name: getattr(row, name) for name in fields}
+            for row in result
+        }
+    
+    async def _load_field_hashes(
+        self, batch: List[Dict[str, Any]]
+    ) -> Dict[Tuple[str, str], Tuple[Optional[str], Dict[str, str]]]:
+        """Fetch stored content and field hashes for a batch."""
+        source_ids: Dict[str, List[str]] = {}
+        for row in batch:
+            source_ids.setdefault(row["source_system"], []).append(row["source_id"])
+        
+        # One query per source system (a single one for SAM.gov) so that
+        # Postgres can use the unique index with source_id = ANY(...)
+        table = Opportunity.__table__
+        existing = {}
+        for source_system, ids in source_ids.items():
+            stmt = select(
+                table.c.source_id,
+                table.c.content_hash,
+                table.c.field_hashes,
+            ).where(
+                table.c.source_system == source_system,
+                table.c.source_id.in_(ids),
+            )
+            result = await self.db_session.execute(stmt)
+            for row in result:
+                existing[(row.source_id, source_system)] = (
+                    row.content_hash, row.field_hashes or {}
+                )
+        return existing
+    
+    def _detect_changes(
+        self,
+        batch: List[Dict[str, Any]],
+        existing: Dict[Tuple[str, str], Tuple[Optional[str], Dict[str, str]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Attach hashes to each row and drop rows that have not changed.
+        
+        New rows get an empty ``changed_fields``; updated rows list every
+        field whose hash differs from the stored one.
+        """
+        changed = []
+        for row in batch:
+            content_hash, field_hashes = self._content_hashes(row)
+            
+            stored = existing.get((row["source_id"], row["source_system"]))
+            if stored and stored[0] == content_hash:
+                continue
+            
+            if stored:
+                old_hashes = stored[1]
+                changed_fields = sorted(
+                    key for key, value in field_hashes.items()
+                    if old_hashes.get(key) != value
+                )
+            else:
+                changed_fields = []
+            
+            changed.append({
+                **row,
+                "content_hash": content_hash,
+                "field_hashes": field_hashes,
+                "changed_fields": changed_fields,
+            })
+        return changed
+    
+    @classmethod
+    def _content_hashes(cls, row: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
+        """Content hash and per-field hashes of a parsed row."""
+        field_hashes = {
+            key: cls._hash_value(value)
+            for key, value in row.items()
+            if key not in cls.UNHASHED_FIELDS
+        }
+        content_hash = hashlib.sha256(
+            json.dumps(field_hashes, sort_keys=True).encode()
+        ).hexdigest()
+        return content_hash, field_hashes
+    
+    @staticmethod
+    def _hash_value(value: Any) -> str:
+        """Short, stable hash of a single normalized field value."""
+        if isinstance(value, (dict, list)):
+            text = json.dumps(value, sort_keys=True, default=str)
         else:
-            # Insert new
-            opportunity = Opportunity(**opp_dict)
-            self.db_session.add(opportunity)
-            return "inserted"
+            text = str(value)
+        return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
     
-    def _parse_opportunity(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Parse SAM.gov API response into Opportunity model format."""
-        # Parse dates
-        def parse_date(date_str: Optional[str]) -> Optional[datetime]:
-            if not date_str:
-                return None
-            try:
-                # SAM.gov uses various date formats
-                for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"]:
-                    try:
-                        return datetime.strptime(date_str[:19], fmt).replace(
-                            tzinfo=timezone.utc
-                        )
-                    except ValueError:
-                        continue
-                return None
-            except Exception:
-                return None
+    @staticmethod
+    def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
+        """Parse a SAM.gov date string into an aware UTC datetime."""
+        if not date_str:
+            return None
+        try:
+            # Fast path for the ISO dates and timestamps most notices use
+            if date_str[4:5] == "-" and date_str[10:11] in ("", "T"):
+                try:
+                    return datetime.fromisoformat(date_str[:19]).replace(tzinfo=timezone.utc)
+                except ValueError:
+                    pass
+            
+            # SAM.gov uses various date formats
+            for fmt in ["%Y-%m-%d", "%m/%d/%Y", "%Y-%m-%dT%H:%M:%S"]:
+                try:
+                    return datetime.strptime(date_str[:19], fmt).replace(
+                        tzinfo=timezone.utc
+                    )
+                except ValueError:
+                    continue
+            return None
+        except Exception:
+            return None
+    
+    def _last_modified(self, data: Dict[str, Any]) -> Optional[datetime]:
+        """
+        Last modification date of a notice.
         
+        Search results don't always carry a modification timestamp; amended
+        notices are re-posted, so postedDate is the fallback.
+        """
+        return self._parse_date(
+            data.get("modifiedDate") or data.get("postedDate")
+        )
+    
+    def _observe_dates(self, opportunities: List[Dict]) -> None:
+        """Track the latest posted and modified dates seen in this run."""
+        for data in opportunities:
+            posted = self._parse_date(data.get("postedDate"))
+            if posted and (not self.last_posted_date or posted > self.last_posted_date):
+                self.last_posted_date = posted
+            
+            modified = self._last_modified(data)
+            if modified and (not self.last_modified_date or modified > self.last_modified_date):
+                self.last_modified_date = modified
+    
+    @classmethod
+    def _parse_opportunity(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse SAM.gov API response into Opportunity model format."""
         # Extract place of performance
         pop = data.get("placeOfPerformance", {}) or {}
         pop_city = pop.get("city", {}) or {}
@@ -264,7 +1002,7 @@ class SAMGovIngester:
             "source_system": "sam.gov",
             "title": data.get("title", ""),
             "description": data.get("description", ""),
-            "notice_type": self.NOTICE_TYPES.get(
+            "notice_type": cls.NOTICE_TYPES.get(
                 data.get("type", ""), data.get("type", "")
             ),
             "solicitation_number": data.get("solicitationNumber", ""),
@@ -273,9 +1011,9 @@ class SAMGovIngester:
             "psc_code": data.get("classificationCode", ""),
             "psc_description": "",
             "set_aside_type": data.get("typeOfSetAsideDescription", ""),
-            "response_deadline": parse_date(data.get("responseDeadLine")),
-            "posted_date": parse_date(data.get("postedDate")),
-            "archive_date": parse_date(data.get("archiveDate")),
+            "response_deadline": cls._parse_date(data.get("responseDeadLine")),
+            "posted_date": cls._parse_date(data.get("postedDate")),
+            "archive_date": cls._parse_date(data.get("archiveDate")),
             "contract_type": data.get("contractType", ""),
             "estimated_value_min": None,
             "estimated_value_max": None,
@@ -291,6 +1029,7 @@ class SAMGovIngester:
             "status": "active",
             "raw_data": data,
             "ingested_at": datetime.now(timezone.utc),
+            "parser_version": cls.PARSER_VERSION,
         }
     
     def _get_sample_opportunities(self) -> List[Dict]:
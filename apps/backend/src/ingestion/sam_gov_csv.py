@@ -0,0 +1,654 @@
+"""
+SAM.gov Contract Opportunities CSV Extract Loader
+
+Bulk loads the public Contract Opportunities CSV extract (the
+``ContractOpportunitiesFullCSV.csv`` download) into ``aureon.opportunities``
+for cold starts and disaster recovery, without paging the API.
+
+The file is streamed in chunks. Each CSV row is mapped onto the v2 search
+API's JSON shape and run through ``SAMGovIngester._parse_opportunity``, so
+rows carry exactly the fields and content hashes an API ingest would
+produce; later API runs only touch notices that really changed. Parsing
+and hashing run in worker processes. Each chunk is COPYed into a
+temporary staging table and merged into ``aureon.opportunities`` with a
+single INSERT ... SELECT ... ON CONFLICT, committed together with the
+progress counters on its ``IngestionLog`` entry.
+
+Description text from the extract also primes
+``ingestion.description_cache``, so the first API run after a load does
+not refetch every description.
+
+Usage:
+    python -m src.ingestion.sam_gov_csv /data/ContractOpportunitiesFullCSV.csv
+    python -m src.ingestion.sam_gov_csv /data/extract.csv --encoding cp1252 --enqueue
+"""
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import click
+import structlog
+from sqlalchemy import String, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import IngestionLog, Opportunity
+from src.ingestion.descriptions import html_to_text
+from src.ingestion.pipeline import Pipeline, Stage
+from src.ingestion.sam_gov import SAMGovIngester
+from src.services.term_index import index_opportunities
+
+if TYPE_CHECKING:
+    from src.ingestion.jobs import JobContext
+
+logger = structlog.get_logger()
+
+# Columns produced by the parser (derived so the two never drift apart),
+# plus the change-detection hashes
+PARSED_COLUMNS = tuple(SAMGovIngester._parse_opportunity({}))
+STAGE_COLUMNS = PARSED_COLUMNS + ("content_hash", "field_hashes")
+# Staged columns that live on aureon.opportunities (raw_data has its own table)
+MERGED_COLUMNS = tuple(column for column in STAGE_COLUMNS if column != SAMGovIngester.RAW_FIELD)
+JSON_COLUMNS = {"raw_data", "field_hashes"}
+
+STAGE_TABLE = "opportunity_csv_stage"
+
+# Length limits of the target's varchar columns; extract values are
+# truncated to fit rather than failing a whole chunk
+COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in Opportunity.__table__.columns
+    if isinstance(column.type, String) and column.type.length and column.name in PARSED_COLUMNS
+}
+
+STAT_KEYS = ("fetched", "inserted", "updated", "unchanged", "failed", "chunks")
+
+
+def _csv_value(record: Dict[str, str], name: str) -> Optional[str]:
+    value = (record.get(name) or "").strip()
+    return value or None
+
+
+def _csv_date(value: Optional[str]) -> Optional[str]:
+    """Extract timestamps (``2024-01-05 13:35:41.08-05``) as API dates."""
+    return value[:10] if value else None
+
+
+def _csv_datetime(value: Optional[str]) -> Optional[str]:
+    """Extract timestamps in the API's ISO form."""
+    return value.replace(" ", "T", 1) if value else None
+
+
+def notice_from_csv(record: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Map one extract row onto the v2 search API's notice shape.
+    
+    Args:
+        record: CSV row keyed by the extract's column headers
+    
+    Returns:
+        Notice dictionary accepted by ``SAMGovIngester._parse_opportunity``
+    """
+    column = partial(_csv_value, record)
+    
+    contacts = []
+    for prefix, kind in (("PrimaryContact", "primary"), ("SecondaryContact", "secondary")):
+        if column(f"{prefix}Fullname") or column(f"{prefix}Email"):
+            contacts.append({
+                "type": kind,
+                "title": column(f"{prefix}Title"),
+                "fullName": column(f"{prefix}Fullname"),
+                "email": column(f"{prefix}Email"),
+                "phone": column(f"{prefix}Phone"),
+                "fax": column(f"{prefix}Fax"),
+            })
+    
+    award = None
+    if column("AwardNumber") or column("Awardee"):
+        award = {
+            "number": column("AwardNumber"),
+            "date": _csv_date(column("AwardDate")),
+            "amount": column("Award$"),
+            "awardee": {"name": column("Awardee")},
+        }
+    
+    path = [column("Department/Ind.Agency"), column("Sub-Tier"), column("Office")]
+    
+    return {
+        "noticeId": column("NoticeId"),
+        "title": column("Title"),
+        "solicitationNumber": column("Sol#"),
+        "fullParentPathName": ".".join(part for part in path if part) or None,
+        "postedDate": _csv_date(column("PostedDate")),
+        "type": column("Type"),
+        "baseType": column("BaseType"),
+        "archiveType": column("ArchiveType"),
+        "archiveDate": _csv_date(column("ArchiveDate")),
+        "typeOfSetAsideDescription": column("SetASide"),
+        "typeOfSetAside": column("SetASideCode"),
+        "responseDeadLine": _csv_datetime(column("ResponseDeadLine")),
+        "naicsCode": column("NaicsCode"),
+        "classificationCode": column("ClassificationCode"),
+        "active": column("Active"),
+        "award": award,
+        "pointOfContact": contacts,
+        # The extract carries the description body itself, not a link
+        "description": html_to_text(record.get("Description") or ""),
+        "organizationType": column("OrganizationType"),
+        "officeAddress": {
+            "city": column("City"),
+            "state": column("State"),
+            "zipcode": column("ZipCode"),
+            "countryCode": column("CountryCode"),
+        },
+        "placeOfPerformance": {
+            "city": {"name": column("PopCity")},
+            "state": {"code": column("PopState")},
+            "zip": column("PopZip"),
+            "country": {"code": column("PopCountry")},
+        },
+        "additionalInfoLink": column("AdditionalInfoLink"),
+        "uiLink": column("Link"),
+    }
+
+
+def prepare_chunk(header: List[str], records: List[List[str]]) -> Tuple[List[tuple], int]:
+    """
+    Parse and hash one chunk of extract rows into staging tuples.
+    
+    Runs in a worker process. Rows without a notice ID or that fail to
+    parse are counted, not raised; a notice repeated within the chunk
+    keeps its last row.
+    
+    Returns:
+        Tuple of (rows in ``STAGE_COLUMNS`` order, failed row count)
+    """
+    rows: Dict[str, tuple] = {}
+    failed = 0
+    for values in records:
+        try:
+            notice = notice_from_csv(dict(zip(header, values)))
+            if not notice["noticeId"]:
+                raise ValueError("missing NoticeId")
+            
+            row = SAMGovIngester._parse_opportunity(notice)
+            for column, length in COLUMN_LENGTHS.items():
+                if isinstance(row[column], str) and len(row[column]) > length:
+                    row[column] = row[column][:length]
+            
+            content_hash, field_hashes = SAMGovIngester._content_hashes(row)
+            row["content_hash"] = content_hash
+            row["field_hashes"] = field_hashes
+        except Exception:
+            failed += 1
+            continue
+        
+        rows[row["source_id"]] = tuple(
+            json.dumps(row[column], default=str) if column in JSON_COLUMNS else row[column]
+            for column in STAGE_COLUMNS
+        )
+    return list(rows.values()), failed
+
+
+@dataclass
+class _Chunk:
+    """One chunk of extract rows moving through the load pipeline."""
+    index: int
+    records: List[List[str]]
+    rows: List[tuple] = field(default_factory=list)
+    failed: int = 0
+    # Set once the chunk's merge is committed; only merged chunks are checkpointed
+    merged: bool = False
+
+
+class SAMGovCSVLoader:
+    """Loads a Contract Opportunities CSV extract in chunks."""
+    
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        chunk_size: Optional[int] = None,
+        parse_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the loader.
+        
+        Args:
+            db_session: Session used for staging, merging and progress updates
+            chunk_size: Rows per COPY/merge transaction
+            parse_workers: Processes parsing and hashing chunks; 1 parses on a
+                thread of this process
+        """
+        settings = get_settings()
+        self.db_session = db_session
+        self.chunk_size = max(1, chunk_size or settings.sam_gov_csv_chunk_size)
+        self.parse_workers = max(1, parse_workers or settings.sam_gov_csv_parse_workers)
+        
+        # Per-stage metrics from the most recent load() call
+        self.last_pipeline_metrics: Dict[str, Dict[str, Any]] = {}
+    
+    async def load(
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        ingestion_log_id: Optional[uuid.UUID] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        on_chunk: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ) -> Dict[str, int]:
+        """
+        Load an extract file.
+        
+        Args:
+            path: CSV extract path
+            encoding: File encoding; undecodable bytes are replaced
+            ingestion_log_id: Log entry whose counters are updated with each chunk
+            checkpoint: Progress from an interrupted run; chunks in its
+                ``completed_chunks`` are skipped and its ``stats`` carried over
+            on_chunk: Awaited with the updated checkpoint after each chunk commits
+        
+        Returns:
+            Dictionary with load statistics
+        
+        Raises:
+            RuntimeError: If any chunk failed to merge, after the other
+                chunks are loaded; failed chunks are not checkpointed
+        """
+        stats = {key: 0 for key in STAT_KEYS}
+        checkpoint = checkpoint or {}
+        completed = set(checkpoint.get("completed_chunks", []))
+        for key, value in checkpoint.get("stats", {}).items():
+            if key in stats:
+                stats[key] = value
+        
+        size = Path(path).stat().st_size
+        logger.info(
+            "Starting SAM.gov CSV load",
+            path=path,
+            bytes=size,
+            chunk_size=self.chunk_size,
+            parse_workers=self.parse_workers,
+            resumed_chunks=len(completed),
+        )
+        
+        executor: Optional[Executor] = None
+        if self.parse_workers > 1:
+            executor = ProcessPoolExecutor(self.parse_workers)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        progress = {"bytes_read": 0}
+        
+        async def prepare(chunk: _Chunk) -> _Chunk:
+            chunk.rows, chunk.failed = await loop.run_in_executor(
+                executor, prepare_chunk, header, chunk.records
+            )
+            chunk.records = []
+            return chunk
+        
+        failed_chunks: List[int] = []
+        
+        async def merge(chunk: _Chunk) -> _Chunk:
+            # Counted only once the chunk commits, so a retry does not count it twice
+            chunk_stats = dict(stats)
+            chunk_stats["fetched"] += len(chunk.rows) + chunk.failed
+            chunk_stats["failed"] += chunk.failed
+            chunk_stats["chunks"] += 1
+            try:
+                counts = await self._merge_chunk(chunk.rows)
+                for key, value in counts.items():
+                    chunk_stats[key] += value
+                if ingestion_log_id:
+                    await self._record_progress(
+                        ingestion_log_id, chunk_stats, progress["bytes_read"], size,
+                        time.perf_counter() - started,
+                    )
+                await self.db_session.commit()
+            except Exception as e:
+                await self.db_session.rollback()
+                logger.warning(
+                    "Failed to load CSV chunk",
+                    chunk=chunk.index,
+                    rows=len(chunk.rows),
+                    error=str(e),
+                )
+                failed_chunks.append(chunk.index)
+                return chunk
+            
+            stats.update(chunk_stats)
+            chunk.merged = True
+            return chunk
+        
+        async def record(chunk: _Chunk) -> None:
+            if not chunk.merged:
+                return
+            completed.add(chunk.index)
+            if on_chunk:
+                await on_chunk({"completed_chunks": sorted(completed), "stats": dict(stats)})
+        
+        binary = open(path, "rb")
+        try:
+            reader = csv.reader(io.TextIOWrapper(binary, encoding=encoding, errors="replace", newline=""))
+            header = [name.strip().lstrip("\ufeff") for name in next(reader, [])]
+            
+            pipeline = Pipeline(
+                self._read_chunks(reader, binary, completed, progress),
+                [
+                    Stage("prepare", prepare, workers=self.parse_workers),
+                    Stage("merge", merge),
+                    Stage("checkpoint", record),
+                ],
+                queue_size=self.parse_workers + 1,
+                size=lambda chunk: len(chunk.records) or len(chunk.rows) + chunk.failed,
+                source_name="read",
+            )
+            try:
+                await pipeline.run()
+            finally:
+                self.last_pipeline_metrics = pipeline.summary()
+        finally:
+            binary.close()
+            if executor:
+                executor.shutdown(cancel_futures=True)
+        
+        if failed_chunks:
+            # Not checkpointed, so a retried job loads just these chunks
+            raise RuntimeError(
+                f"{len(failed_chunks)} CSV chunk(s) failed to merge: {sorted(failed_chunks)}"
+            )
+        
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "SAM.gov CSV load complete",
+            rows_per_second=round(stats["fetched"] / elapsed, 1) if elapsed else None,
+            **stats,
+        )
+        return stats
+    
+    async def _read_chunks(
+        self,
+        reader,
+        binary,
+        completed: set,
+        progress: Dict[str, int],
+    ) -> AsyncIterator[_Chunk]:
+        """Pipeline source: extract rows in fixed-size chunks, read off the event loop."""
+        size = self.chunk_size
+        
+        def read_chunk() -> List[List[str]]:
+            records = []
+            for values in reader:
+                if values:
+                    records.append(values)
+                    if len(records) >= size:
+                        break
+            return records
+        
+        # Allow multi-megabyte description fields
+        csv.field_size_limit(sys.maxsize)
+        index = 0
+        while True:
+            records = await asyncio.to_thread(read_chunk)
+            if not records:
+                return
+            progress["bytes_read"] = binary.tell()
+            if index not in completed:
+                yield _Chunk(index=index, records=records)
+            index += 1
+    
+    async def _merge_chunk(self, rows: List[tuple]) -> Dict[str, int]:
+        """
+        COPY a prepared chunk into staging and merge it into opportunities.
+        
+        Rows whose content hash matches the stored one are left untouched;
+        updated rows get ``changed_fields`` from comparing field hashes in
+        SQL, and their payloads go to ``aureon.opportunity_raw`` in the same
+        statement. Written rows are then re-indexed in the term index. Runs
+        in the caller's transaction.
+        
+        Returns:
+            Dictionary with "inserted", "updated" and "unchanged" counts
+        """
+        if not rows:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        
+        columns = ", ".join(MERGED_COLUMNS)
+        await self.db_session.execute(text(
+            f"CREATE TEMP TABLE {STAGE_TABLE} ON COMMIT DROP AS "
+            f"SELECT {columns}, NULL::jsonb AS raw_data FROM aureon.opportunities WITH NO DATA"
+        ))
+        
+        connection = await self.db_session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGE_TABLE, records=rows, columns=list(STAGE_COLUMNS)
+        )
+        
+        assignments = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in MERGED_COLUMNS
+            if column not in ("source_id", "source_system")
+        )
+        result = await self.db_session.execute(text(f"""
+            WITH merged AS (
+                INSERT INTO aureon.opportunities AS o (
+                    id, {columns}, changed_fields, attachments, amendments, created_at, updated_at
+                )
+                SELECT gen_random_uuid(), {columns}, '{{}}'::text[], '[]'::jsonb, '[]'::jsonb, now(), now()
+                FROM {STAGE_TABLE}
+                ON CONFLICT (source_id, source_system) DO UPDATE SET
+                    {assignments},
+                    changed_fields = ARRAY(
+                        SELECT e.key FROM jsonb_each_text(EXCLUDED.field_hashes) AS e
+                        WHERE o.field_hashes ->> e.key IS DISTINCT FROM e.value
+                        ORDER BY e.key
+                    ),
+                    updated_at = now()
+                WHERE o.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING o.id, o.source_id, o.source_system, (xmax = 0) AS inserted
+            ), raw AS (
+                INSERT INTO aureon.opportunity_raw (opportunity_id, raw_data, updated_at)
+                SELECT merged.id, stage.raw_data, now()
+                FROM merged JOIN {STAGE_TABLE} AS stage USING (source_id, source_system)
+                ON CONFLICT (opportunity_id) DO UPDATE SET
+                    raw_data = EXCLUDED.raw_data,
+                    updated_at = now()
+            )
+            SELECT id, inserted FROM merged
+        """))
+        merged = result.all()
+        inserted = sum(1 for row in merged if row.inserted)
+        written = len(merged)
+        
+        await index_opportunities(self.db_session, [row.id for row in merged])
+        
+        await self.db_session.execute(text(f"""
+            INSERT INTO ingestion.description_cache (notice_id, last_modified, description, fetched_at)
+            SELECT source_id, coalesce(raw_data ->> 'modifiedDate', raw_data ->> 'postedDate', ''), description, now()
+            FROM {STAGE_TABLE}
+            WHERE description <> ''
+            ON CONFLICT DO NOTHING
+        """))
+        
+        return {
+            "inserted": inserted,
+            "updated": written - inserted,
+            "unchanged": len(rows) - written,
+        }
+    
+    async def _record_progress(
+        self,
+        ingestion_log_id: uuid.UUID,
+        stats: Dict[str, int],
+        bytes_read: int,
+        bytes_total: int,
+        elapsed: float,
+    ) -> None:
+        """Update the log entry's counters in the chunk's transaction."""
+        await self.db_session.execute(
+            update(IngestionLog)
+            .where(IngestionLog.id == ingestion_log_id)
+            .values(
+                records_fetched=stats["fetched"],
+                records_inserted=stats["inserted"],
+                records_updated=stats["updated"],
+                records_failed=stats["failed"],
+                extra_metadata=IngestionLog.extra_metadata.op("||")({
+                    "records_unchanged": stats["unchanged"],
+                    "bytes_read": bytes_read,
+                    "bytes_total": bytes_total,
+                    "progress": round(bytes_read / bytes_total, 4) if bytes_total else 1.0,
+                    "rows_per_second": round(stats["fetched"] / elapsed, 1) if elapsed else None,
+                }),
+            )
+        )
+
+
+async def run_sam_gov_csv_load(
+    ingestion_id: uuid.UUID,
+    params: dict,
+    context: Optional["JobContext"] = None,
+):
+    """
+    Load a CSV extract for an ingestion log entry.
+    
+    ``params`` holds ``path`` (readable by the worker), ``encoding`` and
+    ``chunk_size``. With a ``context`` merged chunks are checkpointed so a
+    retried job skips them; a chunk that failed to merge fails the attempt
+    and is loaded again by the retry.
+    """
+    from src.database.connection import async_session_factory
+    
+    checkpoint = context.checkpoint if context else {}
+    
+    async def on_chunk(progress: Dict[str, Any]) -> None:
+        await context.save_checkpoint(**progress)
+    
+    async with async_session_factory() as db:
+        stmt = select(IngestionLog).where(IngestionLog.id == ingestion_id)
+        result = await db.execute(stmt)
+        log = result.scalar_one_or_none()
+        
+        if not log:
+            return
+        
+        log.status = "running"
+        await db.commit()
+        
+        loader = SAMGovCSVLoader(db, chunk_size=params.get("chunk_size"))
+        try:
+            stats = await loader.load(
+                params["path"],
+                encoding=params.get("encoding") or "utf-8",
+                ingestion_log_id=ingestion_id,
+                checkpoint=checkpoint,
+                on_chunk=on_chunk if context else None,
+            )
+        except Exception as e:
+            await db.rollback()
+            if not context:
+                log.status = "failed"
+                log.completed_at = datetime.now(timezone.utc)
+                log.error_message = str(e)
+                await db.commit()
+            raise
+        
+        await db.refresh(log)
+        log.status = "completed"
+        log.completed_at = datetime.now(timezone.utc)
+        log.records_fetched = stats["fetched"]
+        log.records_inserted = stats["inserted"]
+        log.records_updated = stats["updated"]
+        log.records_failed = stats["failed"]
+        log.extra_metadata = {
+            **(log.extra_metadata or {}),
+            "records_unchanged": stats["unchanged"],
+            "chunks": stats["chunks"],
+            "stages": loader.last_pipeline_metrics,
+        }
+        await db.commit()
+
+
+async def enqueue_csv_load(
+    session: AsyncSession,
+    path: str,
+    encoding: str = "utf-8",
+    chunk_size: Optional[int] = None,
+) -> IngestionLog:
+    """
+    Queue a CSV extract load for the ingestion workers.
+    
+    The caller commits.
+    
+    Returns:
+        Ingestion log entry tracking the load
+    """
+    from src.ingestion.jobs import enqueue_job
+    
+    # Chunk boundaries must not change between attempts of the same job
+    params = {
+        "path": str(Path(path).resolve()),
+        "encoding": encoding,
+        "chunk_size": chunk_size or get_settings().sam_gov_csv_chunk_size,
+    }
+    
+    log = IngestionLog(
+        source_system="sam_gov",
+        status="queued",
+        extra_metadata={"csv_extract": params},
+    )
+    session.add(log)
+    await session.flush()
+    await enqueue_job(
+        session,
+        job_type="sam_gov_csv",
+        params=params,
+        ingestion_log_id=log.id,
+        max_attempts=get_settings().ingestion_job_max_attempts,
+    )
+    return log
+
+
+async def _load_from_cli(path: str, encoding: str, chunk_size: Optional[int], enqueue: bool) -> uuid.UUID:
+    """Create the log entry, then queue the load or run it in this process."""
+    from src.database.connection import async_session_factory, init_db
+    
+    await init_db()
+    async with async_session_factory() as db:
+        if enqueue:
+            log = await enqueue_csv_load(db, path, encoding, chunk_size)
+        else:
+            log = IngestionLog(
+                source_system="sam_gov",
+                status="running",
+                extra_metadata={"csv_extract": {"path": str(Path(path).resolve()), "encoding": encoding}},
+            )
+            db.add(log)
+        await db.commit()
+    
+    if not enqueue:
+        await run_sam_gov_csv_load(log.id, {"path": path, "encoding": encoding, "chunk_size": chunk_size})
+    return log.id
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--encoding", default="utf-8", help="File encoding (the extract is sometimes cp1252)")
+@click.option("--chunk-size", type=int, default=None, help="Rows per COPY/merge transaction")
+@click.option("--enqueue", is_flag=True, help="Queue the load for the ingestion workers instead")
+def main(path, encoding, chunk_size, enqueue):
+    """Bulk load a SAM.gov Contract Opportunities CSV extract."""
+    ingestion_id = asyncio.run(_load_from_cli(path, encoding, chunk_size, enqueue))
+    click.echo(f"{'Queued' if enqueue else 'Finished'} CSV load {ingestion_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Relevance Score Maintainer
+
+Keeps ``aureon.relevance_scores`` current for every organization x
+active opportunity pair, so dashboards read precomputed rankings instead
+of scoring on request. Each round applies the changes made since the
+previous one, found by the ``updated_at`` stamps of the table triggers:
+
+- Organizations created or changed are scored against every active
+  opportunity
+- Opportunities created or changed are scored against every
+  organization; archived (or otherwise inactive) notices are skipped
+
+Changes are read in (updated_at, id) keyset order and scores written
+with bulk upserts. Each entity's watermark advances with the batch it
+covers, so a restarted maintainer resumes where it stopped. Changes
+younger than ``score_maintainer_settle_seconds`` wait for the next
+round: a transaction still open when the round starts may commit rows
+stamped earlier than ones already applied.
+
+Semantic scores use the term index snapshot (or embeddings) current
+when a pair is scored; later drift of the corpus statistics alone does
+not trigger re-scoring.
+
+Usage:
+    python -m src.ingestion.score_maintainer
+    python -m src.ingestion.score_maintainer --once
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import click
+import structlog
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import Opportunity, Organization, ScoreWatermark
+from src.ingestion.scoring import score_opportunities
+from src.services.embeddings import get_embedding_engine
+from src.services.relevance_scorer import RelevanceScorer
+from src.services.term_index import current_term_index
+
+logger = structlog.get_logger()
+
+Watermark = Tuple[datetime, uuid.UUID]
+
+# Changed organizations scored together against each page of active opportunities
+ORGANIZATION_BATCH_SIZE = 50
+
+# Sorts after every real ID, so (t, MAX_ID) covers everything stamped up to t
+MAX_ID = uuid.UUID(int=(1 << 128) - 1)
+
+
+class ScoreMaintainer:
+    """Applies organization and opportunity changes to the stored relevance scores."""
+    
+    def __init__(
+        self,
+        session_factory,
+        tick_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the maintainer.
+        
+        Args:
+            session_factory: Creates database sessions
+            tick_seconds: Seconds between rounds
+            batch_size: Opportunities per scoring batch
+        """
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.tick_seconds = tick_seconds or settings.score_maintainer_tick_seconds
+        self.batch_size = batch_size or settings.score_maintainer_batch_size
+        self.settle = timedelta(seconds=settings.score_maintainer_settle_seconds)
+        self._stopping = asyncio.Event()
+    
+    def stop(self):
+        """Stop after the current round."""
+        self._stopping.set()
+    
+    async def run(self):
+        """Run rounds until stopped."""
+        logger.info("Score maintainer started", tick_seconds=self.tick_seconds, batch_size=self.batch_size)
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Score maintenance round failed", error=str(e))
+            
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Score maintainer stopped")
+    
+    async def run_once(self) -> Dict[str, int]:
+        """
+        One round: apply organization changes, then opportunity changes.
+        
+        Returns:
+            Dictionary with round statistics
+        """
+        stats = await self.apply_organization_changes()
+        stats.update(await self.apply_opportunity_changes())
+        if any(stats.values()):
+            logger.info("Score maintenance round complete", **stats)
+        return stats
+    
+    async def apply_organization_changes(self) -> Dict[str, int]:
+        """
+        Score changed organizations against every active opportunity.
+        
+        On the first run every organization counts as changed; the
+        opportunity watermark then starts at this round's cutoff, since
+        every settled opportunity has just been scored.
+        
+        Returns:
+            Dictionary with "organizations" and "organization_scores" counts
+        """
+        counts = {"organizations": 0, "organization_scores": 0}
+        async with self.session_factory() as db:
+            cutoff = await self._cutoff(db)
+            watermark = await self._get_watermark(db, "organizations")
+            first_run = watermark is None
+            scorer = None
+            
+            while True:
+                organizations = await self._changed(db, Organization, watermark, cutoff, ORGANIZATION_BATCH_SIZE)
+                if not organizations:
+                    break
+                scorer = scorer or await self._scorer(db)
+                counts["organization_scores"] += await self._score_active(db, scorer, organizations)
+                
+                watermark = (organizations[-1].updated_at, organizations[-1].id)
+                await self._set_watermark(db, "organizations", watermark)
+                await db.commit()
+                counts["organizations"] += len(organizations)
+            
+            if first_run and await self._get_watermark(db, "opportunities") is None:
+                await self._set_watermark(db, "opportunities", (cutoff, MAX_ID))
+                await db.commit()
+        return counts
+    
+    async def apply_opportunity_changes(self) -> Dict[str, int]:
+        """
+        Score changed active opportunities against every organization.
+        
+        Returns:
+            Dictionary with "opportunities", "opportunity_scores" and
+            "skipped_inactive" counts
+        """
+        counts = {"opportunities": 0, "opportunity_scores": 0, "skipped_inactive": 0}
+        async with self.session_factory() as db:
+            cutoff = await self._cutoff(db)
+            watermark = await self._get_watermark(db, "opportunities")
+            organizations: Optional[List[Organization]] = None
+            scorer = None
+            
+            while True:
+                opportunities = await self._changed(db, Opportunity, watermark, cutoff, self.batch_size)
+                if not opportunities:
+                    break
+                if organizations is None:
+                    result = await db.execute(select(Organization))
+                    organizations = list(result.scalars().all())
+                    scorer = await self._scorer(db, organizations)
+                
+                active = [o for o in opportunities if o.status == "active"]
+                if active and organizations:
+                    counts["opportunity_scores"] += await score_opportunities(db, organizations, active, scorer)
+                
+                watermark = (opportunities[-1].updated_at, opportunities[-1].id)
+                await self._set_watermark(db, "opportunities", watermark)
+                await db.commit()
+                counts["opportunities"] += len(active)
+                counts["skipped_inactive"] += len(opportunities) - len(active)
+                for opportunity in opportunities:
+                    db.expunge(opportunity)
+        return counts
+    
+    async def _score_active(
+        self,
+        db: AsyncSession,
+        scorer: RelevanceScorer,
+        organizations: Sequence[Organization],
+    ) -> int:
+        """Score organizations against all active opportunities, one committed page at a time."""
+        if scorer.embeddings is not None:
+            await asyncio.to_thread(scorer.embeddings.organization_vectors, organizations)
+        
+        written = 0
+        after: Optional[uuid.UUID] = None
+        while True:
+            stmt = select(Opportunity).where(Opportunity.status == "active")
+            if after is not None:
+                stmt = stmt.where(Opportunity.id > after)
+            result = await db.execute(stmt.order_by(Opportunity.id).limit(self.batch_size))
+            opportunities = list(result.scalars().all())
+            if not opportunities:
+                return written
+            
+            written += await score_opportunities(db, organizations, opportunities, scorer)
+            await db.commit()
+            after = opportunities[-1].id
+            for opportunity in opportunities:
+                db.expunge(opportunity)
+    
+    async def _scorer(
+        self,
+        db: AsyncSession,
+        organizations: Sequence[Organization] = (),
+    ) -> RelevanceScorer:
+        scorer = RelevanceScorer(
+            term_index=await current_term_index(db),
+            embeddings=get_embedding_engine(),
+        )
+        if scorer.embeddings is not None and organizations:
+            await asyncio.to_thread(scorer.embeddings.organization_vectors, organizations)
+        return scorer
+    
+    async def _cutoff(self, db: AsyncSession) -> datetime:
+        """Latest ``updated_at`` applied this round (database clock)."""
+        return await db.scalar(select(func.now())) - self.settle
+    
+    async def _changed(
+        self,
+        db: AsyncSession,
+        model: Type[Union[Organization, Opportunity]],
+        watermark: Optional[Watermark],
+        cutoff: datetime,
+        limit: int,
+    ) -> list:
+        """Rows stamped after the watermark and no later than the cutoff, oldest first."""
+        stmt = select(model).where(model.updated_at <= cutoff)
+        if watermark is not None:
+            stmt = stmt.where(tuple_(model.updated_at, model.id) > tuple_(*watermark))
+        result = await db.execute(stmt.order_by(model.updated_at, model.id).limit(limit))
+        return list(result.scalars().all())
+    
+    async def _get_watermark(self, db: AsyncSession, entity: str) -> Optional[Watermark]:
+        row = await db.get(ScoreWatermark, entity, populate_existing=True)
+        return (row.last_updated_at, row.last_id) if row else None
+    
+    async def _set_watermark(self, db: AsyncSession, entity: str, watermark: Watermark) -> None:
+        stmt = insert(ScoreWatermark.__table__).values(
+            entity=entity, last_updated_at=watermark[0], last_id=watermark[1], recorded_at=func.now(),
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["entity"],
+            set_={
+                "last_updated_at": stmt.excluded.last_updated_at,
+                "last_id": stmt.excluded.last_id,
+                "recorded_at": func.now(),
+            },
+        ))
+    
+    async def watermarks(self) -> Dict[str, Optional[Watermark]]:
+        """Current watermark of each entity."""
+        async with self.session_factory() as db:
+            return {
+                entity: await self._get_watermark(db, entity)
+                for entity in ("organizations", "opportunities")
+            }
+
+
+@click.command()
+@click.option("--once", is_flag=True, help="Run a single round and exit")
+@click.option("--tick-seconds", type=float, default=None, help="Seconds between rounds")
+@click.option("--batch-size", type=int, default=None, help="Opportunities per scoring batch")
+def main(once: bool, tick_seconds: Optional[float], batch_size: Optional[int]):
+    """Keep stored relevance scores current until interrupted."""
+    from src.database.connection import async_session_factory
+    
+    maintainer = ScoreMaintainer(async_session_factory, tick_seconds=tick_seconds, batch_size=batch_size)
+    
+    async def run_once():
+        stats = await maintainer.run_once()
+        click.echo(", ".join(f"{key}={value}" for key, value in stats.items()))
+        for entity, watermark in (await maintainer.watermarks()).items():
+            click.echo(f"  {entity}: " + (f"applied through {watermark[0].isoformat()}" if watermark else "not started"))
+    
+    try:
+        asyncio.run(run_once() if once else maintainer.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
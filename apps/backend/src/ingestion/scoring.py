@@ -0,0 +1,102 @@
+"""
+Relevance Scoring for Ingested Opportunities
+
+Scores freshly stored opportunities against organization profiles and
+bulk upserts the results into ``aureon.relevance_scores``.
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Opportunity, Organization, RelevanceScore
+from src.services.relevance_matrix import ScoreMatrix
+from src.services.relevance_scorer import RelevanceScorer
+
+
+async def score_opportunities(
+    session: AsyncSession,
+    organizations: Sequence[Organization],
+    opportunities: Sequence[Opportunity],
+    scorer: RelevanceScorer,
+) -> int:
+    """
+    Score every (organization, opportunity) pair and upsert the results.
+    
+    The caller commits.
+    
+    Returns:
+        Number of score rows written
+    """
+    matrix = scorer.score_matrix(organizations, opportunities)
+    rows = [
+        _score_row(matrix, i, j)
+        for j in range(len(matrix.opportunities))
+        for i in range(len(matrix.organizations))
+    ]
+    
+    if rows:
+        await upsert_relevance_scores(session, rows)
+    return len(rows)
+
+
+async def score_pairs(
+    session: AsyncSession,
+    pairs: Sequence[Tuple[Organization, Opportunity]],
+    scorer: RelevanceScorer,
+) -> int:
+    """
+    Score the given (organization, opportunity) pairs and upsert the results.
+    
+    The caller commits.
+    
+    Returns:
+        Number of score rows written
+    """
+    # One vectorized row per organization over the opportunities paired with it
+    grouped: Dict[Any, Tuple[Organization, List[Opportunity]]] = {}
+    for organization, opportunity in pairs:
+        grouped.setdefault(organization.id, (organization, []))[1].append(opportunity)
+    
+    rows: List[Dict[str, Any]] = []
+    for organization, opportunities in grouped.values():
+        matrix = scorer.score_matrix([organization], opportunities)
+        for j in range(len(opportunities)):
+            rows.append(_score_row(matrix, 0, j))
+    
+    if rows:
+        await upsert_relevance_scores(session, rows)
+    return len(rows)
+
+
+def _score_row(matrix: ScoreMatrix, i: int, j: int) -> Dict[str, Any]:
+    result = matrix.result(i, j)
+    return {
+        "organization_id": matrix.organizations[i].id,
+        "opportunity_id": matrix.opportunities[j].id,
+        "overall_score": result.overall_score,
+        "naics_score": result.naics_score,
+        "semantic_score": result.semantic_score,
+        "geographic_score": result.geographic_score,
+        "size_score": result.size_score,
+        "past_performance_score": result.past_performance_score,
+        "component_weights": result.component_weights,
+        "explanation": result.explanation,
+    }
+
+
+async def upsert_relevance_scores(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Bulk INSERT ... ON CONFLICT DO UPDATE keyed on (organization, opportunity)."""
+    stmt = insert(RelevanceScore.__table__)
+    update_columns = {
+        key: stmt.excluded[key]
+        for key in rows[0]
+        if key not in ("organization_id", "opportunity_id")
+    }
+    update_columns["calculated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["organization_id", "opportunity_id"],
+        set_=update_columns,
+    )
+    await session.execute(stmt, rows)
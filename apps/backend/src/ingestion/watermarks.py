@@ -0,0 +1,127 @@
+"""
+Ingestion Watermarks
+
+Persists the high-water mark (latest posted and last-modified dates) of
+each successful ingestion run per source system and filter set, so that
+the next run only requests what is new or changed since then.
+"""
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import IngestionWatermark
+
+
+def normalize_filters(
+    naics_codes: Optional[List[str]] = None,
+    notice_types: Optional[List[str]] = None,
+    set_aside_codes: Optional[List[str]] = None,
+) -> Dict[str, List[str]]:
+    """Normalize filters so that equivalent requests share a watermark."""
+    return {
+        "naics_codes": sorted({c.strip() for c in naics_codes or [] if c.strip()}),
+        "notice_types": sorted({t.strip() for t in notice_types or [] if t.strip()}),
+        "set_aside_codes": sorted({s.strip() for s in set_aside_codes or [] if s.strip()}),
+    }
+
+
+def filters_match(filters: Dict[str, List[str]], data: Dict[str, Any]) -> bool:
+    """
+    Whether a raw SAM.gov notice satisfies a normalized filter set.
+    
+    Mirrors the API's ``ncode``, ``ptype`` and ``typeOfSetAside`` filters;
+    an empty list matches anything.
+    """
+    checks = (
+        ("naics_codes", "naicsCode"),
+        ("notice_types", "type"),
+        ("set_aside_codes", "typeOfSetAside"),
+    )
+    for filter_name, field_name in checks:
+        allowed = filters.get(filter_name)
+        if allowed and (data.get(field_name) or "").strip() not in allowed:
+            return False
+    return True
+
+
+def filter_key(filters: Dict[str, Any]) -> str:
+    """Stable key for a normalized filter set."""
+    payload = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def get_watermark(
+    session: AsyncSession,
+    source_system: str,
+    filters: Dict[str, Any],
+) -> Optional[IngestionWatermark]:
+    """Load the watermark for a source and normalized filter set."""
+    stmt = select(IngestionWatermark).where(
+        IngestionWatermark.source_system == source_system,
+        IngestionWatermark.filter_key == filter_key(filters),
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+def incremental_start(
+    watermark: Optional[IngestionWatermark],
+    overlap: timedelta,
+) -> Optional[datetime]:
+    """
+    Start of the posted-date window to fetch for an incremental run.
+    
+    The window reaches back ``overlap`` before the watermark to pick up
+    notices that became visible late or were amended on the same day.
+    
+    The search API filters by posted date only, so notices amended after
+    that window are not picked up here; ``last_modified_date`` is kept
+    for reporting, and amendments to older notices come in through the
+    refresh scheduler (``src.ingestion.refresh``).
+    """
+    if not watermark or not watermark.last_posted_date:
+        return None
+    
+    return watermark.last_posted_date - overlap
+
+
+async def advance_watermark(
+    session: AsyncSession,
+    source_system: str,
+    filters: Dict[str, Any],
+    last_posted_date: Optional[datetime],
+    last_modified_date: Optional[datetime],
+    ingestion_log_id: Optional[uuid.UUID] = None,
+) -> IngestionWatermark:
+    """
+    Move the watermark forward after a successful run.
+    
+    Dates never move backwards, so a run that saw nothing new leaves the
+    watermark where it was. The caller commits.
+    """
+    watermark = await get_watermark(session, source_system, filters)
+    if not watermark:
+        watermark = IngestionWatermark(
+            source_system=source_system,
+            filter_key=filter_key(filters),
+            filters=filters,
+        )
+        session.add(watermark)
+    
+    if last_posted_date and (
+        not watermark.last_posted_date or last_posted_date > watermark.last_posted_date
+    ):
+        watermark.last_posted_date = last_posted_date
+    
+    if last_modified_date and (
+        not watermark.last_modified_date or last_modified_date > watermark.last_modified_date
+    ):
+        watermark.last_modified_date = last_modified_date
+    
+    watermark.ingestion_log_id = ingestion_log_id
+    return watermark
@@ -0,0 +1,215 @@
+"""
+Ingestion Worker
+
+Standalone process that drains ``ingestion.ingestion_jobs`` so long
+ingestion runs never compete with request handling in the API process.
+
+Usage:
+    python -m src.ingestion.worker --concurrency 2
+"""
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import click
+import structlog
+
+from src.config import get_settings
+from src.database.connection import async_session_factory
+from src.database.models import IngestionJob, IngestionLog
+from src.ingestion.jobs import JOB_HANDLERS, JobCancelled, JobContext, claim_job
+
+logger = structlog.get_logger()
+
+
+class IngestionWorker:
+    """
+    Polls the job table and runs claimed jobs.
+    
+    Each of the ``concurrency`` slots claims and runs one job at a time.
+    While a job runs, a heartbeat task keeps it from being reclaimed by
+    other workers and picks up cancellation requests.
+    """
+    
+    # Backoff before a failed job becomes available again, per attempt
+    RETRY_BACKOFF_SECONDS = 30
+    
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        settings = get_settings()
+        self.concurrency = concurrency or settings.ingestion_worker_concurrency
+        self.poll_interval = poll_interval or settings.ingestion_worker_poll_seconds
+        self.stale_after = timedelta(seconds=settings.ingestion_job_stale_seconds)
+        self.heartbeat_interval = max(settings.ingestion_job_stale_seconds / 3, 1)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+    
+    def stop(self):
+        """Finish running jobs and stop claiming new ones."""
+        self._stopping.set()
+    
+    async def run(self):
+        """Run all worker slots until stopped."""
+        logger.info(
+            "Ingestion worker started",
+            worker_id=self.worker_id,
+            concurrency=self.concurrency,
+        )
+        await asyncio.gather(*(
+            self._slot(f"{self.worker_id}/{index}")
+            for index in range(self.concurrency)
+        ))
+        logger.info("Ingestion worker stopped", worker_id=self.worker_id)
+    
+    async def run_once(self, slot_id: Optional[str] = None) -> bool:
+        """
+        Claim and run a single job.
+        
+        Returns:
+            True if a job was claimed
+        """
+        slot_id = slot_id or f"{self.worker_id}/0"
+        
+        async with async_session_factory() as session:
+            job = await claim_job(session, slot_id, self.stale_after)
+        
+        if not job:
+            return False
+        
+        await self._execute(job)
+        return True
+    
+    async def _slot(self, slot_id: str):
+        """Claim loop for one unit of concurrency."""
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once(slot_id)
+            except Exception as e:
+                logger.error("Ingestion worker poll failed", slot=slot_id, error=str(e))
+                claimed = False
+            
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _execute(self, job: IngestionJob):
+        """Run a claimed job and record its outcome."""
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            await self._finish(job, "failed", f"Unknown job type '{job.job_type}'", retry=False)
+            return
+        
+        context = JobContext(async_session_factory, job.id, job.checkpoint)
+        handler_task = asyncio.create_task(
+            handler(job.ingestion_log_id, job.params or {}, context)
+        )
+        heartbeat_task = asyncio.create_task(self._heartbeat(context, handler_task))
+        
+        logger.info(
+            "Running ingestion job",
+            job_id=str(job.id),
+            job_type=job.job_type,
+            attempt=job.attempts,
+            resumed=bool(job.checkpoint),
+        )
+        
+        try:
+            await handler_task
+            await self._finish(job, "completed")
+        except JobCancelled:
+            await self._finish(job, "cancelled")
+        except asyncio.CancelledError:
+            if not context.cancel_requested:
+                # Worker shutdown: leave the job to be reclaimed and resumed
+                raise
+            await self._finish(job, "cancelled")
+        except Exception as e:
+            logger.error("Ingestion job failed", job_id=str(job.id), error=str(e))
+            await self._finish(job, "failed", str(e), retry=True)
+        finally:
+            heartbeat_task.cancel()
+    
+    async def _heartbeat(self, context: JobContext, handler_task: asyncio.Task):
+        """Keep the job's lease alive and cancel the handler on request."""
+        while not handler_task.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if await context.heartbeat():
+                    handler_task.cancel()
+                    return
+            except Exception as e:
+                logger.warning("Ingestion job heartbeat failed", job_id=str(context.job_id), error=str(e))
+    
+    async def _finish(
+        self,
+        job: IngestionJob,
+        status: str,
+        error_message: Optional[str] = None,
+        retry: bool = False,
+    ):
+        """
+        Persist the final state of an attempt.
+        
+        Failed jobs with attempts left are re-queued with a linear backoff
+        and keep their checkpoint, so the next attempt resumes where this
+        one stopped.
+        """
+        now = datetime.now(timezone.utc)
+        
+        async with async_session_factory() as session:
+            job = await session.get(IngestionJob, job.id, with_for_update=True)
+            log = None
+            if job.ingestion_log_id:
+                log = await session.get(IngestionLog, job.ingestion_log_id)
+            
+            job.error_message = error_message
+            job.worker_id = None
+            
+            if retry and job.attempts < job.max_attempts and not job.cancel_requested:
+                job.status = "queued"
+                job.available_at = now + timedelta(
+                    seconds=self.RETRY_BACKOFF_SECONDS * job.attempts
+                )
+                if log:
+                    log.status = "queued"
+                    log.error_message = error_message
+            else:
+                if job.cancel_requested and status == "failed":
+                    status = "cancelled"
+                job.status = status
+                job.completed_at = now
+                if log and log.status != status:
+                    log.status = status
+                    log.error_message = error_message
+                    log.completed_at = log.completed_at or now
+            
+            await session.commit()
+
+
+@click.command()
+@click.option("--concurrency", type=int, default=None, help="Jobs to run in parallel")
+@click.option("--poll-interval", type=float, default=None, help="Seconds between polls when idle")
+@click.option("--worker-id", default=None, help="Identifier recorded on claimed jobs")
+def main(concurrency: Optional[int], poll_interval: Optional[float], worker_id: Optional[str]):
+    """Run an ingestion worker until interrupted."""
+    worker = IngestionWorker(
+        concurrency=concurrency,
+        poll_interval=poll_interval,
+        worker_id=worker_id,
+    )
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Candidate Generation
+
+Cuts the active corpus down to the opportunities worth running every
+relevance component on for one organization. An opportunity is a
+candidate when, for each rule, it either passes or lacks (null or blank)
+the data the rule needs:
+
+- NAICS sector: its 2-digit sector is one of the organization's
+- Set-aside: the organization is eligible for it (per
+  ``RelevanceScorer.SET_ASIDE_ELIGIBLE``, as the size score applies it)
+- Deadline: the response deadline has not passed
+- State radius (optional): place of performance within ``state_radius``
+  hops of the organization's state over ``STATE_ADJACENCY``
+
+Rules are skipped when the organization has no data for them, exactly as
+the scorer treats those components as neutral. The same rules are
+available as SQL conditions (``candidate_query``), backed by the partial
+index ``idx_opportunities_candidates``, and in memory
+(``CandidateFilter.matches``) for opportunities already loaded.
+
+``measure_recall`` scores a random sample of the whole active corpus
+with the full scorer and reports which share of the relevant ones
+(overall score at or above a threshold) the filter keeps, and which
+rules dropped the rest. An ineligible set-aside only lowers the size
+component, so such notices can still score as relevant; the filter
+drops them because the organization cannot bid.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from sqlalchemy import Select, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Opportunity, Organization
+from src.services.relevance_scorer import RelevanceScorer
+
+
+def states_within(state: str, radius: int) -> FrozenSet[str]:
+    """States reachable from ``state`` in at most ``radius`` adjacency hops."""
+    neighbours: Dict[str, set] = {}
+    for origin, adjacent in RelevanceScorer.STATE_ADJACENCY.items():
+        for other in adjacent:
+            neighbours.setdefault(origin, set()).add(other)
+            neighbours.setdefault(other, set()).add(origin)
+    
+    reached = {state}
+    frontier = {state}
+    for _ in range(radius):
+        frontier = {n for s in frontier for n in neighbours.get(s, ())} - reached
+        reached |= frontier
+    return frozenset(reached)
+
+
+@dataclass(frozen=True)
+class CandidateFilter:
+    """Blocking rules for one organization; None disables a rule."""
+    sectors: Optional[FrozenSet[str]]
+    blocked_set_asides: Optional[FrozenSet[str]]
+    states: Optional[FrozenSet[str]]
+    now: datetime
+    
+    @classmethod
+    def for_organization(
+        cls,
+        scorer: RelevanceScorer,
+        organization: Organization,
+        state_radius: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> "CandidateFilter":
+        profile = scorer.features.organization(organization)
+        
+        sectors = None
+        if organization.naics_codes:
+            sectors = frozenset(code[:2] for code in profile.naics_codes if len(code) >= 2) or None
+        
+        # Opportunity set-asides the size score would mark ineligible
+        blocked = None
+        if organization.set_aside_types:
+            blocked = frozenset(
+                set_aside for set_aside, eligible in scorer.SET_ASIDE_ELIGIBLE.items()
+                if set_aside == set_aside.upper()
+                and not any(t in profile.set_asides for t in eligible)
+            ) or None
+        
+        states = None
+        if state_radius is not None and profile.state:
+            states = states_within(profile.state, state_radius)
+        
+        return cls(
+            sectors=sectors,
+            blocked_set_asides=blocked,
+            states=states,
+            now=now or datetime.now(timezone.utc),
+        )
+    
+    def conditions(self) -> List[Any]:
+        """SQL conditions on ``Opportunity`` equivalent to ``matches``."""
+        # Inlined constants, so generic plans still match the partial index
+        conditions = [
+            Opportunity.status == literal_column("'active'"),
+            or_(Opportunity.response_deadline.is_(None), Opportunity.response_deadline > self.now),
+        ]
+        if self.sectors is not None:
+            # Same expression as idx_opportunities_candidates
+            conditions.append(or_(
+                func.coalesce(func.btrim(Opportunity.naics_code), "") == "",
+                func.left(func.btrim(Opportunity.naics_code), literal_column("2")).in_(self.sectors),
+            ))
+        if self.blocked_set_asides is not None:
+            conditions.append(or_(
+                Opportunity.set_aside_type.is_(None),
+                func.upper(func.btrim(Opportunity.set_aside_type)).not_in(self.blocked_set_asides),
+            ))
+        if self.states is not None:
+            conditions.append(or_(
+                func.coalesce(func.btrim(Opportunity.place_of_performance_state), "") == "",
+                func.upper(func.btrim(Opportunity.place_of_performance_state)).in_(self.states),
+            ))
+        return conditions
+    
+    def failed_rules(self, scorer: RelevanceScorer, opportunity: Opportunity) -> List[str]:
+        """Rules a loaded opportunity fails; empty for a candidate."""
+        failed = []
+        if opportunity.status != "active":
+            failed.append("status")
+        if opportunity.response_deadline is not None and opportunity.response_deadline <= self.now:
+            failed.append("deadline")
+        
+        profile = scorer.features.opportunity(opportunity)
+        if self.sectors is not None and profile.naics_code \
+                and profile.naics_code[:2] not in self.sectors:
+            failed.append("naics_sector")
+        if self.blocked_set_asides is not None and profile.set_aside in self.blocked_set_asides:
+            failed.append("set_aside")
+        if self.states is not None and profile.state.strip() \
+                and profile.state.strip() not in self.states:
+            failed.append("state")
+        return failed
+    
+    def matches(self, scorer: RelevanceScorer, opportunity: Opportunity) -> bool:
+        """Whether a loaded opportunity passes every rule."""
+        return not self.failed_rules(scorer, opportunity)
+
+
+def candidate_query(candidate_filter: CandidateFilter) -> Select:
+    """SELECT of candidate opportunities, newest first."""
+    return (
+        select(Opportunity)
+        .where(*candidate_filter.conditions())
+        .order_by(Opportunity.posted_date.desc().nulls_last())
+    )
+
+
+async def generate_candidates(
+    session: AsyncSession,
+    scorer: RelevanceScorer,
+    organization: Organization,
+    state_radius: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[Opportunity]:
+    """Load the candidate opportunities for an organization."""
+    stmt = candidate_query(CandidateFilter.for_organization(scorer, organization, state_radius))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+@dataclass
+class RecallReport:
+    """How much of the relevant corpus sample the candidate filter keeps."""
+    corpus: int
+    candidates: int
+    sampled: int
+    relevant: int
+    relevant_kept: int
+    # Relevant opportunities failing each rule (one may fail several)
+    dropped_by: Dict[str, int]
+    min_score: float
+    
+    @property
+    def recall(self) -> Optional[float]:
+        return self.relevant_kept / self.relevant if self.relevant else None
+    
+    @property
+    def reduction(self) -> Optional[float]:
+        return 1 - self.candidates / self.corpus if self.corpus else None
+
+
+def sample_recall(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    opportunities: Sequence[Opportunity],
+    candidate_filter: CandidateFilter,
+    min_score: float,
+) -> Dict[str, Any]:
+    """Score opportunities in full and count the relevant ones the filter keeps."""
+    counts: Dict[str, Any] = {"relevant": 0, "relevant_kept": 0, "dropped_by": {}}
+    if not opportunities:
+        return counts
+    matrix = scorer.score_matrix([organization], opportunities)
+    for j, opportunity in enumerate(matrix.opportunities):
+        if matrix.overall[0, j] < min_score:
+            continue
+        counts["relevant"] += 1
+        failed = candidate_filter.failed_rules(scorer, opportunity)
+        if not failed:
+            counts["relevant_kept"] += 1
+        for rule in failed:
+            counts["dropped_by"][rule] = counts["dropped_by"].get(rule, 0) + 1
+    return counts
+
+
+async def measure_recall(
+    session: AsyncSession,
+    scorer: RelevanceScorer,
+    organization: Organization,
+    min_score: float = 0.6,
+    sample_size: int = 2000,
+    state_radius: Optional[int] = None,
+) -> RecallReport:
+    """
+    Compare the candidate filter against full scoring of a random sample
+    of the active, open corpus.
+    """
+    candidate_filter = CandidateFilter.for_organization(scorer, organization, state_radius)
+    open_conditions = candidate_filter.conditions()[:2]
+    
+    corpus = await session.scalar(select(func.count()).select_from(Opportunity).where(*open_conditions))
+    candidates = await session.scalar(
+        select(func.count()).select_from(Opportunity).where(*candidate_filter.conditions())
+    )
+    
+    result = await session.execute(
+        select(Opportunity).where(*open_conditions)
+        .order_by(func.random())
+        .limit(sample_size)
+    )
+    sample = list(result.scalars().all())
+    counts = sample_recall(scorer, organization, sample, candidate_filter, min_score)
+    
+    return RecallReport(
+        corpus=corpus or 0,
+        candidates=candidates or 0,
+        sampled=len(sample),
+        relevant=counts["relevant"],
+        relevant_kept=counts["relevant_kept"],
+        dropped_by=counts["dropped_by"],
+        min_score=min_score,
+    )
@@ -0,0 +1,400 @@
+"""
+Local Embedding Engine
+
+CPU-only text embeddings for the semantic component of relevance scoring.
+No network calls are made: the default ``hashing`` backend needs nothing
+but NumPy, and the ``sentence-transformers`` backend only loads models
+already present on disk (``embedding_model`` may be a local path).
+
+Opportunity and organization vectors are stored in two memory-mapped
+``VectorIndex`` directories under ``embedding_index_dir`` and are shared by
+every process on the host. Opportunities are embedded in batches by the
+ingestion pipeline; organizations are embedded on first use and again
+whenever their ``updated_at`` moves. Each row carries the entity's
+``updated_at`` as its version, so stale vectors are recognized.
+
+Usage:
+    python -m src.services.embeddings             # embed missing opportunities
+    python -m src.services.embeddings --rebuild   # re-embed everything, then compact
+    python -m src.services.embeddings --compact   # rebuild the IVF lists only
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import Opportunity, Organization
+from src.services.term_index import opportunity_text, organization_text, tokenize
+from src.services.vector_index import VectorIndex, similarity_rows
+
+logger = structlog.get_logger()
+
+OPPORTUNITY_INDEX = "opportunities"
+ORGANIZATION_INDEX = "organizations"
+
+# Candidates searched per requested match, to survive the active-status filter
+SEARCH_OVERFETCH = 4
+
+
+class Embedder(ABC):
+    """Turns texts into unit-length float32 vectors."""
+    
+    name: str = ""
+    dimension: int = 0
+    # Cosine similarities mapped linearly onto [0, 1] scores
+    similarity_range: Tuple[float, float] = (0.0, 1.0)
+    
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Vectors of ``texts``, one row each, shape (len(texts), dimension)."""
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of unigrams and bigrams with sublinear term
+    frequency. Deterministic across processes and dependency-free; a
+    lexical baseline rather than a semantic model.
+    """
+    
+    name = "hashing"
+    similarity_range = (0.05, 0.45)
+    
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            counts: Dict[str, int] = {}
+            for feature in features:
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dimension] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """A sentence-transformers model loaded from local files, run on CPU."""
+    
+    similarity_range = (0.1, 0.6)
+    
+    def __init__(self, model: str, batch_size: int = 64):
+        # Never reach out to the model hub
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+        from sentence_transformers import SentenceTransformer
+        
+        self._model = SentenceTransformer(model, device="cpu")
+        self.name = f"sentence-transformers:{Path(model).name}"
+        self.dimension = self._model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self._model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+
+
+EMBEDDERS = {
+    "hashing": lambda settings: HashingEmbedder(settings.embedding_dimension),
+    "sentence-transformers": lambda settings: SentenceTransformerEmbedder(
+        settings.embedding_model, settings.embedding_batch_size
+    ),
+}
+
+
+def _version(updated_at: Optional[datetime]) -> float:
+    return updated_at.timestamp() if updated_at else 0.0
+
+
+class EmbeddingEngine:
+    """Embedder plus the shared opportunity and organization indexes."""
+    
+    def __init__(
+        self,
+        embedder: Embedder,
+        index_dir: Path,
+        max_segments: int = 16,
+        probes: int = 8,
+        max_pending: int = 20000,
+    ):
+        self.embedder = embedder
+        self.index_dir = Path(index_dir)
+        self.max_segments = max_segments
+        self.probes = probes
+        self.max_pending = max_pending
+        self._indexes: Dict[str, VectorIndex] = {}
+        # Vectors embedded on demand, reused until the index has them (LRU)
+        self._pending: "OrderedDict[Tuple[uuid.UUID, float], np.ndarray]" = OrderedDict()
+    
+    def index(self, name: str) -> VectorIndex:
+        """Open (or refresh) one of the index directories."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = VectorIndex(self.index_dir / name)
+        else:
+            index.reload_if_changed()
+        return index
+    
+    def compatible(self, index: VectorIndex) -> bool:
+        return index.embedder is None or (index.embedder, index.dimension) == (
+            self.embedder.name, self.embedder.dimension
+        )
+    
+    def clear(self, name: str) -> None:
+        """Drop every vector of one index, e.g. before re-embedding with another model."""
+        VectorIndex.clear(self.index_dir / name)
+        self._pending.clear()
+    
+    def add(self, name: str, entities: Sequence[Any], texts: Sequence[str]) -> np.ndarray:
+        """Embed texts and store them under the entities' IDs and versions."""
+        vectors = self.embedder.embed(texts)
+        VectorIndex.append(
+            self.index_dir / name,
+            self.embedder.name,
+            [entity.id for entity in entities],
+            [_version(entity.updated_at) for entity in entities],
+            vectors,
+            max_segments=self.max_segments,
+        )
+        return vectors
+    
+    def vectors(
+        self,
+        name: str,
+        entities: Sequence[Any],
+        texts: Sequence[str],
+        store: bool = False,
+    ) -> np.ndarray:
+        """
+        Current vectors of entities, shape (len(entities), dimension).
+        
+        Stored vectors are used when their version matches ``updated_at``.
+        The rest are embedded in one batch and, with ``store``, added to the
+        index; otherwise they are kept in memory until the write path (the
+        ingestion pipeline) stores them.
+        """
+        index = self.index(name)
+        # An index written by another embedder is ignored until it is rebuilt
+        compatible = self.compatible(index)
+        out = np.empty((len(entities), self.embedder.dimension), dtype=np.float32)
+        missing = []
+        for row, entity in enumerate(entities):
+            version = _version(entity.updated_at)
+            stored = index.get(entity.id) if compatible and entity.id is not None else None
+            # Popped either way: dropped once stored, re-inserted as most recent otherwise
+            pending = self._pending.pop((entity.id, version), None)
+            if stored is not None and stored[1] >= version:
+                out[row] = stored[0]
+            elif pending is not None:
+                out[row] = pending
+                self._pending[(entity.id, version)] = pending
+            else:
+                missing.append(row)
+        
+        if missing:
+            embedded = self.embedder.embed([texts[row] for row in missing])
+            out[missing] = embedded
+            keyed = [row for row in missing if entities[row].id is not None]
+            if store and compatible and keyed:
+                VectorIndex.append(
+                    self.index_dir / name,
+                    self.embedder.name,
+                    [entities[row].id for row in keyed],
+                    [_version(entities[row].updated_at) for row in keyed],
+                    out[keyed],
+                    max_segments=self.max_segments,
+                )
+            else:
+                for row in keyed:
+                    self._pending[(entities[row].id, _version(entities[row].updated_at))] = out[row]
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+        return out
+    
+    def opportunity_vectors(self, opportunities: Sequence[Opportunity]) -> np.ndarray:
+        return self.vectors(
+            OPPORTUNITY_INDEX, opportunities, [opportunity_text(o) for o in opportunities]
+        )
+    
+    def organization_vectors(self, organizations: Sequence[Organization]) -> np.ndarray:
+        """Organization vectors, embedding and storing missing or stale ones in one batch."""
+        return self.vectors(
+            ORGANIZATION_INDEX, organizations, [organization_text(o) for o in organizations], store=True
+        )
+    
+    def organization_vector(self, organization: Organization) -> np.ndarray:
+        return self.organization_vectors([organization])[0]
+    
+    def scale(self, similarities: np.ndarray) -> np.ndarray:
+        """Map cosine similarities onto [0, 1] scores."""
+        low, high = self.embedder.similarity_range
+        return np.clip((similarities.astype(np.float64) - low) / (high - low), 0.0, 1.0)
+    
+    def semantic_scores(self, organization: Organization, opportunity_vectors: np.ndarray) -> np.ndarray:
+        """Scores of one organization against rows of opportunity vectors."""
+        return self.scale(similarity_rows(opportunity_vectors, self.organization_vector(organization)))
+    
+    def semantic_score(self, organization: Organization, opportunity: Opportunity) -> float:
+        """Scaled similarity in [0, 1]; 0.5 (neutral) when either side has no text."""
+        if not organization_text(organization).strip() or not opportunity_text(opportunity).strip():
+            return 0.5
+        return float(self.semantic_scores(organization, self.opportunity_vectors([opportunity]))[0])
+    
+    def search(self, organization: Organization, k: int = 50) -> List[Tuple[uuid.UUID, float]]:
+        """Top-k opportunity IDs for an organization with their scaled scores."""
+        index = self.index(OPPORTUNITY_INDEX)
+        if not self.compatible(index):
+            return []
+        hits = index.search(self.organization_vector(organization), k=k, probes=self.probes)
+        scores = self.scale(np.array([score for _, score in hits], dtype=np.float32))
+        return [(entity_id, float(score)) for (entity_id, _), score in zip(hits, scores)]
+    
+    async def opportunity_rows(self, session: AsyncSession, opportunity_ids: Sequence[uuid.UUID]) -> List[Any]:
+        """Load the columns ``add_opportunities`` needs for stored opportunities."""
+        if not opportunity_ids:
+            return []
+        result = await session.execute(
+            select(Opportunity.id, Opportunity.title, Opportunity.description, Opportunity.updated_at)
+            .where(Opportunity.id.in_(opportunity_ids))
+        )
+        return list(result.all())
+    
+    def add_opportunities(self, rows: Sequence[Any]) -> int:
+        """Embed opportunity rows in one batch and add them to the index."""
+        if rows:
+            self.add(OPPORTUNITY_INDEX, rows, [opportunity_text(row) for row in rows])
+        return len(rows)
+    
+    async def embed_opportunities(self, session: AsyncSession, opportunity_ids: Sequence[uuid.UUID]) -> int:
+        """Embed stored opportunities by ID in a worker thread and add them to the index."""
+        rows = await self.opportunity_rows(session, opportunity_ids)
+        return await asyncio.to_thread(self.add_opportunities, rows)
+
+
+@lru_cache
+def get_embedding_engine() -> Optional[EmbeddingEngine]:
+    """Process-wide engine from settings; None when embeddings are disabled."""
+    settings = get_settings()
+    if not settings.embedding_backend:
+        return None
+    factory = EMBEDDERS.get(settings.embedding_backend)
+    if factory is None:
+        raise ValueError(f"Unknown embedding backend: {settings.embedding_backend}")
+    return EmbeddingEngine(
+        factory(settings),
+        Path(settings.embedding_index_dir),
+        max_segments=settings.embedding_max_segments,
+        probes=settings.embedding_ivf_probes,
+        max_pending=settings.embedding_pending_max,
+    )
+
+
+async def match_opportunities(
+    engine: EmbeddingEngine,
+    session: AsyncSession,
+    organization: Organization,
+    limit: int = 50,
+    min_score: float = 0.0,
+) -> List[Tuple[uuid.UUID, float]]:
+    """
+    Active opportunities nearest to an organization's narratives, best first.
+    
+    The index also holds closed opportunities, so it is searched for
+    ``limit * SEARCH_OVERFETCH`` candidates before filtering on status.
+    """
+    hits = await asyncio.to_thread(engine.search, organization, limit * SEARCH_OVERFETCH)
+    hits = [(opportunity_id, score) for opportunity_id, score in hits if score >= min_score]
+    if not hits:
+        return []
+    result = await session.execute(
+        select(Opportunity.id).where(
+            Opportunity.id.in_([opportunity_id for opportunity_id, _ in hits]),
+            Opportunity.status == "active",
+        )
+    )
+    active = set(result.scalars().all())
+    return [(opportunity_id, score) for opportunity_id, score in hits if opportunity_id in active][:limit]
+
+
+async def backfill_opportunities(engine: EmbeddingEngine, session: AsyncSession, rebuild: bool = False) -> int:
+    """
+    Embed stored opportunities that are missing or stale in the index
+    (all of them with ``rebuild``), in batches of ``embedding_batch_size * 16``.
+    """
+    settings = get_settings()
+    batch_size = settings.embedding_batch_size * 16
+    index = engine.index(OPPORTUNITY_INDEX)
+    embedded = 0
+    last_id = None
+    while True:
+        stmt = select(Opportunity.id, Opportunity.updated_at).order_by(Opportunity.id).limit(batch_size)
+        if last_id is not None:
+            stmt = stmt.where(Opportunity.id > last_id)
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        stale = []
+        for row in rows:
+            stored = None if rebuild else index.get(row.id)
+            if stored is None or stored[1] < _version(row.updated_at):
+                stale.append(row.id)
+        embedded += await engine.embed_opportunities(session, stale)
+        logger.info("Embedded opportunity batch", embedded=embedded)
+    return embedded
+
+
+async def _backfill_from_cli(rebuild: bool, compact: bool) -> int:
+    from src.database.connection import async_session_factory
+    
+    engine = get_embedding_engine()
+    if engine is None:
+        raise click.ClickException("Set EMBEDDING_BACKEND to enable embeddings")
+    
+    embedded = 0
+    if rebuild:
+        engine.clear(OPPORTUNITY_INDEX)
+        engine.clear(ORGANIZATION_INDEX)
+    if not compact:
+        async with async_session_factory() as db:
+            embedded = await backfill_opportunities(engine, db, rebuild=rebuild)
+    if compact or rebuild:
+        await asyncio.to_thread(VectorIndex.compact, engine.index_dir / OPPORTUNITY_INDEX)
+    return embedded
+
+
+@click.command()
+@click.option("--rebuild", is_flag=True, help="Re-embed every opportunity, then compact")
+@click.option("--compact", is_flag=True, help="Only merge segments and rebuild the IVF lists")
+def main(rebuild, compact):
+    """Embed stored opportunities into the local vector index."""
+    embedded = asyncio.run(_backfill_from_cli(rebuild, compact))
+    click.echo(f"Embedded {embedded} opportunities")
+
+
+if __name__ == "__main__":
+    main()
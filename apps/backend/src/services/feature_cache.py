@@ -0,0 +1,184 @@
+"""
+Entity Feature Cache
+
+Text and code features of organizations and opportunities, derived once
+per entity version instead of once per scored pair. Scoring one
+organization against a 5000-opportunity batch used to lowercase and
+tokenize the organization's narratives 5000 times.
+
+Profiles are kept in a bounded LRU keyed by ID and checked against
+``updated_at``, so an edited row is re-derived on next use. One
+process-wide cache (``get_feature_cache``) is shared by
+``RelevanceScorer``, the vectorized relevance path and
+``WinProbabilityModel``. Unsaved entities (no ``id``) are cached per
+object, for as long as the object lives.
+"""
+import re
+import uuid
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, FrozenSet, Optional, Tuple, TypeVar
+
+from src.config import get_settings
+from src.database.models import Organization, Opportunity
+from src.services.naics import NaicsTrie
+
+# Words ignored by relevance keyword extraction
+KEYWORD_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can',
+    'had', 'her', 'was', 'one', 'our', 'out', 'has', 'have', 'been',
+    'will', 'with', 'this', 'that', 'from', 'they', 'which', 'their',
+    'would', 'there', 'could', 'other', 'into', 'more', 'some', 'such',
+    'than', 'them', 'then', 'these', 'only', 'over', 'also', 'after',
+    'services', 'service', 'shall', 'must', 'may', 'contractor'
+})
+
+# Words ignored by win probability capability keyword extraction
+CAPABILITY_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can',
+    'had', 'her', 'was', 'one', 'our', 'out', 'has', 'have', 'been',
+    'will', 'with', 'this', 'that', 'from', 'they', 'which', 'their',
+    'would', 'there', 'could', 'other', 'into', 'more', 'some', 'such',
+    'than', 'them', 'then', 'these', 'only', 'over', 'also', 'after',
+    'services', 'service', 'shall', 'must', 'provide', 'including',
+    'company', 'organization', 'team', 'experience', 'years'
+})
+
+# Capability keywords kept per organization
+CAPABILITY_KEYWORD_LIMIT = 50
+
+KEYWORD_PATTERN = re.compile(r'\b[a-z]{3,}\b')
+CAPABILITY_PATTERN = re.compile(r'\b[a-z]{4,}\b')
+
+
+def extract_keywords(text: str) -> FrozenSet[str]:
+    """Lowercased words of 3+ letters, without stop words."""
+    return frozenset(KEYWORD_PATTERN.findall(text.lower())) - KEYWORD_STOP_WORDS
+
+
+def extract_capability_keywords(text: str) -> Tuple[str, ...]:
+    """Up to CAPABILITY_KEYWORD_LIMIT unique lowercased words of 4+ letters."""
+    keywords = [w for w in CAPABILITY_PATTERN.findall(text.lower()) if w not in CAPABILITY_STOP_WORDS]
+    return tuple(list(set(keywords))[:CAPABILITY_KEYWORD_LIMIT])
+
+
+@dataclass(frozen=True)
+class OrganizationProfile:
+    """Derived organization features; strings are normalized, "" when absent."""
+    # Keywords of the capabilities narrative and past performance summary
+    keywords: FrozenSet[str]
+    has_text: bool
+    # Keywords of the capabilities narrative alone
+    capability_keywords: Tuple[str, ...]
+    past_performance: str
+    naics_codes: Tuple[str, ...]
+    naics: NaicsTrie
+    set_asides: Tuple[str, ...]
+    state: str
+    
+    @classmethod
+    def build(cls, organization: Organization) -> "OrganizationProfile":
+        naics_codes = tuple(code.strip() for code in organization.naics_codes or ())
+        text = (organization.capabilities_narrative or "") + " " + \
+               (organization.past_performance_summary or "")
+        return cls(
+            keywords=extract_keywords(text),
+            has_text=bool(text.strip()),
+            capability_keywords=extract_capability_keywords(organization.capabilities_narrative or ""),
+            past_performance=(organization.past_performance_summary or "").lower(),
+            naics_codes=naics_codes,
+            naics=NaicsTrie(naics_codes),
+            set_asides=tuple(s.upper().strip() for s in organization.set_aside_types or ()),
+            state=(organization.state or "").upper(),
+        )
+
+
+@dataclass(frozen=True)
+class OpportunityProfile:
+    """Derived opportunity features; strings are normalized, "" when absent."""
+    # Keywords of the title and description
+    keywords: FrozenSet[str]
+    has_text: bool
+    description: str
+    naics_code: str
+    naics_description_words: Tuple[str, ...]
+    office: str
+    office_words: Tuple[str, ...]
+    contract_type: str
+    set_aside: str
+    state: str
+    
+    @classmethod
+    def build(cls, opportunity: Opportunity) -> "OpportunityProfile":
+        text = (opportunity.title or "") + " " + (opportunity.description or "")
+        office = (opportunity.contracting_office_name or "").lower()
+        return cls(
+            keywords=extract_keywords(text),
+            has_text=bool(text.strip()),
+            description=(opportunity.description or "").lower(),
+            naics_code=(opportunity.naics_code or "").strip(),
+            naics_description_words=tuple((opportunity.naics_description or "").lower().split()),
+            office=office,
+            office_words=tuple(office.split()),
+            contract_type=(opportunity.contract_type or "").lower(),
+            set_aside=(opportunity.set_aside_type or "").upper().strip(),
+            state=(opportunity.place_of_performance_state or "").upper(),
+        )
+
+
+Profile = TypeVar("Profile")
+
+
+class FeatureCache:
+    """Bounded LRU of entity profiles, re-derived when ``updated_at`` changes."""
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, uuid.UUID], Tuple[Optional[datetime], object]]" = OrderedDict()
+        self._unsaved: "weakref.WeakKeyDictionary[object, object]" = weakref.WeakKeyDictionary()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def organization(self, organization: Organization) -> OrganizationProfile:
+        return self._get("organization", organization, OrganizationProfile.build)
+    
+    def opportunity(self, opportunity: Opportunity) -> OpportunityProfile:
+        return self._get("opportunity", opportunity, OpportunityProfile.build)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._unsaved.clear()
+    
+    def _get(self, kind: str, entity, build: Callable[..., Profile]) -> Profile:
+        if entity.id is None:
+            profile = self._unsaved.get(entity)
+            if profile is None:
+                profile = self._unsaved[entity] = build(entity)
+            return profile
+        
+        key = (kind, entity.id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == entity.updated_at:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        profile = build(entity)
+        self._entries[key] = (entity.updated_at, profile)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return profile
+
+
+@lru_cache()
+def get_feature_cache() -> FeatureCache:
+    """Process-wide feature cache shared by the scorers."""
+    return FeatureCache(get_settings().feature_cache_size)
@@ -0,0 +1,112 @@
+"""
+NAICS Prefix Trie
+
+NAICS codes are hierarchical: each extra digit narrows the sector
+(2-digit sector, 3-digit subsector, ..., 6-digit national industry).
+``NaicsTrie`` compiles a set of codes into a digit trie so the prefix
+questions the scorers ask are answered in O(code length) instead of by
+comparing against every code:
+
+- ``common_prefix_length``: longest prefix shared with any code
+- ``nearest``: value of the closest ancestor (or the code itself)
+- ``descendants``: every value under a prefix
+
+Organization tries are built once per organization version by the
+feature cache; the pricing benchmark trie is built at import.
+"""
+from typing import Dict, Generic, Iterable, List, Mapping, Optional, Tuple, TypeVar, Union
+
+V = TypeVar("V")
+
+# Score per length of the prefix shared with an organization code, longest first
+PREFIX_SCORES: List[Tuple[int, float]] = [(6, 1.0), (5, 0.9), (4, 0.75), (3, 0.5), (2, 0.25)]
+
+
+def prefix_score(length: int) -> float:
+    """Alignment score for a shared prefix of ``length`` digits."""
+    for level, score in PREFIX_SCORES:
+        if length >= level:
+            return score
+    return 0.0
+
+
+class _Node:
+    __slots__ = ("children", "values")
+    
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Values of every code in this subtree, in insertion order
+        self.values: List = []
+
+
+class NaicsTrie(Generic[V]):
+    """Digit trie over NAICS codes, each carrying a value (the code by default)."""
+    
+    def __init__(self, codes: Union[Iterable[str], Mapping[str, V]] = ()):
+        self._root = _Node()
+        self._codes: Dict[str, V] = {}
+        if isinstance(codes, Mapping):
+            for code, value in codes.items():
+                self.insert(code, value)
+        else:
+            for code in codes:
+                self.insert(code)
+    
+    def __len__(self) -> int:
+        return len(self._codes)
+    
+    def __contains__(self, code: str) -> bool:
+        return code in self._codes
+    
+    def insert(self, code: str, value: Optional[V] = None) -> None:
+        """Add a code; re-inserting a code keeps its first value."""
+        if code in self._codes:
+            return
+        value = code if value is None else value
+        self._codes[code] = value
+        node = self._root
+        node.values.append(value)
+        for digit in code:
+            node = node.children.setdefault(digit, _Node())
+            node.values.append(value)
+    
+    def common_prefix_length(self, code: str) -> int:
+        """Length of the longest prefix ``code`` shares with any stored code."""
+        node = self._root
+        length = 0
+        for digit in code:
+            node = node.children.get(digit)
+            if node is None:
+                break
+            length += 1
+        return length
+    
+    def nearest(self, code: str, min_length: int = 4) -> Optional[V]:
+        """
+        Value for ``code`` itself, else for the first code under its deepest
+        stored prefix, provided that prefix is at least ``min_length``
+        digits (or all of a shorter ``code``).
+        """
+        if code in self._codes:
+            return self._codes[code]
+        
+        node = self._root
+        depth = 0
+        for digit in code:
+            child = node.children.get(digit)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        if depth < min(min_length, len(code)):
+            return None
+        return node.values[0] if node.values else None
+    
+    def descendants(self, prefix: str) -> List[V]:
+        """Values of every code starting with ``prefix``, in insertion order."""
+        node = self._root
+        for digit in prefix:
+            node = node.children.get(digit)
+            if node is None:
+                return []
+        return list(node.values)
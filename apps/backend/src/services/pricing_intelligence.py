@@ -14,6 +14,8 @@ from decimal import Decimal
 from datetime import datetime, timezone
 import structlog
 
+from src.services.naics import NaicsTrie
+
 logger = structlog.get_logger()
 
 
@@ -238,7 +240,7 @@ class PricingIntelligenceService:
             min_value=Decimal("75000"),
             max_value=Decimal("25000000"),
             median_value=Decimal("1800000"),
-            average_rate=Decimal("3200000"),
+            average_value=Decimal("3200000"),
             sample_size=1200,
         ),
         "541330": ContractValueBenchmark(
@@ -261,6 +263,9 @@ class PricingIntelligenceService:
         ),
     }
     
+    # Benchmarks by NAICS prefix, compiled once
+    NAICS_BENCHMARK_TRIE = NaicsTrie(NAICS_BENCHMARKS)
+    
     def __init__(self):
         """Initialize pricing intelligence service."""
         pass
@@ -278,7 +283,7 @@ class PricingIntelligenceService:
             opportunity: Opportunity data
             organization: Organization data (optional)
             labor_mix: Labor category mix with FTE counts (optional)
-            
+        
         Returns:
             PricingRecommendation with suggested pricing and analysis
         """
@@ -337,7 +342,7 @@ class PricingIntelligenceService:
         
         Args:
             categories: List of labor category keys (None = all)
-            
+        
         Returns:
             List of LaborRateBenchmark objects
         """
@@ -359,7 +364,7 @@ class PricingIntelligenceService:
         
         Args:
             naics_codes: List of NAICS codes (None = all)
-            
+        
         Returns:
             List of ContractValueBenchmark objects
         """
@@ -368,15 +373,9 @@ class PricingIntelligenceService:
         
         results = []
         for code in naics_codes:
-            # Check exact match first
-            if code in self.NAICS_BENCHMARKS:
-                results.append(self.NAICS_BENCHMARKS[code])
-            else:
-                # Check prefix matches
-                for bench_code, benchmark in self.NAICS_BENCHMARKS.items():
-                    if bench_code.startswith(code[:4]):
-                        results.append(benchmark)
-                        break
+            benchmark = self._get_naics_benchmark(code)
+            if benchmark is not None:
+                results.append(benchmark)
         
         return results
     
@@ -395,7 +394,7 @@ class PricingIntelligenceService:
             duration_months: Contract duration in months
             overhead_rate: Overhead/G&A multiplier
             profit_margin: Target profit margin
-            
+        
         Returns:
             Should-cost breakdown
         """
@@ -437,16 +436,8 @@ class PricingIntelligenceService:
         }
     
     def _get_naics_benchmark(self, naics_code: str) -> Optional[ContractValueBenchmark]:
-        """Get benchmark for NAICS code."""
-        if naics_code in self.NAICS_BENCHMARKS:
-            return self.NAICS_BENCHMARKS[naics_code]
-        
-        # Check 4-digit prefix
-        for code, benchmark in self.NAICS_BENCHMARKS.items():
-            if code.startswith(naics_code[:4]):
-                return benchmark
-        
-        return None
+        """Get benchmark for NAICS code, else its nearest benchmarked ancestor (4+ digits)."""
+        return self.NAICS_BENCHMARK_TRIE.nearest(naics_code, min_length=4)
     
     def _get_relevant_labor_rates(
         self,
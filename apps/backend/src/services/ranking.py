@@ -0,0 +1,117 @@
+"""
+Corpus-Wide Opportunity Ranking
+
+Answers "the k best active opportunities for this organization" over the
+whole open corpus. Encoding 100k opportunities into
+``OpportunityFeatures`` takes seconds, far more than scoring them, so the
+encoded corpus is kept as a shared snapshot, rebuilt after
+``ranking_corpus_refresh_seconds`` or when the scorer's semantic source
+(term index snapshot or embeddings) changes. Deadlines that pass between
+rebuilds are masked out per query.
+
+Ranking itself is ``RelevanceScorer.top_opportunities``: exact cheap
+components, an upper bound on the semantic one, and full scoring only
+of opportunities that could still enter the top k.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import structlog
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import Opportunity, Organization
+from src.services.feature_cache import FeatureCache
+from src.services.relevance_matrix import OpportunityFeatures, TopOpportunities, top_opportunities
+from src.services.relevance_scorer import RelevanceScorer
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class CorpusSnapshot:
+    """Encoded open opportunities and the scorer setup they were encoded for."""
+    features: OpportunityFeatures
+    # Response deadlines as epoch seconds, +inf when absent
+    deadlines: np.ndarray
+    term_index: object
+    embeddings: object
+    loaded_at: float
+    
+    def matches(self, scorer: RelevanceScorer) -> bool:
+        return self.term_index is scorer.term_index and self.embeddings is scorer.embeddings
+    
+    def open_mask(self, now: datetime) -> np.ndarray:
+        return self.deadlines > now.timestamp()
+
+
+_snapshot: Optional[CorpusSnapshot] = None
+_snapshot_lock = asyncio.Lock()
+
+
+async def load_corpus(session: AsyncSession, scorer: RelevanceScorer) -> CorpusSnapshot:
+    """Load and encode every active opportunity whose deadline has not passed."""
+    result = await session.execute(
+        select(Opportunity).where(
+            Opportunity.status == "active",
+            or_(Opportunity.response_deadline.is_(None),
+                Opportunity.response_deadline > datetime.now(timezone.utc)),
+        )
+    )
+    opportunities = list(result.scalars().all())
+    
+    started = time.monotonic()
+    # Encoding is CPU-bound; keep the event loop free meanwhile. The worker
+    # thread gets a private cache that keeps nothing: the shared one is not
+    # thread-safe, and the corpus would evict all of it anyway
+    features = await asyncio.to_thread(
+        OpportunityFeatures.build, scorer, opportunities, FeatureCache(maxsize=0)
+    )
+    deadlines = np.array([
+        o.response_deadline.timestamp() if o.response_deadline else np.inf
+        for o in opportunities
+    ])
+    logger.info(
+        "Encoded ranking corpus",
+        opportunities=len(opportunities),
+        seconds=round(time.monotonic() - started, 2),
+    )
+    
+    return CorpusSnapshot(
+        features=features,
+        deadlines=deadlines,
+        term_index=scorer.term_index,
+        embeddings=scorer.embeddings,
+        loaded_at=time.monotonic(),
+    )
+
+
+async def current_corpus(session: AsyncSession, scorer: RelevanceScorer) -> CorpusSnapshot:
+    """Shared corpus snapshot for the scorer, rebuilt when stale."""
+    global _snapshot
+    settings = get_settings()
+    async with _snapshot_lock:
+        if _snapshot is None or not _snapshot.matches(scorer) or \
+                time.monotonic() - _snapshot.loaded_at > settings.ranking_corpus_refresh_seconds:
+            _snapshot = await load_corpus(session, scorer)
+        return _snapshot
+
+
+async def rank_opportunities(
+    session: AsyncSession,
+    scorer: RelevanceScorer,
+    organization: Organization,
+    k: int = 50,
+    min_score: float = 0.0,
+) -> TopOpportunities:
+    """The k best open opportunities for an organization, best first."""
+    snapshot = await current_corpus(session, scorer)
+    return top_opportunities(
+        scorer, organization, snapshot.features, k, min_score,
+        mask=snapshot.open_mask(datetime.now(timezone.utc)),
+    )
@@ -0,0 +1,631 @@
+"""
+Vectorized Relevance Scoring
+
+Computes ``RelevanceScorer`` component scores for N organizations against
+M opportunities as NumPy arrays. Opportunity attributes are encoded once
+into numeric features:
+
+- NAICS codes as integer IDs of their 2- to 6-digit prefixes
+- Place of performance as state indices
+- Set-aside eligibility as bitmasks
+- Estimated value as floats (revenue ratios are formed per organization)
+- Keywords as a sparse row of keyword IDs, with BM25 term weights when
+  the scorer has a term index, or text embeddings when it has an
+  embedding engine
+
+Each component mirrors the matching ``RelevanceScorer._calculate_*``
+method branch for branch, so the arrays equal the scalar scores exactly.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.database.models import Organization, Opportunity
+from src.services.feature_cache import FeatureCache
+from src.services.naics import PREFIX_SCORES
+from src.services.relevance_scorer import RelevanceScoreResult, RelevanceScorer
+from src.services.term_index import SIMILARITY_SCALE, opportunity_text, term_frequencies
+
+# Prefix lengths and scores, longest first (see _calculate_naics_score)
+NAICS_PREFIX_SCORES = PREFIX_SCORES
+
+# Columns scored in full per step of the top-K search
+TOP_K_BLOCK_SIZE = 2048
+# Headroom on upper bounds for float rounding in the weighted sums
+BOUND_SLACK = 1e-9
+
+# Words probed per opportunity in past performance narratives
+NAICS_DESCRIPTION_WORDS = 3
+OFFICE_NAME_WORDS = 2
+
+MISSING = -1
+
+
+def _lookup(vocab: Dict[str, int], key: str) -> int:
+    """Return the ID for key, assigning the next one on first sight."""
+    index = vocab.get(key)
+    if index is None:
+        index = vocab[key] = len(vocab)
+    return index
+
+
+def _padded_ids(vocab: Dict[str, int], words: List[str], width: int) -> List[int]:
+    ids = [_lookup(vocab, word) for word in words[:width]]
+    return ids + [MISSING] * (width - len(ids))
+
+
+@dataclass
+class OpportunityFeatures:
+    """Numeric features for a fixed list of opportunities (the matrix columns)."""
+    opportunities: List[Opportunity]
+    
+    # NAICS: prefix IDs per length in NAICS_PREFIX_SCORES order, shape (5, M)
+    naics_prefixes: np.ndarray
+    naics_present: np.ndarray
+    prefix_vocab: Dict[str, int]
+    
+    # Geography: state index, MISSING when absent
+    states: np.ndarray
+    in_dc_area: np.ndarray
+    state_vocab: Dict[str, int]
+    
+    # Size: eligible set-aside bits (0 = no rule) and estimated value (NaN = absent)
+    set_aside_masks: np.ndarray
+    set_aside_bits: Dict[str, int]
+    value_max: np.ndarray
+    
+    # Semantic: keyword IDs in CSR layout plus each ID's row; with a term
+    # index, the IDs are index terms and carry their BM25 weights
+    keyword_ids: np.ndarray
+    keyword_rows: np.ndarray
+    keyword_counts: np.ndarray
+    keyword_vocab: Dict[str, int]
+    keyword_weights: Optional[np.ndarray]
+    # With an embedding engine: one vector per opportunity, and whether it has text
+    embedding_vectors: Optional[np.ndarray]
+    embedding_text: Optional[np.ndarray]
+    
+    # Past performance: probe word IDs and the matched contract type
+    naics_words: np.ndarray
+    office_words: np.ndarray
+    contract_types: np.ndarray
+    past_performance_checks: np.ndarray
+    word_vocab: Dict[str, int]
+    
+    @property
+    def size(self) -> int:
+        return len(self.opportunities)
+    
+    def take(self, columns: np.ndarray) -> "OpportunityFeatures":
+        """Features of the given opportunity columns, in that order."""
+        columns = np.asarray(columns, dtype=np.int64)
+        counts = self.keyword_counts[columns].astype(np.int64)
+        
+        # Positions of the selected rows' keywords in the CSR arrays
+        offsets = np.concatenate(([0], np.cumsum(self.keyword_counts.astype(np.int64))))
+        starts = np.repeat(offsets[columns] - (np.cumsum(counts) - counts), counts)
+        positions = starts + np.arange(counts.sum())
+        
+        return OpportunityFeatures(
+            opportunities=[self.opportunities[j] for j in columns],
+            naics_prefixes=self.naics_prefixes[:, columns],
+            naics_present=self.naics_present[columns],
+            prefix_vocab=self.prefix_vocab,
+            states=self.states[columns],
+            in_dc_area=self.in_dc_area[columns],
+            state_vocab=self.state_vocab,
+            set_aside_masks=self.set_aside_masks[columns],
+            set_aside_bits=self.set_aside_bits,
+            value_max=self.value_max[columns],
+            keyword_ids=self.keyword_ids[positions],
+            keyword_rows=np.repeat(np.arange(len(columns), dtype=np.int32), counts),
+            keyword_counts=self.keyword_counts[columns],
+            keyword_vocab=self.keyword_vocab,
+            keyword_weights=self.keyword_weights[positions] if self.keyword_weights is not None else None,
+            embedding_vectors=self.embedding_vectors[columns] if self.embedding_vectors is not None else None,
+            embedding_text=self.embedding_text[columns] if self.embedding_text is not None else None,
+            naics_words=self.naics_words[columns],
+            office_words=self.office_words[columns],
+            contract_types=self.contract_types[columns],
+            past_performance_checks=self.past_performance_checks[columns],
+            word_vocab=self.word_vocab,
+        )
+    
+    @classmethod
+    def build(
+        cls,
+        scorer: RelevanceScorer,
+        opportunities: Sequence[Opportunity],
+        feature_cache: Optional[FeatureCache] = None,
+    ) -> "OpportunityFeatures":
+        """
+        Encode opportunities using the scorer's tables and keyword extraction.
+        
+        Profiles come from ``feature_cache`` when given, else from the
+        scorer's cache.
+        """
+        features = feature_cache if feature_cache is not None else scorer.features
+        opportunities = list(opportunities)
+        count = len(opportunities)
+        
+        prefix_vocab: Dict[str, int] = {}
+        naics_prefixes = np.full((len(NAICS_PREFIX_SCORES), count), MISSING, dtype=np.int32)
+        naics_present = np.zeros(count, dtype=bool)
+        
+        state_vocab: Dict[str, int] = {}
+        states = np.full(count, MISSING, dtype=np.int32)
+        
+        set_aside_bits: Dict[str, int] = {}
+        for eligible in scorer.SET_ASIDE_ELIGIBLE.values():
+            for set_aside in eligible:
+                set_aside_bits.setdefault(set_aside, 1 << len(set_aside_bits))
+        set_aside_masks = np.zeros(count, dtype=np.int64)
+        value_max = np.full(count, np.nan)
+        
+        keyword_vocab: Dict[str, int] = {}
+        keyword_ids: List[int] = []
+        keyword_weights: Optional[List[float]] = [] if scorer.term_index is not None else None
+        keyword_counts = np.zeros(count)
+        embedding_text = np.zeros(count, dtype=bool) if scorer.embeddings is not None else None
+        
+        word_vocab: Dict[str, int] = {}
+        naics_words = np.full((count, NAICS_DESCRIPTION_WORDS), MISSING, dtype=np.int32)
+        office_words = np.full((count, OFFICE_NAME_WORDS), MISSING, dtype=np.int32)
+        contract_types = np.full(count, MISSING, dtype=np.int8)
+        past_performance_checks = np.zeros(count)
+        contract_keys = list(scorer.CONTRACT_TYPE_KEYWORDS)
+        
+        for j, opportunity in enumerate(opportunities):
+            profile = features.opportunity(opportunity)
+            
+            if opportunity.naics_code:
+                naics_present[j] = True
+                code = profile.naics_code
+                for k, (length, _) in enumerate(NAICS_PREFIX_SCORES):
+                    if len(code) >= length:
+                        naics_prefixes[k, j] = _lookup(prefix_vocab, code[:length])
+                
+                past_performance_checks[j] += 1
+                naics_words[j] = _padded_ids(word_vocab, profile.naics_description_words, NAICS_DESCRIPTION_WORDS)
+            
+            if profile.state:
+                states[j] = _lookup(state_vocab, profile.state)
+            
+            if opportunity.set_aside_type:
+                for set_aside in scorer.SET_ASIDE_ELIGIBLE.get(profile.set_aside, []):
+                    set_aside_masks[j] |= set_aside_bits[set_aside]
+            
+            if opportunity.estimated_value_max:
+                value_max[j] = float(opportunity.estimated_value_max)
+            
+            if embedding_text is not None:
+                embedding_text[j] = profile.has_text
+            elif keyword_weights is not None:
+                frequencies, doc_length = term_frequencies(opportunity_text(opportunity))
+                weights = scorer.term_index.document_weights(frequencies, doc_length)
+                keyword_ids.extend(_lookup(keyword_vocab, term) for term in weights)
+                keyword_weights.extend(weights.values())
+                keyword_counts[j] = len(weights)
+            else:
+                keywords = profile.keywords
+                keyword_ids.extend(_lookup(keyword_vocab, keyword) for keyword in keywords)
+                keyword_counts[j] = len(keywords)
+            
+            if opportunity.contracting_office_name:
+                past_performance_checks[j] += 1
+                office_words[j] = _padded_ids(word_vocab, profile.office_words, OFFICE_NAME_WORDS)
+            
+            if opportunity.contract_type:
+                past_performance_checks[j] += 1
+                ct = profile.contract_type
+                for index, contract_type in enumerate(contract_keys):
+                    if ct in contract_type:
+                        contract_types[j] = index
+                        break
+        
+        in_dc_area = np.zeros(count, dtype=bool)
+        for state, index in state_vocab.items():
+            if state in scorer.DC_AREA:
+                in_dc_area[states == index] = True
+        
+        return cls(
+            opportunities=opportunities,
+            naics_prefixes=naics_prefixes,
+            naics_present=naics_present,
+            prefix_vocab=prefix_vocab,
+            states=states,
+            in_dc_area=in_dc_area,
+            state_vocab=state_vocab,
+            set_aside_masks=set_aside_masks,
+            set_aside_bits=set_aside_bits,
+            value_max=value_max,
+            keyword_ids=np.asarray(keyword_ids, dtype=np.int32),
+            keyword_rows=np.repeat(np.arange(count, dtype=np.int32), keyword_counts.astype(np.int64)),
+            keyword_counts=keyword_counts,
+            keyword_vocab=keyword_vocab,
+            keyword_weights=np.asarray(keyword_weights) if keyword_weights is not None else None,
+            embedding_vectors=(
+                scorer.embeddings.opportunity_vectors(opportunities) if embedding_text is not None else None
+            ),
+            embedding_text=embedding_text,
+            naics_words=naics_words,
+            office_words=office_words,
+            contract_types=contract_types,
+            past_performance_checks=past_performance_checks,
+            word_vocab=word_vocab,
+        )
+
+
+@dataclass
+class ScoreMatrix:
+    """Component and overall scores, each shaped (organizations, opportunities)."""
+    scorer: RelevanceScorer
+    organizations: List[Organization]
+    opportunities: List[Opportunity]
+    naics: np.ndarray
+    semantic: np.ndarray
+    geographic: np.ndarray
+    size: np.ndarray
+    past_performance: np.ndarray
+    overall: np.ndarray
+    
+    def result(self, i: int, j: int) -> RelevanceScoreResult:
+        """Build the scalar result for organization i and opportunity j."""
+        naics = float(self.naics[i, j])
+        semantic = float(self.semantic[i, j])
+        geographic = float(self.geographic[i, j])
+        size = float(self.size[i, j])
+        past_performance = float(self.past_performance[i, j])
+        overall = float(self.overall[i, j])
+        
+        explanation = self.scorer._generate_explanation(
+            self.organizations[i], self.opportunities[j],
+            naics, semantic, geographic, size, past_performance, overall
+        )
+        # Python's round(), not np.round(), to match the scalar path exactly
+        return RelevanceScoreResult(
+            overall_score=round(overall, 4),
+            naics_score=round(naics, 4),
+            semantic_score=round(semantic, 4),
+            geographic_score=round(geographic, 4),
+            size_score=round(size, 4),
+            past_performance_score=round(past_performance, 4),
+            component_weights=self.scorer.weights_for(self.organizations[i]),
+            explanation=explanation,
+        )
+
+
+def score_matrix(
+    scorer: RelevanceScorer,
+    organizations: Sequence[Organization],
+    features: OpportunityFeatures,
+) -> ScoreMatrix:
+    """Score every organization against every opportunity in features."""
+    organizations = list(organizations)
+    shape = (len(organizations), features.size)
+    components = {
+        name: np.empty(shape)
+        for name in ("naics", "semantic", "geographic", "size", "past_performance")
+    }
+    
+    for i, organization in enumerate(organizations):
+        components["naics"][i] = _naics_scores(scorer, organization, features)
+        components["semantic"][i] = _semantic_scores(scorer, organization, features)
+        components["geographic"][i] = _geographic_scores(scorer, organization, features)
+        components["size"][i] = _size_scores(scorer, organization, features)
+        components["past_performance"][i] = _past_performance_scores(scorer, organization, features)
+    
+    # One weight column per component, a row per organization's profile
+    profiles = [scorer.weights_for(organization) for organization in organizations]
+    weights = {
+        name: np.array([profile[name] for profile in profiles]).reshape(-1, 1)
+        for name in components
+    }
+    # Same operand order as calculate_score so the float sums agree
+    overall = (
+        components["naics"] * weights["naics"] +
+        components["semantic"] * weights["semantic"] +
+        components["geographic"] * weights["geographic"] +
+        components["size"] * weights["size"] +
+        components["past_performance"] * weights["past_performance"]
+    )
+    
+    return ScoreMatrix(
+        scorer=scorer,
+        organizations=organizations,
+        opportunities=features.opportunities,
+        overall=overall,
+        **components,
+    )
+
+
+@dataclass
+class TopOpportunities:
+    """Best opportunities for one organization, best first."""
+    results: List[Tuple[Opportunity, RelevanceScoreResult]]
+    # Opportunities considered, and how many were scored in full
+    considered: int
+    scored: int
+
+
+def top_opportunities(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+    k: int,
+    min_score: float = 0.0,
+    mask: Optional[np.ndarray] = None,
+) -> TopOpportunities:
+    """
+    The k highest-scoring opportunities in features (where ``mask`` is
+    set), with the same scores as ``score_matrix``.
+    
+    Threshold-style search: NAICS, geographic, size and past performance
+    scores are cheap array lookups and are computed exactly for every
+    column; the semantic score is replaced by a per-column upper bound.
+    Blocks of the highest remaining bounds are then scored in full until
+    no remaining bound can beat the current k-th score.
+    """
+    weights = scorer.weights_for(organization)
+    bounds = (
+        _naics_scores(scorer, organization, features) * weights["naics"] +
+        _semantic_bounds(scorer, organization, features) * weights["semantic"] +
+        _geographic_scores(scorer, organization, features) * weights["geographic"] +
+        _size_scores(scorer, organization, features) * weights["size"] +
+        _past_performance_scores(scorer, organization, features) * weights["past_performance"]
+    ) + BOUND_SLACK
+    
+    eligible = bounds >= min_score
+    if mask is not None:
+        eligible &= mask
+    remaining = np.flatnonzero(eligible)
+    
+    # Best (score, block matrix, column in block) found so far
+    best: List[Tuple[float, ScoreMatrix, int]] = []
+    scored = 0
+    while remaining.size:
+        if len(best) >= k:
+            remaining = remaining[bounds[remaining] > best[-1][0]]
+            if not remaining.size:
+                break
+        # The highest bounds left, without sorting the rest
+        if remaining.size > TOP_K_BLOCK_SIZE:
+            picked = np.argpartition(-bounds[remaining], TOP_K_BLOCK_SIZE - 1)[:TOP_K_BLOCK_SIZE]
+            rest = np.ones(remaining.size, dtype=bool)
+            rest[picked] = False
+            block, remaining = remaining[picked], remaining[rest]
+        else:
+            block, remaining = remaining, remaining[:0]
+        
+        matrix = score_matrix(scorer, [organization], features.take(block))
+        scored += len(block)
+        
+        overall = matrix.overall[0]
+        hits = np.flatnonzero(overall >= min_score)
+        if hits.size > k:
+            hits = hits[np.argpartition(-overall[hits], k - 1)[:k]]
+        best.extend((float(overall[j]), matrix, int(j)) for j in hits)
+        best.sort(key=lambda item: item[0], reverse=True)
+        del best[k:]
+    
+    return TopOpportunities(
+        results=[(block_matrix.opportunities[j], block_matrix.result(0, j)) for _, block_matrix, j in best],
+        considered=features.size if mask is None else int(mask.sum()),
+        scored=scored,
+    )
+
+
+def _semantic_bounds(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    """Upper bounds on ``_semantic_scores``; exact where it is neutral."""
+    org_profile = scorer.features.organization(organization)
+    if scorer.embeddings is not None:
+        if not org_profile.has_text:
+            return np.full(features.size, 0.5)
+        return np.where(features.embedding_text, 1.0, 0.5)
+    if scorer.term_index is not None:
+        if not scorer.term_index.organization_vector(organization):
+            return np.full(features.size, 0.5)
+        return np.where(features.keyword_counts > 0, 1.0, 0.5)
+    
+    org_keywords = org_profile.keywords
+    if not org_keywords:
+        return np.full(features.size, 0.5)
+    
+    # Jaccard grows with the intersection, which is at most the smaller side
+    # (counting only organization keywords some opportunity has)
+    known = sum(1 for keyword in org_keywords if keyword in features.keyword_vocab)
+    intersection = np.minimum(known, features.keyword_counts)
+    union = len(org_keywords) + features.keyword_counts - intersection
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = np.minimum(1.0, intersection / union * 5)
+    return np.where(features.keyword_counts > 0, scaled, 0.5)
+
+
+def _naics_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    if not organization.naics_codes:
+        return np.full(features.size, 0.5)
+    
+    best = np.zeros(features.size)
+    for org_naics in scorer.features.organization(organization).naics_codes:
+        matched = np.zeros(features.size, dtype=bool)
+        # Longest prefix first; the first length that matches sets the score
+        for k, (length, score) in enumerate(NAICS_PREFIX_SCORES):
+            prefix_id = features.prefix_vocab.get(org_naics[:length]) if len(org_naics) >= length else None
+            if prefix_id is None:
+                continue
+            hit = (features.naics_prefixes[k] == prefix_id) & ~matched
+            best[hit] = np.maximum(best[hit], score)
+            matched |= hit
+    
+    return np.where(features.naics_present, best, 0.5)
+
+
+def _semantic_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    if scorer.embeddings is not None:
+        return _embedding_scores(scorer, organization, features)
+    if scorer.term_index is not None:
+        return _bm25_scores(scorer, organization, features)
+    
+    org_keywords = scorer.features.organization(organization).keywords
+    if not org_keywords:
+        return np.full(features.size, 0.5)
+    
+    in_org = np.zeros(len(features.keyword_vocab), dtype=bool)
+    for keyword in org_keywords:
+        index = features.keyword_vocab.get(keyword)
+        if index is not None:
+            in_org[index] = True
+    
+    intersection = np.bincount(
+        features.keyword_rows,
+        weights=in_org[features.keyword_ids],
+        minlength=features.size,
+    )
+    union = len(org_keywords) + features.keyword_counts - intersection
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = np.minimum(1.0, intersection / union * 5)
+    return np.where(features.keyword_counts > 0, scaled, 0.5)
+
+
+def _embedding_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    if not scorer.features.organization(organization).has_text:
+        return np.full(features.size, 0.5)
+    scores = scorer.embeddings.semantic_scores(organization, features.embedding_vectors)
+    return np.where(features.embedding_text, scores, 0.5)
+
+
+def _bm25_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    query = scorer.term_index.organization_vector(organization)
+    if not query:
+        return np.full(features.size, 0.5)
+    
+    query_weights = np.zeros(len(features.keyword_vocab))
+    for term, weight in query.items():
+        index = features.keyword_vocab.get(term)
+        if index is not None:
+            query_weights[index] = weight
+    
+    # bincount sums each row in posting order, as the scalar loop does
+    similarity = np.bincount(
+        features.keyword_rows,
+        weights=query_weights[features.keyword_ids] * features.keyword_weights,
+        minlength=features.size,
+    )
+    scaled = np.minimum(1.0, similarity * SIMILARITY_SCALE)
+    return np.where(features.keyword_counts > 0, scaled, 0.5)
+
+
+def _geographic_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    org_state = scorer.features.organization(organization).state
+    if not org_state:
+        return np.full(features.size, 0.6)
+    
+    adjacent = set(scorer.STATE_ADJACENCY.get(org_state, []))
+    adjacent.update(
+        state for state, neighbours in scorer.STATE_ADJACENCY.items()
+        if org_state in neighbours
+    )
+    
+    # One extra slot so MISSING (-1) indexes a False entry
+    is_adjacent = np.zeros(len(features.state_vocab) + 1, dtype=bool)
+    for state, index in features.state_vocab.items():
+        is_adjacent[index] = state in adjacent
+    
+    scores = np.full(features.size, 0.4)
+    if org_state in scorer.DC_AREA:
+        scores[:] = 0.7
+    else:
+        scores[features.in_dc_area] = 0.7
+    scores[is_adjacent[features.states]] = 0.8
+    
+    org_index = features.state_vocab.get(org_state)
+    if org_index is not None:
+        scores[features.states == org_index] = 1.0
+    
+    scores[features.states == MISSING] = 0.6
+    return scores
+
+
+def _size_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    scores = np.ones(features.size)
+    
+    if organization.set_aside_types:
+        org_mask = 0
+        for set_aside in scorer.features.organization(organization).set_asides:
+            org_mask |= features.set_aside_bits.get(set_aside, 0)
+        has_rule = features.set_aside_masks != 0
+        eligible = (features.set_aside_masks & org_mask) != 0
+        scores[has_rule & ~eligible] = 0.2
+    
+    if organization.annual_revenue:
+        ratio = features.value_max / float(organization.annual_revenue)
+        capacity = np.select(
+            [ratio < 0.1, ratio < 0.5, ratio < 1.0, ratio < 2.0],
+            [0.95, 1.0, 0.8, 0.5],
+            0.2,
+        )
+        has_value = ~np.isnan(features.value_max)
+        scores = np.where(has_value, np.minimum(scores, capacity), scores)
+    
+    return scores
+
+
+def _past_performance_scores(
+    scorer: RelevanceScorer,
+    organization: Organization,
+    features: OpportunityFeatures,
+) -> np.ndarray:
+    if not organization.past_performance_summary:
+        return np.full(features.size, 0.5)
+    
+    pp_summary = scorer.features.organization(organization).past_performance
+    
+    # One extra slot so MISSING (-1) padding indexes a False entry
+    word_found = np.zeros(len(features.word_vocab) + 1, dtype=bool)
+    for word, index in features.word_vocab.items():
+        word_found[index] = word in pp_summary
+    
+    contract_found = np.zeros(len(scorer.CONTRACT_TYPE_KEYWORDS) + 1, dtype=bool)
+    for index, keywords in enumerate(scorer.CONTRACT_TYPE_KEYWORDS.values()):
+        contract_found[index] = any(kw in pp_summary for kw in keywords)
+    
+    indicators = (
+        word_found[features.naics_words].any(axis=1).astype(float) +
+        word_found[features.office_words].any(axis=1) +
+        contract_found[features.contract_types]
+    )
+    
+    checks = features.past_performance_checks
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = 0.4 + (0.6 * indicators / checks)
+    return np.where(checks > 0, scores, 0.6)
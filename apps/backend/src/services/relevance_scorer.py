@@ -11,11 +11,17 @@ based on multiple factors:
 """
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
-import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
 
 from src.database.models import Organization, Opportunity
 from src.config import get_settings
+from src.services.feature_cache import FeatureCache, KEYWORD_STOP_WORDS, extract_keywords, get_feature_cache
+from src.services.naics import prefix_score
+
+if TYPE_CHECKING:
+    from src.services.embeddings import EmbeddingEngine
+    from src.services.relevance_matrix import OpportunityFeatures, ScoreMatrix, TopOpportunities
+    from src.services.term_index import TermIndex
 
 settings = get_settings()
 
@@ -72,9 +78,44 @@ class RelevanceScorer:
         "HUBZone": ["HUBZone"],
     }
     
-    def __init__(self, weights: Optional[Dict[str, float]] = None):
-        """Initialize scorer with optional custom weights."""
+    # Federal hub states, scored as nationally reachable
+    DC_AREA = {"DC", "VA", "MD"}
+    
+    # Contract type keywords looked for in past performance narratives
+    CONTRACT_TYPE_KEYWORDS = {
+        "firm-fixed": ["fixed", "ffp"],
+        "time-and-materials": ["time", "materials", "t&m"],
+        "cost-plus": ["cost", "plus", "cpff", "cpaf"],
+        "idiq": ["idiq", "indefinite", "delivery"],
+    }
+    
+    # Words ignored by keyword extraction
+    STOP_WORDS = KEYWORD_STOP_WORDS
+    
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        term_index: Optional["TermIndex"] = None,
+        embeddings: Optional["EmbeddingEngine"] = None,
+        feature_cache: Optional[FeatureCache] = None,
+    ):
+        """
+        Initialize scorer with optional custom weights.
+        
+        With ``embeddings`` the semantic component is the scaled cosine
+        similarity of local text embeddings; otherwise, with a
+        ``term_index``, it is BM25 similarity against the corpus index;
+        without either it falls back to keyword overlap. Derived entity
+        features come from ``feature_cache`` (the shared cache by default).
+        """
         self.weights = weights or self.DEFAULT_WEIGHTS
+        self.term_index = term_index
+        self.embeddings = embeddings
+        self.features = feature_cache if feature_cache is not None else get_feature_cache()
+    
+    def weights_for(self, organization: Organization) -> Dict[str, float]:
+        """Component weights for an organization: its own profile, if set."""
+        return organization.scoring_weights or self.weights
     
     async def calculate_score(
         self,
@@ -87,7 +128,7 @@ class RelevanceScorer:
         Args:
             organization: The organization profile
             opportunity: The procurement opportunity
-            
+        
         Returns:
             RelevanceScoreResult with all component scores and explanation
         """
@@ -99,12 +140,13 @@ class RelevanceScorer:
         past_performance_score = self._calculate_past_performance_score(organization, opportunity)
         
         # Calculate weighted overall score
+        weights = self.weights_for(organization)
         overall_score = (
-            naics_score * self.weights["naics"] +
-            semantic_score * self.weights["semantic"] +
-            geographic_score * self.weights["geographic"] +
-            size_score * self.weights["size"] +
-            past_performance_score * self.weights["past_performance"]
+            naics_score * weights["naics"] +
+            semantic_score * weights["semantic"] +
+            geographic_score * weights["geographic"] +
+            size_score * weights["size"] +
+            past_performance_score * weights["past_performance"]
         )
         
         # Generate explanation
@@ -121,10 +163,54 @@ class RelevanceScorer:
             geographic_score=round(geographic_score, 4),
             size_score=round(size_score, 4),
             past_performance_score=round(past_performance_score, 4),
-            component_weights=self.weights,
+            component_weights=weights,
             explanation=explanation,
         )
     
+    def score_matrix(
+        self,
+        organizations: Sequence[Organization],
+        opportunities: Union[Sequence[Opportunity], "OpportunityFeatures"],
+    ) -> "ScoreMatrix":
+        """
+        Score N organizations against M opportunities in one vectorized pass.
+        
+        Produces the same scores as calling ``calculate_score`` on every
+        pair. Pass prebuilt ``OpportunityFeatures`` to reuse them across
+        calls.
+        
+        Args:
+            organizations: Organization profiles (rows)
+            opportunities: Opportunities or their precomputed features (columns)
+        
+        Returns:
+            ScoreMatrix holding an N x M array per component
+        """
+        from src.services.relevance_matrix import OpportunityFeatures, score_matrix
+        
+        if not isinstance(opportunities, OpportunityFeatures):
+            opportunities = OpportunityFeatures.build(self, opportunities)
+        return score_matrix(self, organizations, opportunities)
+    
+    def top_opportunities(
+        self,
+        organization: Organization,
+        opportunities: Union[Sequence[Opportunity], "OpportunityFeatures"],
+        k: int = 50,
+        min_score: float = 0.0,
+    ) -> "TopOpportunities":
+        """
+        The k best opportunities for an organization, best first.
+        
+        Scores equal ``calculate_score``, but opportunities whose upper
+        bound cannot beat the current k-th score are never scored in full.
+        """
+        from src.services.relevance_matrix import OpportunityFeatures, top_opportunities
+        
+        if not isinstance(opportunities, OpportunityFeatures):
+            opportunities = OpportunityFeatures.build(self, opportunities)
+        return top_opportunities(self, organization, opportunities, k, min_score)
+    
     def _calculate_naics_score(
         self, 
         organization: Organization, 
@@ -144,40 +230,11 @@ class RelevanceScorer:
         if not opportunity.naics_code or not organization.naics_codes:
             return 0.5  # Neutral when data unavailable
         
-        opp_naics = opportunity.naics_code.strip()
-        
-        best_score = 0.0
-        for org_naics in organization.naics_codes:
-            org_naics = org_naics.strip()
-            
-            # Calculate matching prefix length
-            match_length = 0
-            for i, (c1, c2) in enumerate(zip(opp_naics, org_naics)):
-                if c1 == c2:
-                    match_length = i + 1
-                else:
-                    break
-            
-            # Score based on match length
-            if match_length >= 6:
-                score = 1.0
-            elif match_length >= 5:
-                score = 0.9
-            elif match_length >= 4:
-                score = 0.75
-            elif match_length >= 3:
-                score = 0.5
-            elif match_length >= 2:
-                score = 0.25
-            else:
-                score = 0.0
-            
-            best_score = max(best_score, score)
-            
-            if best_score == 1.0:
-                break  # Can't do better
+        opp_naics = self.features.opportunity(opportunity).naics_code
         
-        return best_score
+        # Longest prefix shared with any organization code
+        match_length = self.features.organization(organization).naics.common_prefix_length(opp_naics)
+        return prefix_score(match_length)
     
     async def _calculate_semantic_score(
         self,
@@ -188,21 +245,23 @@ class RelevanceScorer:
         Calculate semantic similarity between organization capabilities
         and opportunity requirements.
         
-        Uses keyword overlap as a baseline. In production, would use
-        embeddings (sentence-transformers) for true semantic matching.
+        Uses local embeddings when an engine is configured, BM25 similarity
+        when a term index is, and keyword overlap as a baseline otherwise.
         """
-        # Get text to compare
-        org_text = (organization.capabilities_narrative or "") + " " + \
-                   (organization.past_performance_summary or "")
-        opp_text = (opportunity.title or "") + " " + \
-                   (opportunity.description or "")
+        if self.embeddings is not None:
+            return self.embeddings.semantic_score(organization, opportunity)
+        if self.term_index is not None:
+            return self.term_index.semantic_score(organization, opportunity)
+        
+        org_profile = self.features.organization(organization)
+        opp_profile = self.features.opportunity(opportunity)
         
-        if not org_text.strip() or not opp_text.strip():
+        if not org_profile.has_text or not opp_profile.has_text:
             return 0.5  # Neutral when no text
         
-        # Tokenize and get keywords
-        org_keywords = self._extract_keywords(org_text)
-        opp_keywords = self._extract_keywords(opp_text)
+        # Keywords tokenized once per entity version
+        org_keywords = org_profile.keywords
+        opp_keywords = opp_profile.keywords
         
         if not org_keywords or not opp_keywords:
             return 0.5
@@ -219,24 +278,9 @@ class RelevanceScorer:
         
         return scaled_score
     
-    def _extract_keywords(self, text: str) -> set:
+    def _extract_keywords(self, text: str) -> frozenset:
         """Extract meaningful keywords from text."""
-        # Lowercase and tokenize
-        text = text.lower()
-        words = re.findall(r'\b[a-z]{3,}\b', text)
-        
-        # Remove common stop words
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can',
-            'had', 'her', 'was', 'one', 'our', 'out', 'has', 'have', 'been',
-            'will', 'with', 'this', 'that', 'from', 'they', 'which', 'their',
-            'would', 'there', 'could', 'other', 'into', 'more', 'some', 'such',
-            'than', 'them', 'then', 'these', 'only', 'over', 'also', 'after',
-            'services', 'service', 'shall', 'must', 'may', 'contractor'
-        }
-        
-        keywords = {w for w in words if w not in stop_words}
-        return keywords
+        return extract_keywords(text)
     
     def _calculate_geographic_score(
         self,
@@ -253,15 +297,12 @@ class RelevanceScorer:
         - National capability implied: 0.7
         - No location data: 0.5 (neutral)
         """
-        org_state = organization.state
-        opp_state = opportunity.place_of_performance_state
+        org_state = self.features.organization(organization).state
+        opp_state = self.features.opportunity(opportunity).state
         
         if not org_state or not opp_state:
             return 0.6  # Slight positive for flexibility
         
-        org_state = org_state.upper()
-        opp_state = opp_state.upper()
-        
         # Exact match
         if org_state == opp_state:
             return 1.0
@@ -277,8 +318,7 @@ class RelevanceScorer:
             return 0.8
         
         # DC area gets special treatment (federal hub)
-        dc_area = {"DC", "VA", "MD"}
-        if org_state in dc_area or opp_state in dc_area:
+        if org_state in self.DC_AREA or opp_state in self.DC_AREA:
             return 0.7
         
         # Default - different region
@@ -302,8 +342,8 @@ class RelevanceScorer:
         
         # Check set-aside eligibility
         if opportunity.set_aside_type and organization.set_aside_types:
-            opp_setaside = opportunity.set_aside_type.upper()
-            org_setasides = [s.upper() for s in organization.set_aside_types]
+            opp_setaside = self.features.opportunity(opportunity).set_aside
+            org_setasides = self.features.organization(organization).set_asides
             
             # Check if organization qualifies for this set-aside
             eligible_types = self.SET_ASIDE_ELIGIBLE.get(opp_setaside, [])
@@ -349,7 +389,8 @@ class RelevanceScorer:
         if not organization.past_performance_summary:
             return 0.5  # Neutral - no data
         
-        pp_summary = organization.past_performance_summary.lower()
+        pp_summary = self.features.organization(organization).past_performance
+        opp_profile = self.features.opportunity(opportunity)
         
         # Check for relevant keywords from opportunity
         relevance_indicators = 0
@@ -358,29 +399,20 @@ class RelevanceScorer:
         # Check NAICS area
         if opportunity.naics_code:
             total_checks += 1
-            naics_desc = (opportunity.naics_description or "").lower()
-            if any(word in pp_summary for word in naics_desc.split()[:3]):
+            if any(word in pp_summary for word in opp_profile.naics_description_words[:3]):
                 relevance_indicators += 1
         
         # Check agency experience
         if opportunity.contracting_office_name:
             total_checks += 1
-            office = opportunity.contracting_office_name.lower()
-            if any(word in pp_summary for word in office.split()[:2]):
+            if any(word in pp_summary for word in opp_profile.office_words[:2]):
                 relevance_indicators += 1
         
         # Check contract type experience
-        contract_keywords = {
-            "firm-fixed": ["fixed", "ffp"],
-            "time-and-materials": ["time", "materials", "t&m"],
-            "cost-plus": ["cost", "plus", "cpff", "cpaf"],
-            "idiq": ["idiq", "indefinite", "delivery"],
-        }
-        
         if opportunity.contract_type:
             total_checks += 1
-            ct = opportunity.contract_type.lower()
-            for contract_type, keywords in contract_keywords.items():
+            ct = opp_profile.contract_type
+            for contract_type, keywords in self.CONTRACT_TYPE_KEYWORDS.items():
                 if ct in contract_type:
                     if any(kw in pp_summary for kw in keywords):
                         relevance_indicators += 1
@@ -15,6 +15,7 @@ from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 
 from src.database.models import Organization, Opportunity
+from src.services.feature_cache import FeatureCache, get_feature_cache
 
 
 @dataclass
@@ -66,9 +67,9 @@ class RiskAssessor:
         "timeline": 0.10,
     }
     
-    def __init__(self):
-        """Initialize risk assessor."""
-        pass
+    def __init__(self, feature_cache: Optional[FeatureCache] = None):
+        """Initialize risk assessor with an optional feature cache."""
+        self.features = feature_cache if feature_cache is not None else get_feature_cache()
     
     async def assess_risk(
         self,
@@ -81,7 +82,7 @@ class RiskAssessor:
         Args:
             organization: The organization profile
             opportunity: The procurement opportunity
-            
+        
         Returns:
             RiskAssessmentResult with all category assessments
         """
@@ -222,14 +223,13 @@ class RiskAssessor:
         
         # Check NAICS alignment
         if opportunity.naics_code and organization.naics_codes:
-            opp_naics = opportunity.naics_code[:4]  # Check at 4-digit level
-            matching = any(
-                n.startswith(opp_naics[:2]) for n in organization.naics_codes
-            )
-            if not matching:
+            opp_naics = self.features.opportunity(opportunity).naics_code
+            match_length = self.features.organization(organization).naics.common_prefix_length(opp_naics)
+            # Same 2-digit sector, then same 4-digit industry group
+            if match_length < min(2, len(opp_naics)):
                 factors.append(f"NAICS {opportunity.naics_code} outside core competencies")
                 risk_score += 0.5
-            elif not any(n.startswith(opp_naics) for n in organization.naics_codes):
+            elif match_length < min(4, len(opp_naics)):
                 factors.append(f"NAICS {opportunity.naics_code} is adjacent to core codes")
                 risk_score += 0.2
         
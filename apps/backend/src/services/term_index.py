@@ -0,0 +1,404 @@
+"""
+BM25 Term Index
+
+Corpus-level sparse index over opportunity titles and descriptions, used
+for the semantic component of relevance scoring.
+
+Postings (term frequency and document length per term and opportunity)
+live in ``aureon.opportunity_terms``, document frequencies in
+``aureon.term_stats`` and corpus totals in ``aureon.term_corpus``. All
+three are updated incrementally whenever opportunities are stored. No
+weights are baked into the postings; IDF and length normalization are
+applied at query time from the current statistics.
+
+The similarity between an organization and an opportunity is a sparse
+dot product of two vectors:
+
+- the organization's query vector: IDF weights of the indexed terms in its
+  capability and past performance narratives, normalized to sum to 1
+- the opportunity's BM25 term weights
+  ``tf / (tf + k1 * (1 - b + b * doc_length / avg_doc_length))``, each below 1
+
+so the raw similarity lies in [0, 1). Query vectors are stored in
+``aureon.organization_query_vectors``, which turns "all matches for an
+organization" into a lookup over the postings of its query terms.
+
+Hard-deleted opportunities drop their postings through the foreign key but
+their terms keep counting toward ``term_stats`` until the index is rebuilt.
+
+Usage:
+    python -m src.services.term_index    # rebuild from scratch
+"""
+import asyncio
+import math
+import re
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.database.models import (
+    Opportunity, OpportunityTerm, Organization, OrganizationQueryVector, TermCorpus, TermStat,
+)
+from src.services.relevance_scorer import RelevanceScorer
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Strong matches land around 0.2-0.3 raw similarity; spread them over [0, 1]
+SIMILARITY_SCALE = 4.0
+
+# Highest-IDF terms kept per query vector, bounding the postings a lookup reads
+QUERY_VECTOR_TERMS = 64
+
+# Recompute a stored query vector once the corpus has grown or shrunk this much
+QUERY_VECTOR_DRIFT = 0.1
+
+# Opportunities indexed per statement
+INDEX_BATCH_SIZE = 500
+
+TOKEN_PATTERN = re.compile(r'\b[a-z]{3,}\b')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, same rules as the keyword scorer."""
+    return [
+        word for word in TOKEN_PATTERN.findall(text.lower())
+        if word not in RelevanceScorer.STOP_WORDS
+    ]
+
+
+def opportunity_text(opportunity: Any) -> str:
+    return (opportunity.title or "") + " " + (opportunity.description or "")
+
+
+def organization_text(organization: Organization) -> str:
+    return (organization.capabilities_narrative or "") + " " + \
+           (organization.past_performance_summary or "")
+
+
+def term_frequencies(text: str) -> Tuple[Dict[str, int], int]:
+    """Term counts in first-occurrence order, and the document length."""
+    tokens = tokenize(text)
+    return dict(Counter(tokens)), len(tokens)
+
+
+class TermIndex:
+    """In-memory snapshot of the corpus statistics."""
+    
+    def __init__(self, doc_count: int, total_length: int, doc_freq: Dict[str, int]):
+        self.doc_count = doc_count
+        self.total_length = total_length
+        self.doc_freq = doc_freq
+        self.loaded_at = time.monotonic()
+        self._query_vectors: Dict[Tuple[Any, Any], Dict[str, float]] = {}
+    
+    @property
+    def avg_doc_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+    
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency (non-negative variant)."""
+        df = self.doc_freq.get(term, 0)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+    
+    def query_vector(self, text: str) -> Dict[str, float]:
+        """IDF weights of the indexed terms in text, normalized to sum to 1."""
+        weights = {
+            term: self.idf(term)
+            for term in set(tokenize(text))
+            if self.doc_freq.get(term, 0) > 0
+        }
+        top = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:QUERY_VECTOR_TERMS]
+        total = sum(weight for _, weight in top)
+        if total <= 0:
+            return {}
+        return {term: weight / total for term, weight in top}
+    
+    def organization_vector(self, organization: Organization) -> Dict[str, float]:
+        """Query vector of an organization, memoized per (id, updated_at)."""
+        if organization.id is None:
+            return self.query_vector(organization_text(organization))
+        key = (organization.id, organization.updated_at)
+        vector = self._query_vectors.get(key)
+        if vector is None:
+            vector = self._query_vectors[key] = self.query_vector(organization_text(organization))
+        return vector
+    
+    def length_norm(self, doc_length: int) -> float:
+        return BM25_K1 * (1 - BM25_B + BM25_B * doc_length / self.avg_doc_length)
+    
+    def document_weights(self, frequencies: Dict[str, int], doc_length: int) -> Dict[str, float]:
+        """Saturated BM25 term weights of a document."""
+        norm = self.length_norm(doc_length)
+        return {term: tf / (tf + norm) for term, tf in frequencies.items()}
+    
+    def semantic_score(self, organization: Organization, opportunity: Opportunity) -> float:
+        """Scaled similarity in [0, 1]; 0.5 (neutral) when either side has no terms."""
+        query = self.organization_vector(organization)
+        frequencies, doc_length = term_frequencies(opportunity_text(opportunity))
+        if not query or not frequencies:
+            return 0.5
+        
+        similarity = sum(
+            query.get(term, 0.0) * weight
+            for term, weight in self.document_weights(frequencies, doc_length).items()
+        )
+        return min(1.0, similarity * SIMILARITY_SCALE)
+    
+    @classmethod
+    async def load(cls, session: AsyncSession) -> "TermIndex":
+        """Read the corpus totals and document frequencies."""
+        corpus = await session.get(TermCorpus, True)
+        result = await session.execute(
+            select(TermStat.term, TermStat.doc_freq).where(TermStat.doc_freq > 0)
+        )
+        return cls(
+            doc_count=corpus.doc_count if corpus else 0,
+            total_length=corpus.total_length if corpus else 0,
+            doc_freq=dict(result.all()),
+        )
+
+
+_current: Optional[TermIndex] = None
+
+
+async def current_term_index(session: AsyncSession) -> Optional[TermIndex]:
+    """
+    Shared snapshot of the term index, reloaded after
+    ``term_index_refresh_seconds``. None while the index is empty.
+    """
+    global _current
+    settings = get_settings()
+    if _current is None or time.monotonic() - _current.loaded_at > settings.term_index_refresh_seconds:
+        _current = await TermIndex.load(session)
+    return _current if _current.doc_count else None
+
+
+async def index_opportunities(session: AsyncSession, opportunity_ids: Sequence[uuid.UUID]) -> int:
+    """
+    (Re)index the given opportunities from their stored title and description.
+    
+    Replaces their postings and applies the difference to the document
+    frequencies and corpus totals. Runs in the caller's transaction; the
+    caller commits.
+    
+    Returns:
+        Number of opportunities with at least one indexed term
+    """
+    indexed = 0
+    for start in range(0, len(opportunity_ids), INDEX_BATCH_SIZE):
+        indexed += await _index_batch(session, list(opportunity_ids[start:start + INDEX_BATCH_SIZE]))
+    return indexed
+
+
+async def _index_batch(session: AsyncSession, opportunity_ids: List[uuid.UUID]) -> int:
+    if not opportunity_ids:
+        return 0
+    
+    # Previous postings, to take their counts back out of the statistics
+    result = await session.execute(
+        select(OpportunityTerm.opportunity_id, OpportunityTerm.term, OpportunityTerm.doc_length)
+        .where(OpportunityTerm.opportunity_id.in_(opportunity_ids))
+    )
+    df_delta: Counter = Counter()
+    old_lengths: Dict[uuid.UUID, int] = {}
+    for row in result:
+        df_delta[row.term] -= 1
+        old_lengths[row.opportunity_id] = row.doc_length
+    
+    await session.execute(
+        delete(OpportunityTerm).where(OpportunityTerm.opportunity_id.in_(opportunity_ids))
+    )
+    
+    result = await session.execute(
+        select(Opportunity.id, Opportunity.title, Opportunity.description)
+        .where(Opportunity.id.in_(opportunity_ids))
+    )
+    postings: List[Dict[str, Any]] = []
+    new_lengths: Dict[uuid.UUID, int] = {}
+    for row in result:
+        frequencies, doc_length = term_frequencies(opportunity_text(row))
+        if not frequencies:
+            continue
+        new_lengths[row.id] = doc_length
+        for term, tf in frequencies.items():
+            df_delta[term] += 1
+            postings.append({
+                "term": term,
+                "opportunity_id": row.id,
+                "term_frequency": tf,
+                "doc_length": doc_length,
+            })
+    
+    if postings:
+        await session.execute(insert(OpportunityTerm.__table__), postings)
+    
+    # Sorted so concurrent indexers lock term rows in the same order
+    changes = [
+        {"term": term, "doc_freq": delta}
+        for term, delta in sorted(df_delta.items())
+        if delta
+    ]
+    if changes:
+        stmt = insert(TermStat.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["term"],
+            set_={"doc_freq": TermStat.__table__.c.doc_freq + stmt.excluded.doc_freq},
+        )
+        await session.execute(stmt, changes)
+    
+    doc_delta = len(new_lengths) - len(old_lengths)
+    length_delta = sum(new_lengths.values()) - sum(old_lengths.values())
+    if doc_delta or length_delta:
+        stmt = insert(TermCorpus.__table__).values(id=True, doc_count=doc_delta, total_length=length_delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "doc_count": TermCorpus.__table__.c.doc_count + stmt.excluded.doc_count,
+                "total_length": TermCorpus.__table__.c.total_length + stmt.excluded.total_length,
+            },
+        )
+        await session.execute(stmt)
+    
+    return len(new_lengths)
+
+
+async def ensure_query_vector(
+    session: AsyncSession,
+    index: TermIndex,
+    organization: Organization,
+) -> Dict[str, float]:
+    """
+    Stored query vector of an organization, recomputed when missing, older
+    than the organization's last update, or computed against a corpus that
+    has since drifted by more than ``QUERY_VECTOR_DRIFT``. The caller commits.
+    """
+    stored = await session.get(OrganizationQueryVector, organization.id)
+    if stored is not None:
+        drift = abs(index.doc_count - stored.doc_count) / max(stored.doc_count, 1)
+        fresh = organization.updated_at is None or stored.computed_at >= organization.updated_at
+        if fresh and drift <= QUERY_VECTOR_DRIFT:
+            return stored.terms
+    
+    terms = index.organization_vector(organization)
+    stmt = insert(OrganizationQueryVector.__table__).values(
+        organization_id=organization.id,
+        terms=terms,
+        doc_count=index.doc_count,
+        computed_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["organization_id"],
+        set_={
+            "terms": stmt.excluded.terms,
+            "doc_count": stmt.excluded.doc_count,
+            "computed_at": stmt.excluded.computed_at,
+        },
+    )
+    await session.execute(stmt)
+    return terms
+
+
+async def match_opportunities(
+    session: AsyncSession,
+    index: TermIndex,
+    organization: Organization,
+    limit: int = 50,
+    min_score: float = 0.0,
+) -> List[Tuple[uuid.UUID, float]]:
+    """
+    Active opportunities ranked by semantic score for an organization.
+    
+    Reads only the postings of the organization's query terms instead of
+    scanning the corpus. Scores agree with ``TermIndex.semantic_score`` up to
+    floating-point summation order. The caller commits (the query vector may
+    have been refreshed).
+    
+    Returns:
+        (opportunity_id, semantic_score) pairs, best first
+    """
+    terms = await ensure_query_vector(session, index, organization)
+    if not terms:
+        return []
+    
+    result = await session.execute(text("""
+        SELECT opportunity_id, similarity
+        FROM (
+            SELECT t.opportunity_id,
+                   sum(q.value::float8 * t.term_frequency
+                       / (t.term_frequency + :k1 * (1 - :b + :b * t.doc_length / :avg_length))) AS similarity
+            FROM aureon.organization_query_vectors v
+            CROSS JOIN LATERAL jsonb_each_text(v.terms) AS q
+            JOIN aureon.opportunity_terms t ON t.term = q.key
+            JOIN aureon.opportunities o ON o.id = t.opportunity_id AND o.status = 'active'
+            WHERE v.organization_id = :organization_id
+            GROUP BY t.opportunity_id
+        ) matches
+        WHERE least(1.0, similarity * :scale) >= :min_score
+        ORDER BY similarity DESC
+        LIMIT :limit
+    """), {
+        "organization_id": organization.id,
+        "k1": BM25_K1,
+        "b": BM25_B,
+        "avg_length": index.avg_doc_length,
+        "scale": SIMILARITY_SCALE,
+        "min_score": min_score,
+        "limit": limit,
+    })
+    return [
+        (row.opportunity_id, min(1.0, row.similarity * SIMILARITY_SCALE))
+        for row in result
+    ]
+
+
+async def rebuild_term_index(session: AsyncSession) -> int:
+    """
+    Index every stored opportunity from scratch, committing per batch.
+    
+    Returns:
+        Number of opportunities with at least one indexed term
+    """
+    await session.execute(text(
+        "TRUNCATE aureon.opportunity_terms, aureon.term_stats, aureon.term_corpus"
+    ))
+    await session.commit()
+    
+    indexed = 0
+    last_id = None
+    while True:
+        stmt = select(Opportunity.id).order_by(Opportunity.id).limit(INDEX_BATCH_SIZE)
+        if last_id is not None:
+            stmt = stmt.where(Opportunity.id > last_id)
+        ids = list((await session.execute(stmt)).scalars().all())
+        if not ids:
+            break
+        indexed += await _index_batch(session, ids)
+        await session.commit()
+        last_id = ids[-1]
+    return indexed
+
+
+async def _rebuild_from_cli() -> int:
+    from src.database.connection import async_session_factory
+    
+    async with async_session_factory() as db:
+        return await rebuild_term_index(db)
+
+
+@click.command()
+def main():
+    """Rebuild the BM25 term index from all stored opportunities."""
+    indexed = asyncio.run(_rebuild_from_cli())
+    click.echo(f"Indexed {indexed} opportunities")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Memory-Mapped Vector Index
+
+On-disk nearest-neighbour index for unit-length float32 vectors keyed by
+UUID, shared by every process that opens the same directory. Vectors are
+memory-mapped read-only, so uvicorn workers and ingestion workers on one
+host share a single copy in the page cache.
+
+Layout of an index directory:
+
+- ``manifest.json``: embedder name, dimension and the list of live segments
+- ``<segment>.vectors``: raw float32 matrix, one row per vector
+- ``<segment>.ids.npy``: UUID bytes and version (e.g. ``updated_at``) per row
+- ``<segment>.ivf.npz``: for compacted segments, k-means centroids and the
+  row offsets of each inverted list (rows are stored grouped by list)
+
+Segments are immutable. Writers add a flat segment per batch and swap the
+manifest atomically under an exclusive file lock; readers pick up the new
+manifest on ``reload_if_changed``. When the same ID appears in several
+segments, the row in the newest segment wins. ``compact`` merges all live
+rows into a single IVF segment, so top-K queries only scan the ``probes``
+closest lists instead of every row; flat segments are scanned in full.
+"""
+import fcntl
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+ID_DTYPE = np.dtype([("id", "V16"), ("version", "<f8")])
+
+# Rows per inverted list targeted by compaction
+ROWS_PER_LIST = 1000
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 50000
+
+# Rows scored per block in similarity_rows
+SIMILARITY_BLOCK = 4096
+
+
+def similarity_rows(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Dot product of each row with query, in float32.
+    
+    Computed block by block with an elementwise product and a row sum, so
+    a row's result does not depend on how many other rows are scored with
+    it (unlike a BLAS matrix-vector product).
+    """
+    out = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), SIMILARITY_BLOCK):
+        block = np.asarray(vectors[start:start + SIMILARITY_BLOCK], dtype=np.float32)
+        out[start:start + len(block)] = (block * query).sum(axis=1)
+    return out
+
+
+@dataclass
+class _Segment:
+    name: str
+    vectors: np.ndarray
+    ids: np.ndarray
+    # Rows not superseded by a newer segment
+    live: np.ndarray
+    centroids: Optional[np.ndarray] = None
+    offsets: Optional[np.ndarray] = None
+
+
+class VectorIndex:
+    """Read side of an index directory; write with the ``append``/``compact`` class methods."""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.embedder: Optional[str] = None
+        self.dimension: Optional[int] = None
+        self._segments: List[_Segment] = []
+        self._rows: Dict[uuid.UUID, Tuple[int, int]] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._load()
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def reload_if_changed(self) -> bool:
+        """Re-open the index if another process swapped the manifest."""
+        if self._manifest_stat() == self._manifest_mtime:
+            return False
+        self._load()
+        return True
+    
+    def get(self, entity_id: uuid.UUID) -> Optional[Tuple[np.ndarray, float]]:
+        """Vector and version stored for an ID, or None."""
+        location = self._rows.get(entity_id)
+        if location is None:
+            return None
+        segment = self._segments[location[0]]
+        return np.asarray(segment.vectors[location[1]]), float(segment.ids["version"][location[1]])
+    
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 50,
+        probes: int = 8,
+    ) -> List[Tuple[uuid.UUID, float]]:
+        """Top-k IDs by dot product with query, best first."""
+        query = np.asarray(query, dtype=np.float32)
+        candidates: List[Tuple[float, uuid.UUID]] = []
+        for segment in self._segments:
+            for start, stop in self._scan_ranges(segment, query, probes):
+                live = np.flatnonzero(segment.live[start:stop]) + start
+                if not len(live):
+                    continue
+                scores = segment.vectors[live] @ query
+                if len(live) > k:
+                    top = np.argpartition(-scores, k)[:k]
+                    live, scores = live[top], scores[top]
+                ids = segment.ids["id"][live]
+                candidates.extend(
+                    (float(score), uuid.UUID(bytes=bytes(raw)))
+                    for score, raw in zip(scores, ids)
+                )
+        candidates.sort(key=lambda item: -item[0])
+        return [(entity_id, score) for score, entity_id in candidates[:k]]
+    
+    def _scan_ranges(self, segment: _Segment, query: np.ndarray, probes: int) -> Iterator[Tuple[int, int]]:
+        if segment.centroids is None:
+            yield 0, len(segment.ids)
+            return
+        nearest = np.argsort(-(segment.centroids @ query))[:probes]
+        for list_index in nearest:
+            yield int(segment.offsets[list_index]), int(segment.offsets[list_index + 1])
+    
+    def _manifest_stat(self) -> Optional[int]:
+        try:
+            return (self.path / MANIFEST).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _load(self) -> None:
+        # A writer may delete the segments of the manifest just read; read it again
+        for attempt in range(3):
+            mtime = self._manifest_stat()
+            manifest = _read_manifest(self.path)
+            try:
+                segments = [
+                    _open_segment(self.path, entry, manifest["dimension"])
+                    for entry in manifest["segments"]
+                ]
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        
+        rows: Dict[uuid.UUID, Tuple[int, int]] = {}
+        for index, segment in enumerate(segments):
+            for row, raw in enumerate(segment.ids["id"]):
+                entity_id = uuid.UUID(bytes=bytes(raw))
+                previous = rows.get(entity_id)
+                if previous is not None:
+                    segments[previous[0]].live[previous[1]] = False
+                rows[entity_id] = (index, row)
+        
+        self.embedder = manifest["embedder"]
+        self.dimension = manifest["dimension"]
+        self._segments = segments
+        self._rows = rows
+        self._manifest_mtime = mtime
+    
+    @classmethod
+    def append(
+        cls,
+        path: Path,
+        embedder: str,
+        ids: Sequence[uuid.UUID],
+        versions: Sequence[float],
+        vectors: np.ndarray,
+        max_segments: int = 16,
+    ) -> None:
+        """
+        Add a batch as a new flat segment.
+        
+        Once more than ``max_segments`` flat segments exist they are merged
+        into one, keeping reader open cost and scan fan-out bounded.
+        """
+        if not len(ids):
+            return
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with _locked(path):
+            manifest = _read_manifest(path)
+            _check_compatible(manifest, embedder, vectors.shape[1])
+            manifest["embedder"] = embedder
+            manifest["dimension"] = vectors.shape[1]
+            manifest["segments"].append(_write_segment(path, ids, versions, vectors))
+            
+            flat = [entry for entry in manifest["segments"] if not entry.get("lists")]
+            if len(flat) > max_segments:
+                merged = _merge_entries(path, manifest, flat, build_lists=False)
+                manifest["segments"] = [
+                    entry for entry in manifest["segments"] if entry.get("lists")
+                ] + [merged]
+            _write_manifest(path, manifest)
+            _remove_unreferenced(path, manifest)
+    
+    @classmethod
+    def clear(cls, path: Path) -> None:
+        """Remove every segment, leaving an empty index."""
+        path = Path(path)
+        with _locked(path):
+            manifest = {"embedder": None, "dimension": None, "segments": []}
+            _write_manifest(path, manifest)
+            _remove_unreferenced(path, manifest)
+    
+    @classmethod
+    def compact(cls, path: Path, rows_per_list: int = ROWS_PER_LIST) -> int:
+        """
+        Merge every live row into a single IVF segment.
+        
+        Returns:
+            Number of rows in the compacted index
+        """
+        path = Path(path)
+        with _locked(path):
+            manifest = _read_manifest(path)
+            if not manifest["segments"]:
+                return 0
+            merged = _merge_entries(path, manifest, manifest["segments"], build_lists=True, rows_per_list=rows_per_list)
+            manifest["segments"] = [merged]
+            _write_manifest(path, manifest)
+            _remove_unreferenced(path, manifest)
+            return merged["rows"]
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        return json.loads((path / MANIFEST).read_text())
+    except FileNotFoundError:
+        return {"embedder": None, "dimension": None, "segments": []}
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    temp = path / f"{MANIFEST}.{os.getpid()}.tmp"
+    temp.write_text(json.dumps(manifest, indent=2))
+    os.replace(temp, path / MANIFEST)
+
+
+def _check_compatible(manifest: dict, embedder: str, dimension: int) -> None:
+    if manifest["segments"] and (manifest["embedder"], manifest["dimension"]) != (embedder, dimension):
+        raise ValueError(
+            f"Index holds {manifest['embedder']} vectors of dimension {manifest['dimension']}, "
+            f"not {embedder} of dimension {dimension}; rebuild it"
+        )
+
+
+def _write_segment(
+    path: Path,
+    ids: Sequence[uuid.UUID],
+    versions: Sequence[float],
+    vectors: np.ndarray,
+    centroids: Optional[np.ndarray] = None,
+    offsets: Optional[np.ndarray] = None,
+) -> dict:
+    name = uuid.uuid4().hex
+    records = np.empty(len(ids), dtype=ID_DTYPE)
+    records["id"] = [entity_id.bytes for entity_id in ids]
+    records["version"] = versions
+    
+    # Write everything before the manifest references it
+    vectors.astype(np.float32).tofile(path / f"{name}.vectors")
+    np.save(path / f"{name}.ids.npy", records)
+    entry = {"name": name, "rows": len(ids), "lists": 0}
+    if centroids is not None:
+        np.savez(path / f"{name}.ivf.npz", centroids=centroids, offsets=offsets)
+        entry["lists"] = len(centroids)
+    return entry
+
+
+def _open_segment(path: Path, entry: dict, dimension: int) -> _Segment:
+    name = entry["name"]
+    rows = entry["rows"]
+    vectors = np.memmap(path / f"{name}.vectors", dtype=np.float32, mode="r", shape=(rows, dimension)) \
+        if rows else np.empty((0, dimension), dtype=np.float32)
+    ids = np.load(path / f"{name}.ids.npy", mmap_mode="r")
+    segment = _Segment(name=name, vectors=vectors, ids=ids, live=np.ones(rows, dtype=bool))
+    if entry.get("lists"):
+        with np.load(path / f"{name}.ivf.npz") as ivf:
+            segment.centroids = ivf["centroids"]
+            segment.offsets = ivf["offsets"]
+    return segment
+
+
+def _merge_entries(
+    path: Path,
+    manifest: dict,
+    entries: List[dict],
+    build_lists: bool,
+    rows_per_list: int = ROWS_PER_LIST,
+) -> dict:
+    """Write the live rows of entries as one segment (IVF-ordered when build_lists)."""
+    # Liveness is decided across all segments, not only the merged ones
+    latest: Dict[bytes, Tuple[str, int]] = {}
+    for entry in manifest["segments"]:
+        ids = np.load(path / f"{entry['name']}.ids.npy", mmap_mode="r")
+        for row, raw in enumerate(ids["id"]):
+            latest[bytes(raw)] = (entry["name"], row)
+    
+    vectors, records = [], []
+    for entry in entries:
+        segment = _open_segment(path, entry, manifest["dimension"])
+        keep = [
+            row for row, raw in enumerate(segment.ids["id"])
+            if latest[bytes(raw)] == (entry["name"], row)
+        ]
+        vectors.append(np.asarray(segment.vectors[keep]))
+        records.append(np.asarray(segment.ids[keep]))
+    vectors = np.concatenate(vectors) if vectors else np.empty((0, manifest["dimension"]), dtype=np.float32)
+    records = np.concatenate(records) if records else np.empty(0, dtype=ID_DTYPE)
+    ids = [uuid.UUID(bytes=bytes(raw)) for raw in records["id"]]
+    
+    lists = len(vectors) // rows_per_list if build_lists else 0
+    if lists < 2:
+        return _write_segment(path, ids, records["version"], vectors)
+    
+    centroids, assignment = _kmeans(vectors, lists)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.zeros(lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignment, minlength=lists), out=offsets[1:])
+    logger.info("Built IVF segment", rows=len(vectors), lists=lists)
+    return _write_segment(
+        path,
+        [ids[i] for i in order],
+        records["version"][order],
+        vectors[order],
+        centroids=centroids,
+        offsets=offsets,
+    )
+
+
+def _kmeans(vectors: np.ndarray, lists: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on a sample, then assign every row to its nearest centroid."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        for list_index in range(lists):
+            members = sample[assignment == list_index]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[list_index] = centroid / (np.linalg.norm(centroid) or 1.0)
+    
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), SIMILARITY_BLOCK):
+        block = vectors[start:start + SIMILARITY_BLOCK]
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assignment
+
+
+def _remove_unreferenced(path: Path, manifest: dict) -> None:
+    """Delete segment files the manifest no longer lists; open mappings stay valid."""
+    referenced = {entry["name"] for entry in manifest["segments"]}
+    for file in path.iterdir():
+        name = file.name.split(".", 1)[0]
+        if file.suffix in (".vectors", ".npy", ".npz") and name not in referenced:
+            file.unlink(missing_ok=True)
@@ -0,0 +1,136 @@
+"""
+Relevance Weight Profiles
+
+The overall relevance score is a weighted sum of five stored component
+scores, so changing the weights never requires re-scoring: stored
+components are re-weighted in SQL.
+
+- ``rerank_stored_scores`` ranks an organization's stored scores under
+  any weights (a what-if query; nothing is written). The covering index
+  ``idx_relevance_org_components`` serves it from the index alone.
+- ``recompute_overall_scores`` applies a saved weight profile to every
+  stored score of the organization in one UPDATE.
+
+Stored components are rounded to four places, so a re-weighted overall
+score can differ from a full re-score in the last place.
+"""
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Mapping, Optional
+
+from sqlalchemy import ColumnElement, Numeric, Row, func, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Organization, RelevanceScore
+from src.services.relevance_scorer import RelevanceScorer
+
+COMPONENTS = tuple(RelevanceScorer.DEFAULT_WEIGHTS)
+
+COMPONENT_COLUMNS = {
+    "naics": RelevanceScore.naics_score,
+    "semantic": RelevanceScore.semantic_score,
+    "geographic": RelevanceScore.geographic_score,
+    "size": RelevanceScore.size_score,
+    "past_performance": RelevanceScore.past_performance_score,
+}
+
+
+def normalize_weights(weights: Mapping[str, float]) -> Dict[str, float]:
+    """
+    Validate a weight profile and scale it to sum to 1.
+    
+    Raises:
+        ValueError: On unknown or missing components, negative weights,
+            or weights summing to zero
+    """
+    unknown = set(weights) - set(COMPONENTS)
+    missing = set(COMPONENTS) - set(weights)
+    if unknown or missing:
+        raise ValueError(f"Weights must cover exactly {', '.join(COMPONENTS)}")
+    if any(weights[name] < 0 for name in COMPONENTS):
+        raise ValueError("Weights must not be negative")
+    
+    total = sum(weights[name] for name in COMPONENTS)
+    if total <= 0:
+        raise ValueError("Weights must not all be zero")
+    return {name: weights[name] / total for name in COMPONENTS}
+
+
+def profile_weights(scorer: RelevanceScorer, organization: Organization) -> Dict[str, float]:
+    """The organization's weight profile, or the scorer's weights (a copy)."""
+    return dict(scorer.weights_for(organization))
+
+
+def weighted_overall(weights: Mapping[str, float]) -> ColumnElement:
+    """Overall score of a ``relevance_scores`` row under weights, rounded as stored."""
+    # Numeric arithmetic, so the rounding matches the stored Numeric(5, 4)
+    return func.round(
+        sum(
+            func.coalesce(column, 0) * literal(Decimal(str(weights[name])), Numeric)
+            for name, column in COMPONENT_COLUMNS.items()
+        ),
+        4,
+    )
+
+
+async def rerank_stored_scores(
+    session: AsyncSession,
+    organization_id: uuid.UUID,
+    weights: Mapping[str, float],
+    limit: int = 50,
+    min_score: float = 0.0,
+) -> List[Row]:
+    """
+    An organization's stored scores ranked under ``weights``, best first.
+    
+    Rows carry ``opportunity_id``, the re-weighted ``overall_score``,
+    the ``stored_overall_score`` and the five component scores.
+    """
+    overall = weighted_overall(weights)
+    stmt = select(
+        RelevanceScore.opportunity_id,
+        overall.label("overall_score"),
+        RelevanceScore.overall_score.label("stored_overall_score"),
+        *COMPONENT_COLUMNS.values(),
+    ).where(RelevanceScore.organization_id == organization_id)
+    if min_score > 0:
+        stmt = stmt.where(overall >= min_score)
+    
+    result = await session.execute(
+        stmt.order_by(overall.desc(), RelevanceScore.opportunity_id).limit(limit)
+    )
+    return list(result.all())
+
+
+async def recompute_overall_scores(
+    session: AsyncSession,
+    organization_id: uuid.UUID,
+    weights: Mapping[str, float],
+) -> int:
+    """Re-weight every stored score of an organization; returns rows updated."""
+    result = await session.execute(
+        update(RelevanceScore)
+        .where(RelevanceScore.organization_id == organization_id)
+        .values(overall_score=weighted_overall(weights), component_weights=dict(weights))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def save_weight_profile(
+    session: AsyncSession,
+    scorer: RelevanceScorer,
+    organization: Organization,
+    weights: Optional[Mapping[str, float]],
+) -> int:
+    """
+    Set (or, with None, clear) an organization's weight profile and
+    re-weight its stored scores to match; without a profile they take
+    the scorer's weights.
+    
+    Returns:
+        Number of stored scores re-weighted
+    """
+    organization.scoring_weights = normalize_weights(weights) if weights is not None else None
+    await session.flush()
+    return await recompute_overall_scores(session, organization.id, profile_weights(scorer, organization))
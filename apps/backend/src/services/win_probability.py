@@ -15,6 +15,7 @@ from typing import Dict, List, Optional
 from decimal import Decimal
 
 from src.database.models import Organization, Opportunity
+from src.services.feature_cache import FeatureCache, extract_capability_keywords, get_feature_cache
 
 
 @dataclass
@@ -67,9 +68,14 @@ class WinProbabilityModel:
         "HUBZONE": ["HUBZone", "HUBZONE"],
     }
     
-    def __init__(self, weights: Optional[Dict[str, float]] = None):
-        """Initialize model with optional custom weights."""
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        feature_cache: Optional[FeatureCache] = None,
+    ):
+        """Initialize model with optional custom weights and feature cache."""
         self.weights = weights or self.FACTOR_WEIGHTS
+        self.features = feature_cache if feature_cache is not None else get_feature_cache()
     
     async def calculate_win_probability(
         self,
@@ -82,7 +88,7 @@ class WinProbabilityModel:
         Args:
             organization: The organization profile
             opportunity: The procurement opportunity
-            
+        
         Returns:
             WinProbabilityResult with probability, factors, and recommendation
         """
@@ -159,34 +165,24 @@ class WinProbabilityModel:
         
         # NAICS match
         if opportunity.naics_code and organization.naics_codes:
-            opp_naics = opportunity.naics_code.strip()
+            opp_naics = self.features.opportunity(opportunity).naics_code
+            match_length = self.features.organization(organization).naics.common_prefix_length(opp_naics)
             
-            for org_naics in organization.naics_codes:
-                org_naics = org_naics.strip()
-                
-                # Calculate matching prefix length
-                match_length = 0
-                for i, (c1, c2) in enumerate(zip(opp_naics, org_naics)):
-                    if c1 == c2:
-                        match_length = i + 1
-                    else:
-                        break
-                
-                if match_length >= 6:
-                    score = max(score, 1.0)
-                    reasons.append(f"Exact NAICS {opp_naics} match")
-                elif match_length >= 5:
-                    score = max(score, 0.9)
-                    reasons.append(f"Strong NAICS match (5-digit)")
-                elif match_length >= 4:
-                    score = max(score, 0.75)
-                    reasons.append(f"Good NAICS match (4-digit)")
-                elif match_length >= 3:
-                    score = max(score, 0.5)
-                    reasons.append(f"Partial NAICS match (3-digit)")
-                elif match_length >= 2:
-                    score = max(score, 0.25)
-                    reasons.append(f"Related industry sector")
+            if match_length >= 6:
+                score = 1.0
+                reasons.append(f"Exact NAICS {opp_naics} match")
+            elif match_length >= 5:
+                score = 0.9
+                reasons.append(f"Strong NAICS match (5-digit)")
+            elif match_length >= 4:
+                score = 0.75
+                reasons.append(f"Good NAICS match (4-digit)")
+            elif match_length >= 3:
+                score = 0.5
+                reasons.append(f"Partial NAICS match (3-digit)")
+            elif match_length >= 2:
+                score = 0.25
+                reasons.append(f"Related industry sector")
         
         # PSC code match bonus
         if opportunity.psc_code and organization.psc_codes:
@@ -196,9 +192,9 @@ class WinProbabilityModel:
         
         # Keyword match in description
         if organization.capabilities_narrative and opportunity.description:
-            keywords = self._extract_capability_keywords(organization.capabilities_narrative)
-            desc_lower = (opportunity.description or "").lower()
-            matches = sum(1 for kw in keywords if kw.lower() in desc_lower)
+            keywords = self.features.organization(organization).capability_keywords
+            desc_lower = self.features.opportunity(opportunity).description
+            matches = sum(1 for kw in keywords if kw in desc_lower)
             if matches > 3:
                 score = min(1.0, score + 0.1)
                 reasons.append(f"Strong keyword alignment ({matches} matches)")
@@ -215,8 +211,8 @@ class WinProbabilityModel:
         if not opportunity.set_aside_type:
             return 0.6, "Full and open competition - no set-aside restrictions"
         
-        opp_setaside = opportunity.set_aside_type.upper().strip()
-        org_setasides = [s.upper().strip() for s in (organization.set_aside_types or [])]
+        opp_setaside = self.features.opportunity(opportunity).set_aside
+        org_setasides = self.features.organization(organization).set_asides
         
         if not org_setasides:
             # Check if it's a small business set-aside
@@ -242,20 +238,21 @@ class WinProbabilityModel:
         if not organization.past_performance_summary:
             return 0.4, "No past performance summary on file"
         
-        pp_summary = organization.past_performance_summary.lower()
+        pp_summary = self.features.organization(organization).past_performance
+        opp_profile = self.features.opportunity(opportunity)
         score = 0.4  # Base score for having PP
         reasons = []
         
         # Check NAICS relevance
         if opportunity.naics_code:
-            naics_desc = (opportunity.naics_description or "").lower()
-            if any(word in pp_summary for word in naics_desc.split()[:3] if len(word) > 3):
+            naics_words = opp_profile.naics_description_words[:3]
+            if any(word in pp_summary for word in naics_words if len(word) > 3):
                 score += 0.2
                 reasons.append("Relevant industry experience")
         
         # Check agency experience
         if opportunity.contracting_office_name:
-            office_words = opportunity.contracting_office_name.lower().split()[:2]
+            office_words = opp_profile.office_words[:2]
             if any(word in pp_summary for word in office_words if len(word) > 3):
                 score += 0.2
                 reasons.append("Agency experience")
@@ -269,7 +266,7 @@ class WinProbabilityModel:
         }
         
         if opportunity.contract_type:
-            ct = opportunity.contract_type.lower()
+            ct = opp_profile.contract_type
             for ct_type, keywords in contract_keywords.items():
                 if ct_type in ct and any(kw in pp_summary for kw in keywords):
                     score += 0.15
@@ -291,8 +288,8 @@ class WinProbabilityModel:
         if not organization.past_performance_summary:
             return 0.3, "No agency relationship history available"
         
-        office = opportunity.contracting_office_name.lower()
-        pp = organization.past_performance_summary.lower()
+        office = self.features.opportunity(opportunity).office
+        pp = self.features.organization(organization).past_performance
         
         # Check for agency name mentions
         agency_keywords = {
@@ -329,8 +326,8 @@ class WinProbabilityModel:
         opportunity: Opportunity
     ) -> tuple[float, str]:
         """Score geographic alignment."""
-        org_state = (organization.state or "").upper()
-        opp_state = (opportunity.place_of_performance_state or "").upper()
+        org_state = self.features.organization(organization).state
+        opp_state = self.features.opportunity(opportunity).state
         
         if not org_state or not opp_state:
             return 0.6, "Geographic location not specified"
@@ -361,7 +358,7 @@ class WinProbabilityModel:
         
         # Remote work check
         if opportunity.description:
-            desc_lower = opportunity.description.lower()
+            desc_lower = self.features.opportunity(opportunity).description
             if "remote" in desc_lower or "telework" in desc_lower:
                 return 0.8, "Remote/telework eligible"
         
@@ -463,21 +460,4 @@ class WinProbabilityModel:
     
     def _extract_capability_keywords(self, text: str) -> List[str]:
         """Extract meaningful capability keywords from text."""
-        import re
-        
-        text = text.lower()
-        words = re.findall(r'\b[a-z]{4,}\b', text)
-        
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can',
-            'had', 'her', 'was', 'one', 'our', 'out', 'has', 'have', 'been',
-            'will', 'with', 'this', 'that', 'from', 'they', 'which', 'their',
-            'would', 'there', 'could', 'other', 'into', 'more', 'some', 'such',
-            'than', 'them', 'then', 'these', 'only', 'over', 'also', 'after',
-            'services', 'service', 'shall', 'must', 'provide', 'including',
-            'company', 'organization', 'team', 'experience', 'years'
-        }
-        
-        keywords = [w for w in words if w not in stop_words]
-        return list(set(keywords))[:50]  # Return unique keywords, limited
-
+        return list(extract_capability_keywords(text))
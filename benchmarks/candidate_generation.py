@@ -0,0 +1,213 @@
+"""
+Candidate Generation Benchmark
+
+Scores synthetic organizations against a synthetic corpus two ways:
+
+- ``full``: every active opportunity through ``RelevanceScorer.score_matrix``
+- ``candidates``: only the opportunities passing ``CandidateFilter``
+  (NAICS sector, set-aside eligibility, open deadline, optional state
+  radius), then ``score_matrix`` on those
+
+Reports the share of the corpus the filter drops, the scoring time saved,
+and recall: the share of pairs scoring at least ``--min-score`` in full
+that are still candidates, with the rules that dropped the others. No
+database is needed; models are built in memory and the filter is applied
+with ``CandidateFilter.failed_rules``, which mirrors the SQL conditions
+(in production the filter runs in Postgres, not in Python).
+
+Usage:
+    # 10 organizations against 50k opportunities
+    python benchmarks/candidate_generation.py --organizations 10 --opportunities 50000
+
+    # Also keep only opportunities within one adjacent state
+    python benchmarks/candidate_generation.py --state-radius 1
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import click
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+
+# Codes from a spread of sectors, as in the SAM.gov feed
+NAICS = [
+    "541511", "541512", "541330", "541611", "518210", "236220", "237310", "238220",
+    "561210", "561720", "334511", "336411", "611430", "621111", "488190", "811219",
+]
+STATES = ["VA", "MD", "DC", "CA", "TX", "FL", "NY", "CO", "WA", "OR", "NV", "GA", "NM", "OK", None]
+SET_ASIDES = ["SB", "8A", "WOSB", "EDWOSB", "SDVOSB", "VOSB", "HUBZone", None, None, None, None]
+# Narrative vocabulary per 2-digit sector; texts mix in some shared filler
+SECTOR_WORDS = {
+    "54": "software development cybersecurity engineering analytics consulting modernization".split(),
+    "51": "cloud hosting data center network storage platform".split(),
+    "23": "construction renovation roofing paving electrical hvac".split(),
+    "56": "janitorial custodial security guards landscaping grounds".split(),
+    "33": "avionics sensors aircraft components manufacturing instruments".split(),
+    "61": "training curriculum instruction courses simulation exercises".split(),
+    "62": "medical clinical health physicians telehealth patients".split(),
+    "48": "logistics transportation freight airfield cargo handling".split(),
+    "81": "repair equipment calibration electronics overhaul servicing".split(),
+}
+FILLER = (
+    "support program management requirements delivery performance acquisition schedule "
+    "quality reporting compliance staffing oversight planning coordination documentation "
+    "transition risk budget milestones deliverables personnel standards review"
+).split()
+
+
+def _text(rng, sectors, words):
+    vocabulary = [word for sector in sectors for word in SECTOR_WORDS[sector]]
+    return " ".join(
+        rng.choice(vocabulary) if rng.random() < 0.85 else rng.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+def _organizations(count, rng):
+    from src.database.models import Organization
+    
+    organizations = []
+    for i in range(count):
+        naics_codes = rng.sample(NAICS, rng.randint(1, 4))
+        sectors = [code[:2] for code in naics_codes]
+        organizations.append(Organization(
+            name=f"Org {i}",
+            naics_codes=naics_codes,
+            set_aside_types=rng.sample([s for s in SET_ASIDES if s], rng.randint(0, 2)),
+            state=rng.choice(STATES),
+            annual_revenue=Decimal(rng.choice([0, 500_000, 5_000_000, 50_000_000])),
+            capabilities_narrative=_text(rng, sectors, 60),
+            past_performance_summary=rng.choice([None, _text(rng, sectors, 40)]),
+        ))
+    return organizations
+
+
+def _opportunities(count, rng, now):
+    from src.database.models import Opportunity
+    
+    opportunities = []
+    for j in range(count):
+        naics_code = rng.choice(NAICS + [None])
+        # Uncoded notices read like any sector
+        sectors = [naics_code[:2]] if naics_code else [rng.choice(list(SECTOR_WORDS))]
+        opportunities.append(Opportunity(
+            source_id=f"bench-{j}",
+            source_system="benchmark",
+            title=_text(rng, sectors, 8),
+            description=rng.choice([None, _text(rng, sectors, 120)]),
+            naics_code=naics_code,
+            place_of_performance_state=rng.choice(STATES),
+            set_aside_type=rng.choice(SET_ASIDES),
+            estimated_value_max=rng.choice([None, Decimal(rng.randint(10_000, 80_000_000))]),
+            response_deadline=rng.choice([None, now + timedelta(days=rng.randint(-30, 90))]),
+            status="active",
+        ))
+    return opportunities
+
+
+def _run(organization_count, opportunity_count, min_score, state_radius, seed):
+    from src.services.candidates import CandidateFilter
+    from src.services.feature_cache import FeatureCache
+    from src.services.relevance_scorer import RelevanceScorer
+    
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    organizations = _organizations(organization_count, rng)
+    opportunities = _opportunities(opportunity_count, rng, now)
+    scorer = RelevanceScorer(feature_cache=FeatureCache(organization_count + opportunity_count))
+    # Full scoring also sees only opportunities still open
+    open_opportunities = [
+        o for o in opportunities if o.response_deadline is None or o.response_deadline > now
+    ]
+    
+    # Per organization, as the API scores one organization's corpus
+    full_seconds = filter_seconds = candidate_seconds = 0.0
+    candidate_pairs = relevant = relevant_kept = 0
+    dropped_by = {}
+    for organization in organizations:
+        started = time.perf_counter()
+        full = scorer.score_matrix([organization], open_opportunities)
+        full_seconds += time.perf_counter() - started
+        
+        started = time.perf_counter()
+        candidate_filter = CandidateFilter.for_organization(scorer, organization, state_radius, now=now)
+        failed = [candidate_filter.failed_rules(scorer, o) for o in open_opportunities]
+        candidates = [o for o, rules in zip(open_opportunities, failed) if not rules]
+        filter_seconds += time.perf_counter() - started
+        
+        started = time.perf_counter()
+        if candidates:
+            scorer.score_matrix([organization], candidates)
+        candidate_seconds += time.perf_counter() - started
+        
+        candidate_pairs += len(candidates)
+        for j, rules in enumerate(failed):
+            if full.overall[0, j] >= min_score:
+                relevant += 1
+                relevant_kept += not rules
+                for rule in rules:
+                    dropped_by[rule] = dropped_by.get(rule, 0) + 1
+    
+    full_pairs = organization_count * len(open_opportunities)
+    return {
+        "benchmark": "candidate_generation",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "organizations": organization_count,
+            "opportunities": opportunity_count,
+            "min_score": min_score,
+            "state_radius": state_radius,
+            "seed": seed,
+        },
+        "open_pairs": full_pairs,
+        "candidate_pairs": candidate_pairs,
+        "reduction": round(1 - candidate_pairs / full_pairs, 4) if full_pairs else None,
+        "relevant_pairs": relevant,
+        "relevant_kept": relevant_kept,
+        "recall": round(relevant_kept / relevant, 4) if relevant else None,
+        "relevant_dropped_by": dropped_by,
+        "full_seconds": round(full_seconds, 4),
+        # In-memory stand-in for the indexed SQL filter
+        "filter_seconds": round(filter_seconds, 4),
+        "candidate_seconds": round(candidate_seconds, 4),
+        "scoring_speedup": round(full_seconds / candidate_seconds, 2) if candidate_seconds else None,
+    }
+
+
+@click.command()
+@click.option("--organizations", type=int, default=10, help="Organizations")
+@click.option("--opportunities", type=int, default=50000, help="Opportunities in the corpus")
+@click.option("--min-score", type=float, default=0.6, help="Overall score counted as relevant")
+@click.option("--state-radius", type=int, default=None, help="Adjacent-state hops kept; unset disables the rule")
+@click.option("--seed", type=int, default=7, help="Synthetic data seed")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(organizations, opportunities, min_score, state_radius, seed, output):
+    """Compare full relevance scoring with scoring candidates only."""
+    result = _run(organizations, opportunities, min_score, state_radius, seed)
+    
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"candidate_generation_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+    
+    click.echo(f"candidates:       {result['candidate_pairs']} of {result['open_pairs']} pairs "
+               f"({result['reduction']} dropped)")
+    click.echo(f"recall:           {result['recall']} ({result['relevant_kept']} of "
+               f"{result['relevant_pairs']} pairs >= {min_score})")
+    click.echo(f"dropped by rule:  {result['relevant_dropped_by']}")
+    click.echo(f"full scoring:     {result['full_seconds']} s")
+    click.echo(f"candidate scoring: {result['candidate_seconds']} s ({result['scoring_speedup']}x), "
+               f"in-memory filter {result['filter_seconds']} s")
+    click.echo(f"written to        {output}")
+
+
+if __name__ == "__main__":
+    main()
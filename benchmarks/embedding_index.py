@@ -0,0 +1,195 @@
+"""
+Embedding Index Benchmark
+
+Embeds synthetic opportunity texts with a local embedder, builds the
+memory-mapped vector index in ingestion-sized batches, compacts it into
+IVF lists, and measures:
+
+- Embedding throughput (texts per second)
+- Build time: batched appends, then compaction
+- Top-K query latency (p50/p99) on the flat and the compacted index
+- Recall@K of the compacted index against exact brute force
+- Pairwise lookup latency (stored vector fetch plus similarity)
+
+No database is needed; the index is written to a temporary directory.
+
+Usage:
+    # 100k opportunities with the hashing embedder
+    python benchmarks/embedding_index.py --opportunities 100000
+
+    # A local sentence-transformers model
+    python benchmarks/embedding_index.py --backend sentence-transformers --model /models/all-MiniLM-L6-v2
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+
+# Topic vocabularies; each text mixes mostly one topic with some filler
+TOPICS = [
+    "cloud migration hosting kubernetes containers devops platform",
+    "cybersecurity zero trust intrusion detection vulnerability assessment",
+    "construction renovation facilities roofing hvac electrical",
+    "medical records health informatics clinical telehealth",
+    "geospatial imagery satellite mapping intelligence analysis",
+    "logistics warehousing supply chain transportation fleet",
+    "training curriculum instructional design simulation exercises",
+    "software development agile modernization legacy applications",
+    "research laboratory testing evaluation prototype engineering",
+    "janitorial grounds maintenance custodial landscaping services",
+]
+FILLER = "support services program management contract requirements delivery performance".split()
+
+
+def _texts(count, rng, words=60):
+    topics = [topic.split() for topic in TOPICS]
+    texts = []
+    for _ in range(count):
+        topic = rng.choice(topics)
+        texts.append(" ".join(
+            rng.choice(topic) if rng.random() < 0.7 else rng.choice(FILLER)
+            for _ in range(words)
+        ))
+    return texts
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 3)
+
+
+def _embedder(backend, model, dimension):
+    from src.services.embeddings import HashingEmbedder, SentenceTransformerEmbedder
+    
+    if backend == "hashing":
+        return HashingEmbedder(dimension)
+    return SentenceTransformerEmbedder(model)
+
+
+def _query_latencies(index, queries, k, probes):
+    latencies = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query, k=k, probes=probes))
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def _run(opportunity_count, query_count, batch_size, k, probes, rows_per_list, backend, model, dimension, seed):
+    from src.services.vector_index import VectorIndex, similarity_rows
+    
+    rng = random.Random(seed)
+    embedder = _embedder(backend, model, dimension)
+    texts = _texts(opportunity_count, rng)
+    ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(opportunity_count)]
+    
+    started = time.perf_counter()
+    vectors = embedder.embed(texts)
+    embed_seconds = time.perf_counter() - started
+    
+    queries = embedder.embed(_texts(query_count, rng, words=120))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "opportunities"
+        
+        started = time.perf_counter()
+        for start in range(0, opportunity_count, batch_size):
+            stop = start + batch_size
+            VectorIndex.append(path, embedder.name, ids[start:stop], [1.0] * len(ids[start:stop]), vectors[start:stop])
+        append_seconds = time.perf_counter() - started
+        
+        index = VectorIndex(path)
+        flat_latencies, exact = _query_latencies(index, queries, k, probes)
+        
+        started = time.perf_counter()
+        VectorIndex.compact(path, rows_per_list=rows_per_list)
+        compact_seconds = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        index = VectorIndex(path)
+        open_seconds = time.perf_counter() - started
+        ivf_latencies, approximate = _query_latencies(index, queries, k, probes)
+        
+        recall = np.mean([
+            len({i for i, _ in got} & {i for i, _ in want}) / len(want)
+            for got, want in zip(approximate, exact)
+        ])
+        
+        pair_latencies = []
+        for query in queries:
+            entity_id = ids[rng.randrange(opportunity_count)]
+            started = time.perf_counter()
+            vector, _ = index.get(entity_id)
+            similarity_rows(vector[None, :], query)
+            pair_latencies.append(time.perf_counter() - started)
+    
+    return {
+        "benchmark": "embedding_index",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "opportunities": opportunity_count,
+            "queries": query_count,
+            "batch_size": batch_size,
+            "k": k,
+            "probes": probes,
+            "rows_per_list": rows_per_list,
+            "embedder": embedder.name,
+            "dimension": embedder.dimension,
+            "seed": seed,
+        },
+        "embed_texts_per_second": round(opportunity_count / embed_seconds) if embed_seconds else None,
+        "append_seconds": round(append_seconds, 3),
+        "compact_seconds": round(compact_seconds, 3),
+        "open_seconds": round(open_seconds, 4),
+        "flat_query_ms": {"p50": _percentile(flat_latencies, 50), "p99": _percentile(flat_latencies, 99)},
+        "ivf_query_ms": {"p50": _percentile(ivf_latencies, 50), "p99": _percentile(ivf_latencies, 99)},
+        "ivf_recall_at_k": round(float(recall), 4),
+        "pair_lookup_ms": {"p50": _percentile(pair_latencies, 50), "p99": _percentile(pair_latencies, 99)},
+    }
+
+
+@click.command()
+@click.option("--opportunities", type=int, default=100000, help="Vectors in the index")
+@click.option("--queries", type=int, default=200, help="Organization queries to time")
+@click.option("--batch-size", type=int, default=1000, help="Vectors per appended segment")
+@click.option("--k", type=int, default=50, help="Neighbours per query")
+@click.option("--probes", type=int, default=8, help="IVF lists scanned per query")
+@click.option("--rows-per-list", type=int, default=1000, help="Target rows per IVF list")
+@click.option("--backend", type=click.Choice(["hashing", "sentence-transformers"]), default="hashing")
+@click.option("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="Local model for sentence-transformers")
+@click.option("--dimension", type=int, default=384, help="Hashing embedder dimension")
+@click.option("--seed", type=int, default=7, help="Synthetic data seed")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(opportunities, queries, batch_size, k, probes, rows_per_list, backend, model, dimension, seed, output):
+    """Measure embedding index build and query latency."""
+    result = _run(opportunities, queries, batch_size, k, probes, rows_per_list, backend, model, dimension, seed)
+    
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"embedding_index_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+    
+    click.echo(f"embedding:        {result['embed_texts_per_second']} texts/s")
+    click.echo(f"append:           {result['append_seconds']} s")
+    click.echo(f"compact:          {result['compact_seconds']} s")
+    click.echo(f"flat query:       p50 {result['flat_query_ms']['p50']} ms, p99 {result['flat_query_ms']['p99']} ms")
+    click.echo(f"ivf query:        p50 {result['ivf_query_ms']['p50']} ms, p99 {result['ivf_query_ms']['p99']} ms")
+    click.echo(f"ivf recall@{k}:    {result['ivf_recall_at_k']}")
+    click.echo(f"pair lookup:      p50 {result['pair_lookup_ms']['p50']} ms, p99 {result['pair_lookup_ms']['p99']} ms")
+    click.echo(f"written to        {output}")
+
+
+if __name__ == "__main__":
+    main()
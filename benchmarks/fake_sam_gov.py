@@ -0,0 +1,484 @@
+"""
+Fake SAM.gov Opportunities API
+
+Local stand-in for ``/opportunities/v2/search`` (and the noticedesc
+endpoint its description links point to) used by the ingestion
+benchmarks. Serves either deterministic synthetic notices or pages
+recorded from the real API, honors ``limit``/``offset``/``totalRecords``
+and the ``postedFrom``/``postedTo``/``ncode``/``noticeid`` filters, and can inject
+latency and 429 responses.
+
+Usage:
+    # Serve 100k synthetic notices with 50 ms latency and 2% throttling
+    python benchmarks/fake_sam_gov.py serve --records 100000 --latency-ms 50 --rate-429 0.02
+
+    # Record real pages for later replay (needs SAM_GOV_API_KEY)
+    python benchmarks/fake_sam_gov.py record --out benchmarks/recordings/sam --pages 5
+
+    # Replay recorded pages
+    python benchmarks/fake_sam_gov.py serve --recorded benchmarks/recordings/sam
+
+    # Write 1M synthetic notices in the Contract Opportunities CSV extract format
+    python benchmarks/fake_sam_gov.py csv --records 1000000 --out /tmp/opportunities.csv
+
+Point the ingester at it with ``SAM_GOV_BASE_URL=http://127.0.0.1:8081/opportunities/v2``
+or ``SAMGovIngester(base_url=...)``. In-process callers can skip sockets
+entirely with ``httpx.ASGITransport(app=create_app(...))``.
+"""
+import asyncio
+import csv
+import json
+import os
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import click
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+NAICS_POOL = [
+    ("541511", "Custom Computer Programming Services"),
+    ("541512", "Computer Systems Design Services"),
+    ("541519", "Other Computer Related Services"),
+    ("541330", "Engineering Services"),
+    ("541611", "Administrative Management and General Management Consulting Services"),
+    ("541715", "Research and Development in the Physical, Engineering, and Life Sciences"),
+    ("236220", "Commercial and Institutional Building Construction"),
+    ("562910", "Remediation Services"),
+    ("334111", "Electronic Computer Manufacturing"),
+    ("611430", "Professional and Management Development Training"),
+]
+
+NOTICE_TYPES = ["o", "k", "p", "r", "s"]
+
+SET_ASIDES = [
+    (None, None),
+    ("SBA", "Total Small Business Set-Aside (FAR 19.5)"),
+    ("8A", "8(a) Set-Aside (FAR 19.8)"),
+    ("WOSB", "Women-Owned Small Business (WOSB) Program Set-Aside (FAR 19.15)"),
+    ("SDVOSBC", "Service-Disabled Veteran-Owned Small Business (SDVOSB) Set-Aside (FAR 19.14)"),
+    ("HZC", "Historically Underutilized Business (HUBZone) Set-Aside (FAR 19.13)"),
+]
+
+PLACES = [
+    ("Washington", "DC"), ("Arlington", "VA"), ("Denver", "CO"),
+    ("San Diego", "CA"), ("Huntsville", "AL"), ("Dayton", "OH"),
+    ("Norfolk", "VA"), ("Colorado Springs", "CO"), ("Austin", "TX"),
+]
+
+OFFICES = [
+    "Department of the Army", "Defense Information Systems Agency",
+    "General Services Administration", "Department of Veterans Affairs",
+    "Environmental Protection Agency", "Department of Energy",
+]
+
+TITLE_WORDS = [
+    "Cloud", "Migration", "Cybersecurity", "Assessment", "Modernization",
+    "Support", "Services", "Engineering", "Data", "Analytics", "Network",
+    "Operations", "Maintenance", "Training", "Logistics", "Software",
+]
+
+
+@dataclass
+class FakeSAMConfig:
+    """Behaviour of the fake server."""
+    records: int = 10000
+    start_date: date = date(2024, 1, 1)
+    days: int = 365
+    seed: int = 7
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    rate_429: float = 0.0
+    retry_after_seconds: float = 1.0
+    recorded_dir: Optional[str] = None
+
+
+class SyntheticNotices:
+    """
+    Deterministic notices, evenly spread over a posted-date range.
+    
+    Notice ``i`` is generated on demand, so large datasets cost no memory;
+    the posted-date window maps directly to a contiguous index range.
+    """
+    
+    def __init__(self, config: FakeSAMConfig):
+        self.config = config
+    
+    def posted_date(self, index: int) -> date:
+        return self.config.start_date + timedelta(
+            days=index * self.config.days // max(self.config.records, 1)
+        )
+    
+    def select(self, posted_from: Optional[date], posted_to: Optional[date], ncodes: Optional[set]) -> Sequence[int]:
+        """Indices matching the query, in posted-date order."""
+        total = self.config.records
+        days = self.config.days
+        lo, hi = 0, total
+        if posted_from:
+            offset_days = (posted_from - self.config.start_date).days
+            lo = min(total, max(0, -(-offset_days * total // days)))
+        if posted_to:
+            offset_days = (posted_to - self.config.start_date).days + 1
+            hi = min(total, max(0, -(-offset_days * total // days)))
+        indices: Sequence[int] = range(lo, max(lo, hi))
+        if ncodes:
+            indices = [i for i in indices if NAICS_POOL[i % len(NAICS_POOL)][0] in ncodes]
+        return indices
+    
+    def find(self, notice_id: str) -> Sequence[int]:
+        """Index of a single notice, as a one-element (or empty) selection."""
+        index = self._index(notice_id)
+        return [] if index is None else [index]
+    
+    def _index(self, notice_id: str) -> Optional[int]:
+        prefix = f"FAKE{self.config.seed:02d}"
+        if not notice_id.startswith(prefix) or not notice_id[len(prefix):].isdigit():
+            return None
+        index = int(notice_id[len(prefix):])
+        return index if index < self.config.records else None
+    
+    def notice(self, index: int, base_url: str = "https://api.sam.gov") -> Dict[str, Any]:
+        rng = random.Random(self.config.seed * 1_000_003 + index)
+        naics, naics_description = NAICS_POOL[index % len(NAICS_POOL)]
+        set_aside, set_aside_description = rng.choice(SET_ASIDES)
+        city, state = rng.choice(PLACES)
+        posted = self.posted_date(index)
+        title = " ".join(rng.sample(TITLE_WORDS, 4))
+        notice_id = f"FAKE{self.config.seed:02d}{index:09d}"
+        
+        return {
+            "noticeId": notice_id,
+            "title": title,
+            "solicitationNumber": f"SOL-{posted.year}-{index:06d}",
+            "fullParentPathName": f"DEPT OF EXAMPLE.{rng.choice(OFFICES).upper()}",
+            "postedDate": posted.isoformat(),
+            "type": rng.choice(NOTICE_TYPES),
+            "baseType": "Solicitation",
+            "archiveType": "autocustom",
+            "archiveDate": (posted + timedelta(days=90)).isoformat(),
+            "typeOfSetAsideDescription": set_aside_description,
+            "typeOfSetAside": set_aside,
+            "responseDeadLine": (posted + timedelta(days=rng.randint(10, 60))).isoformat() + "T17:00:00-04:00",
+            "naicsCode": naics,
+            "naicsDescription": naics_description,
+            "classificationCode": "D302",
+            "active": "Yes",
+            "description": f"{base_url}/prod/opportunities/v1/noticedesc?noticeid={notice_id}",
+            "organizationType": "OFFICE",
+            "office": {"name": rng.choice(OFFICES)},
+            "placeOfPerformance": {
+                "city": {"name": city},
+                "state": {"code": state},
+                "country": {"code": "USA"},
+            },
+            "pointOfContact": [
+                {
+                    "type": "primary",
+                    "fullName": "Contracting Officer",
+                    "email": f"co{index % 997}@example.gov",
+                    "phone": "202-555-0100",
+                }
+            ],
+            "uiLink": f"https://sam.gov/opp/{notice_id}/view",
+        }
+    
+    def page(self, indices: Sequence[int], offset: int, limit: int, base_url: str) -> List[Dict[str, Any]]:
+        return [self.notice(i, base_url) for i in indices[offset:offset + limit]]
+    
+    def description(self, notice_id: str) -> Optional[str]:
+        """HTML description body for a synthetic notice."""
+        index = self._index(notice_id)
+        if index is None:
+            return None
+        rng = random.Random(self.config.seed * 7_919 + index)
+        naics, naics_description = NAICS_POOL[index % len(NAICS_POOL)]
+        paragraphs = [
+            f"The Government has a requirement for {naics_description.lower()} "
+            f"(NAICS {naics}) in support of {rng.choice(OFFICES)}.",
+            "The contractor shall provide " + ", ".join(
+                word.lower() for word in rng.sample(TITLE_WORDS, 6)
+            ) + " services as described in the attached Performance Work Statement.",
+            "Offerors must be registered in SAM at the time of submission. "
+            "Questions are due no later than ten days before the response date.",
+        ]
+        return "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+
+
+class RecordedNotices:
+    """Notices replayed from JSON pages captured from the real API."""
+    
+    def __init__(self, directory: str):
+        items = []
+        for path in sorted(Path(directory).glob("*.json")):
+            with open(path) as f:
+                payload = json.load(f)
+            items.extend(payload.get("opportunitiesData", []) if isinstance(payload, dict) else payload)
+        items.sort(key=lambda item: item.get("postedDate") or "")
+        self.items = items
+    
+    def select(self, posted_from: Optional[date], posted_to: Optional[date], ncodes: Optional[set]) -> Sequence[int]:
+        matched = []
+        for index, item in enumerate(self.items):
+            posted = _parse_posted(item.get("postedDate"))
+            if posted_from and posted and posted < posted_from:
+                continue
+            if posted_to and posted and posted > posted_to:
+                continue
+            if ncodes and item.get("naicsCode") not in ncodes:
+                continue
+            matched.append(index)
+        return matched
+    
+    def find(self, notice_id: str) -> Sequence[int]:
+        return [index for index, item in enumerate(self.items) if item.get("noticeId") == notice_id]
+    
+    def page(self, indices: Sequence[int], offset: int, limit: int, base_url: str) -> List[Dict[str, Any]]:
+        items = []
+        for i in indices[offset:offset + limit]:
+            item = self.items[i]
+            description = item.get("description") or ""
+            if description.startswith("https://api.sam.gov"):
+                # Keep description fetches on the fake server
+                item = {**item, "description": base_url + description[len("https://api.sam.gov"):]}
+            items.append(item)
+        return items
+    
+    def description(self, notice_id: str) -> Optional[str]:
+        """Recordings hold no description bodies; serve a placeholder."""
+        if not any(item.get("noticeId") == notice_id for item in self.items):
+            return None
+        return f"<p>Recorded notice {notice_id}. Description body was not recorded.</p>"
+
+
+def _parse_posted(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def _parse_query_date(value: Optional[str]) -> Optional[date]:
+    """Parse the API's MM/DD/YYYY query dates."""
+    if not value:
+        return None
+    return datetime.strptime(value, "%m/%d/%Y").date()
+
+
+def create_app(config: Optional[FakeSAMConfig] = None) -> FastAPI:
+    """Build the fake API application."""
+    config = config or FakeSAMConfig()
+    source = RecordedNotices(config.recorded_dir) if config.recorded_dir else SyntheticNotices(config)
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake SAM.gov Opportunities API")
+    app.state.config = config
+    app.state.requests = 0
+    app.state.throttled = 0
+    app.state.description_requests = 0
+    
+    @app.get("/opportunities/v2/search")
+    async def search(request: Request):
+        app.state.requests += 1
+        query = request.query_params
+        
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+            await asyncio.sleep(delay / 1000)
+        
+        if config.rate_429 and rng.random() < config.rate_429:
+            app.state.throttled += 1
+            return JSONResponse(
+                {"error": {"code": "OVER_RATE_LIMIT", "message": "API rate limit exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        
+        try:
+            limit = min(int(query.get("limit", 10)), 1000)
+            offset = max(int(query.get("offset", 0)), 0)
+            posted_from = _parse_query_date(query.get("postedFrom"))
+            posted_to = _parse_query_date(query.get("postedTo"))
+        except ValueError as e:
+            return JSONResponse({"error": {"message": str(e)}}, status_code=400)
+        
+        if query.get("noticeid"):
+            indices = source.find(query["noticeid"])
+        else:
+            ncodes = set(query["ncode"].split(",")) if query.get("ncode") else None
+            indices = source.select(posted_from, posted_to, ncodes)
+        
+        return JSONResponse({
+            "totalRecords": len(indices),
+            "limit": limit,
+            "offset": offset,
+            "opportunitiesData": source.page(indices, offset, limit, str(request.base_url).rstrip("/")),
+            "links": [],
+        })
+    
+    @app.get("/prod/opportunities/v1/noticedesc")
+    async def notice_description(request: Request):
+        app.state.description_requests += 1
+        
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+            await asyncio.sleep(delay / 1000)
+        
+        if config.rate_429 and rng.random() < config.rate_429:
+            app.state.throttled += 1
+            return JSONResponse(
+                {"error": {"code": "OVER_RATE_LIMIT", "message": "API rate limit exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        
+        description = source.description(request.query_params.get("noticeid", ""))
+        if description is None:
+            return JSONResponse({"error": {"message": "Notice not found"}}, status_code=404)
+        return JSONResponse({"description": description})
+    
+    return app
+
+
+@click.group()
+def cli():
+    """Fake SAM.gov API for offline ingestion benchmarks."""
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1")
+@click.option("--port", type=int, default=8081)
+@click.option("--records", type=int, default=10000, help="Synthetic notices to serve")
+@click.option("--start-date", type=click.DateTime(["%Y-%m-%d"]), default="2024-01-01", help="First synthetic posted date")
+@click.option("--days", type=int, default=365, help="Days the synthetic notices are spread over")
+@click.option("--latency-ms", type=float, default=0.0, help="Added latency per request")
+@click.option("--latency-jitter-ms", type=float, default=0.0, help="Random extra latency per request")
+@click.option("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+@click.option("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+@click.option("--recorded", type=click.Path(exists=True, file_okay=False), default=None, help="Replay recorded pages")
+def serve(host, port, records, start_date, days, latency_ms, latency_jitter_ms, rate_429, retry_after, recorded):
+    """Serve the fake API over HTTP."""
+    import uvicorn
+    
+    config = FakeSAMConfig(
+        records=records,
+        start_date=start_date.date(),
+        days=days,
+        latency_ms=latency_ms,
+        latency_jitter_ms=latency_jitter_ms,
+        rate_429=rate_429,
+        retry_after_seconds=retry_after,
+        recorded_dir=recorded,
+    )
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning")
+
+
+@cli.command()
+@click.option("--out", type=click.Path(file_okay=False), required=True, help="Directory for recorded pages")
+@click.option("--pages", type=int, default=5, help="Pages to record")
+@click.option("--limit", type=int, default=1000, help="Page size")
+@click.option("--posted-from", default=None, help="MM/DD/YYYY, defaults to 30 days ago")
+@click.option("--posted-to", default=None, help="MM/DD/YYYY, defaults to today")
+def record(out, pages, limit, posted_from, posted_to):
+    """Record pages from the real API for replay."""
+    import httpx
+    
+    api_key = os.environ.get("SAM_GOV_API_KEY")
+    if not api_key:
+        raise click.ClickException("SAM_GOV_API_KEY is required to record responses")
+    
+    today = date.today()
+    params = {
+        "api_key": api_key,
+        "postedFrom": posted_from or (today - timedelta(days=30)).strftime("%m/%d/%Y"),
+        "postedTo": posted_to or today.strftime("%m/%d/%Y"),
+        "limit": limit,
+    }
+    Path(out).mkdir(parents=True, exist_ok=True)
+    
+    with httpx.Client(timeout=60) as client:
+        for page in range(pages):
+            params["offset"] = page * limit
+            response = client.get("https://api.sam.gov/opportunities/v2/search", params=params)
+            response.raise_for_status()
+            payload = response.json()
+            path = Path(out) / f"page_{page:04d}.json"
+            path.write_text(json.dumps(payload))
+            click.echo(f"{path}: {len(payload.get('opportunitiesData', []))} notices")
+            if params["offset"] + limit >= payload.get("totalRecords", 0):
+                break
+
+
+# Column headers of the public Contract Opportunities CSV extract
+CSV_EXTRACT_COLUMNS = [
+    "NoticeId", "Title", "Sol#", "Department/Ind.Agency", "CGAC", "Sub-Tier",
+    "FPDS Code", "Office", "AAC Code", "PostedDate", "Type", "BaseType",
+    "ArchiveType", "ArchiveDate", "SetASideCode", "SetASide", "ResponseDeadLine",
+    "NaicsCode", "ClassificationCode", "PopStreetAddress", "PopCity", "PopState",
+    "PopZip", "PopCountry", "Active", "AwardNumber", "AwardDate", "Award$",
+    "Awardee", "PrimaryContactTitle", "PrimaryContactFullname",
+    "PrimaryContactEmail", "PrimaryContactPhone", "PrimaryContactFax",
+    "SecondaryContactTitle", "SecondaryContactFullname", "SecondaryContactEmail",
+    "SecondaryContactPhone", "SecondaryContactFax", "OrganizationType", "State",
+    "City", "ZipCode", "CountryCode", "AdditionalInfoLink", "Link", "Description",
+]
+
+
+def csv_extract_row(source: SyntheticNotices, index: int) -> List[Optional[str]]:
+    """One synthetic notice as a CSV extract row."""
+    notice = source.notice(index)
+    pop = notice["placeOfPerformance"]
+    contact = notice["pointOfContact"][0]
+    department, _, sub_tier = notice["fullParentPathName"].partition(".")
+    values = {
+        "NoticeId": notice["noticeId"],
+        "Title": notice["title"],
+        "Sol#": notice["solicitationNumber"],
+        "Department/Ind.Agency": department,
+        "Sub-Tier": sub_tier,
+        "Office": notice["office"]["name"],
+        "PostedDate": notice["postedDate"] + " 09:30:00.000-04",
+        "Type": notice["type"],
+        "BaseType": notice["baseType"],
+        "ArchiveType": notice["archiveType"],
+        "ArchiveDate": notice["archiveDate"],
+        "SetASideCode": notice["typeOfSetAside"],
+        "SetASide": notice["typeOfSetAsideDescription"],
+        "ResponseDeadLine": notice["responseDeadLine"],
+        "NaicsCode": notice["naicsCode"],
+        "ClassificationCode": notice["classificationCode"],
+        "PopCity": pop["city"]["name"],
+        "PopState": pop["state"]["code"],
+        "PopCountry": pop["country"]["code"],
+        "Active": notice["active"],
+        "PrimaryContactFullname": contact["fullName"],
+        "PrimaryContactEmail": contact["email"],
+        "PrimaryContactPhone": contact["phone"],
+        "OrganizationType": notice["organizationType"],
+        "Link": notice["uiLink"],
+        "Description": source.description(notice["noticeId"]),
+    }
+    return [values.get(column) for column in CSV_EXTRACT_COLUMNS]
+
+
+@cli.command("csv")
+@click.option("--out", type=click.Path(dir_okay=False), required=True, help="CSV file to write")
+@click.option("--records", type=int, default=100000, help="Synthetic notices to write")
+@click.option("--start-date", type=click.DateTime(["%Y-%m-%d"]), default="2024-01-01", help="First synthetic posted date")
+@click.option("--days", type=int, default=365, help="Days the synthetic notices are spread over")
+def write_csv(out, records, start_date, days):
+    """Write synthetic notices in the CSV extract format."""
+    source = SyntheticNotices(FakeSAMConfig(records=records, start_date=start_date.date(), days=days))
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_EXTRACT_COLUMNS)
+        for index in range(records):
+            writer.writerow(csv_extract_row(source, index))
+    click.echo(f"{out}: {records} notices")
+
+
+if __name__ == "__main__":
+    cli()
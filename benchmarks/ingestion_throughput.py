@@ -0,0 +1,204 @@
+"""
+Ingestion Throughput Benchmark
+
+Runs ``SAMGovIngester`` against the fake SAM.gov server (no network) and
+reports records/sec, page latency percentiles, retries, peak RSS and
+per-stage pipeline metrics.
+
+Usage:
+    # Fetch only, fake server in a subprocess over loopback HTTP
+    python benchmarks/ingestion_throughput.py --records 100000 --latency-ms 50
+
+    # Include parsing and the bulk upsert (needs DATABASE_URL)
+    python benchmarks/ingestion_throughput.py --records 50000 --store
+
+    # Decode each page in one piece instead of incrementally
+    python benchmarks/ingestion_throughput.py --buffered-json
+
+    # In-process ASGI transport, 2% throttled requests
+    python benchmarks/ingestion_throughput.py --transport asgi --rate-429 0.02
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import click
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_sam_gov import FakeSAMConfig, create_app  # noqa: E402
+
+START_DATE = date(2024, 1, 1)
+DAYS = 365
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, records: int, latency_ms: float, jitter_ms: float, rate_429: float) -> subprocess.Popen:
+    """Start the fake server in a subprocess and wait until it accepts connections."""
+    process = subprocess.Popen([
+        sys.executable, str(BENCH_DIR / "fake_sam_gov.py"), "serve",
+        "--port", str(port),
+        "--records", str(records),
+        "--start-date", START_DATE.isoformat(),
+        "--days", str(DAYS),
+        "--latency-ms", str(latency_ms),
+        "--latency-jitter-ms", str(jitter_ms),
+        "--rate-429", str(rate_429),
+        "--retry-after", "0.2",
+    ])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise click.ClickException("Fake SAM.gov server did not start")
+
+
+async def _run(records, concurrency, transport, latency_ms, jitter_ms, rate_429, store, rps, stream_json):
+    # Settings are read once at import time
+    os.environ["SAM_GOV_REQUESTS_PER_SECOND"] = str(rps)
+    from src.ingestion.sam_gov import SAMGovIngester, create_sam_gov_client
+
+    process = None
+    if transport == "asgi":
+        app = create_app(FakeSAMConfig(
+            records=records,
+            start_date=START_DATE,
+            days=DAYS,
+            latency_ms=latency_ms,
+            latency_jitter_ms=jitter_ms,
+            rate_429=rate_429,
+            retry_after_seconds=0.2,
+        ))
+        client = create_sam_gov_client(transport=httpx.ASGITransport(app=app))
+        base_url = "http://fake-sam.local/opportunities/v2/search"
+    else:
+        port = _free_port()
+        process = _start_server(port, records, latency_ms, jitter_ms, rate_429)
+        client = create_sam_gov_client()
+        base_url = f"http://127.0.0.1:{port}/opportunities/v2/search"
+
+    session = None
+    if store:
+        from src.database.connection import async_session_factory, init_db
+        await init_db()
+        session = async_session_factory()
+
+    ingester = SAMGovIngester(
+        api_key="benchmark",
+        db_session=session,
+        max_concurrency=concurrency,
+        client=client,
+        base_url=base_url,
+        stream_json=stream_json,
+    )
+
+    try:
+        started = time.perf_counter()
+        stats = await ingester.ingest(
+            posted_from=START_DATE.strftime("%m/%d/%Y"),
+            posted_to=(START_DATE + timedelta(days=DAYS)).strftime("%m/%d/%Y"),
+            limit=None,
+            paginate=True,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.aclose()
+        if session:
+            await session.close()
+        if process:
+            process.terminate()
+            process.wait()
+
+    metrics = client.metrics.summary()
+    return {
+        "benchmark": "ingestion_throughput",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "records": records,
+            "concurrency": concurrency,
+            "transport": transport,
+            "latency_ms": latency_ms,
+            "latency_jitter_ms": jitter_ms,
+            "rate_429": rate_429,
+            "store": store,
+            "requests_per_second": rps,
+            "stream_json": stream_json,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(stats["fetched"] / elapsed, 1) if elapsed else None,
+        "page_latency_p50_ms": metrics["p50_ms"],
+        "page_latency_p99_ms": metrics["p99_ms"],
+        "requests": metrics["requests"],
+        "retries": metrics["retries"],
+        "throttled_seconds": metrics["throttled_seconds"],
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_page_text_kb": round(stats["peak_page_text_bytes"] / 1024, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stats": stats,
+        "stages": ingester.last_pipeline_metrics,
+    }
+
+
+@click.command()
+@click.option("--records", type=int, default=50000, help="Synthetic notices served by the fake API")
+@click.option("--concurrency", type=int, default=4, help="Page requests in flight")
+@click.option("--transport", type=click.Choice(["http", "asgi"]), default="http", help="Loopback HTTP or in-process ASGI")
+@click.option("--latency-ms", type=float, default=20.0, help="Fake server latency per page")
+@click.option("--latency-jitter-ms", "jitter_ms", type=float, default=10.0, help="Random extra latency per page")
+@click.option("--rate-429", type=float, default=0.0, help="Fraction of requests throttled")
+@click.option("--store/--no-store", default=False, help="Parse and upsert into DATABASE_URL")
+@click.option("--rps", type=float, default=1000.0, help="Client-side rate limit")
+@click.option("--stream-json/--buffered-json", default=True, help="Incremental or whole-body JSON decoding")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(records, concurrency, transport, latency_ms, jitter_ms, rate_429, store, rps, stream_json, output):
+    """Measure SAM.gov ingestion throughput against the fake API."""
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    result = asyncio.run(_run(
+        records, concurrency, transport, latency_ms, jitter_ms, rate_429, store, rps, stream_json
+    ))
+
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"ingestion_throughput_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+
+    click.echo(f"records/sec:      {result['records_per_second']}")
+    click.echo(f"page p50 / p99:   {result['page_latency_p50_ms']} ms / {result['page_latency_p99_ms']} ms")
+    click.echo(f"requests/retries: {result['requests']} / {result['retries']}")
+    click.echo(f"peak page text:   {result['peak_page_text_kb']} KB")
+    click.echo(f"peak RSS:         {result['peak_rss_mb']} MB")
+    for name, stage in result["stages"].items():
+        click.echo(
+            f"  {name:<10} {stage['items_per_second']} rec/s, "
+            f"p50 {stage['p50_ms']} ms, p99 {stage['p99_ms']} ms, "
+            f"utilization {stage['utilization']}"
+        )
+    click.echo(f"written to        {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Opportunity List Latency Benchmark
+
+Times the ``list_opportunities`` endpoint against DATABASE_URL and reports
+p50/p99 latency per page along with the on-disk size of the opportunities
+heap and the raw payload table.
+
+Two variants are measured on the same data:
+
+- ``split``: the endpoint as shipped; raw_data stays in aureon.opportunity_raw
+- ``inline``: the same page query with each row's raw payload joined back in,
+  which is what the list read when raw_data lived on aureon.opportunities
+
+Usage:
+    # Before/after on a real database: run once before applying
+    # migrations/003_opportunity_raw_table.sql and once after
+    python benchmarks/opportunity_list_latency.py --iterations 200
+
+    # Larger pages, filtered by NAICS
+    python benchmarks/opportunity_list_latency.py --page-size 100 --naics-code 541512
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import click
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+async def _table_sizes(session):
+    from sqlalchemy import text
+    
+    result = await session.execute(text("""
+        SELECT relname,
+               pg_relation_size(c.oid) AS heap_bytes,
+               pg_total_relation_size(c.oid) AS total_bytes
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'aureon' AND relname IN ('opportunities', 'opportunity_raw')
+    """))
+    sizes = {
+        row.relname: {
+            "heap_mb": round(row.heap_bytes / 1024 / 1024, 1),
+            "total_mb": round(row.total_bytes / 1024 / 1024, 1),
+        }
+        for row in result
+    }
+    column = await session.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'aureon' AND table_name = 'opportunities' AND column_name = 'raw_data'
+    """))
+    sizes["raw_data_on_opportunities"] = column.scalar() is not None
+    return sizes
+
+
+async def _time_split(session, iterations, page_size, naics_code):
+    from src.api.opportunities import list_opportunities
+    
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await list_opportunities(
+            naics_code=naics_code,
+            page=1 + i % 5,
+            page_size=page_size,
+            db=session,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+        session.expunge_all()
+    return samples
+
+
+async def _time_inline(session, iterations, page_size, naics_code):
+    from sqlalchemy import select
+    from src.api.schemas import OpportunityResponse
+    from src.database.models import Opportunity, OpportunityRaw
+    
+    samples = []
+    for i in range(iterations):
+        stmt = (
+            select(Opportunity, OpportunityRaw.raw_data)
+            .outerjoin(OpportunityRaw, OpportunityRaw.opportunity_id == Opportunity.id)
+            .where(Opportunity.status == "active")
+        )
+        if naics_code:
+            stmt = stmt.where(Opportunity.naics_code == naics_code)
+        stmt = stmt.order_by(Opportunity.posted_date.desc()).offset(i % 5 * page_size).limit(page_size)
+        
+        started = time.perf_counter()
+        result = await session.execute(stmt)
+        [OpportunityResponse.model_validate(opp) for opp, _ in result.all()]
+        samples.append((time.perf_counter() - started) * 1000)
+        session.expunge_all()
+    return samples
+
+
+async def _run(iterations, page_size, naics_code, warmup):
+    from src.database.connection import async_session_factory
+    
+    async with async_session_factory() as session:
+        sizes = await _table_sizes(session)
+        variants = {"split": _time_split}
+        # Not created until migration 003 has been applied
+        if "opportunity_raw" in sizes:
+            variants["inline"] = _time_inline
+        latencies = {}
+        for name, timer in variants.items():
+            await timer(session, warmup, page_size, naics_code)
+            samples = await timer(session, iterations, page_size, naics_code)
+            latencies[name] = {
+                "p50_ms": _percentile(samples, 50),
+                "p99_ms": _percentile(samples, 99),
+                "mean_ms": round(statistics.fmean(samples), 2),
+            }
+    
+    return {
+        "benchmark": "opportunity_list_latency",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "iterations": iterations,
+            "page_size": page_size,
+            "naics_code": naics_code,
+            "warmup": warmup,
+        },
+        "tables": sizes,
+        "latency": latencies,
+    }
+
+
+@click.command()
+@click.option("--iterations", type=int, default=200, help="Timed requests per variant")
+@click.option("--page-size", type=int, default=20, help="Rows per page")
+@click.option("--naics-code", default=None, help="Filter pages by NAICS code")
+@click.option("--warmup", type=int, default=20, help="Untimed requests per variant")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(iterations, page_size, naics_code, warmup, output):
+    """Measure opportunity list latency with and without the raw payload."""
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    
+    result = asyncio.run(_run(iterations, page_size, naics_code, warmup))
+    
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"opportunity_list_latency_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+    
+    tables = result["tables"]
+    click.echo(f"raw_data inline:  {tables['raw_data_on_opportunities']}")
+    for name in ("opportunities", "opportunity_raw"):
+        if name in tables:
+            click.echo(f"{name + ':':<17} heap {tables[name]['heap_mb']} MB, total {tables[name]['total_mb']} MB")
+    for name, stats in result["latency"].items():
+        click.echo(f"  {name:<8} p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms, mean {stats['mean_ms']} ms")
+    click.echo(f"written to        {output}")
+
+
+if __name__ == "__main__":
+    main()
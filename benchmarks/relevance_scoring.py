@@ -0,0 +1,203 @@
+"""
+Relevance Scoring Benchmark
+
+Scores synthetic organizations against synthetic opportunities with the
+scalar ``RelevanceScorer.calculate_score`` path and the vectorized
+``RelevanceScorer.score_matrix`` path. Checks that a sample of pairs
+produces identical results and reports the time of each path.
+
+No database is needed; models are built in memory.
+
+Usage:
+    # One organization against 100k opportunities
+    python benchmarks/relevance_scoring.py --opportunities 100000
+
+    # 20 organizations, compare every pair against the scalar path
+    python benchmarks/relevance_scoring.py --organizations 20 --opportunities 2000 --verify-all
+
+    # BM25 semantic scoring against an in-memory term index
+    python benchmarks/relevance_scoring.py --term-index
+
+    # Semantic scoring with the local hashing embedder
+    python benchmarks/relevance_scoring.py --embeddings
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import click
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+
+NAICS = ["541511", "541512", "541519", "541330", "541611", "541690", "518210", "236220", "561210", "54151"]
+STATES = ["VA", "MD", "DC", "CA", "TX", "FL", "NY", "CO", "WA", "OR", "NV", "GA", None]
+SET_ASIDES = ["SB", "8A", "WOSB", "SDVOSB", "HUBZone", "HUBZONE", "VOSB", None, None, None]
+CONTRACT_TYPES = ["Firm-Fixed", "Time", "Cost-Plus", "IDIQ", "Other", None]
+WORDS = (
+    "cloud migration cybersecurity network engineering software development data analytics "
+    "logistics training facilities maintenance construction program management support "
+    "modernization infrastructure research systems integration health medical records "
+    "acquisition planning geospatial intelligence satellite communications testing"
+).split()
+OFFICES = ["Department of the Army", "Naval Sea Systems", "General Services Administration", "Veterans Affairs", None]
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _organizations(count, rng):
+    from src.database.models import Organization
+    
+    return [
+        Organization(
+            name=f"Org {i}",
+            naics_codes=rng.sample(NAICS, rng.randint(0, 3)),
+            set_aside_types=rng.sample([s for s in SET_ASIDES if s], rng.randint(0, 2)),
+            state=rng.choice(STATES),
+            annual_revenue=Decimal(rng.choice([0, 500_000, 5_000_000, 50_000_000])),
+            capabilities_narrative=_text(rng, 60),
+            past_performance_summary=rng.choice([None, _text(rng, 40) + " ffp idiq army"]),
+        )
+        for i in range(count)
+    ]
+
+
+def _opportunities(count, rng):
+    from src.database.models import Opportunity
+    
+    return [
+        Opportunity(
+            source_id=f"bench-{j}",
+            source_system="benchmark",
+            title=_text(rng, 8),
+            description=rng.choice([None, _text(rng, 120)]),
+            naics_code=rng.choice(NAICS + [None, " 5415"]),
+            naics_description=rng.choice([None, _text(rng, 4)]),
+            place_of_performance_state=rng.choice(STATES),
+            set_aside_type=rng.choice(SET_ASIDES),
+            estimated_value_max=rng.choice([None, Decimal(0), Decimal(rng.randint(10_000, 80_000_000))]),
+            contracting_office_name=rng.choice(OFFICES),
+            contract_type=rng.choice(CONTRACT_TYPES),
+        )
+        for j in range(count)
+    ]
+
+
+def _term_index(opportunities):
+    """Build index statistics in memory, as index_opportunities would in SQL."""
+    from collections import Counter
+    from src.services.term_index import TermIndex, opportunity_text, term_frequencies
+    
+    doc_freq = Counter()
+    doc_count = total_length = 0
+    for opportunity in opportunities:
+        frequencies, doc_length = term_frequencies(opportunity_text(opportunity))
+        if frequencies:
+            doc_freq.update(frequencies.keys())
+            doc_count += 1
+            total_length += doc_length
+    return TermIndex(doc_count, total_length, dict(doc_freq))
+
+
+async def _run(organization_count, opportunity_count, scalar_sample, verify_all, seed, term_index, embeddings):
+    from src.services.embeddings import EmbeddingEngine, HashingEmbedder
+    from src.services.relevance_matrix import OpportunityFeatures
+    from src.services.relevance_scorer import RelevanceScorer
+    
+    rng = random.Random(seed)
+    organizations = _organizations(organization_count, rng)
+    opportunities = _opportunities(opportunity_count, rng)
+    scorer = RelevanceScorer(
+        term_index=_term_index(opportunities) if term_index else None,
+        # Unsaved models have no IDs, so nothing is written to the index
+        embeddings=EmbeddingEngine(HashingEmbedder(), Path(tempfile.mkdtemp())) if embeddings else None,
+    )
+    
+    started = time.perf_counter()
+    features = OpportunityFeatures.build(scorer, opportunities)
+    build_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    matrix = scorer.score_matrix(organizations, features)
+    matrix_seconds = time.perf_counter() - started
+    
+    if verify_all:
+        pairs = [(i, j) for i in range(organization_count) for j in range(opportunity_count)]
+    else:
+        pairs = [
+            (rng.randrange(organization_count), rng.randrange(opportunity_count))
+            for _ in range(scalar_sample)
+        ]
+    
+    mismatches = 0
+    started = time.perf_counter()
+    for i, j in pairs:
+        expected = await scorer.calculate_score(organizations[i], opportunities[j])
+        if matrix.result(i, j) != expected:
+            mismatches += 1
+    scalar_seconds = time.perf_counter() - started
+    scalar_pairs_per_second = len(pairs) / scalar_seconds if scalar_seconds else None
+    total_pairs = organization_count * opportunity_count
+    
+    return {
+        "benchmark": "relevance_scoring",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "organizations": organization_count,
+            "opportunities": opportunity_count,
+            "verified_pairs": len(pairs),
+            "seed": seed,
+            "term_index": term_index,
+            "embeddings": embeddings,
+        },
+        "feature_build_seconds": round(build_seconds, 3),
+        "matrix_seconds": round(matrix_seconds, 4),
+        "matrix_pairs_per_second": round(total_pairs / matrix_seconds) if matrix_seconds else None,
+        "scalar_pairs_per_second": round(scalar_pairs_per_second) if scalar_pairs_per_second else None,
+        "scalar_seconds_estimated": round(total_pairs / scalar_pairs_per_second, 2) if scalar_pairs_per_second else None,
+        "mismatches": mismatches,
+    }
+
+
+@click.command()
+@click.option("--organizations", type=int, default=1, help="Organizations (matrix rows)")
+@click.option("--opportunities", type=int, default=100000, help="Opportunities (matrix columns)")
+@click.option("--scalar-sample", type=int, default=2000, help="Random pairs checked against the scalar path")
+@click.option("--verify-all", is_flag=True, help="Check every pair against the scalar path")
+@click.option("--seed", type=int, default=7, help="Synthetic data seed")
+@click.option("--term-index", is_flag=True, help="Score semantics with BM25 over an in-memory term index")
+@click.option("--embeddings", is_flag=True, help="Score semantics with the local hashing embedder")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(organizations, opportunities, scalar_sample, verify_all, seed, term_index, embeddings, output):
+    """Compare scalar and vectorized relevance scoring."""
+    result = asyncio.run(
+        _run(organizations, opportunities, scalar_sample, verify_all, seed, term_index, embeddings)
+    )
+    
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"relevance_scoring_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+    
+    click.echo(f"feature build:    {result['feature_build_seconds']} s")
+    click.echo(f"matrix scoring:   {result['matrix_seconds']} s ({result['matrix_pairs_per_second']} pairs/s)")
+    click.echo(f"scalar scoring:   {result['scalar_pairs_per_second']} pairs/s "
+               f"(~{result['scalar_seconds_estimated']} s for all pairs)")
+    click.echo(f"mismatches:       {result['mismatches']} of {result['config']['verified_pairs']}")
+    click.echo(f"written to        {output}")
+    if result["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Top-K Ranking Benchmark
+
+Ranks a synthetic open corpus for each of several organizations two ways:
+
+- ``full``: ``score_matrix`` over every opportunity, then a sort
+- ``pruned``: ``top_opportunities``, which scores in full only the
+  opportunities whose upper bound can still beat the k-th score
+
+Both use the same prebuilt ``OpportunityFeatures`` (the corpus snapshot
+the API keeps). Checks that both return the same top-k scores and
+reports per-query latency and the share of the corpus scored in full.
+No database is needed; models are built in memory.
+
+Usage:
+    # Top 50 of 100k opportunities for 20 organizations
+    python benchmarks/top_k_ranking.py --opportunities 100000 --organizations 20 --k 50
+
+Results are printed and written to ``benchmarks/results/``.
+"""
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import click
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "apps" / "backend"))
+
+NAICS = [
+    "541511", "541512", "541330", "541611", "518210", "236220", "237310", "238220",
+    "561210", "561720", "334511", "336411", "611430", "621111", "488190", "811219",
+]
+STATES = ["VA", "MD", "DC", "CA", "TX", "FL", "NY", "CO", "WA", "OR", "NV", "GA", None]
+SET_ASIDES = ["SB", "8A", "WOSB", "SDVOSB", "VOSB", None, None, None, None]
+CONTRACT_TYPES = ["Firm-Fixed", "Time", "Cost-Plus", "IDIQ", None]
+OFFICES = ["Department of the Army", "Naval Sea Systems", "General Services Administration", "Veterans Affairs", None]
+# Narrative vocabulary per 2-digit sector; texts mix in some shared filler
+SECTOR_WORDS = {
+    "54": "software development cybersecurity engineering analytics consulting modernization".split(),
+    "51": "cloud hosting data center network storage platform".split(),
+    "23": "construction renovation roofing paving electrical hvac".split(),
+    "56": "janitorial custodial security guards landscaping grounds".split(),
+    "33": "avionics sensors aircraft components manufacturing instruments".split(),
+    "61": "training curriculum instruction courses simulation exercises".split(),
+    "62": "medical clinical health physicians telehealth patients".split(),
+    "48": "logistics transportation freight airfield cargo handling".split(),
+    "81": "repair equipment calibration electronics overhaul servicing".split(),
+}
+FILLER = (
+    "support program management requirements delivery performance acquisition schedule "
+    "quality reporting compliance staffing oversight planning coordination documentation"
+).split()
+
+
+def _text(rng, sectors, words):
+    vocabulary = [word for sector in sectors for word in SECTOR_WORDS[sector]]
+    return " ".join(
+        rng.choice(vocabulary) if rng.random() < 0.85 else rng.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+def _organizations(count, rng):
+    from src.database.models import Organization
+    
+    organizations = []
+    for i in range(count):
+        naics_codes = rng.sample(NAICS, rng.randint(1, 4))
+        sectors = [code[:2] for code in naics_codes]
+        organizations.append(Organization(
+            name=f"Org {i}",
+            naics_codes=naics_codes,
+            set_aside_types=rng.sample([s for s in SET_ASIDES if s], rng.randint(0, 2)),
+            state=rng.choice(STATES),
+            annual_revenue=Decimal(rng.choice([0, 500_000, 5_000_000, 50_000_000])),
+            capabilities_narrative=_text(rng, sectors, 60),
+            past_performance_summary=rng.choice([None, _text(rng, sectors, 40) + " ffp idiq army"]),
+        ))
+    return organizations
+
+
+def _opportunities(count, rng):
+    from src.database.models import Opportunity
+    
+    opportunities = []
+    for j in range(count):
+        naics_code = rng.choice(NAICS + [None])
+        sectors = [naics_code[:2]] if naics_code else [rng.choice(list(SECTOR_WORDS))]
+        opportunities.append(Opportunity(
+            source_id=f"bench-{j}",
+            source_system="benchmark",
+            title=_text(rng, sectors, 8),
+            description=rng.choice([None, _text(rng, sectors, 120)]),
+            naics_code=naics_code,
+            naics_description=_text(rng, sectors, 4),
+            place_of_performance_state=rng.choice(STATES),
+            set_aside_type=rng.choice(SET_ASIDES),
+            estimated_value_max=rng.choice([None, Decimal(rng.randint(10_000, 80_000_000))]),
+            contracting_office_name=rng.choice(OFFICES),
+            contract_type=rng.choice(CONTRACT_TYPES),
+        ))
+    return opportunities
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 2)
+
+
+def _run(organization_count, opportunity_count, k, min_score, seed):
+    from src.services.feature_cache import FeatureCache
+    from src.services.relevance_matrix import OpportunityFeatures, score_matrix, top_opportunities
+    from src.services.relevance_scorer import RelevanceScorer
+    
+    rng = random.Random(seed)
+    organizations = _organizations(organization_count, rng)
+    opportunities = _opportunities(opportunity_count, rng)
+    scorer = RelevanceScorer(feature_cache=FeatureCache(organization_count + opportunity_count))
+    
+    started = time.perf_counter()
+    features = OpportunityFeatures.build(scorer, opportunities)
+    build_seconds = time.perf_counter() - started
+    
+    full_latencies, pruned_latencies, scored = [], [], []
+    mismatches = 0
+    for organization in organizations:
+        started = time.perf_counter()
+        overall = score_matrix(scorer, [organization], features).overall[0]
+        best = np.sort(overall[overall >= min_score])[::-1][:k]
+        full_latencies.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        top = top_opportunities(scorer, organization, features, k, min_score)
+        pruned_latencies.append(time.perf_counter() - started)
+        scored.append(top.scored / features.size)
+        
+        expected = [round(float(score), 4) for score in best]
+        mismatches += [result.overall_score for _, result in top.results] != expected
+    
+    return {
+        "benchmark": "top_k_ranking",
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "organizations": organization_count,
+            "opportunities": opportunity_count,
+            "k": k,
+            "min_score": min_score,
+            "seed": seed,
+        },
+        "feature_build_seconds": round(build_seconds, 2),
+        "full_ms": {"p50": _percentile(full_latencies, 50), "p99": _percentile(full_latencies, 99)},
+        "pruned_ms": {"p50": _percentile(pruned_latencies, 50), "p99": _percentile(pruned_latencies, 99)},
+        "scored_fraction": {"mean": round(float(np.mean(scored)), 4), "max": round(float(np.max(scored)), 4)},
+        "mismatches": mismatches,
+    }
+
+
+@click.command()
+@click.option("--organizations", type=int, default=20, help="Organizations ranked (one query each)")
+@click.option("--opportunities", type=int, default=100000, help="Opportunities in the corpus")
+@click.option("--k", type=int, default=50, help="Opportunities returned per query")
+@click.option("--min-score", type=float, default=0.0, help="Minimum overall score returned")
+@click.option("--seed", type=int, default=7, help="Synthetic data seed")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Result JSON path")
+def main(organizations, opportunities, k, min_score, seed, output):
+    """Compare full ranking with bound-pruned top-K ranking."""
+    result = _run(organizations, opportunities, k, min_score, seed)
+    
+    output = Path(output) if output else (
+        BENCH_DIR / "results" / f"top_k_ranking_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    output.write_text(json.dumps(result, indent=2))
+    
+    click.echo(f"feature build:    {result['feature_build_seconds']} s (once per corpus snapshot)")
+    click.echo(f"full ranking:     p50 {result['full_ms']['p50']} ms, p99 {result['full_ms']['p99']} ms")
+    click.echo(f"pruned ranking:   p50 {result['pruned_ms']['p50']} ms, p99 {result['pruned_ms']['p99']} ms")
+    click.echo(f"scored in full:   mean {result['scored_fraction']['mean']:.1%}, "
+               f"max {result['scored_fraction']['max']:.1%}")
+    click.echo(f"mismatches:       {result['mismatches']} of {organizations} queries")
+    click.echo(f"written to        {output}")
+    if result["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
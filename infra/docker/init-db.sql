@@ -42,6 +42,7 @@ CREATE TABLE IF NOT EXISTS aureon.organizations (
     founded_year INTEGER,
     capabilities_narrative TEXT,
     past_performance_summary TEXT,
+    scoring_weights JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     metadata JSONB DEFAULT '{}'
@@ -88,13 +89,53 @@ CREATE TABLE IF NOT EXISTS aureon.opportunities (
     security_clearance_required VARCHAR(100),
     attachments JSONB DEFAULT '[]',
     amendments JSONB DEFAULT '[]',
-    raw_data JSONB,
+    content_hash VARCHAR(64),
+    field_hashes JSONB DEFAULT '{}',
+    changed_fields TEXT[],
+    parser_version INTEGER,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     ingested_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     UNIQUE (source_id, source_system)
 );
 
+-- Raw source payloads, kept off the hot opportunities table and lz4-compressed
+CREATE TABLE IF NOT EXISTS aureon.opportunity_raw (
+    opportunity_id UUID PRIMARY KEY REFERENCES aureon.opportunities(id) ON DELETE CASCADE,
+    raw_data JSONB COMPRESSION lz4 NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+-- Compress payloads above 128 bytes instead of the default ~2 kB
+ALTER TABLE aureon.opportunity_raw SET (toast_tuple_target = 128);
+
+-- BM25 term index over opportunity titles and descriptions (see src.services.term_index)
+CREATE TABLE IF NOT EXISTS aureon.opportunity_terms (
+    term TEXT NOT NULL,
+    opportunity_id UUID NOT NULL REFERENCES aureon.opportunities(id) ON DELETE CASCADE,
+    term_frequency INTEGER NOT NULL,
+    doc_length INTEGER NOT NULL,
+    PRIMARY KEY (term, opportunity_id)
+);
+
+CREATE TABLE IF NOT EXISTS aureon.term_stats (
+    term TEXT PRIMARY KEY,
+    doc_freq INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS aureon.term_corpus (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CONSTRAINT chk_term_corpus_single_row CHECK (id),
+    doc_count BIGINT NOT NULL DEFAULT 0,
+    total_length BIGINT NOT NULL DEFAULT 0
+);
+
+-- Organization narratives as term-index query vectors
+CREATE TABLE IF NOT EXISTS aureon.organization_query_vectors (
+    organization_id UUID PRIMARY KEY REFERENCES aureon.organizations(id) ON DELETE CASCADE,
+    terms JSONB NOT NULL,
+    doc_count BIGINT NOT NULL,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Relevance scores table
 CREATE TABLE IF NOT EXISTS aureon.relevance_scores (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -149,6 +190,83 @@ CREATE TABLE IF NOT EXISTS ingestion.ingestion_logs (
     metadata JSONB DEFAULT '{}'
 );
 
+-- Ingestion watermarks (last successful run per source and filter set)
+CREATE TABLE IF NOT EXISTS ingestion.ingestion_watermarks (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    source_system VARCHAR(50) NOT NULL,
+    filter_key VARCHAR(64) NOT NULL,
+    filters JSONB DEFAULT '{}',
+    last_posted_date TIMESTAMP WITH TIME ZONE,
+    last_modified_date TIMESTAMP WITH TIME ZONE,
+    ingestion_log_id UUID REFERENCES ingestion.ingestion_logs(id) ON DELETE SET NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_watermark_source_filter UNIQUE (source_system, filter_key)
+);
+
+-- Notice description text, keyed by notice and last modification
+CREATE TABLE IF NOT EXISTS ingestion.description_cache (
+    notice_id VARCHAR(100) NOT NULL,
+    last_modified VARCHAR(40) NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    fetched_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (notice_id, last_modified)
+);
+
+-- Ingestion jobs (durable queue consumed by ingestion workers)
+CREATE TABLE IF NOT EXISTS ingestion.ingestion_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    ingestion_log_id UUID REFERENCES ingestion.ingestion_logs(id) ON DELETE CASCADE,
+    job_type VARCHAR(50) NOT NULL,
+    params JSONB DEFAULT '{}',
+    status VARCHAR(20) DEFAULT 'queued',
+    priority INTEGER DEFAULT 0,
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 3,
+    available_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    checkpoint JSONB DEFAULT '{}',
+    cancel_requested BOOLEAN DEFAULT FALSE,
+    worker_id VARCHAR(100),
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    error_message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    CONSTRAINT chk_ingestion_job_status CHECK (status IN ('queued', 'running', 'completed', 'failed', 'cancelled'))
+);
+
+-- Ingestion subscriptions (per-organization SAM.gov filters merged by the shared-fetch planner)
+CREATE TABLE IF NOT EXISTS ingestion.ingestion_subscriptions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    organization_id UUID NOT NULL REFERENCES aureon.organizations(id) ON DELETE CASCADE,
+    naics_codes TEXT[],
+    notice_types TEXT[],
+    set_aside_codes TEXT[],
+    active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Refresh schedule of tracked notices (priority queue drained by the refresh scheduler)
+CREATE TABLE IF NOT EXISTS ingestion.notice_refresh (
+    opportunity_id UUID PRIMARY KEY REFERENCES aureon.opportunities(id) ON DELETE CASCADE,
+    source_id VARCHAR(100) NOT NULL,
+    tier VARCHAR(20) NOT NULL,
+    priority INTEGER NOT NULL,
+    next_refresh_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_refreshed_at TIMESTAMP WITH TIME ZONE,
+    last_changed_at TIMESTAMP WITH TIME ZONE,
+    refresh_count INTEGER DEFAULT 0,
+    retired_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Last organization / opportunity change applied to relevance_scores (see src.ingestion.score_maintainer)
+CREATE TABLE IF NOT EXISTS ingestion.score_watermarks (
+    entity VARCHAR(20) PRIMARY KEY,
+    last_updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_id UUID NOT NULL,
+    recorded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Benchmark results table
 CREATE TABLE IF NOT EXISTS analytics.benchmark_results (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -169,6 +287,8 @@ CREATE INDEX IF NOT EXISTS idx_opportunities_naics ON aureon.opportunities(naics
 CREATE INDEX IF NOT EXISTS idx_opportunities_posted ON aureon.opportunities(posted_date DESC);
 CREATE INDEX IF NOT EXISTS idx_opportunities_deadline ON aureon.opportunities(response_deadline);
 CREATE INDEX IF NOT EXISTS idx_opportunities_status ON aureon.opportunities(status);
+CREATE INDEX IF NOT EXISTS idx_opportunities_updated ON aureon.opportunities(updated_at);
+CREATE INDEX IF NOT EXISTS idx_opportunities_parser_version ON aureon.opportunities(parser_version);
 CREATE INDEX IF NOT EXISTS idx_opportunities_title_trgm ON aureon.opportunities USING gin(title gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_opportunities_description_trgm ON aureon.opportunities USING gin(description gin_trgm_ops);
 
@@ -178,10 +298,21 @@ CREATE INDEX IF NOT EXISTS idx_organizations_name_trgm ON aureon.organizations U
 CREATE INDEX IF NOT EXISTS idx_relevance_org ON aureon.relevance_scores(organization_id);
 CREATE INDEX IF NOT EXISTS idx_relevance_opp ON aureon.relevance_scores(opportunity_id);
 CREATE INDEX IF NOT EXISTS idx_relevance_score ON aureon.relevance_scores(overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_relevance_org_score ON aureon.relevance_scores(organization_id, overall_score DESC);
+CREATE INDEX IF NOT EXISTS idx_relevance_org_components ON aureon.relevance_scores(organization_id)
+    INCLUDE (opportunity_id, overall_score, naics_score, semantic_score, geographic_score, size_score, past_performance_score);
+CREATE INDEX IF NOT EXISTS idx_organizations_updated ON aureon.organizations(updated_at, id);
 
 CREATE INDEX IF NOT EXISTS idx_risk_org ON aureon.risk_assessments(organization_id);
 CREATE INDEX IF NOT EXISTS idx_risk_opp ON aureon.risk_assessments(opportunity_id);
 
+CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_claim ON ingestion.ingestion_jobs(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_ingestion_subscriptions_org ON ingestion.ingestion_subscriptions(organization_id);
+CREATE INDEX IF NOT EXISTS idx_notice_refresh_due ON ingestion.notice_refresh(priority, next_refresh_at) WHERE retired_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_opportunities_archive ON aureon.opportunities(archive_date) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_opportunities_candidates ON aureon.opportunities(left(btrim(naics_code), 2), response_deadline) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_opportunity_terms_opportunity ON aureon.opportunity_terms(opportunity_id);
+
 -- Full-text search configuration
 CREATE TEXT SEARCH CONFIGURATION IF NOT EXISTS aureon.procurement_config (COPY = english);
 
@@ -194,16 +325,46 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
+-- A weight profile change re-weights stored scores in place; it is not a
+-- profile change for the score maintainer to re-score
+CREATE OR REPLACE FUNCTION aureon.update_organizations_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.scoring_weights IS DISTINCT FROM OLD.scoring_weights
+       AND to_jsonb(NEW) - 'scoring_weights' - 'updated_at'
+           = to_jsonb(OLD) - 'scoring_weights' - 'updated_at' THEN
+        NEW.updated_at = OLD.updated_at;
+    ELSE
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
 -- Create triggers
 CREATE TRIGGER update_organizations_updated_at
     BEFORE UPDATE ON aureon.organizations
     FOR EACH ROW
-    EXECUTE FUNCTION aureon.update_updated_at_column();
+    EXECUTE FUNCTION aureon.update_organizations_updated_at();
+
+-- Re-stamping parser_version on unchanged content is not a content change
+CREATE OR REPLACE FUNCTION aureon.update_opportunities_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.parser_version IS DISTINCT FROM OLD.parser_version
+       AND NEW.content_hash IS NOT DISTINCT FROM OLD.content_hash THEN
+        NEW.updated_at = OLD.updated_at;
+    ELSE
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
 
 CREATE TRIGGER update_opportunities_updated_at
     BEFORE UPDATE ON aureon.opportunities
     FOR EACH ROW
-    EXECUTE FUNCTION aureon.update_updated_at_column();
+    EXECUTE FUNCTION aureon.update_opportunities_updated_at();
 
 -- Insert sample data for testing
 INSERT INTO aureon.organizations (name, legal_name, uei, naics_codes, psc_codes, set_aside_types, city, state, employee_count, capabilities_narrative)
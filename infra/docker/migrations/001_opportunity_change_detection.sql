@@ -0,0 +1,10 @@
+-- Content-hash change detection for opportunities
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 001_opportunity_change_detection.sql
+-- (fresh databases get these columns from init-db.sql)
+
+ALTER TABLE aureon.opportunities ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE aureon.opportunities ADD COLUMN IF NOT EXISTS field_hashes JSONB DEFAULT '{}';
+ALTER TABLE aureon.opportunities ADD COLUMN IF NOT EXISTS changed_fields TEXT[];
+
+-- Incremental consumers read rows changed since their last checkpoint
+CREATE INDEX IF NOT EXISTS idx_opportunities_updated ON aureon.opportunities(updated_at);
@@ -0,0 +1,28 @@
+-- Per-row parser version for re-parsing stored raw_data
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 002_opportunity_parser_version.sql
+-- (fresh databases get these from init-db.sql)
+
+ALTER TABLE aureon.opportunities ADD COLUMN IF NOT EXISTS parser_version INTEGER;
+
+-- Re-parse jobs select rows parsed by an older version
+CREATE INDEX IF NOT EXISTS idx_opportunities_parser_version ON aureon.opportunities(parser_version);
+
+-- Re-stamping parser_version on unchanged content is not a content change
+CREATE OR REPLACE FUNCTION aureon.update_opportunities_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.parser_version IS DISTINCT FROM OLD.parser_version
+       AND NEW.content_hash IS NOT DISTINCT FROM OLD.content_hash THEN
+        NEW.updated_at = OLD.updated_at;
+    ELSE
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_opportunities_updated_at ON aureon.opportunities;
+CREATE TRIGGER update_opportunities_updated_at
+    BEFORE UPDATE ON aureon.opportunities
+    FOR EACH ROW
+    EXECUTE FUNCTION aureon.update_opportunities_updated_at();
@@ -0,0 +1,29 @@
+-- Move opportunities.raw_data into a compressed side table
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 003_opportunity_raw_table.sql
+-- (fresh databases get this layout from init-db.sql)
+
+CREATE TABLE IF NOT EXISTS aureon.opportunity_raw (
+    opportunity_id UUID PRIMARY KEY REFERENCES aureon.opportunities(id) ON DELETE CASCADE,
+    raw_data JSONB COMPRESSION lz4 NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+-- Compress payloads above 128 bytes instead of the default ~2 kB
+ALTER TABLE aureon.opportunity_raw SET (toast_tuple_target = 128);
+
+-- Copy and drop in one transaction so no payload is lost to a concurrent ingest
+BEGIN;
+LOCK TABLE aureon.opportunities IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO aureon.opportunity_raw (opportunity_id, raw_data, updated_at)
+SELECT id, raw_data, updated_at
+FROM aureon.opportunities
+WHERE raw_data IS NOT NULL
+ON CONFLICT (opportunity_id) DO NOTHING;
+
+ALTER TABLE aureon.opportunities DROP COLUMN IF EXISTS raw_data;
+COMMIT;
+
+-- Dropping a column leaves its data in place until the table is rewritten;
+-- reclaim it (takes an exclusive lock for the duration of the rewrite)
+VACUUM FULL ANALYZE aureon.opportunities;
+ANALYZE aureon.opportunity_raw;
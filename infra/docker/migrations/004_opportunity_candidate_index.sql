@@ -0,0 +1,8 @@
+-- Index the NAICS sector and deadline filters of candidate generation
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 004_opportunity_candidate_index.sql
+-- (fresh databases get this index from init-db.sql)
+
+-- CONCURRENTLY avoids blocking ingestion writes; it cannot run inside a transaction block
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_opportunities_candidates
+    ON aureon.opportunities(left(btrim(naics_code), 2), response_deadline)
+    WHERE status = 'active';
@@ -0,0 +1,15 @@
+-- Incrementally maintained relevance scores: change watermarks and ranking index
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 005_score_maintainer.sql
+-- (fresh databases get these from init-db.sql)
+
+CREATE TABLE IF NOT EXISTS ingestion.score_watermarks (
+    entity VARCHAR(20) PRIMARY KEY,
+    last_updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_id UUID NOT NULL,
+    recorded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per-organization rankings read from the maintained table
+CREATE INDEX IF NOT EXISTS idx_relevance_org_score ON aureon.relevance_scores(organization_id, overall_score DESC);
+-- Keyset scan of changed organizations
+CREATE INDEX IF NOT EXISTS idx_organizations_updated ON aureon.organizations(updated_at, id);
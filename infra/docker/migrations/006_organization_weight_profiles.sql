@@ -0,0 +1,31 @@
+-- Per-organization relevance weight profiles, re-weighted over stored components
+-- Apply to existing databases with: psql "$DATABASE_URL" -f 006_organization_weight_profiles.sql
+-- (fresh databases get these from init-db.sql)
+
+ALTER TABLE aureon.organizations ADD COLUMN IF NOT EXISTS scoring_weights JSONB;
+
+-- Re-ranking under other weights reads an organization's components from the index alone
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_relevance_org_components ON aureon.relevance_scores(organization_id)
+    INCLUDE (opportunity_id, overall_score, naics_score, semantic_score, geographic_score, size_score, past_performance_score);
+
+-- A weight profile change re-weights stored scores in place; it is not a
+-- profile change for the score maintainer to re-score
+CREATE OR REPLACE FUNCTION aureon.update_organizations_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.scoring_weights IS DISTINCT FROM OLD.scoring_weights
+       AND to_jsonb(NEW) - 'scoring_weights' - 'updated_at'
+           = to_jsonb(OLD) - 'scoring_weights' - 'updated_at' THEN
+        NEW.updated_at = OLD.updated_at;
+    ELSE
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_organizations_updated_at ON aureon.organizations;
+CREATE TRIGGER update_organizations_updated_at
+    BEFORE UPDATE ON aureon.organizations
+    FOR EACH ROW
+    EXECUTE FUNCTION aureon.update_organizations_updated_at();
@@ -0,0 +1,112 @@
+"""
+Shared fixtures.
+
+Tests import the backend as ``src`` (as the app and benchmarks do) and
+build models in memory; nothing here needs a database.
+"""
+import random
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apps" / "backend"))
+
+from src.database.models import Opportunity, Organization  # noqa: E402
+from src.services.feature_cache import FeatureCache  # noqa: E402
+from src.services.relevance_scorer import RelevanceScorer  # noqa: E402
+from src.services.term_index import TermIndex, opportunity_text, term_frequencies  # noqa: E402
+
+NAICS = ["541511", "541512", "541519", "541330", "541611", "518210", "236220", "561210", "54151"]
+STATES = ["VA", "MD", "DC", "CA", "TX", "FL", "NY", "CO", None]
+SET_ASIDES = ["SB", "8A", "WOSB", "SDVOSB", "HUBZone", "HUBZONE", "VOSB", None, None, None]
+CONTRACT_TYPES = ["Firm-Fixed", "Time", "Cost-Plus", "IDIQ", None]
+OFFICES = ["Department of the Army", "Naval Sea Systems", "General Services Administration", None]
+WORDS = (
+    "cloud migration cybersecurity network engineering software development data analytics "
+    "logistics training facilities maintenance construction program management support "
+    "modernization infrastructure research systems integration health medical records"
+).split()
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_organizations(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        Organization(
+            name=f"Org {i}",
+            naics_codes=rng.sample(NAICS, rng.randint(0, 3)),
+            set_aside_types=rng.sample([s for s in SET_ASIDES if s], rng.randint(0, 2)),
+            state=rng.choice(STATES),
+            annual_revenue=Decimal(rng.choice([0, 500_000, 5_000_000, 50_000_000])),
+            capabilities_narrative=rng.choice([None, _text(rng, 40)]),
+            past_performance_summary=rng.choice([None, _text(rng, 30) + " ffp idiq army"]),
+        )
+        for i in range(count)
+    ]
+
+
+def make_opportunities(count, seed=2):
+    rng = random.Random(seed)
+    return [
+        Opportunity(
+            source_id=f"test-{j}",
+            source_system="test",
+            title=_text(rng, 6),
+            description=rng.choice([None, _text(rng, 60)]),
+            naics_code=rng.choice(NAICS + [None, " 5415"]),
+            naics_description=rng.choice([None, _text(rng, 3)]),
+            place_of_performance_state=rng.choice(STATES),
+            set_aside_type=rng.choice(SET_ASIDES),
+            estimated_value_max=rng.choice([None, Decimal(0), Decimal(rng.randint(10_000, 80_000_000))]),
+            contracting_office_name=rng.choice(OFFICES),
+            contract_type=rng.choice(CONTRACT_TYPES),
+            response_deadline=rng.choice([None, NOW + timedelta(days=rng.randint(-20, 60))]),
+            status="active",
+        )
+        for j in range(count)
+    ]
+
+
+def build_term_index(opportunities):
+    """Index statistics built in memory, as index_opportunities would in SQL."""
+    doc_freq = Counter()
+    doc_count = total_length = 0
+    for opportunity in opportunities:
+        frequencies, doc_length = term_frequencies(opportunity_text(opportunity))
+        if frequencies:
+            doc_freq.update(frequencies.keys())
+            doc_count += 1
+            total_length += doc_length
+    return TermIndex(doc_count, total_length, dict(doc_freq))
+
+
+@pytest.fixture
+def organizations():
+    return make_organizations(8)
+
+
+@pytest.fixture
+def opportunities():
+    return make_opportunities(400)
+
+
+@pytest.fixture(params=["keywords", "terms", "embeddings"])
+def scorer(request, opportunities, tmp_path):
+    """Scorer in each semantic mode, with a private feature cache."""
+    from src.services.embeddings import EmbeddingEngine, HashingEmbedder
+    
+    return RelevanceScorer(
+        term_index=build_term_index(opportunities) if request.param == "terms" else None,
+        # Unsaved models have no IDs, so nothing is written to the index
+        embeddings=EmbeddingEngine(HashingEmbedder(), tmp_path) if request.param == "embeddings" else None,
+        feature_cache=FeatureCache(),
+    )
@@ -0,0 +1,96 @@
+"""Candidate blocking rules, in memory and as SQL."""
+from datetime import timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from src.database.models import Opportunity, Organization
+from src.services.candidates import CandidateFilter, candidate_query, sample_recall, states_within
+from src.services.feature_cache import FeatureCache
+from src.services.relevance_scorer import RelevanceScorer
+
+from conftest import NOW, make_opportunities, make_organizations
+
+
+def _opportunity(**values):
+    values.setdefault("status", "active")
+    return Opportunity(source_id="x", source_system="test", title="t", **values)
+
+
+def _filter(scorer, state_radius=None, **organization):
+    return CandidateFilter.for_organization(scorer, Organization(name="Org", **organization), state_radius, NOW)
+
+
+def test_states_within():
+    assert states_within("DC", 0) == {"DC"}
+    assert states_within("DC", 1) == {"DC", "VA", "MD"}
+    assert states_within("DC", 2) >= {"WV", "NC", "PA", "DE"}
+    # Adjacency is used in both directions
+    assert "CA" in states_within("NV", 1)
+    assert states_within("ZZ", 3) == {"ZZ"}
+
+
+def test_rules_skipped_without_organization_data():
+    scorer = RelevanceScorer(feature_cache=FeatureCache())
+    candidate_filter = _filter(scorer, state_radius=1)
+    
+    assert (candidate_filter.sectors, candidate_filter.blocked_set_asides, candidate_filter.states) == \
+        (None, None, None)
+    assert candidate_filter.matches(scorer, _opportunity(naics_code="236220", set_aside_type="8A"))
+
+
+def test_failed_rules():
+    scorer = RelevanceScorer(feature_cache=FeatureCache())
+    candidate_filter = _filter(
+        scorer, state_radius=1, naics_codes=["541511"], set_aside_types=["8A"], state="DC",
+    )
+    
+    assert candidate_filter.sectors == {"54"}
+    assert "8A" not in candidate_filter.blocked_set_asides
+    assert {"WOSB", "SDVOSB"} <= candidate_filter.blocked_set_asides
+    
+    assert candidate_filter.failed_rules(scorer, _opportunity(
+        naics_code="541330", set_aside_type="8A", place_of_performance_state="md",
+    )) == []
+    # Blank data passes every rule
+    assert candidate_filter.failed_rules(scorer, _opportunity(
+        naics_code=" ", set_aside_type=None, place_of_performance_state="",
+    )) == []
+    assert candidate_filter.failed_rules(scorer, _opportunity(
+        status="archived",
+        response_deadline=NOW,
+        naics_code="236220",
+        set_aside_type=" wosb",
+        place_of_performance_state="CA",
+    )) == ["status", "deadline", "naics_sector", "set_aside", "state"]
+    assert candidate_filter.matches(scorer, _opportunity(response_deadline=NOW + timedelta(seconds=1)))
+
+
+def test_conditions_compile():
+    scorer = RelevanceScorer(feature_cache=FeatureCache())
+    candidate_filter = _filter(
+        scorer, state_radius=0, naics_codes=["541511", "236220"], set_aside_types=["WOSB"], state="VA",
+    )
+    
+    assert len(candidate_filter.conditions()) == 5
+    sql = str(candidate_query(candidate_filter).compile(dialect=postgresql.dialect()))
+    assert "status = 'active'" in sql
+    assert "left(btrim(aureon.opportunities.naics_code), 2) IN" in sql
+    assert "upper(btrim(aureon.opportunities.set_aside_type)) NOT IN" in sql
+    
+    unfiltered = _filter(scorer)
+    assert len(unfiltered.conditions()) == 2
+    where = str(candidate_query(unfiltered).whereclause.compile(dialect=postgresql.dialect()))
+    assert "naics_code" not in where
+
+
+def test_sample_recall_counts_relevant():
+    scorer = RelevanceScorer(feature_cache=FeatureCache())
+    opportunities = make_opportunities(200)
+    for organization in make_organizations(5):
+        candidate_filter = CandidateFilter.for_organization(scorer, organization, 1, NOW)
+        counts = sample_recall(scorer, organization, opportunities, candidate_filter, 0.5)
+        
+        overall = scorer.score_matrix([organization], opportunities).overall[0]
+        relevant = [o for o, score in zip(opportunities, overall) if score >= 0.5]
+        assert counts["relevant"] == len(relevant)
+        assert counts["relevant_kept"] == sum(candidate_filter.matches(scorer, o) for o in relevant)
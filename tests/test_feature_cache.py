@@ -0,0 +1,89 @@
+"""Entity feature cache: keyed by ID, invalidated by ``updated_at``."""
+import uuid
+from datetime import timedelta
+
+from src.services.feature_cache import FeatureCache, OrganizationProfile
+from src.services.relevance_scorer import RelevanceScorer
+
+from conftest import NOW, make_opportunities, make_organizations
+
+
+def _saved(entity):
+    entity.id = uuid.uuid4()
+    entity.updated_at = NOW
+    return entity
+
+
+def test_hit_until_updated_at_changes():
+    cache = FeatureCache()
+    organization = _saved(make_organizations(1)[0])
+    
+    first = cache.organization(organization)
+    assert cache.organization(organization) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    organization.capabilities_narrative = "satellite ground station operations"
+    organization.updated_at = NOW + timedelta(seconds=1)
+    profile = cache.organization(organization)
+    assert profile is not first
+    assert profile.keywords == OrganizationProfile.build(organization).keywords
+    assert "satellite" in profile.keywords
+    assert cache.misses == 2
+
+
+def test_kinds_do_not_collide():
+    cache = FeatureCache()
+    organization = _saved(make_organizations(1)[0])
+    opportunity = _saved(make_opportunities(1)[0])
+    opportunity.id = organization.id
+    
+    cache.organization(organization)
+    cache.opportunity(opportunity)
+    assert len(cache) == 2
+    assert cache.misses == 2
+
+
+def test_lru_eviction():
+    cache = FeatureCache(maxsize=3)
+    opportunities = [_saved(o) for o in make_opportunities(4)]
+    
+    for opportunity in opportunities[:3]:
+        cache.opportunity(opportunity)
+    cache.opportunity(opportunities[0])
+    cache.opportunity(opportunities[3])
+    assert len(cache) == 3
+    
+    cache.opportunity(opportunities[0])
+    assert cache.hits == 2
+    cache.opportunity(opportunities[1])
+    assert cache.misses == 5
+
+
+def test_unsaved_entities_cached_per_object():
+    cache = FeatureCache()
+    first, second = make_opportunities(2)
+    
+    assert cache.opportunity(first) is cache.opportunity(first)
+    assert cache.opportunity(second) is not cache.opportunity(first)
+    assert len(cache) == 0
+
+
+async def test_edited_organization_rescored():
+    organization = _saved(make_organizations(1)[0])
+    opportunities = make_opportunities(50)
+    scorer = RelevanceScorer(feature_cache=FeatureCache())
+    for opportunity in opportunities:
+        await scorer.calculate_score(organization, opportunity)
+    
+    organization.naics_codes = ["541511"]
+    organization.capabilities_narrative = "cloud migration software development"
+    organization.updated_at = NOW + timedelta(minutes=5)
+    fresh = RelevanceScorer(feature_cache=FeatureCache())
+    for opportunity in opportunities:
+        assert await scorer.calculate_score(organization, opportunity) == \
+            await fresh.calculate_score(organization, opportunity)
+
+
+def test_scorer_keeps_an_empty_private_cache():
+    cache = FeatureCache()
+    assert RelevanceScorer(feature_cache=cache).features is cache
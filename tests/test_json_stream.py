@@ -0,0 +1,112 @@
+"""Incremental array extraction must match a whole-document parse."""
+import json
+import random
+
+import pytest
+
+from src.ingestion.json_stream import JSONArrayStream
+
+DOCUMENT = json.dumps({
+    "totalRecords": 3,
+    "limit": 1000,
+    "opportunitiesData": [
+        {"noticeId": "a1", "title": "Tricky ]} \"quoted\" \\ text, [with] brackets"},
+        {"noticeId": "a2", "title": "Unicode café — 🚀", "values": [1, 2.5, None, True]},
+        {"noticeId": "a3", "description": "x" * 50000, "nested": {"opportunitiesData": []}},
+    ],
+    "links": [{"rel": "self", "href": "https://example.test/?q=]"}],
+})
+
+
+def _stream(pieces, key="opportunitiesData"):
+    parser = JSONArrayStream(key)
+    items = []
+    for piece in pieces:
+        items.extend(parser.feed(piece))
+    items.extend(parser.close())
+    return items, parser
+
+
+def _random_pieces(text, rng, largest):
+    pieces, pos = [], 0
+    while pos < len(text):
+        size = rng.randint(1, largest)
+        pieces.append(text[pos:pos + size])
+        pos += size
+    return pieces
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_chunk_boundaries(seed):
+    rng = random.Random(seed)
+    expected = json.loads(DOCUMENT)
+    
+    items, parser = _stream(_random_pieces(DOCUMENT, rng, rng.choice([1, 7, 100, 4096])))
+    
+    assert items == expected.pop("opportunitiesData")
+    assert parser.envelope == expected
+
+
+def test_whole_document_in_one_piece():
+    items, parser = _stream([DOCUMENT])
+    assert [item["noticeId"] for item in items] == ["a1", "a2", "a3"]
+    assert parser.envelope["totalRecords"] == 3
+
+
+def test_large_item_in_small_pieces():
+    item = {"noticeId": "big", "description": "word " * 400_000}
+    text = json.dumps({"opportunitiesData": [item, {"noticeId": "next"}], "totalRecords": 2})
+    
+    items, parser = _stream(text[i:i + 512] for i in range(0, len(text), 512))
+    
+    assert items == [item, {"noticeId": "next"}]
+    assert parser.envelope == {"totalRecords": 2}
+
+
+def test_items_yielded_before_document_ends():
+    parser = JSONArrayStream("data")
+    assert parser.feed('{"total": 2, "data": [{"id": 1}, ') == [{"id": 1}]
+    assert parser.feed('{"id": 2}]}') == [{"id": 2}]
+    assert parser.close() == []
+    assert parser.envelope == {"total": 2}
+
+
+def test_empty_array():
+    items, parser = _stream(['{"opportunitiesData": [ ], "totalRecords": 0}'])
+    assert items == []
+    assert parser.envelope == {"totalRecords": 0}
+
+
+def test_missing_array_is_envelope():
+    items, parser = _stream(['{"error": ', '"rate limited"}'])
+    assert items == []
+    assert parser.envelope == {"error": "rate limited"}
+
+
+def test_document_ending_inside_array():
+    parser = JSONArrayStream("opportunitiesData")
+    parser.feed('{"opportunitiesData": [{"noticeId": "a1"}, {"noticeId": ')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_buffer_holds_only_unconsumed_text():
+    text = json.dumps({"opportunitiesData": [{"noticeId": str(i), "title": "t" * 200} for i in range(2000)]})
+    
+    items, parser = _stream(text[i:i + 1024] for i in range(0, len(text), 1024))
+    
+    assert len(items) == 2000
+    assert parser.peak_text_bytes < len(text) // 50
+
+
+def test_items_after_split_item_not_delayed():
+    parser = JSONArrayStream("data")
+    split = '{"id": 0, "text": "' + "x" * 1000 + '"}'
+    assert parser.feed('{"data": [' + split[:300]) == []
+    assert parser.feed(split[300:] + ",") == [{"id": 0, "text": "x" * 1000}]
+    
+    # Short pieces after the split item each complete an item at once
+    for i in range(1, 20):
+        assert parser.feed(f'{{"id": {i}}},') == [{"id": i}]
+    assert parser.feed('{"id": 20}]}') == [{"id": 20}]
+    assert parser.close() == []
@@ -0,0 +1,102 @@
+"""Shared-fetch plans must fetch exactly the union of the subscriptions."""
+import itertools
+import random
+import uuid
+
+import pytest
+
+from src.database.models import IngestionSubscription
+from src.ingestion.plans import build_plan, subscription_filters
+from src.ingestion.watermarks import filters_match
+
+NAICS = ["541511", "541512", "541330", "236220"]
+NOTICE_TYPES = ["o", "k", "p"]
+SET_ASIDES = ["SBA", "8A", "WOSB"]
+
+
+def _subscription(naics=(), notice_types=(), set_asides=(), organization_id=None):
+    return IngestionSubscription(
+        id=uuid.uuid4(),
+        organization_id=organization_id or uuid.uuid4(),
+        naics_codes=list(naics),
+        notice_types=list(notice_types),
+        set_aside_codes=list(set_asides),
+    )
+
+
+def _notices():
+    """One notice per combination of field values, including blanks."""
+    for naics, notice_type, set_aside in itertools.product(
+        NAICS + [""], NOTICE_TYPES + [""], SET_ASIDES + [""]
+    ):
+        yield {"naicsCode": naics, "type": notice_type, "typeOfSetAside": set_aside}
+
+
+def _check_plan(subscriptions):
+    plan = build_plan(subscriptions)
+    
+    served = [sid for query in plan for sid in query.subscription_ids]
+    assert sorted(served) == sorted(str(s.id) for s in subscriptions)
+    for notice in _notices():
+        wanted = any(filters_match(subscription_filters(s), notice) for s in subscriptions)
+        fetched = any(filters_match(query.filters, notice) for query in plan)
+        assert wanted == fetched, notice
+    # Each query's subscribers are covered by its filters
+    by_id = {str(s.id): s for s in subscriptions}
+    for query in plan:
+        for sid in query.subscription_ids:
+            for notice in _notices():
+                if filters_match(subscription_filters(by_id[sid]), notice):
+                    assert filters_match(query.filters, notice)
+    return plan
+
+
+def test_identical_filters_collapse():
+    organization_id = uuid.uuid4()
+    subscriptions = [
+        _subscription(["541511", " 541512"], ["o"], organization_id=organization_id),
+        _subscription(["541512", "541511"], ["o", "o"], organization_id=organization_id),
+        _subscription(["541511", "541512"], ["o"]),
+    ]
+    plan = _check_plan(subscriptions)
+    
+    assert len(plan) == 1
+    assert len(plan[0].subscription_ids) == 3
+    assert len(plan[0].organization_ids) == 2
+
+
+def test_covered_query_dropped():
+    plan = _check_plan([_subscription(["541511"], ["o"]), _subscription(["541511"])])
+    assert [query.filters["notice_types"] for query in plan] == [[]]
+
+
+def test_single_dimension_difference_merged():
+    plan = _check_plan([_subscription(["541511"], ["o"]), _subscription(["541330"], ["o"])])
+    assert len(plan) == 1
+    assert plan[0].filters["naics_codes"] == ["541330", "541511"]
+
+
+def test_two_dimension_difference_kept_apart():
+    plan = _check_plan([_subscription(["541511"], ["o"]), _subscription(["541330"], ["k"])])
+    assert len(plan) == 2
+
+
+def test_empty_plan():
+    assert build_plan([]) == []
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_random_subscriptions(seed):
+    rng = random.Random(seed)
+    subscriptions = [
+        _subscription(
+            rng.sample(NAICS, rng.randint(0, 2)),
+            rng.sample(NOTICE_TYPES, rng.randint(0, 2)),
+            rng.sample(SET_ASIDES, rng.randint(0, 1)),
+        )
+        for _ in range(rng.randint(1, 12))
+    ]
+    plan = _check_plan(subscriptions)
+    
+    assert len(plan) <= len(subscriptions)
+    assert [query.key for query in build_plan(subscriptions)] == [query.key for query in plan]
@@ -0,0 +1,157 @@
+"""Deadline tiers and the refresh request budget."""
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.ingestion import refresh
+from src.ingestion.refresh import RECENT_CHANGE, RefreshBudget, RefreshScheduler, refresh_schedule
+
+NOW = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("deadline, tier, interval", [
+    (NOW + timedelta(hours=1), "closing", timedelta(hours=2)),
+    (NOW + timedelta(days=3), "closing", timedelta(hours=2)),
+    (NOW + timedelta(days=3, seconds=1), "hot", timedelta(hours=8)),
+    (NOW + timedelta(days=14), "hot", timedelta(hours=8)),
+    (NOW + timedelta(days=30), "warm", timedelta(days=1)),
+    (NOW + timedelta(days=45), "warm", timedelta(days=1)),
+    (NOW + timedelta(days=46), "cold", timedelta(days=7)),
+    (NOW - timedelta(minutes=1), "cold", timedelta(days=7)),
+    (None, "cold", timedelta(days=7)),
+])
+def test_tier_from_deadline(deadline, tier, interval):
+    assert refresh_schedule(deadline, None, NOW)[0] == tier
+    assert refresh_schedule(deadline, None, NOW)[2] == NOW + interval
+
+
+def test_priority_follows_tier_order():
+    priorities = [
+        refresh_schedule(NOW + timedelta(days=days), None, NOW)[1]
+        for days in (1, 10, 40, 100)
+    ]
+    assert priorities == [0, 1, 2, 3]
+
+
+def test_recent_change_moves_one_tier_hotter():
+    warm = NOW + timedelta(days=30)
+    
+    assert refresh_schedule(warm, NOW - RECENT_CHANGE, NOW)[0] == "hot"
+    assert refresh_schedule(warm, NOW - RECENT_CHANGE - timedelta(seconds=1), NOW)[0] == "warm"
+    assert refresh_schedule(None, NOW - timedelta(hours=1), NOW)[0] == "warm"
+    assert refresh_schedule(NOW + timedelta(hours=1), NOW, NOW)[:2] == ("closing", 0)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_budget_caps_burst_and_refills(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    budget = RefreshBudget(requests_per_hour=1200)
+    
+    # Five minutes' worth to start with, and never more
+    assert budget.take(500) == 100
+    assert budget.take(1) == 0
+    
+    clock.now += 60
+    assert budget.take(500) == 20
+    
+    clock.now += 3600
+    assert budget.take(500) == 100
+
+
+def test_zero_budget(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    budget = RefreshBudget(requests_per_hour=0)
+    
+    assert budget.take(5) == 0
+    clock.now += 3600
+    assert budget.take(5) == 0
+
+
+def test_small_budget_still_sends(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    budget = RefreshBudget(requests_per_hour=6)
+    
+    assert budget.take(5) == 1
+    clock.now += 600
+    assert budget.take(5) == 1
+
+
+def test_refund_returns_unspent_tokens(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    budget = RefreshBudget(requests_per_hour=1200)
+    
+    assert budget.take(100) == 100
+    budget.refund(30)
+    assert budget.take(100) == 30
+    budget.refund(500)
+    assert budget.take(500) == 100
+
+
+async def test_sync_retracks_retired_active_notices():
+    statements = []
+    
+    class Session:
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *exc_info):
+            return False
+        
+        async def execute(self, statement, params=None):
+            statements.append(statement)
+            if len(statements) == 1:
+                return [SimpleNamespace(
+                    id=uuid.uuid4(), source_id="n1", response_deadline=NOW + timedelta(days=1), updated_at=NOW,
+                )]
+            return None
+        
+        async def commit(self):
+            pass
+    
+    scheduler = RefreshScheduler(Session, requests_per_hour=60, tick_seconds=60)
+    assert await scheduler.sync() == 1
+    
+    select_sql, upsert_sql = (str(s.compile(dialect=postgresql.dialect())) for s in statements)
+    assert "notice_refresh.retired_at IS NOT NULL" in select_sql
+    assert "ON CONFLICT (opportunity_id) DO UPDATE" in upsert_sql
+    assert "retired_at = %(param_1)s" in upsert_sql
+
+
+async def test_refresh_due_refunds_unclaimed_tokens(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    
+    class Session:
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *exc_info):
+            return False
+    
+    async def count_due(db, now):
+        return 10
+    
+    async def claim(db, limit, now):
+        # Every due entry is locked by another scheduler
+        return []
+    
+    scheduler = RefreshScheduler(Session, requests_per_hour=1200, tick_seconds=60)
+    scheduler._count_due = count_due
+    scheduler._claim = claim
+    
+    assert await scheduler.refresh_due() == {"refreshed": 0, "changed": 0, "missing": 0, "failed": 0}
+    assert scheduler.budget.take(500) == 100
@@ -0,0 +1,44 @@
+"""Vectorized relevance scoring must match the scalar scorer exactly."""
+import numpy as np
+
+from src.services.relevance_matrix import OpportunityFeatures
+
+
+async def test_score_matrix_matches_calculate_score(scorer, organizations, opportunities):
+    matrix = scorer.score_matrix(organizations, opportunities)
+
+    assert matrix.overall.shape == (len(organizations), len(opportunities))
+    for i, organization in enumerate(organizations):
+        for j, opportunity in enumerate(opportunities):
+            expected = await scorer.calculate_score(organization, opportunity)
+            assert matrix.result(i, j) == expected
+
+
+def test_prebuilt_features_match_model_lists(scorer, organizations, opportunities):
+    features = OpportunityFeatures.build(scorer, opportunities)
+
+    from_features = scorer.score_matrix(organizations, features)
+    from_models = scorer.score_matrix(organizations, opportunities)
+    assert np.array_equal(from_features.overall, from_models.overall)
+
+
+def test_empty_inputs(scorer, organizations, opportunities):
+    assert scorer.score_matrix([], opportunities).overall.shape == (0, len(opportunities))
+    assert scorer.score_matrix(organizations, []).overall.shape == (len(organizations), 0)
+
+
+async def test_weight_profiles_match_calculate_score(scorer, organizations, opportunities):
+    default = scorer.score_matrix(organizations[:1], opportunities).overall[0]
+    organizations[0].scoring_weights = {
+        "naics": 0.1, "semantic": 0.5, "geographic": 0.1, "size": 0.2, "past_performance": 0.1,
+    }
+    organizations[1].scoring_weights = {
+        "naics": 1.0, "semantic": 0.0, "geographic": 0.0, "size": 0.0, "past_performance": 0.0,
+    }
+    matrix = scorer.score_matrix(organizations[:3], opportunities)
+    
+    assert not np.array_equal(matrix.overall[0], default)
+    for i, organization in enumerate(organizations[:3]):
+        for j, opportunity in enumerate(opportunities):
+            expected = await scorer.calculate_score(organization, opportunity)
+            assert matrix.result(i, j) == expected
@@ -0,0 +1,69 @@
+"""SAM.gov ingest pipeline checkpointing."""
+from unittest.mock import MagicMock
+
+from src.ingestion.sam_gov import SAMGovIngester, _PageBatch
+
+TOTAL = 6
+PAGE_SIZE = 2
+
+
+def _ingester(failing_offsets):
+    client = MagicMock()
+    client.metrics.summary.return_value = {}
+    ingester = SAMGovIngester(api_key="test", db_session=MagicMock(), client=client, hydrate_descriptions=False)
+    ingester.PAGE_SIZE = PAGE_SIZE
+    
+    async def fetch_batch(params, parse=None):
+        offset = params["offset"]
+        items = [{"noticeId": f"n{offset + i}", "title": "t"} for i in range(params["limit"])]
+        return _PageBatch(offset=offset, items=items), TOTAL
+    
+    async def store(rows, changed_ids=None):
+        # Rows of a failing page all fail, as when its upsert batch rolls back
+        page_offset = int(rows[0]["source_id"][1:]) // PAGE_SIZE * PAGE_SIZE
+        failed = len(rows) if page_offset in failing_offsets else 0
+        return {"inserted": len(rows) - failed, "updated": 0, "unchanged": 0, "failed": failed}
+    
+    ingester._fetch_batch = fetch_batch
+    ingester._store_opportunities = store
+    return ingester
+
+
+async def test_failed_store_not_checkpointed():
+    checkpoints = []
+    
+    async def on_page(progress):
+        checkpoints.append(progress)
+    
+    stats = await _ingester({2}).ingest(paginate=True, on_page=on_page)
+    
+    assert stats["failed"] == PAGE_SIZE
+    assert checkpoints[-1]["completed_offsets"] == [0, 4]
+    # The failed page's failures are counted again when it is retried
+    assert "failed" not in checkpoints[-1]["stats"]
+
+
+async def test_resume_fetches_only_failed_pages():
+    fetched = []
+    ingester = _ingester(set())
+    fetch_batch = ingester._fetch_batch
+    
+    async def recording_fetch(params, parse=None):
+        fetched.append(params["offset"])
+        return await fetch_batch(params, parse)
+    
+    ingester._fetch_batch = recording_fetch
+    checkpoints = []
+    
+    async def on_page(progress):
+        checkpoints.append(progress)
+    
+    stats = await ingester.ingest(
+        paginate=True, checkpoint={"completed_offsets": [0, 4], "stats": {}}, on_page=on_page
+    )
+    
+    # The first page is always fetched for its total
+    assert sorted(fetched) == [0, 2]
+    assert stats["failed"] == 0
+    assert checkpoints[-1]["completed_offsets"] == [0, 2, 4]
+    assert ingester.last_window_complete
@@ -0,0 +1,124 @@
+"""Contract Opportunities extract rows must map like API notices."""
+from src.ingestion.sam_gov_csv import COLUMN_LENGTHS, STAGE_COLUMNS, notice_from_csv, prepare_chunk
+
+RECORD = {
+    "NoticeId": "abc123",
+    "Title": "Cloud Migration Support ",
+    "Sol#": "W91-26-R-0001",
+    "Department/Ind.Agency": "DEPT OF DEFENSE",
+    "Sub-Tier": "DEPT OF THE ARMY",
+    "Office": "W6QK ACC-APG",
+    "PostedDate": "2026-01-05 13:35:41.08-05",
+    "Type": "Solicitation",
+    "BaseType": "Solicitation",
+    "ArchiveType": "autocustom",
+    "ArchiveDate": "2026-03-01",
+    "SetASide": "Total Small Business Set-Aside (FAR 19.5)",
+    "SetASideCode": "SBA",
+    "ResponseDeadLine": "2026-02-01 17:00:00-05",
+    "NaicsCode": "541512",
+    "ClassificationCode": "D302",
+    "PopCity": "Aberdeen",
+    "PopState": "MD",
+    "PopZip": "21005",
+    "PopCountry": "USA",
+    "Active": "Yes",
+    "AwardNumber": "",
+    "Awardee": "",
+    "PrimaryContactFullname": "Jane Smith",
+    "PrimaryContactEmail": "jane.smith@example.mil",
+    "PrimaryContactPhone": "555-0100",
+    "SecondaryContactFullname": "",
+    "SecondaryContactEmail": "",
+    "Description": "<p>Migrate <b>legacy</b> systems.</p>",
+    "Link": "https://sam.gov/opp/abc123/view",
+}
+
+HEADER = list(RECORD)
+
+
+def _values(**changes):
+    return [changes.get(name, value) for name, value in RECORD.items()]
+
+
+def test_notice_mapping():
+    notice = notice_from_csv(RECORD)
+    
+    assert notice["noticeId"] == "abc123"
+    assert notice["title"] == "Cloud Migration Support"
+    assert notice["solicitationNumber"] == "W91-26-R-0001"
+    assert notice["fullParentPathName"] == "DEPT OF DEFENSE.DEPT OF THE ARMY.W6QK ACC-APG"
+    assert notice["postedDate"] == "2026-01-05"
+    assert notice["archiveDate"] == "2026-03-01"
+    assert notice["responseDeadLine"] == "2026-02-01T17:00:00-05"
+    assert notice["typeOfSetAside"] == "SBA"
+    assert notice["placeOfPerformance"]["state"] == {"code": "MD"}
+    assert notice["pointOfContact"] == [{
+        "type": "primary",
+        "title": None,
+        "fullName": "Jane Smith",
+        "email": "jane.smith@example.mil",
+        "phone": "555-0100",
+        "fax": None,
+    }]
+    assert notice["award"] is None
+    assert "<" not in notice["description"]
+    assert "legacy" in notice["description"]
+
+
+def test_award_and_missing_columns():
+    notice = notice_from_csv({"NoticeId": "x", "Awardee": "Acme Corp", "Award$": "125000"})
+    
+    assert notice["award"] == {
+        "number": None, "date": None, "amount": "125000", "awardee": {"name": "Acme Corp"},
+    }
+    assert notice["title"] is None
+    assert notice["fullParentPathName"] is None
+    assert notice["pointOfContact"] == []
+
+
+def test_prepare_chunk_rows():
+    rows, failed = prepare_chunk(HEADER, [_values()])
+    
+    assert failed == 0
+    row = dict(zip(STAGE_COLUMNS, rows[0]))
+    assert row["source_id"] == "abc123"
+    assert row["source_system"] == "sam.gov"
+    assert row["naics_code"] == "541512"
+    assert row["place_of_performance_state"] == "MD"
+    assert row["point_of_contact_email"] == "jane.smith@example.mil"
+    assert row["response_deadline"].year == 2026
+    assert isinstance(row["raw_data"], str) and isinstance(row["field_hashes"], str)
+
+
+def test_prepare_chunk_failures_and_duplicates():
+    rows, failed = prepare_chunk(HEADER, [
+        _values(Title="first"),
+        _values(NoticeId=" "),
+        _values(NoticeId="other"),
+        _values(Title="second"),
+    ])
+    
+    assert failed == 1
+    by_id = {row[STAGE_COLUMNS.index("source_id")]: row for row in rows}
+    assert sorted(by_id) == ["abc123", "other"]
+    assert by_id["abc123"][STAGE_COLUMNS.index("title")] == "second"
+
+
+def test_prepare_chunk_hashes_are_stable():
+    first, _ = prepare_chunk(HEADER, [_values()])
+    second, _ = prepare_chunk(HEADER, [_values()])
+    changed, _ = prepare_chunk(HEADER, [_values(Title="Amended title")])
+    
+    content_hash = STAGE_COLUMNS.index("content_hash")
+    assert first[0][content_hash] == second[0][content_hash]
+    assert changed[0][content_hash] != first[0][content_hash]
+
+
+def test_prepare_chunk_truncates_long_values():
+    length = COLUMN_LENGTHS["solicitation_number"]
+    
+    rows, failed = prepare_chunk(HEADER, [_values(**{"Sol#": "9" * (length + 20)})])
+    
+    assert failed == 0
+    assert rows[0][STAGE_COLUMNS.index("solicitation_number")] == "9" * length
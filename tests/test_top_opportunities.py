@@ -0,0 +1,75 @@
+"""Bounded top-k ranking must return the best k of the full score matrix."""
+import uuid
+
+import numpy as np
+import pytest
+
+from src.services.feature_cache import FeatureCache
+from src.services.relevance_matrix import OpportunityFeatures, top_opportunities
+
+
+def _check_top(scorer, organization, features, k, min_score=0.0, mask=None):
+    full = scorer.score_matrix([organization], features)
+    overall = full.overall[0]
+    eligible = overall >= min_score
+    if mask is not None:
+        eligible &= mask
+    best = np.sort(overall[eligible])[::-1][:k]
+    
+    top = top_opportunities(scorer, organization, features, k, min_score=min_score, mask=mask)
+    
+    # Results carry scores rounded as stored
+    assert [result.overall_score for _, result in top.results] == [round(float(s), 4) for s in best]
+    columns = {id(opportunity): j for j, opportunity in enumerate(features.opportunities)}
+    for opportunity, result in top.results:
+        j = columns[id(opportunity)]
+        assert eligible[j]
+        assert result == full.result(0, j)
+    assert top.scored <= top.considered
+    return top
+
+
+@pytest.mark.parametrize("k", [1, 10, 50])
+def test_top_k_matches_full_matrix(scorer, organizations, opportunities, k):
+    features = OpportunityFeatures.build(scorer, opportunities)
+    for organization in organizations:
+        _check_top(scorer, organization, features, k)
+
+
+def test_min_score_and_mask(scorer, organizations, opportunities):
+    features = OpportunityFeatures.build(scorer, opportunities)
+    mask = np.random.default_rng(3).random(features.size) < 0.5
+    for organization in organizations:
+        top = _check_top(scorer, organization, features, 20, min_score=0.45, mask=mask)
+        assert top.considered == int(mask.sum())
+
+
+def test_k_larger_than_candidates(scorer, organizations, opportunities):
+    features = OpportunityFeatures.build(scorer, opportunities[:7])
+    top = _check_top(scorer, organizations[0], features, 25)
+    assert len(top.results) == 7
+
+
+def test_take_selects_columns(scorer, organizations, opportunities):
+    features = OpportunityFeatures.build(scorer, opportunities)
+    # Out of order, repeated, and including opportunities without descriptions
+    columns = np.array([5, 0, 399, 5] + [j for j, o in enumerate(opportunities) if not o.description][:3])
+    taken = features.take(columns)
+    
+    assert taken.opportunities == [opportunities[j] for j in columns]
+    expected = scorer.score_matrix(organizations, [opportunities[j] for j in columns]).overall
+    assert np.array_equal(scorer.score_matrix(organizations, taken).overall, expected)
+    assert taken.take(np.array([], dtype=np.int64)).size == 0
+
+
+def test_build_with_private_cache(scorer, organizations, opportunities):
+    for j, opportunity in enumerate(opportunities):
+        opportunity.id = uuid.UUID(int=j + 1)
+    private = FeatureCache(maxsize=0)
+    
+    features = OpportunityFeatures.build(scorer, opportunities, private)
+    
+    assert len(scorer.features) == 0 and len(private) == 0
+    assert private.misses == len(opportunities)
+    expected = scorer.score_matrix(organizations, opportunities).overall
+    assert np.array_equal(scorer.score_matrix(organizations, features).overall, expected)
@@ -0,0 +1,79 @@
+"""Weight profile validation and SQL re-weighting."""
+import uuid
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.database.models import Organization
+from src.services.feature_cache import FeatureCache
+from src.services.relevance_scorer import RelevanceScorer
+from src.services.weight_profiles import (
+    COMPONENTS, normalize_weights, profile_weights, rerank_stored_scores, weighted_overall
+)
+
+WEIGHTS = {"naics": 2, "semantic": 4, "geographic": 1, "size": 2, "past_performance": 1}
+
+
+def test_normalize_scales_to_one():
+    normalized = normalize_weights(WEIGHTS)
+    
+    assert list(normalized) == list(COMPONENTS)
+    assert normalized["semantic"] == pytest.approx(0.4)
+    assert sum(normalized.values()) == pytest.approx(1.0)
+    assert normalize_weights(normalized) == pytest.approx(normalized)
+
+
+@pytest.mark.parametrize("weights", [
+    {**WEIGHTS, "price": 1},
+    {name: WEIGHTS[name] for name in COMPONENTS[:-1]},
+    {**WEIGHTS, "size": -1},
+    dict.fromkeys(COMPONENTS, 0),
+])
+def test_normalize_rejects(weights):
+    with pytest.raises(ValueError):
+        normalize_weights(weights)
+
+
+def test_weighted_overall_sql():
+    expression = weighted_overall(normalize_weights(WEIGHTS))
+    sql = str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    
+    assert sql.startswith("round(")
+    assert "coalesce(aureon.relevance_scores.semantic_score, 0) * 0.4" in sql
+    assert sql.endswith(", 4)")
+
+
+def test_weighted_overall_uses_exact_decimals():
+    expression = weighted_overall(dict.fromkeys(COMPONENTS, 0.1))
+    values = [bind.value for bind in expression.compile().binds.values()]
+    
+    assert Decimal("0.1") in values
+    assert all(not isinstance(value, float) for value in values)
+
+
+async def test_rerank_statement():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    await rerank_stored_scores(session, uuid.uuid4(), normalize_weights(WEIGHTS), limit=5, min_score=0.6)
+    
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    # Selected, filtered on and ordered by
+    assert sql.count("round(") == 3
+    assert "ORDER BY round(" in sql
+    assert "LIMIT" in sql
+
+
+def test_profile_weights_default_to_scorer():
+    custom = normalize_weights(WEIGHTS)
+    scorer = RelevanceScorer(weights=custom, feature_cache=FeatureCache())
+    organization = Organization(name="Org")
+    
+    weights = profile_weights(scorer, organization)
+    assert weights == custom
+    weights["naics"] = 0
+    assert scorer.weights == custom
+    
+    organization.scoring_weights = dict.fromkeys(COMPONENTS, 0.2)
+    assert profile_weights(scorer, organization) == organization.scoring_weights